@@ -0,0 +1,309 @@
+"""
+Pre-generated skill quiz bank for Agent 1 verification and onboarding.
+
+Quiz endpoints used to wait on Gemini for every question, even though the
+same popular skills (Python, React, Docker...) are requested constantly.
+The bank keeps a stock of questions per (skill, level):
+
+- draw() samples a random question the user has not seen yet (milliseconds)
+- When stock the user hasn't seen runs low, a background job tops the
+  bank back up with one batched Gemini call
+- Only a completely cold (skill, level) - or a user who has seen every
+  question - generates on the request path, and those questions are banked
+
+Key Schema (Redis backend):
+- quiz_bank:{skill}:{level} -> HASH question_id -> JSON question (30 day TTL, refreshed on refill)
+- quiz_seen:{user_id}:{skill}:{level} -> SET of question ids served to the user (180 day TTL)
+"""
+
+import os
+import json
+import random
+import hashlib
+import logging
+import threading
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from core.redis_client import redis_manager
+from services.job_queue import job_queue, TERMINAL_STATUSES
+from .tools import generate_skill_quiz_batch
+
+logger = logging.getLogger("QuizBank")
+
+# TTL Constants
+TTL_QUIZ_BANK = int(timedelta(days=30).total_seconds())   # 30 days (questions rotate out)
+TTL_QUIZ_SEEN = int(timedelta(days=180).total_seconds())  # 180 days
+
+QUIZ_BANK_SIZE = int(os.getenv("QUIZ_BANK_SIZE", "30"))
+QUIZ_BANK_LOW_WATERMARK = int(os.getenv("QUIZ_BANK_LOW_WATERMARK", "5"))
+QUIZ_BANK_BATCH_SIZE = int(os.getenv("QUIZ_BANK_BATCH_SIZE", "10"))
+QUIZ_BANK_INLINE_BATCH = int(os.getenv("QUIZ_BANK_INLINE_BATCH", "3"))
+QUIZ_BANK_PREWARM_SKILLS = [
+    s.strip() for s in os.getenv(
+        "QUIZ_BANK_PREWARM_SKILLS",
+        "Python,JavaScript,TypeScript,React,Node.js,SQL,Docker,AWS,Java,Git"
+    ).split(",") if s.strip()
+]
+
+QUIZ_LEVELS = ("beginner", "intermediate", "advanced")
+# Onboarding difficulty mix: 2 easy, 2 medium, 1 challenging
+ONBOARDING_LEVELS = ("beginner", "beginner", "intermediate", "intermediate", "advanced")
+
+REFILL_JOB_TYPE = "quiz_bank_refill"
+
+
+def question_id(question: dict) -> str:
+    """Stable id from the normalized question text (dedupes regenerated questions)."""
+    text = " ".join(question["question"].lower().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+# Backends
+# =============================================================================
+
+class LocalQuizBankBackend:
+    """In-process backend. Not shared across workers; used for dev and tests."""
+
+    def __init__(self):
+        self._banks: Dict[str, Dict[str, dict]] = {}
+        self._seen: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def questions(self, bank_key: str) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self._banks.get(bank_key, {}))
+
+    def add(self, bank_key: str, items: Dict[str, dict]) -> None:
+        with self._lock:
+            self._banks.setdefault(bank_key, {}).update(items)
+
+    def seen(self, seen_key: str) -> Set[str]:
+        with self._lock:
+            return set(self._seen.get(seen_key, set()))
+
+    def mark_seen(self, seen_key: str, qids: List[str]) -> None:
+        with self._lock:
+            self._seen.setdefault(seen_key, set()).update(qids)
+
+
+class RedisQuizBankBackend:
+    """Shared backend - every API/worker replica serves from the same stock."""
+
+    def _client(self):
+        client = redis_manager.get_client()
+        if not client:
+            raise RuntimeError("Redis unavailable for quiz bank")
+        return client
+
+    def questions(self, bank_key: str) -> Dict[str, dict]:
+        raw = self._client().hgetall(bank_key) or {}
+        return {
+            (k.decode() if isinstance(k, bytes) else k): json.loads(v)
+            for k, v in raw.items()
+        }
+
+    def add(self, bank_key: str, items: Dict[str, dict]) -> None:
+        pipe = self._client().pipeline()
+        pipe.hset(bank_key, mapping={qid: json.dumps(q) for qid, q in items.items()})
+        pipe.expire(bank_key, TTL_QUIZ_BANK)
+        pipe.execute()
+
+    def seen(self, seen_key: str) -> Set[str]:
+        return {m.decode() if isinstance(m, bytes) else m for m in self._client().smembers(seen_key)}
+
+    def mark_seen(self, seen_key: str, qids: List[str]) -> None:
+        pipe = self._client().pipeline()
+        pipe.sadd(seen_key, *qids)
+        pipe.expire(seen_key, TTL_QUIZ_SEEN)
+        pipe.execute()
+
+
+class QuizBank:
+    """Stocked question pools per (skill, level) with per-user no-repeat sampling."""
+
+    def __init__(self, backend=None, size: int = QUIZ_BANK_SIZE, low_watermark: int = QUIZ_BANK_LOW_WATERMARK):
+        self._backend = backend
+        self.size = size
+        self.low_watermark = low_watermark
+        self.stats = {"served": 0, "cold_misses": 0, "refills_queued": 0}
+
+    @property
+    def backend(self):
+        """Resolve lazily so REDIS_URL is read after load_dotenv()."""
+        if self._backend is None:
+            if redis_manager.get_client():
+                self._backend = RedisQuizBankBackend()
+                logger.info("✅ Quiz bank using Redis backend")
+            else:
+                self._backend = LocalQuizBankBackend()
+                logger.info("⚠️ Quiz bank using local in-process backend")
+        return self._backend
+
+    # =========================================================================
+    # Keys
+    # =========================================================================
+
+    @staticmethod
+    def _slug(skill: str, level: str) -> str:
+        return f"{' '.join(skill.lower().split())}:{level.lower()}"
+
+    def _bank_key(self, skill: str, level: str) -> str:
+        return f"quiz_bank:{self._slug(skill, level)}"
+
+    def _seen_key(self, user_id: str, skill: str, level: str) -> str:
+        return f"quiz_seen:{user_id}:{self._slug(skill, level)}"
+
+    # =========================================================================
+    # Stock
+    # =========================================================================
+
+    def stock(self, skill: str, level: str) -> int:
+        return len(self.backend.questions(self._bank_key(skill, level)))
+
+    def refill(self, skill: str, level: str, target: Optional[int] = None, max_batches: int = 3) -> int:
+        """
+        Generate questions until the bank holds `target` (default: bank size).
+
+        Returns the number of new questions added.
+        """
+        target = target or self.size
+        bank_key = self._bank_key(skill, level)
+        added = 0
+        for _ in range(max_batches):
+            existing = self.backend.questions(bank_key)
+            missing = target - len(existing)
+            if missing <= 0:
+                break
+            batch = generate_skill_quiz_batch(
+                skill, level,
+                count=min(QUIZ_BANK_BATCH_SIZE, missing),
+                avoid=[q["question"] for q in existing.values()]
+            )
+            new = {}
+            for question in batch:
+                qid = question_id(question)
+                if qid not in existing:
+                    new[qid] = {**question, "skill": skill, "level": level}
+            if not new:
+                break
+            self.backend.add(bank_key, new)
+            added += len(new)
+        logger.info(f"🧠 Quiz bank {skill}/{level}: +{added} questions")
+        return added
+
+    def schedule_refill(self, skill: str, level: str) -> Optional[str]:
+        """Queue a background top-up unless one is already pending for this bank."""
+        job_id = f"{REFILL_JOB_TYPE}:{self._slug(skill, level)}"
+        try:
+            existing = job_queue.get(job_id)
+            if existing and existing["status"] not in TERMINAL_STATUSES:
+                return None
+            self.stats["refills_queued"] += 1
+            return job_queue.submit(REFILL_JOB_TYPE, {"skill": skill, "level": level}, max_retries=1, job_id=job_id)
+        except Exception as e:
+            logger.warning(f"Quiz bank refill scheduling failed for {skill}/{level}: {e}")
+            return None
+
+    def prewarm(self, skills: Optional[List[str]] = None) -> List[str]:
+        """Queue refills for popular skills at every level whose stock is low."""
+        job_ids = []
+        for skill in skills or QUIZ_BANK_PREWARM_SKILLS:
+            for level in QUIZ_LEVELS:
+                if self.stock(skill, level) < self.size:
+                    job_id = self.schedule_refill(skill, level)
+                    if job_id:
+                        job_ids.append(job_id)
+        return job_ids
+
+    # =========================================================================
+    # Serving
+    # =========================================================================
+
+    def draw(self, user_id: str, skill: str, level: str = "intermediate") -> Optional[Dict[str, Any]]:
+        """
+        Serve a random question this user hasn't seen for (skill, level).
+
+        Generates inline only when the bank has nothing unseen left for the
+        user; returns None if that generation fails too.
+        """
+        bank_key = self._bank_key(skill, level)
+        seen_key = self._seen_key(user_id, skill, level)
+
+        bank = self.backend.questions(bank_key)
+        unseen = sorted(set(bank) - self.backend.seen(seen_key))
+        if not unseen:
+            self.stats["cold_misses"] += 1
+            # Small inline batch keeps the wait close to a single question; the rest is queued
+            self.refill(skill, level, target=len(bank) + QUIZ_BANK_INLINE_BATCH, max_batches=1)
+            bank = self.backend.questions(bank_key)
+            unseen = sorted(set(bank) - self.backend.seen(seen_key))
+            if not unseen:
+                return None
+
+        qid = random.choice(unseen)
+        self.backend.mark_seen(seen_key, [qid])
+        self.stats["served"] += 1
+
+        if len(unseen) - 1 < self.low_watermark or len(bank) < self.size:
+            self.schedule_refill(skill, level)
+
+        return {"question_id": qid, **bank[qid]}
+
+    def draw_onboarding(self, user_id: str, skills: List[str], count: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Assemble an onboarding quiz from banked questions, spreading skills
+        round-robin over the easy/medium/challenging mix.
+
+        Returns None (after scheduling refills) when the bank can't cover it,
+        so the caller can fall back to live generation.
+        """
+        if not skills:
+            return None
+
+        questions = []
+        missing = False
+        for i, level in enumerate(ONBOARDING_LEVELS[:count]):
+            skill = skills[i % min(len(skills), 8)]
+            seen_key = self._seen_key(user_id, skill, level)
+            bank = self.backend.questions(self._bank_key(skill, level))
+            taken = {q["question_id"] for q in questions}
+            unseen = sorted(set(bank) - self.backend.seen(seen_key) - taken)
+            if not unseen:
+                self.schedule_refill(skill, level)
+                missing = True
+                continue
+            qid = random.choice(unseen)
+            questions.append({"question_id": qid, "seen_key": seen_key, **bank[qid]})
+
+        if missing:
+            self.stats["cold_misses"] += 1
+            return None
+
+        for q in questions:
+            self.backend.mark_seen(q.pop("seen_key"), [q["question_id"]])
+        self.stats["served"] += len(questions)
+
+        return [
+            {
+                "id": f"q{i + 1}",
+                "question": q["question"],
+                "options": q["options"],
+                "correct_index": q["correct_index"],
+                "skill_being_tested": q["skill"],
+            }
+            for i, q in enumerate(questions)
+        ]
+
+
+def quiz_bank_refill_job(payload: dict, ctx) -> dict:
+    """Job handler: top the (skill, level) bank back up to its target size."""
+    added = quiz_bank.refill(payload["skill"], payload["level"])
+    return {"added": added, "stock": quiz_bank.stock(payload["skill"], payload["level"])}
+
+
+job_queue.register(REFILL_JOB_TYPE, quiz_bank_refill_job)
+
+
+# Singleton instance
+quiz_bank = QuizBank()
@@ -1,6 +1,8 @@
 # backend/agents/agent_1_perception/service.py
 import os
+import time
 import uuid
+import asyncio
 import tempfile
 from pathlib import Path
 from datetime import datetime
@@ -15,9 +17,9 @@ from .tools import (
     extract_structured_data, 
     generate_embedding, 
     upload_resume_to_storage,
-    generate_skill_quiz,
     generate_onboarding_questions
 )
+from .quiz_bank import quiz_bank
 from .github_watchdog import (
     fetch_user_recent_activity,
     analyze_code_context,
@@ -26,7 +28,8 @@ from .github_watchdog import (
 )
 
 # Import ATS scoring from Agent 4
-from agents.agent_4_operative.tools import calculate_ats_score
+from agents.agent_4_operative.tools import calculate_ats_score, quick_ats_score
+from agents.agent_4_operative.service import enqueue_ats_refinement
 
 # Redis cache integration
 from services.cache_service import cache_service
@@ -51,6 +54,18 @@ class PerceptionService:
         """
         Handles the full flow: PDF Save -> Parse -> Gemini -> DB -> Pinecone
         Now also initializes skills_metadata for resume-extracted skills.
+
+        Stages run as a dependency graph rather than one after another:
+
+        - upload, parse: the saved file
+        - extract, ats_score: parse
+        - embedding: extract
+        - profile_upsert: upload, extract, ats_score
+        - vector_upsert: embedding, profile_upsert
+
+        Independent stages (upload / parse, extract / ATS, embedding /
+        profile upsert) overlap, and the profile row is still written before
+        the Pinecone vector. Per-stage durations are returned in `timings`.
         """
         # 1. Save File Temporarily
         temp_dir = Path(tempfile.gettempdir()) / "agent1_uploads"
@@ -61,17 +76,39 @@ class PerceptionService:
             content = await file.read()
             f.write(content)
 
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+
+        async def stage(name: str, fn, *args, **kwargs):
+            """Run a blocking stage in a worker thread, recording its duration."""
+            stage_start = time.perf_counter()
+            try:
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            finally:
+                timings[name] = round(time.perf_counter() - stage_start, 3)
+
+        tasks: List[asyncio.Task] = []
+
+        def start(name: str, fn, *args, **kwargs) -> asyncio.Task:
+            task = asyncio.create_task(stage(name, fn, *args, **kwargs))
+            tasks.append(task)
+            return task
+
         try:
-            # 2. Upload to Storage (Long-term)
-            resume_url = upload_resume_to_storage(str(pdf_path), user_id)
+            # 2. Upload to Storage (Long-term) - only the saved file is needed
+            upload = start("upload", upload_resume_to_storage, str(pdf_path), user_id)
 
-            # 3. Parse & Extract
-            resume_text = parse_pdf(str(pdf_path))
-            extracted_data = extract_structured_data(resume_text)
+            # 3. Parse, then Gemini extraction alongside the instant ATS score
+            #    (cached LLM result or local pre-score; a provisional score is
+            #    refined by the LLM in the background)
+            resume_text = await stage("parse", parse_pdf, str(pdf_path))
+            extract = start("extract", extract_structured_data, resume_text)
+            ats = start("ats_score", quick_ats_score, resume_text)
+            extracted_data = await extract
             
-            # 4. Generate Vector
+            # 4. Generate Vector (runs while the profile row is written)
             summary = extracted_data.get("experience_summary", resume_text[:500])
-            embedding = generate_embedding(summary)
+            embed = start("embedding", generate_embedding, summary)
 
             # 5. Build skills_metadata from extracted skills
             skills_list = extracted_data.get("skills", [])
@@ -87,17 +124,12 @@ class PerceptionService:
                     "last_seen": now
                 }
 
-            # 6. Calculate ATS Score for primary resume
-            print(f"📊 [Agent 1] Calculating ATS score for user: {user_id}")
-            try:
-                ats_result = await calculate_ats_score(resume_text)
-                ats_score = ats_result.get("score", 0)
-                print(f"✅ [Agent 1] ATS Score: {ats_score}")
-            except Exception as e:
-                print(f"⚠️ [Agent 1] ATS scoring failed: {e}")
-                ats_score = 0
+            ats_result = await ats
+            ats_score = ats_result.get("score", 0)
+            print(f"✅ [Agent 1] ATS Score: {ats_score}{' (provisional)' if ats_result.get('provisional') else ''}")
+            resume_url = await upload
 
-            # 7. Prepare DB Record (Supabase Profiles)
+            # 6. Prepare DB Record (Supabase Profiles)
             profile_data = {
                 "user_id": user_id,
                 "name": extracted_data.get("name"),
@@ -113,7 +145,12 @@ class PerceptionService:
             }
 
             # 7. Upsert to DB
-            self.supabase.table("profiles").upsert(profile_data).execute()
+            profile_upsert = start(
+                "profile_upsert",
+                lambda: self.supabase.table("profiles").upsert(profile_data).execute()
+            )
+            embedding = await embed
+            await profile_upsert
 
             # 8. Upsert to Pinecone (full profile schema)
             vector_data = {
@@ -137,11 +174,23 @@ class PerceptionService:
                     "type": "user_profile"
                 }
             }
-            self.index.upsert(vectors=[vector_data], namespace="users")
+            await stage("vector_upsert", self.index.upsert, vectors=[vector_data], namespace="users")
+            cache_service.bump_profile_version(user_id)
+
+            if ats_result.get("provisional"):
+                try:
+                    enqueue_ats_refinement(user_id, resume_text)
+                except Exception as e:
+                    print(f"⚠️ [Agent 1] ATS refinement not queued: {e}")
 
-            return profile_data
+            timings["total"] = round(time.perf_counter() - started, 3)
+            print(f"✅ [Agent 1] Resume ingested in {timings['total']}s: {timings}")
+            return {**profile_data, "timings": timings}
 
         finally:
+            # A failed stage leaves its siblings running; let them settle so
+            # none is still reading the temp file when it is removed
+            await asyncio.gather(*tasks, return_exceptions=True)
             if os.path.exists(pdf_path):
                 os.remove(pdf_path)
 
@@ -208,6 +257,7 @@ class PerceptionService:
                     set_metadata={"name": name},
                     namespace="users"
                 )
+                cache_service.bump_profile_version(user_id)
             except Exception as e:
                 print(f"[Profile] Pinecone update warning: {e}")
         
@@ -539,6 +589,7 @@ class PerceptionService:
                 set_metadata={"skills": final_skills},
                 namespace="users"
             )
+            cache_service.bump_profile_version(user_id)
         except Exception as e:
             print(f"[Watchdog] Pinecone update warning: {e}")
         
@@ -695,8 +746,8 @@ class PerceptionService:
             if existing_level:
                 level = existing_level
         
-        # Generate quiz using LangChain tool
-        quiz_data = generate_skill_quiz(skill_name, level)
+        # Serve from the pre-generated bank (generates inline only when cold)
+        quiz_data = quiz_bank.draw(user_id, skill_name, level)
         
         if not quiz_data:
             raise HTTPException(status_code=500, detail="Failed to generate quiz question")
@@ -786,6 +837,7 @@ class PerceptionService:
                 set_metadata={"skills": skills_list},
                 namespace="users"
             )
+            cache_service.bump_profile_version(user_id)
         except Exception as e:
             print(f"[Quiz] Pinecone update warning: {e}")
         
@@ -957,6 +1009,7 @@ class PerceptionService:
                 }
             }
             self.index.upsert(vectors=[vector_data], namespace="users")
+            cache_service.bump_profile_version(user_id)
         
         return {
             "status": "success",
@@ -995,8 +1048,8 @@ class PerceptionService:
                 detail="No skills or target roles found. Please complete profile setup first."
             )
         
-        # Generate questions using Gemini
-        questions = generate_onboarding_questions(skills, target_roles)
+        # Banked questions for the user's skills; live Gemini generation if the bank can't cover them
+        questions = quiz_bank.draw_onboarding(user_id, skills) or generate_onboarding_questions(skills, target_roles)
         
         if not questions or len(questions) < 5:
             raise HTTPException(
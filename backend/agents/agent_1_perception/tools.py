@@ -18,6 +18,9 @@ from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmb
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
+from services.llm_cache import llm_cache
+from services.structured_output import structured_output, langchain_call
+
 
 def parse_pdf(file_path: str) -> str:
     """Parse a PDF file and extract all text."""
@@ -212,6 +215,32 @@ def upload_resume_to_storage(pdf_path: str, user_id: str) -> str:
 # SKILL VERIFICATION: Quiz Generation
 # =============================================================================
 
+SKILL_QUIZ_MODEL = "gemini-2.5-flash"
+SKILL_QUIZ_TEMPERATURE = 0.7  # Slight creativity for varied questions
+
+SKILL_QUIZ_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "question": {"type": "STRING"},
+        "options": {"type": "ARRAY", "items": {"type": "STRING"}, "minItems": 4, "maxItems": 4},
+        "correct_index": {"type": "INTEGER"},
+        "explanation": {"type": "STRING"},
+    },
+    "required": ["question", "options", "correct_index", "explanation"],
+}
+
+
+# Sampled at SKILL_QUIZ_TEMPERATURE so repeat calls get fresh questions; reuse
+# happens in the quiz bank, not here
+llm_cache.register("perception.generate_skill_quiz", enabled=False)
+
+
+def _check_quiz_answer(result: dict) -> Optional[str]:
+    if result["correct_index"] not in range(4):
+        return f"Invalid correct_index: {result['correct_index']}"
+    return None
+
+
 def generate_skill_quiz(skill_name: str, level: str = "intermediate") -> Optional[Dict[str, Any]]:
     """
     Generate a multiple-choice quiz question for skill verification.
@@ -231,17 +260,13 @@ def generate_skill_quiz(skill_name: str, level: str = "intermediate") -> Optiona
     
     # 1. Initialize LLM
     llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",  # Switched to 1.5-flash
-        temperature=0.7,  # Slight creativity for varied questions
+        model=SKILL_QUIZ_MODEL,
+        temperature=SKILL_QUIZ_TEMPERATURE,
         google_api_key=api_key
     )
     
-    # 2. Setup Parser
-    parser = JsonOutputParser()
-    
-    # 3. Define Prompt
-    prompt = PromptTemplate(
-        template="""
+    # 2. Define Prompt (the response shape is enforced by SKILL_QUIZ_SCHEMA)
+    prompt = f"""
         You are a technical interviewer creating a skill verification quiz.
         
         Generate ONE multiple-choice question to verify someone's knowledge of: {skill_name}
@@ -256,48 +281,97 @@ def generate_skill_quiz(skill_name: str, level: str = "intermediate") -> Optiona
         - Provide exactly 4 options (only ONE correct)
         - Options should be plausible (no obviously wrong answers)
         
-        {format_instructions}
-        
         Return a JSON object with these exact keys:
         - "question": The question text
         - "options": Array of exactly 4 answer strings
         - "correct_index": Index (0-3) of the correct answer
         - "explanation": Brief explanation of why the answer is correct
-        """,
-        input_variables=["skill_name", "level"],
-        partial_variables={"format_instructions": parser.get_format_instructions()},
-    )
-    
-    # 4. Create Chain
-    chain = prompt | llm | parser
+        """
     
     try:
         print(f"[Quiz] Generating {level} question for: {skill_name}")
-        result = chain.invoke({
-            "skill_name": skill_name,
-            "level": level
-        })
-        
-        # Validate response structure
-        if not all(k in result for k in ["question", "options", "correct_index"]):
-            print(f"[Quiz] Invalid response structure: {result}")
-            return None
-            
-        if len(result.get("options", [])) != 4:
-            print(f"[Quiz] Expected 4 options, got {len(result.get('options', []))}")
-            return None
-            
-        if not isinstance(result.get("correct_index"), int) or result["correct_index"] not in range(4):
-            print(f"[Quiz] Invalid correct_index: {result.get('correct_index')}")
-            return None
-        
-        return result
+        return llm_cache.get_or_compute(
+            "perception.generate_skill_quiz", SKILL_QUIZ_MODEL, SKILL_QUIZ_TEMPERATURE, prompt,
+            lambda: structured_output.generate(
+                "perception.generate_skill_quiz",
+                langchain_call(llm, prompt),
+                schema=SKILL_QUIZ_SCHEMA,
+                validate=_check_quiz_answer,
+            ),
+        )
         
     except Exception as e:
         print(f"[Quiz] Generation Error: {e}")
         return None
 
 
+def generate_skill_quiz_batch(
+    skill_name: str,
+    level: str = "intermediate",
+    count: int = 10,
+    avoid: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Generate several distinct quiz questions for one (skill, level) in a single call.
+    
+    Used to stock the quiz bank. Not cached - every call should add new questions.
+    
+    Args:
+        skill_name: The skill to test
+        level: Difficulty level - "beginner", "intermediate", "advanced"
+        count: Number of questions to request
+        avoid: Existing question texts the new ones must not repeat
+        
+    Returns:
+        List of valid questions (question, options, correct_index, explanation);
+        empty if generation fails
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("⚠️ GEMINI_API_KEY not set")
+        return []
+    
+    llm = ChatGoogleGenerativeAI(
+        model=SKILL_QUIZ_MODEL,
+        temperature=SKILL_QUIZ_TEMPERATURE,
+        google_api_key=api_key
+    )
+    
+    existing = "\n".join(f"- {text}" for text in (avoid or [])[-30:]) or "- (none)"
+    prompt = f"""
+        You are a technical interviewer building a bank of skill verification questions.
+        
+        Generate {count} DISTINCT multiple-choice questions about: {skill_name}
+        Difficulty Level: {level}
+        
+        Requirements:
+        - Questions should test practical/applied knowledge, not just definitions
+        - For {level} level:
+          - beginner: Basic concepts and syntax
+          - intermediate: Common patterns and best practices  
+          - advanced: Edge cases, performance, architecture decisions
+        - Each question has exactly 4 plausible options and only ONE correct answer
+        - Cover different topics; do not repeat or rephrase these existing questions:
+        {existing}
+        
+        Return a JSON array of objects with keys "question", "options",
+        "correct_index" (0-3) and "explanation".
+        """
+    
+    try:
+        print(f"[Quiz] Generating {count} {level} questions for: {skill_name}")
+        questions = structured_output.generate(
+            "perception.generate_skill_quiz_batch",
+            langchain_call(llm, prompt),
+            schema={"type": "ARRAY", "items": SKILL_QUIZ_SCHEMA, "minItems": 1},
+        )
+        return [q for q in questions if _check_quiz_answer(q) is None]
+        
+    except Exception as e:
+        print(f"[Quiz] Batch Generation Error: {e}")
+        return []
+
+
 # =============================================================================
 # ONBOARDING: Generate 5 Quiz Questions
 # =============================================================================
@@ -30,6 +30,7 @@ from pinecone import Pinecone, ServerlessSpec
 
 # Import schemas and tools
 from .schemas import JobSchema, HackathonSchema, MarketNewsSchema, CronExecutionLog
+from services.cache_service import cache_service
 from .tools import (
     # Job providers
     search_jsearch_jobs,
@@ -687,6 +688,9 @@ class MarketIntelligenceService:
                     namespace=namespace or ""
                 )
                 print(f"[Market] Upserted {len(vectors)} vectors to Pinecone")
+                if not namespace:
+                    # Job records changed - invalidate pre-computed interview contexts
+                    cache_service.bump_job_versions([v["id"] for v in vectors])
                 return len(vectors)
             except Exception as e:
                 print(f"[Market] Pinecone upsert error: {str(e)}")
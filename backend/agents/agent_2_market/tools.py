@@ -16,13 +16,16 @@ import re
 import json
 import requests
 from typing import Any, Literal, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 
 # --- THIRD PARTY IMPORTS ---
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 import google.generativeai as genai
 
+from services.llm_cache import llm_cache
+from services.structured_output import structured_output, genai_call, StructuredOutputError
+
 # Load environment variables
 load_dotenv()
 
@@ -676,6 +679,13 @@ def search_serpapi_news(
 # 8. GEMINI LLM - Query Generation & Role Optimization
 # =============================================================================
 
+STRING_LIST_SCHEMA = {"type": "ARRAY", "items": {"type": "STRING"}}
+
+# Both prompts depend only on the role/skill sets, which repeat across nightly runs
+llm_cache.register("market.optimize_roles", ttl=int(timedelta(hours=24).total_seconds()))
+llm_cache.register("market.search_queries", ttl=int(timedelta(hours=24).total_seconds()))
+
+
 def optimize_roles_with_llm(
     roles: list[str],
     skills: list[str],
@@ -718,24 +728,16 @@ Return ONLY a JSON array of role strings, nothing else.
 Example: ["Frontend Developer", "Data Scientist", "DevOps Engineer"]
 """
         
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Parse JSON response
-        if response_text.startswith("[") or "{" in response_text:
-            # Extract JSON from response (might have markdown or extra text)
-            json_start = response_text.find("[")
-            json_end = response_text.rfind("]") + 1
-            if json_start >= 0 and json_end > json_start:
-                try:
-                    json_text = response_text[json_start:json_end]
-                    optimized_roles = json.loads(json_text)
-                    if isinstance(optimized_roles, list) and optimized_roles:
-                        # Don't validate against original list - LLM might clean/normalize names
-                        print(f"[LLM] Optimized roles: {optimized_roles}")
-                        return optimized_roles[:max_roles]
-                except json.JSONDecodeError as e:
-                    print(f"[LLM] JSON parse error: {e}")
+        optimized_roles = llm_cache.get_or_compute(
+            "market.optimize_roles", "gemini-2.5-flash", None, prompt,
+            lambda: structured_output.generate(
+                "market.optimize_roles", genai_call(model, prompt), schema=STRING_LIST_SCHEMA
+            ),
+        )
+        if optimized_roles:
+            # Don't validate against original list - LLM might clean/normalize names
+            print(f"[LLM] Optimized roles: {optimized_roles}")
+            return optimized_roles[:max_roles]
         
         # Fallback: return first N roles
         print("[LLM] Could not parse response, using fallback")
@@ -804,15 +806,18 @@ Return ONLY a JSON array of query strings."""
         }
         
         prompt = type_prompts.get(query_type, type_prompts["jobs"])
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Parse JSON response
-        if response_text.startswith("["):
-            queries = json.loads(response_text)
-            if isinstance(queries, list) and all(isinstance(q, str) for q in queries):
-                print(f"[LLM] Generated {query_type} queries: {queries}")
-                return queries[:5]
+        try:
+            queries = llm_cache.get_or_compute(
+                "market.search_queries", "gemini-2.5-flash", None, prompt,
+                lambda: structured_output.generate(
+                    "market.search_queries", genai_call(model, prompt), schema=STRING_LIST_SCHEMA
+                ),
+            )
+        except StructuredOutputError:
+            queries = []
+        if queries:
+            print(f"[LLM] Generated {query_type} queries: {queries}")
+            return queries[:5]
         
         # Fallback queries
         fallback = {
@@ -15,6 +15,7 @@ import google.generativeai as genai
 
 # Redis cache integration
 from services.cache_service import cache_service
+from services.structured_output import structured_output, genai_call, StructuredOutputError
 
 # Initialize
 router = APIRouter(prefix="/api/saved-jobs", tags=["Saved Jobs"])
@@ -293,6 +294,93 @@ async def get_progress(job_id: str):
 # Roadmap Merge Endpoints
 # =============================================================================
 
+_RESOURCE_LIST = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"name": {"type": "STRING"}, "url": {"type": "STRING"}},
+        "required": ["name", "url"],
+    },
+}
+
+MERGED_ROADMAP_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING"},
+        "description": {"type": "STRING"},
+        "total_estimated_weeks": {"type": "INTEGER"},
+        "skill_categories": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "category": {"type": "STRING"},
+                    "skills": {
+                        "type": "ARRAY",
+                        "items": {
+                            "type": "OBJECT",
+                            "properties": {
+                                "name": {"type": "STRING"},
+                                "priority": {"type": "STRING", "enum": ["high", "medium", "low"]},
+                                "appears_in_jobs": {"type": "ARRAY", "items": {"type": "STRING"}},
+                                "estimated_days": {"type": "INTEGER"},
+                                "resources": _RESOURCE_LIST,
+                            },
+                            "required": ["name", "priority"],
+                        },
+                    },
+                },
+                "required": ["category", "skills"],
+            },
+        },
+        "learning_path": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "phase": {"type": "INTEGER"},
+                    "title": {"type": "STRING"},
+                    "duration_days": {"type": "INTEGER"},
+                    "skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "milestone": {"type": "STRING"},
+                    "daily_plan": {
+                        "type": "ARRAY",
+                        "items": {
+                            "type": "OBJECT",
+                            "properties": {
+                                "day": {"type": "INTEGER"},
+                                "focus": {"type": "STRING"},
+                                "resources": _RESOURCE_LIST,
+                            },
+                            "required": ["day", "focus"],
+                        },
+                    },
+                },
+                "required": ["phase", "title", "skills"],
+            },
+        },
+        "combined_missing_skills": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "all_resources": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"skill": {"type": "STRING"}, "resources": _RESOURCE_LIST},
+                "required": ["skill", "resources"],
+            },
+        },
+        "source_jobs": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"title": {"type": "STRING"}, "company": {"type": "STRING"}},
+                "required": ["title", "company"],
+            },
+        },
+    },
+    "required": ["title", "description", "skill_categories", "learning_path", "combined_missing_skills", "source_jobs"],
+}
+
+
 @router.post("/merge-roadmaps", response_model=GlobalRoadmapResponse)
 async def merge_roadmaps(request: MergeRoadmapsRequest):
     """Merge roadmaps from multiple saved jobs using LLM"""
@@ -414,20 +502,13 @@ Return ONLY valid JSON in this exact format:
 }}"""
 
     try:
-        response = llm.generate_content(merge_prompt)
-        response_text = response.text.strip()
-        
-        # Clean markdown code blocks if present
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        response_text = response_text.strip()
-        
-        merged_roadmap = json.loads(response_text)
-    except json.JSONDecodeError as e:
+        merged_roadmap = structured_output.generate(
+            "strategist.merge_roadmaps",
+            genai_call(llm, merge_prompt),
+            schema=MERGED_ROADMAP_SCHEMA,
+        )
+    except StructuredOutputError as e:
         print(f"[Merge] JSON Parse Error: {e}")
-        print(f"[Merge] Raw response: {response.text[:500]}")
         # Fallback: create a basic merged roadmap
         all_skills = []
         for job in jobs:
@@ -14,7 +14,7 @@ import os
 import logging
 import math
 from typing import Any, Optional, Dict, List
-from datetime import datetime, timezone, date
+from datetime import datetime, timezone, date, timedelta
 from supabase import create_client
 from pinecone import Pinecone
 from google import genai
@@ -22,6 +22,8 @@ from dotenv import load_dotenv
 
 # Redis cache integration
 from services.cache_service import cache_service
+from services.llm_cache import llm_cache
+from services.structured_output import structured_output, genai_client_call
 
 load_dotenv()
 
@@ -50,6 +52,28 @@ SEMANTIC_WEIGHT = 0.6  # 60% weight for semantic similarity
 RECENCY_WEIGHT = 0.4   # 40% weight for recency
 RECENCY_DECAY_LAMBDA = 0.03  # Exponential decay rate (90 day half-life)
 
+# Pre-compute mock interview context for the user's top N matched jobs
+INTERVIEW_PREWARM_TOP_K = int(os.getenv("INTERVIEW_PREWARM_TOP_K", "3"))
+
+# Drop matched jobs that resemble the user's past rejections (Agent 4 anti-patterns)
+ANTI_PATTERN_FILTER = os.getenv("ANTI_PATTERN_FILTER", "true").lower() == "true"
+ANTI_PATTERN_THRESHOLD = float(os.getenv("ANTI_PATTERN_THRESHOLD", "0.85"))
+
+HOT_SKILLS_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "skill": {"type": "STRING"},
+            "demand_trend": {"type": "STRING"},
+            "reason": {"type": "STRING"},
+        },
+        "required": ["skill", "demand_trend", "reason"],
+    },
+}
+# Hot skills depend only on skills, roles and matched titles - shared by similar profiles
+llm_cache.register("strategist.hot_skills", ttl=int(timedelta(days=3).total_seconds()))
+
 
 class StrategistService:
     """
@@ -255,7 +279,8 @@ class StrategistService:
         self, 
         user_vector: list[float], 
         namespace: str, 
-        top_k: int
+        top_k: int,
+        include_values: bool = False
     ) -> list[dict[str, Any]]:
         """
         Query a Pinecone namespace with user's vector using hybrid scoring.
@@ -267,6 +292,7 @@ class StrategistService:
         4. Re-rank and return top_k results
         
         Returns list of matches with metadata sorted by hybrid score.
+        With include_values, each match also carries its vector under "values".
         """
         if not self.pinecone_index:
             return []
@@ -278,6 +304,7 @@ class StrategistService:
                 vector=user_vector,
                 top_k=oversample_k,
                 include_metadata=True,
+                include_values=include_values,
                 namespace=namespace
             )
             
@@ -331,6 +358,8 @@ class StrategistService:
                     "supabase_id": metadata.get("supabase_id"),
                     "posted_at": posted_at.isoformat() if posted_at else None,
                 }
+                if include_values:
+                    match_dict["values"] = match.get("values")
                 
                 scored_matches.append(match_dict)
             
@@ -451,22 +480,15 @@ Return ONLY a valid JSON array with exactly 3 skills:
 Focus on skills the user DOESN'T already have that are in high demand. Keep reasons under 50 chars.
 Return ONLY the JSON array, no markdown."""
 
-            response = self.gemini_client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=prompt,
+            skills = llm_cache.get_or_compute(
+                "strategist.hot_skills", "gemini-2.0-flash", None, prompt,
+                lambda: structured_output.generate(
+                    "strategist.hot_skills",
+                    genai_client_call(self.gemini_client, "gemini-2.0-flash", prompt),
+                    schema=HOT_SKILLS_SCHEMA,
+                ),
             )
-            
-            import json
-            text = response.text.strip()
-            # Clean markdown if present
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-                text = text.strip()
-            
-            skills = json.loads(text)
-            if isinstance(skills, list) and len(skills) > 0:
+            if skills:
                 return skills[:3]
                 
         except Exception as e:
@@ -539,7 +561,11 @@ Return ONLY the JSON array, no markdown."""
             return {"error": "No user embedding found"}
         
         # Query all namespaces
-        jobs = self._query_namespace(user_vector, NAMESPACE_JOBS, top_k=10)
+        # Screen a wider candidate list so filtered jobs are backfilled
+        candidates = self._query_namespace(
+            user_vector, NAMESPACE_JOBS, top_k=20 if ANTI_PATTERN_FILTER else 10, include_values=ANTI_PATTERN_FILTER
+        )
+        jobs = self._screen_anti_patterns(user_id, candidates, user_vector)[:10]
         hackathons = self._query_namespace(user_vector, NAMESPACE_HACKATHONS, top_k=10)
         news = self._query_namespace(user_vector, NAMESPACE_NEWS, top_k=5)
         
@@ -587,8 +613,58 @@ Return ONLY the JSON array, no markdown."""
             stats = today_data.get("stats", {})
             logger.info(f"✅ Saved today_data for {user_id}: {stats.get('jobs_count', 0)} jobs ({stats.get('jobs_with_roadmap', 0)} with roadmaps), {stats.get('hackathons_count', 0)} hackathons, {stats.get('news_count', 0)} news")
         
+        # =========================================================================
+        # CACHE WARMING: Pre-compute interview context for top jobs so starting
+        # a mock interview is a single cache read instead of fetch + LLM call
+        # =========================================================================
+        self._prewarm_interview_contexts(user_id, jobs)
+        
         return today_data
     
+    def _prewarm_interview_contexts(self, user_id: str, jobs: list[dict[str, Any]]) -> int:
+        """Pre-compute interview contexts for the user's top matched jobs."""
+        if INTERVIEW_PREWARM_TOP_K <= 0:
+            return 0
+        
+        job_ids = [j["id"] for j in jobs[:INTERVIEW_PREWARM_TOP_K] if j.get("id")]
+        if not job_ids:
+            return 0
+        
+        try:
+            from core.context_loader import prewarm_interview_contexts
+            warmed = prewarm_interview_contexts(user_id, job_ids)
+            logger.info(f"🔥 Cache WARMED interview_context for {user_id}: {warmed}/{len(job_ids)} jobs")
+            return warmed
+        except Exception as e:
+            logger.warning(f"Could not warm interview_context cache: {e}")
+            return 0
+    
+    def _screen_anti_patterns(
+        self, user_id: str, jobs: list[dict[str, Any]], user_vector: list[float]
+    ) -> list[dict[str, Any]]:
+        """
+        Remove jobs matching the user's rejection anti-patterns.
+        
+        Scores the job vectors returned by the match query (popped here so they
+        are never stored) - no embedding calls, and a user without anti-patterns
+        costs a single Pinecone query.
+        """
+        vectors = [job.pop("values", None) for job in jobs]
+        if not ANTI_PATTERN_FILTER or not jobs:
+            return jobs
+        
+        try:
+            from agents.agent_4_operative.evolution import screen_job_vectors
+            checks = screen_job_vectors(user_id, vectors, user_vector, threshold=ANTI_PATTERN_THRESHOLD)
+        except Exception as e:
+            logger.warning(f"Anti-pattern screening skipped for {user_id}: {e}")
+            return jobs
+        
+        kept = [job for job, check in zip(jobs, checks) if not check["is_anti_pattern"]]
+        if len(kept) < len(jobs):
+            logger.info(f"🚫 Filtered {len(jobs) - len(kept)} anti-pattern jobs for {user_id}")
+        return kept
+    
     def run_daily_matching(self) -> dict[str, Any]:
         """
         Main cron entry point: Process all users.
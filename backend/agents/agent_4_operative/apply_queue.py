@@ -0,0 +1,319 @@
+"""
+Queued auto-apply for Agent 4.
+
+`/auto-apply` used to run the browser agent inside the HTTP request, so a
+bulk run either timed out or hammered one job board until it blocked us.
+Applications now go through a dedicated job queue:
+
+- Clients get a job id straight away and poll `/agent4/auto-apply/jobs/{id}`.
+- Per-domain limits: at most AUTO_APPLY_DOMAIN_CONCURRENCY applications run
+  against one site at a time, and consecutive starts on a site are spaced by
+  AUTO_APPLY_DOMAIN_MIN_INTERVAL (+ up to AUTO_APPLY_DOMAIN_JITTER) seconds.
+  A job that hits a limit is deferred (re-queued without spending a retry),
+  so its worker moves on to another domain and throughput stays steady.
+- Transient failures (crash, timeout, pool at capacity) retry with backoff;
+  failures the page reported (404, captcha, login wall) do not.
+- Status goes to the `applications` table via `save_application_status`:
+  "queued" on submit, then "success" / "failed" once the job settles.
+
+Limits are shared across replicas through Redis when available:
+- apply_domain:{domain}:active -> INT in-flight applications (lease TTL)
+- apply_domain:{domain}:next -> present while the start interval runs (PX TTL)
+
+Every job runs on one long-lived event loop so the shared browser pool keeps
+its Chromium between applications.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from core.redis_client import redis_manager
+from services.job_queue import JobQueue, JobDeferred
+from .browser_pool import browser_pool, BROWSER_POOL_MAX_CONTEXTS
+from .tools import run_auto_apply, save_application_status, download_file
+from .workspace import request_file, release
+
+logger = logging.getLogger("Agent4.ApplyQueue")
+
+AUTO_APPLY_JOB_TYPE = "auto_apply"
+# One worker per pooled browser context, so queued jobs never wait on the pool
+AUTO_APPLY_WORKERS = int(os.getenv("AUTO_APPLY_WORKERS", str(BROWSER_POOL_MAX_CONTEXTS)))
+AUTO_APPLY_MAX_RETRIES = int(os.getenv("AUTO_APPLY_MAX_RETRIES", "2"))
+AUTO_APPLY_TIMEOUT = float(os.getenv("AUTO_APPLY_TIMEOUT", "600"))
+AUTO_APPLY_BATCH_MAX_JOBS = int(os.getenv("AUTO_APPLY_BATCH_MAX_JOBS", "50"))
+AUTO_APPLY_DOMAIN_CONCURRENCY = int(os.getenv("AUTO_APPLY_DOMAIN_CONCURRENCY", "1"))
+AUTO_APPLY_DOMAIN_MIN_INTERVAL = float(os.getenv("AUTO_APPLY_DOMAIN_MIN_INTERVAL", "30"))
+AUTO_APPLY_DOMAIN_JITTER = float(os.getenv("AUTO_APPLY_DOMAIN_JITTER", "10"))
+# Recheck delay when a domain is at its concurrency limit
+AUTO_APPLY_BUSY_DEFER = float(os.getenv("AUTO_APPLY_BUSY_DEFER", "5"))
+# Upper bound on an application's slot if its worker dies mid-run
+AUTO_APPLY_DOMAIN_LEASE = int(os.getenv("AUTO_APPLY_DOMAIN_LEASE", str(int(AUTO_APPLY_TIMEOUT) + 60)))
+
+
+def target_domain(url: str) -> str:
+    """Rate-limit key for a job URL: lowercased host without `www.` ("" if invalid)."""
+    host = (urlparse(url.strip() if "://" in url else f"https://{url.strip()}").hostname or "").lower()
+    if "." not in host or not all(c.isalnum() or c in ".-" for c in host):
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+# =============================================================================
+# Per-domain limiter
+# =============================================================================
+
+class DomainLimiter:
+    """
+    Concurrency cap plus minimum spacing between starts, per target domain.
+
+    `try_acquire` never blocks: it returns 0 when the slot was taken, or the
+    number of seconds to wait before asking again.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = AUTO_APPLY_DOMAIN_CONCURRENCY,
+        min_interval: float = AUTO_APPLY_DOMAIN_MIN_INTERVAL,
+        jitter: float = AUTO_APPLY_DOMAIN_JITTER,
+        busy_defer: float = AUTO_APPLY_BUSY_DEFER,
+        lease_seconds: int = AUTO_APPLY_DOMAIN_LEASE
+    ):
+        self.concurrency = max(1, concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self.jitter = max(0.0, jitter)
+        self.busy_defer = busy_defer
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @staticmethod
+    def _active_key(domain: str) -> str:
+        return f"apply_domain:{domain}:active"
+
+    @staticmethod
+    def _next_key(domain: str) -> str:
+        return f"apply_domain:{domain}:next"
+
+    def _interval(self) -> float:
+        return self.min_interval + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def try_acquire(self, domain: str) -> float:
+        client = redis_manager.get_client()
+        if client:
+            try:
+                return self._try_acquire_redis(client, domain)
+            except Exception as e:
+                logger.warning(f"⚠️ Redis domain limiter failed, using local limits: {e}")
+        return self._try_acquire_local(domain)
+
+    def release(self, domain: str) -> None:
+        client = redis_manager.get_client()
+        if client:
+            try:
+                if client.decr(self._active_key(domain)) <= 0:
+                    client.delete(self._active_key(domain))
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Redis domain release failed: {e}")
+        with self._lock:
+            if self._active.get(domain, 0) > 0:
+                self._active[domain] -= 1
+
+    def _try_acquire_redis(self, client, domain: str) -> float:
+        active_key = self._active_key(domain)
+        if client.incr(active_key) > self.concurrency:
+            client.decr(active_key)
+            return self.busy_defer
+        client.expire(active_key, self.lease_seconds)
+
+        interval_ms = int(self._interval() * 1000)
+        if interval_ms and not client.set(self._next_key(domain), "1", nx=True, px=interval_ms):
+            client.decr(active_key)
+            remaining = client.pttl(self._next_key(domain))
+            return max(remaining, 100) / 1000 if remaining and remaining > 0 else 0.1
+        return 0.0
+
+    def _try_acquire_local(self, domain: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            if self._active.get(domain, 0) >= self.concurrency:
+                return self.busy_defer
+            ready_at = self._next_start.get(domain, 0.0)
+            if ready_at > now:
+                return ready_at - now
+            self._active[domain] = self._active.get(domain, 0) + 1
+            self._next_start[domain] = now + self._interval()
+            return 0.0
+
+
+# =============================================================================
+# Browser event loop
+# =============================================================================
+
+class BrowserLoop:
+    """
+    One event loop thread shared by every auto-apply job.
+
+    Queue handlers run on worker threads; `asyncio.run` per job would give the
+    browser pool a new loop each time and relaunch Chromium for every
+    application. Coroutines submitted here share the pool's loop instead, and
+    the inline API endpoints `submit` here rather than awaiting on uvicorn's loop.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="auto-apply-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run `coro` on the shared loop and wait for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Auto-apply timed out after {timeout:.0f}s")
+
+    async def submit(self, coro):
+        """Await `coro` on the shared loop from another event loop (API handlers)."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()))
+
+    def stop(self) -> None:
+        """Close the pooled browser and stop the loop (shutdown hook)."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(browser_pool.close(), loop).result(10)
+        except Exception as e:
+            logger.warning(f"⚠️ Browser pool close failed: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+# =============================================================================
+# Job handler
+# =============================================================================
+
+def _fetch_resume(payload: dict) -> Tuple[Optional[str], Optional[str]]:
+    """Resume to upload: stored `{user_id}.pdf`, else `resume_url`. Returns (path, path_to_release)."""
+    user_id = payload.get("user_id")
+    if user_id:
+        try:
+            path = download_file(user_id, f"{user_id}.pdf")
+            return path, path
+        except Exception as e:
+            print(f"⚠️ Failed to download resume from Supabase: {e}")
+
+    resume_url = payload.get("resume_url")
+    if resume_url:
+        response = httpx.get(resume_url, timeout=30)
+        if response.status_code == 200:
+            lowered = resume_url.lower()
+            ext = ".docx" if ".docx" in lowered else ".doc" if ".doc" in lowered else ".pdf"
+            path = request_file(user_id or "anon", f"resume{ext}")
+            with open(path, "wb") as f:
+                f.write(response.content)
+            return path, path
+    return None, None
+
+
+def _record_outcome(payload: dict, ctx, status: str, message: str) -> None:
+    if payload.get("user_id") and payload.get("job_id"):
+        save_application_status(payload["user_id"], payload["job_id"], status, {
+            "message": message,
+            "apply_job_id": ctx.job_id,
+            "attempts": ctx.attempt,
+        })
+
+
+def auto_apply_job(payload: dict, ctx) -> dict:
+    """Queue handler: wait for a domain slot, run the browser agent, record the outcome."""
+    domain = payload["domain"]
+    wait = domain_limiter.try_acquire(domain)
+    if wait > 0:
+        raise JobDeferred(wait, f"{domain} rate limited")
+
+    downloaded = None
+    try:
+        ctx.stage("preparing_resume")
+        resume_path, downloaded = _fetch_resume(payload)
+        ctx.stage("applying", domain=domain)
+        result = browser_loop.run(
+            run_auto_apply(job_url=payload["job_url"], user_data=payload["user_data"], resume_path=resume_path),
+            timeout=AUTO_APPLY_TIMEOUT
+        )
+    except Exception as e:
+        # Timeouts / download errors on the last attempt would otherwise leave the row "queued"
+        if ctx.final_attempt:
+            _record_outcome(payload, ctx, "failed", str(e))
+        raise
+    finally:
+        domain_limiter.release(domain)
+        if downloaded:
+            release(downloaded)
+
+    if result.get("retryable") and not ctx.final_attempt:
+        # Let the queue back off and retry; only the final outcome is recorded
+        raise RuntimeError(result["message"])
+
+    _record_outcome(payload, ctx, "success" if result["success"] else "failed", result["details"])
+    return result
+
+
+# Browser work gets its own queue so it never starves resume/interview jobs
+auto_apply_queue = JobQueue("auto_apply", workers=AUTO_APPLY_WORKERS)
+auto_apply_queue.register(AUTO_APPLY_JOB_TYPE, auto_apply_job)
+
+
+def enqueue_auto_apply(
+    user_id: str,
+    job_url: str,
+    user_data: dict,
+    job_id: Optional[str] = None,
+    resume_url: Optional[str] = None
+) -> str:
+    """Queue one application. Returns the id clients poll."""
+    domain = target_domain(job_url)
+    payload = {
+        "user_id": user_id,
+        "job_url": job_url,
+        "user_data": user_data,
+        "job_id": job_id,
+        "resume_url": resume_url,
+        "domain": domain,
+    }
+    apply_job_id = auto_apply_queue.submit(
+        AUTO_APPLY_JOB_TYPE,
+        payload,
+        max_retries=AUTO_APPLY_MAX_RETRIES,
+        metadata={"user_id": user_id, "job_id": job_id, "job_url": job_url, "domain": domain}
+    )
+    if user_id and job_id:
+        save_application_status(user_id, job_id, "queued", {"apply_job_id": apply_job_id, "job_url": job_url})
+    return apply_job_id
+
+
+# Singleton instances
+domain_limiter = DomainLimiter()
+browser_loop = BrowserLoop()
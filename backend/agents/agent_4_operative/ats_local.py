@@ -0,0 +1,251 @@
+"""
+Deterministic local ATS pre-scorer.
+
+Gives an instant, reproducible provisional score from three checks, so the
+LLM scan (tools.llm_ats_score) only runs on demand or in the background:
+
+- Keywords (45): coverage of a skills vocabulary - against the job
+  description's skills when one is given, else breadth of recognised skills
+- Sections (30): contact details, experience, education, skills, projects,
+  summary
+- Formatting (25): length, bullet structure, quantified achievements, dates
+  and extraction noise
+
+Plain token sets (no NLP model): a resume scores in well under a
+millisecond and the same text always gets the same score.
+"""
+
+import re
+from typing import Dict, List, Optional, Set
+
+# canonical skill -> aliases (lowercase; multi-word aliases match as n-grams)
+SKILL_VOCABULARY: Dict[str, Dict[str, List[str]]] = {
+    "languages": {
+        "Python": ["python"], "Java": ["java"], "JavaScript": ["javascript", "js", "es6"],
+        "TypeScript": ["typescript", "ts"], "Go": ["go", "golang"], "Rust": ["rust"], "C++": ["c++", "cpp"],
+        "C#": ["c#", "csharp"], "C": ["c"], "Kotlin": ["kotlin"], "Swift": ["swift"], "Ruby": ["ruby"],
+        "PHP": ["php"], "Scala": ["scala"], "R": ["r"], "SQL": ["sql"], "Bash": ["bash", "shell scripting"],
+        "Dart": ["dart"], "MATLAB": ["matlab"],
+    },
+    "backend": {
+        "FastAPI": ["fastapi"], "Django": ["django"], "Flask": ["flask"], "Node.js": ["node.js", "nodejs", "node"],
+        "Express": ["express", "express.js"], "Spring Boot": ["spring boot", "spring"], "REST APIs": ["rest", "restful", "rest api", "rest apis"],
+        "GraphQL": ["graphql"], "gRPC": ["grpc"], "Microservices": ["microservices", "microservice"],
+        "Celery": ["celery"], "Kafka": ["kafka"], "RabbitMQ": ["rabbitmq"], "ASP.NET": ["asp.net", "dotnet", ".net"],
+    },
+    "frontend": {
+        "React": ["react", "react.js", "reactjs"], "Next.js": ["next.js", "nextjs"], "Vue": ["vue", "vue.js", "vuejs"],
+        "Angular": ["angular"], "Svelte": ["svelte"], "HTML": ["html", "html5"], "CSS": ["css", "css3"],
+        "Tailwind CSS": ["tailwind", "tailwindcss", "tailwind css"], "Redux": ["redux"], "React Native": ["react native"],
+        "Flutter": ["flutter"], "Webpack": ["webpack"], "Vite": ["vite"],
+    },
+    "databases": {
+        "PostgreSQL": ["postgresql", "postgres"], "MySQL": ["mysql"], "MongoDB": ["mongodb", "mongo"],
+        "Redis": ["redis"], "Elasticsearch": ["elasticsearch"], "SQLite": ["sqlite"], "DynamoDB": ["dynamodb"],
+        "Cassandra": ["cassandra"], "Supabase": ["supabase"], "Firebase": ["firebase"],
+    },
+    "data": {
+        "Snowflake": ["snowflake"], "Spark": ["spark", "pyspark", "apache spark"], "Airflow": ["airflow"], "dbt": ["dbt"], "Pandas": ["pandas"],
+        "NumPy": ["numpy"], "ETL": ["etl"], "Data Warehousing": ["data warehousing", "data warehouse"],
+    },
+    "cloud_devops": {
+        "AWS": ["aws", "amazon web services"], "GCP": ["gcp", "google cloud"], "Azure": ["azure"],
+        "Docker": ["docker"], "Kubernetes": ["kubernetes", "k8s"], "Terraform": ["terraform"],
+        "CI/CD": ["ci/cd", "cicd", "continuous integration"], "GitHub Actions": ["github actions"],
+        "Jenkins": ["jenkins"], "Linux": ["linux", "unix"], "Nginx": ["nginx"], "Ansible": ["ansible"],
+        "Prometheus": ["prometheus"], "Grafana": ["grafana"], "Git": ["git"], "Serverless": ["serverless", "lambda"],
+    },
+    "ml_ai": {
+        "Machine Learning": ["machine learning", "ml"], "Deep Learning": ["deep learning"],
+        "PyTorch": ["pytorch"], "TensorFlow": ["tensorflow"], "scikit-learn": ["scikit-learn", "sklearn"],
+        "NLP": ["nlp", "natural language processing"], "Computer Vision": ["computer vision", "opencv"],
+        "LLMs": ["llm", "llms", "large language models"], "LangChain": ["langchain"], "LangGraph": ["langgraph"],
+        "RAG": ["rag", "retrieval augmented generation"], "Hugging Face": ["hugging face", "huggingface", "transformers"],
+        "Pinecone": ["pinecone"], "Vector Databases": ["vector database", "vector databases", "vector db"],
+        "MLOps": ["mlops"], "Data Analysis": ["data analysis", "data analytics"], "Statistics": ["statistics"],
+    },
+    "practices": {
+        "Agile": ["agile", "scrum"], "Unit Testing": ["unit testing", "unit tests", "pytest", "jest", "junit"],
+        "System Design": ["system design", "distributed systems"], "Data Structures": ["data structures", "algorithms"],
+        "OOP": ["oop", "object oriented", "object-oriented"], "Security": ["security", "oauth", "jwt"],
+        "Performance Optimization": ["performance optimization", "caching"], "Code Review": ["code review", "code reviews"],
+    },
+}
+
+# Suggested first when no job description is given (per dominant role category)
+CORE_SKILLS: Dict[str, List[str]] = {
+    "backend": ["REST APIs", "Microservices", "Docker", "PostgreSQL", "Redis", "Unit Testing"],
+    "frontend": ["TypeScript", "React", "Next.js", "CSS", "Unit Testing"],
+    "data": ["SQL", "Python", "Spark", "Airflow", "ETL", "Data Warehousing"],
+    "cloud_devops": ["Docker", "Kubernetes", "Terraform", "CI/CD", "AWS", "Linux"],
+    "ml_ai": ["Python", "PyTorch", "Machine Learning", "LLMs", "MLOps", "Docker"],
+}
+
+# Single letters/short words that are skills only in an explicit list context
+_AMBIGUOUS_ALIASES = {"c", "r", "go", "js", "ts", "ml", "rest", "node", "express", "rust", "swift", "spring",
+                      "lambda", "security", "caching", "statistics", "agile", "git", "spark", "dart"}
+
+_ALIAS_TO_SKILL: Dict[str, str] = {}
+_SKILL_CATEGORY: Dict[str, str] = {}
+for _category, _skills in SKILL_VOCABULARY.items():
+    for _skill, _aliases in _skills.items():
+        _SKILL_CATEGORY.setdefault(_skill, _category)
+        for _alias in _aliases:
+            _ALIAS_TO_SKILL[_alias] = _skill
+_MAX_NGRAM = max(len(alias.split()) for alias in _ALIAS_TO_SKILL)
+
+_TOKEN_RE = re.compile(r"[a-z0-9.#+][a-z0-9+#./\-]*")
+_LIST_LINE_RE = re.compile(r"[,|;•·]")
+_PROSE_WORDS = {"i", "we", "a", "an", "the", "to", "and", "of", "in", "for", "with", "on", "at", "is", "was"}
+
+SECTION_PATTERNS = {
+    "experience": re.compile(r"^(work\s+|professional\s+)?(experience|employment|work history|internships?)\b"),
+    "education": re.compile(r"^(education|academic|qualifications)\b"),
+    "skills": re.compile(r"^(technical\s+|core\s+|key\s+)?(skills|technologies|tech stack|competencies)\b"),
+    "projects": re.compile(r"^(personal\s+|academic\s+|key\s+)?projects?\b"),
+    "summary": re.compile(r"^(professional\s+)?(summary|profile|objective|about me)\b"),
+}
+SECTION_POINTS = {"experience": 8, "education": 6, "skills": 6, "projects": 2, "summary": 2}
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"(\+?\d[\d\s().-]{8,}\d)")
+_BULLET_RE = re.compile(r"^\s*([-•*▪●◦‣–]|\d+[.)])\s+")
+_METRIC_RE = re.compile(r"\d+(\.\d+)?\s*(%|x\b|k\b|m\b|\+)|[$₹€£]\s?\d|\b\d{2,}\s+(users|customers|requests|clients|ms|hours|students)")
+_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+
+ATS_LOCAL_TARGET_SKILLS = 12  # recognised skills for full keyword credit without a JD
+
+
+def _tokens(line: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(line):
+        token = token.rstrip(".-/")
+        if not token:
+            continue
+        tokens.append(token)
+        if "/" in token and token not in _ALIAS_TO_SKILL:
+            tokens.extend(part for part in token.split("/") if part)
+    return tokens
+
+
+def extract_skills(text: str) -> List[str]:
+    """Canonical vocabulary skills mentioned in `text`, in order of first mention."""
+    found: Dict[str, None] = {}
+    for raw_line in (text or "").lower().splitlines():
+        tokens = _tokens(raw_line)
+        in_list = bool(_LIST_LINE_RE.search(raw_line)) or (len(tokens) <= 4 and not _PROSE_WORDS.intersection(tokens))
+        i = 0
+        while i < len(tokens):
+            # Longest alias wins ("react native" is not also "react")
+            for n in range(min(_MAX_NGRAM, len(tokens) - i), 0, -1):
+                gram = " ".join(tokens[i:i + n])
+                skill = _ALIAS_TO_SKILL.get(gram)
+                if skill and (n > 1 or in_list or gram not in _AMBIGUOUS_ALIASES):
+                    found.setdefault(skill, None)
+                    i += n
+                    break
+            else:
+                i += 1
+    return list(found)
+
+
+def _section_score(lines: List[str], text: str) -> tuple:
+    found: Set[str] = set()
+    for line in lines:
+        header = line.strip().lower().strip(":").strip()
+        if 0 < len(header) <= 40:
+            for name, pattern in SECTION_PATTERNS.items():
+                if pattern.match(header):
+                    found.add(name)
+    points = sum(SECTION_POINTS[name] for name in found)
+    points += 3 if _EMAIL_RE.search(text) else 0
+    points += 3 if _PHONE_RE.search(text) else 0
+    return points, found
+
+
+def _formatting_score(lines: List[str], text: str) -> tuple:
+    notes = []
+    words = len(text.split())
+    if 250 <= words <= 1200:
+        length = 7
+    elif 120 <= words <= 1800:
+        length = 4
+        notes.append("too short" if words < 250 else "too long")
+    else:
+        length = 1
+        notes.append("too short" if words < 250 else "too long")
+
+    bullets = sum(1 for line in lines if _BULLET_RE.match(line))
+    bullet_points = 5 if bullets >= 5 else bullets
+    if bullets < 3:
+        notes.append("few bullet points")
+
+    metrics = len(_METRIC_RE.findall(text.lower()))
+    metric_points = 6 if metrics >= 4 else int(metrics * 1.5)
+    if metrics < 2:
+        notes.append("few quantified achievements")
+
+    dates = 3 if len(_YEAR_RE.findall(text)) >= 2 else 0
+    if not dates:
+        notes.append("no dates")
+
+    noise = sum(1 for ch in text if not (ch.isprintable() or ch in "\n\t")) / max(1, len(text))
+    long_lines = sum(1 for line in lines if len(line) > 250)
+    clean = 4 if noise < 0.01 and long_lines <= 2 else 1
+    if clean < 4:
+        notes.append("extraction noise or very long lines")
+
+    return length + bullet_points + metric_points + dates + clean, notes
+
+
+def score_resume_locally(resume_text: str, job_description: Optional[str] = None) -> dict:
+    """
+    Instant provisional ATS score.
+
+    Returns the same shape as the LLM scorer ({score, missing_keywords,
+    summary}) plus `provisional: True` and a per-check `breakdown`.
+    """
+    text = resume_text or ""
+    lines = text.splitlines()
+    skills = extract_skills(text)
+    skill_set = set(skills)
+
+    jd_skills = extract_skills(job_description) if job_description else []
+    if jd_skills:
+        matched = [s for s in jd_skills if s in skill_set]
+        keyword_points = round(45 * len(matched) / len(jd_skills))
+        missing = [s for s in jd_skills if s not in skill_set]
+    else:
+        keyword_points = round(45 * min(1.0, len(skills) / ATS_LOCAL_TARGET_SKILLS))
+        counts: Dict[str, int] = {}
+        for skill in skills:
+            counts[_SKILL_CATEGORY[skill]] = counts.get(_SKILL_CATEGORY[skill], 0) + 1
+        # Languages, databases and practices say little about the target role
+        focus = max(CORE_SKILLS, key=lambda c: counts.get(c, 0)) if any(c in CORE_SKILLS for c in counts) else "backend"
+        missing = [s for s in CORE_SKILLS[focus] if s not in skill_set]
+
+    section_points, sections = _section_score(lines, text)
+    formatting_points, notes = _formatting_score(lines, text)
+    score = max(0, min(100, keyword_points + section_points + formatting_points))
+
+    absent = [name for name in SECTION_POINTS if name not in sections]
+    summary = f"Provisional score from {len(skills)} recognised skills"
+    if jd_skills:
+        summary += f" ({len(jd_skills) - len(missing)}/{len(jd_skills)} job skills matched)"
+    if absent:
+        summary += f"; missing sections: {', '.join(absent)}"
+    if notes:
+        summary += f"; formatting: {', '.join(notes)}"
+
+    return {
+        "score": score,
+        "missing_keywords": missing[:10],
+        "summary": summary + ".",
+        "provisional": True,
+        "breakdown": {
+            "keywords": keyword_points,
+            "sections": section_points,
+            "formatting": formatting_points,
+            "skills_found": skills,
+        },
+    }
@@ -0,0 +1,263 @@
+"""
+Reusable Chromium pool for Agent 4 auto-apply.
+
+Launching a browser per application costs seconds, and the old
+`_global_browser_refs` list kept every launched browser alive forever. This
+pool keeps ONE Chromium per process and hands each application its own
+browser context (separate cookies, storage and tabs):
+
+- Concurrency gate: at most BROWSER_POOL_MAX_CONTEXTS leases at a time;
+  acquiring waits up to BROWSER_POOL_ACQUIRE_TIMEOUT and then raises
+  `BrowserPoolBusy`.
+- Idle eviction: Chromium is closed BROWSER_POOL_IDLE_TIMEOUT seconds after
+  the last lease is released and relaunched on the next acquire.
+- Recycling: after BROWSER_POOL_MAX_USES contexts the browser is relaunched
+  at the next quiet moment, bounding renderer memory growth; a crashed or
+  disconnected browser is relaunched on the next acquire.
+- Exclusive leases: an agent that drives the browser over CDP (and so sees
+  every tab) can request `exclusive=True`, which serializes those leases on
+  the shared Chromium instead of mixing applications.
+
+State is bound to the running event loop. A pool used from a new loop starts
+fresh; the old Chromium is closed on the loop that launched it, if that loop
+is still running. Callers should stay on `apply_queue.browser_loop`.
+"""
+
+import os
+import time
+import socket
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger("Agent4.BrowserPool")
+
+BROWSER_POOL_MAX_CONTEXTS = int(os.getenv("BROWSER_POOL_MAX_CONTEXTS", "3"))
+BROWSER_POOL_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT", "60"))
+BROWSER_POOL_IDLE_TIMEOUT = float(os.getenv("BROWSER_POOL_IDLE_TIMEOUT", "300"))
+BROWSER_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "50"))
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "true").lower() == "true"
+
+
+class BrowserPoolBusy(RuntimeError):
+    """Raised when no browser context frees up within the acquire timeout."""
+
+
+@dataclass
+class BrowserLease:
+    """One application's isolated browser context on the shared Chromium."""
+    context: Any
+    cdp_url: Optional[str]
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def launch_chromium(headless: bool = BROWSER_HEADLESS) -> Tuple[Any, Optional[str], Callable[[], Awaitable[None]]]:
+    """
+    Launch Chromium through Playwright with a CDP endpoint.
+
+    Returns (browser, cdp_url, close).
+    """
+    from playwright.async_api import async_playwright
+
+    port = _free_port()
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(
+            headless=headless,
+            args=[f"--remote-debugging-port={port}", "--disable-dev-shm-usage"]
+        )
+    except Exception:
+        await playwright.stop()
+        raise
+
+    async def close():
+        try:
+            await browser.close()
+        finally:
+            await playwright.stop()
+
+    return browser, f"http://127.0.0.1:{port}", close
+
+
+class BrowserPool:
+    """One shared Chromium, an isolated context per lease."""
+
+    def __init__(
+        self,
+        max_contexts: int = BROWSER_POOL_MAX_CONTEXTS,
+        idle_timeout: float = BROWSER_POOL_IDLE_TIMEOUT,
+        max_uses: int = BROWSER_POOL_MAX_USES,
+        acquire_timeout: float = BROWSER_POOL_ACQUIRE_TIMEOUT,
+        launcher: Optional[Callable[[], Awaitable[tuple]]] = None
+    ):
+        self.max_contexts = max(1, max_contexts)
+        self.idle_timeout = idle_timeout
+        self.max_uses = max(1, max_uses)
+        self.acquire_timeout = acquire_timeout
+        self._launcher = launcher or launch_chromium
+        self._loop = None
+        self._reset_state()
+        self.stats = {
+            "launches": 0,
+            "contexts": 0,
+            "rejected": 0,
+            "evictions": 0,
+            "recycles": 0,
+            "launch_seconds": 0.0,
+        }
+
+    def _reset_state(self) -> None:
+        self._browser = None
+        self._cdp_url = None
+        self._close = None
+        self._uses = 0
+        self._active = 0
+        self._release_token = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._exclusive_lock: Optional[asyncio.Lock] = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is self._loop:
+            return
+        old_loop, close = self._loop, self._close
+        if close is not None:
+            # Playwright objects belong to the loop that launched them
+            if old_loop is not None and old_loop.is_running():
+                logger.warning("⚠️ Browser pool used from a new event loop - closing the old browser on its loop")
+                asyncio.run_coroutine_threadsafe(self._close_quietly(close), old_loop)
+            else:
+                logger.warning("⚠️ Browser pool used from a new event loop - old loop is gone, browser already stopped")
+        self._loop = loop
+        self._reset_state()
+        self._semaphore = asyncio.Semaphore(self.max_contexts)
+        self._launch_lock = asyncio.Lock()
+        self._exclusive_lock = asyncio.Lock()
+
+    # =========================================================================
+    # Browser lifecycle
+    # =========================================================================
+
+    def _connected(self) -> bool:
+        try:
+            return self._browser is not None and self._browser.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _close_quietly(close: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await close()
+        except Exception as e:
+            logger.warning(f"⚠️ Browser close failed: {e}")
+
+    async def _shutdown_browser(self) -> None:
+        close, self._close = self._close, None
+        self._browser, self._cdp_url, self._uses = None, None, 0
+        if close:
+            await self._close_quietly(close)
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self._browser is not None and self._uses >= self.max_uses and self._active == 0:
+                self.stats["recycles"] += 1
+                logger.info(f"♻️ Recycling Chromium after {self._uses} contexts")
+                await self._shutdown_browser()
+            elif self._browser is not None and not self._connected():
+                logger.warning("⚠️ Chromium disconnected - relaunching")
+                await self._shutdown_browser()
+
+            if self._browser is None:
+                started = time.perf_counter()
+                self._browser, self._cdp_url, self._close = await self._launcher()
+                elapsed = time.perf_counter() - started
+                self.stats["launches"] += 1
+                self.stats["launch_seconds"] += elapsed
+                logger.info(f"🌐 Chromium launched in {elapsed:.2f}s")
+            return self._browser
+
+    async def _evict_when_idle(self, token: int) -> None:
+        await asyncio.sleep(self.idle_timeout)
+        async with self._launch_lock:
+            if self._active == 0 and token == self._release_token and self._browser is not None:
+                self.stats["evictions"] += 1
+                logger.info(f"💤 Closing idle Chromium after {self.idle_timeout:.0f}s")
+                await self._shutdown_browser()
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    @asynccontextmanager
+    async def context(self, exclusive: bool = False, **context_options):
+        """
+        Lease an isolated browser context for one application.
+
+        Raises:
+            BrowserPoolBusy: if no slot frees up within the acquire timeout
+        """
+        self._bind_loop()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.stats["rejected"] += 1
+            raise BrowserPoolBusy(f"All {self.max_contexts} browser contexts are in use")
+
+        exclusive_held = False
+        context = None
+        try:
+            if exclusive:
+                await self._exclusive_lock.acquire()
+                exclusive_held = True
+
+            browser = await self._ensure_browser()
+            context = await browser.new_context(**context_options)
+            self._active += 1
+            self._uses += 1
+            self.stats["contexts"] += 1
+            yield BrowserLease(context=context, cdp_url=self._cdp_url)
+        finally:
+            if context is not None:
+                self._active -= 1
+                try:
+                    await context.close()
+                except Exception:
+                    pass  # Browser already gone
+            if exclusive_held:
+                self._exclusive_lock.release()
+            self._semaphore.release()
+
+            if self._active == 0 and self._browser is not None:
+                self._release_token += 1
+                asyncio.get_running_loop().create_task(self._evict_when_idle(self._release_token))
+
+    async def close(self) -> None:
+        """Close Chromium now (shutdown hook)."""
+        if self._loop is asyncio.get_running_loop() and self._launch_lock is not None:
+            async with self._launch_lock:
+                await self._shutdown_browser()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "active": self._active,
+            "max_contexts": self.max_contexts,
+            "browser_running": self._browser is not None,
+            "avg_launch_seconds": round(self.stats["launch_seconds"] / self.stats["launches"], 3) if self.stats["launches"] else 0.0,
+        }
+
+
+# Singleton instance
+browser_pool = BrowserPool()
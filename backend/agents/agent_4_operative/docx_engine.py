@@ -1,9 +1,12 @@
+import io
 import os
+import bisect
 import tempfile
-import subprocess
 import platform
+from typing import Optional
 from pdf2docx import Converter
 from docx import Document
+from .office_converter import office_converter
 
 # Platform-specific import for docx2pdf (only works on Windows/macOS)
 try:
@@ -14,6 +17,83 @@ except ImportError:
     docx2pdf_convert = None
 import shutil
 
+SECTION_HEADERS = ["EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION", "WORK EXPERIENCE", "TECHNICAL SKILLS", "CERTIFICATIONS"]
+
+
+def _matches_section(section: str, txt: str) -> bool:
+    """A line starts `section` if it is the header or a short line containing it."""
+    return section == txt or (section in txt and len(txt) < 40)
+
+
+def _is_section_boundary(txt: str) -> bool:
+    """A line that ends the previous section (known header or short ALL-CAPS word)."""
+    return txt in SECTION_HEADERS or (txt.isupper() and 3 < len(txt) < 30 and " " not in txt)
+
+
+class SectionIndex:
+    """
+    One scan of a document: upper-cased text of every body paragraph and
+    table cell, plus the positions of section boundaries.
+    
+    Built once per document so N edits cost one XML walk instead of N.
+    """
+
+    def __init__(self, doc):
+        self.paragraphs = doc.paragraphs
+        self.texts = [p.text.strip().upper() for p in self.paragraphs]
+        self.boundaries = [i for i, txt in enumerate(self.texts) if _is_section_boundary(txt)]
+        # Only short lines (or exact headers) can start a section
+        self._candidates = [(i, txt) for i, txt in enumerate(self.texts) if txt and len(txt) < 40]
+        self._long_exact = {}
+        for i, txt in enumerate(self.texts):
+            if len(txt) >= 40:
+                self._long_exact.setdefault(txt, i)
+
+        # Table cells in document order; merged cells are returned once
+        self.cells = []
+        seen = set()
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    if cell._tc in seen:
+                        continue
+                    seen.add(cell._tc)
+                    self.cells.append((cell, cell.text.strip().upper()))
+
+    def section_end(self, start: int) -> int:
+        """Index of the first boundary after `start` (or end of document)."""
+        pos = bisect.bisect_right(self.boundaries, start)
+        return self.boundaries[pos] if pos < len(self.boundaries) else len(self.texts)
+
+    def find_paragraph_section(self, section: str, claimed: list) -> Optional[tuple]:
+        """
+        (start, end) of the first unclaimed paragraph section matching `section`.
+
+        Spans never intersect a claimed one: a section that would run into a
+        claimed span (e.g. "Tools and skills" inside EXPERIENCE) ends where
+        that span starts, and one left without a body line is skipped.
+        """
+        def free_span(i):
+            if any(lo <= i < hi for lo, hi in claimed):
+                return None
+            end = min([self.section_end(i)] + [lo for lo, _ in claimed if i < lo])
+            return (i, end) if end > i + 1 else None
+
+        for i, txt in self._candidates:
+            if _matches_section(section, txt):
+                span = free_span(i)
+                if span:
+                    return span
+        i = self._long_exact.get(section)
+        return free_span(i) if i is not None else None
+
+    def find_cell(self, section: str):
+        for cell, txt in self.cells:
+            if _matches_section(section, txt):
+                return cell
+        return None
+
+
 class DocxSurgeon:
     def __init__(self):
         pass
@@ -40,94 +120,25 @@ class DocxSurgeon:
 
     def replace_section_content(self, docx_path: str, section_name: str, new_text: str) -> bool:
         """
-        Edits the DOCX file to replace section content.
+        Edits the DOCX file in place to replace one section's content.
         Strategy: Find the header, then replace text until the next header.
         """
         print(f"📝 [DocxSurgeon] Editing section: {section_name}")
         
         try:
             doc = Document(docx_path)
-            
-            # Normalize header for search
-            target_header = section_name.strip().upper()
-            
-            # Simple header detection heuristics
-            # Known headers: EXPERIENCE, PROJECTS, SKILLS, EDUCATION
-            
-            header_found = False
-            in_target_section = False
-            
-            # We need to iterate and modify. 
-            # Note: doc.paragraphs implies linear text. Tables might be issue but pdf2docx usually outputs flow text or tables.
-            # pdf2docx often puts layout in tables. We might need to search tables too.
-            
-            # PHASE 1: SEARCH PARAGRAPHS
-            paragraphs_to_remove = []
-            insert_point = None
-            
-            for i, para in enumerate(doc.paragraphs):
-                text = para.text.strip().upper()
-                
-                # Check if this is a header
-                is_header = text in ["EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION", "WORK EXPERIENCE", "TECHNICAL SKILLS"]
-                
-                if is_header:
-                    if text == target_header or target_header in text:
-                        print(f"   📍 Found Header: {text}")
-                        header_found = True
-                        in_target_section = True
-                        insert_point = i + 1 # Insert after header
-                        continue
-                    elif in_target_section:
-                        # Found NEXT header, stop
-                        print(f"   🛑 Found Next Header: {text}. Stopping section edit.")
-                        in_target_section = False
-                        break
-                
-                if in_target_section:
-                    # Mark paragraph for deletion (clear text)
-                    # We can't easily "delete" paragraphs in python-docx list, but we can clear content
-                    para.clear() 
-            
-            # PHASE 2: INSERT NEW CONTENT
-            if header_found and insert_point is not None:
-                # We cleared the old text. Now we need to insert the new text.
-                # However, python-docx doesn't support "insert paragraph at index" easily without internal API hacks.
-                # EASIER: Append text to the Header paragraph? No.
-                # EASIER: We just cleared the old paragraphs. We can set the text of the *first* cleared paragraph 
-                # to the new content, provided there was at least one.
-                
-                # Let's try to be safer: 
-                # 1. Clear all old paragraphs in section.
-                # 2. Add the new text to the FIRST content paragraph we found (or creating one).
-                
-                # Re-iterate to fill
-                in_target_section = False
-                filled = False
-                
-                for para in doc.paragraphs:
-                    text = para.text.strip().upper() # This might be empty now if cleared? No, para.text is accessed.
-                    
-                    # We need to track index manually or re-check headers? 
-                    # If we cleared text, checks will fail.
-                    # BETTER STRATEGY: Do it in one pass or keep indices.
-                    pass
-                
-                # Let's retry strategy:
-                # 1. Scan to find Header Index and Next Header Index.
-                # 2. Delete paragraphs between them.
-                # 3. Insert new paragraph at Header Index + 1.
-                pass 
-                
-            raise NotImplementedError("Complex logic needed for DOCX structure. Using simplified append for now.")
-
+            applied = self.apply_edits(doc, [{"section": section_name, "content": new_text}])
+            if applied:
+                doc.save(docx_path)
+            return applied > 0
         except Exception as e:
-            print(f"   ⚠️ Edit failed (Fallback to simple replace?): {e}")
+            print(f"   ⚠️ Edit failed: {e}")
             return False
 
-    def _detect_section_style(self, doc, start_idx, end_idx):
+    def _detect_section_style(self, paragraphs, start_idx, end_idx):
         """
         Scans paragraphs in the range to find the most common font and size.
+        `paragraphs` is the document's paragraph list (see SectionIndex).
         """
         fonts = {}
         sizes = {}
@@ -137,8 +148,8 @@ class DocxSurgeon:
         
         for i in range(start_idx, scan_limit):
             try:
-                if i >= len(doc.paragraphs): break
-                p = doc.paragraphs[i]
+                if i >= len(paragraphs): break
+                p = paragraphs[i]
                 for run in p.runs:
                     # Font Name
                     if run.font.name:
@@ -157,118 +168,102 @@ class DocxSurgeon:
         print(f"   🎨 Detected Style: Font={dom_font}, Size={dom_size}")
         return {"font_name": dom_font, "font_size": dom_size}
 
-    def simple_replace(self, docx_path: str, edits: list) -> str:
+    def apply_edits(self, doc, edits: list) -> int:
         """
-        Replaces sections in DOCX (Paragraphs & Tables) ensuring style preservation.
-        """
-        doc = Document(docx_path)
+        Replaces sections of an in-memory Document in a single pass.
+        
+        The section index is built once; every edit is resolved against it
+        (paragraph sections first, then table cells), styles are read from
+        the old content, and only then is the document mutated.
         
-        headers = ["EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION", "WORK EXPERIENCE", "TECHNICAL SKILLS", "CERTIFICATIONS"]
+        Returns:
+            Number of edits applied
+        """
+        index = SectionIndex(doc)
+        claimed = []      # (start, end) paragraph ranges already taken
+        para_plans = {}   # start -> (end, content)
+        cell_plans = []   # (cell, section, content)
         
         for edit in edits:
-            section = edit["section"].upper() 
-            new_content = edit["content"].replace("**", "") 
+            section = edit["section"].strip().upper()
+            new_content = edit["content"].replace("**", "")
             print(f"   ✏️ Patching {section}...")
             
-            replaced = False
-            
             # --- STRATEGY 1: PARAGRAPHS ---
-            start_idx = -1
-            for i, p in enumerate(doc.paragraphs):
-                txt = p.text.strip().upper()
-                if (section == txt) or (section in txt and len(txt) < 40):
-                    start_idx = i
-                    break
+            span = index.find_paragraph_section(section, claimed)
+            if span:
+                claimed.append(span)
+                para_plans[span[0]] = (span[1], new_content)
+                continue
             
-            if start_idx != -1:
-                # 2. Find End Header
-                end_idx = len(doc.paragraphs)
-                for i in range(start_idx + 1, len(doc.paragraphs)):
-                    p = doc.paragraphs[i]
-                    txt = p.text.strip().upper()
-                    is_header_line = any(h == txt for h in headers)
-                    if is_header_line or (txt.isupper() and len(txt) < 30 and len(txt) > 3 and " " not in txt):
-                        end_idx = i
-                        break
-                
-                # 3. Detect Style from the OLD content before deleting
-                style = self._detect_section_style(doc, start_idx + 1, end_idx)
+            # --- STRATEGY 2: TABLES ---
+            # Header in a cell: overwrite the whole cell with header + content
+            cell = index.find_cell(section)
+            if cell is not None:
+                print(f"   📍 Found Header '{section}' in Table Cell")
+                cell_plans.append((cell, section, new_content))
+        
+        paragraphs = index.paragraphs
+        # Detect every style from the OLD content before anything is deleted
+        styles = {start: self._detect_section_style(paragraphs, start + 1, end) for start, (end, _) in para_plans.items()}
+        
+        for start, (end, new_content) in para_plans.items():
+            style = styles[start]
+            if start + 1 < len(paragraphs):
+                target_p = paragraphs[start + 1]
+                target_p.clear() # Clear existing runs
                 
-                # 4. Replace Content
-                if start_idx + 1 < len(doc.paragraphs):
-                    target_p = doc.paragraphs[start_idx + 1]
-                    target_p.clear() # Clear existing runs
-                    
-                    # Add new run with detected style
-                    run = target_p.add_run(new_content)
-                    if style["font_name"]:
-                        run.font.name = style["font_name"]
-                    if style["font_size"]:
-                        run.font.size = style["font_size"]
-                    
-                    # Remove subsequent paragraphs
-                    for i in range(end_idx - 1, start_idx + 1, -1):
-                        p_element = doc.paragraphs[i]._element
-                        p_element.getparent().remove(p_element)
-                else:
-                    p = doc.add_paragraph()
-                    run = p.add_run(new_content)
-                    if style["font_name"]: run.font.name = style["font_name"]
+                # Add new run with detected style
+                run = target_p.add_run(new_content)
+                if style["font_name"]:
+                    run.font.name = style["font_name"]
+                if style["font_size"]:
+                    run.font.size = style["font_size"]
                 
-                replaced = True
-
-            if replaced: continue
-
-            # --- STRATEGY 2: TABLES ---
-            # If not found in paragraphs, check tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        txt = cell.text.strip().upper()
-                        # Check header in cell
-                        if (section == txt) or (section in txt and len(txt) < 40):
-                            print(f"   📍 Found Header '{section}' in Table Cell")
-                            
-                            # We assume the content follows IN THE SAME CELL or subsequent cells?
-                            # Usually simple resumes might have "EXPERIENCE" in col 1, content in col 2.
-                            # OR "EXPERIENCE" in row 1, content in row 2.
-                            
-                            # Heuristic: Clear this cell's text *after* the header? 
-                            # Or does the header occupy the whole cell?
-                            
-                            # Case A: Header is the whole cell. Content is likely in NEXT row/cell.
-                            # Case B: Header + Content in same cell.
-                            
-                            # Let's try to find where the content is.
-                            # Only replacing the *next* block if possible.
-                            
-                            # Simplified Table Edit:
-                            # If header is in this cell, let's append new content here or replace the rest of the cell?
-                            # SAFEST: Replace the WHOLE CELL content with "HEADER + \n + New Content" 
-                            # to ensure we don't lose the header if it's mixed.
-                            
-                            # Capture style from cell paragraphs
-                            style = {"font_name": None, "font_size": None}
-                            if cell.paragraphs:
-                                style = self._detect_style_from_obj(cell.paragraphs[0])
+                # Remove the rest of the section's paragraphs
+                for p in paragraphs[start + 2:end]:
+                    p_element = p._element
+                    p_element.getparent().remove(p_element)
+            else:
+                p = doc.add_paragraph()
+                run = p.add_run(new_content)
+                if style["font_name"]: run.font.name = style["font_name"]
+        
+        for cell, section, new_content in cell_plans:
+            # Capture style from cell paragraphs
+            style = self._detect_style_from_obj(cell.paragraphs[0]) if cell.paragraphs else {}
+            
+            cell.text = section + "\n" + new_content # Simple overwrite
+            
+            # Re-apply style to the whole cell
+            for p in cell.paragraphs:
+                for run in p.runs:
+                    if style.get("font_name"): run.font.name = style["font_name"]
+                    if style.get("font_size"): run.font.size = style["font_size"]
+        
+        return len(para_plans) + len(cell_plans)
 
-                            cell.text = section + "\n" + new_content # Simple overwrite
-                            
-                            # Re-apply style to the whole cell
-                            for p in cell.paragraphs:
-                                for run in p.runs:
-                                    if style.get("font_name"): run.font.name = style["font_name"]
-                                    if style.get("font_size"): run.font.size = style["font_size"]
-                            
-                            replaced = True
-                            break
-                    if replaced: break
-                if replaced: break
-                
+    def simple_replace(self, docx_path: str, edits: list) -> str:
+        """
+        Replaces sections in DOCX (Paragraphs & Tables) ensuring style preservation.
+        Writes `<name>_edited.docx` next to the input and returns its path.
+        """
+        doc = Document(docx_path)
+        self.apply_edits(doc, edits)
+        
         new_path = docx_path.replace(".docx", "_edited.docx")
         doc.save(new_path)
         return new_path
 
+    def simple_replace_bytes(self, docx_bytes: bytes, edits: list) -> bytes:
+        """In-memory variant of simple_replace: DOCX bytes in, edited DOCX bytes out."""
+        doc = Document(io.BytesIO(docx_bytes))
+        self.apply_edits(doc, edits)
+        
+        out = io.BytesIO()
+        doc.save(out)
+        return out.getvalue()
+
     def extract_text(self, docx_path: str) -> dict:
         """
         Parses the DOCX file (paragraphs AND tables) and returns section content.
@@ -371,40 +366,26 @@ class DocxSurgeon:
     def convert_docx_to_pdf(self, docx_path: str) -> str:
         """
         Converts DOCX back to PDF.
-        Uses docx2pdf on Windows/macOS, LibreOffice on Linux.
+        Uses the shared LibreOffice converter on Linux, docx2pdf on Windows/macOS.
         """
-        import time
         pdf_path = docx_path.replace(".docx", ".pdf")
         print(f"🔄 [DocxSurgeon] Converting DOCX to PDF: {docx_path}")
         
         try:
             # Check platform and use appropriate method
             if platform.system() == "Linux":
-                # Use LibreOffice for Linux/Docker
-                output_dir = os.path.dirname(docx_path)
-                result = subprocess.run([
-                    "libreoffice", "--headless", "--convert-to", "pdf",
-                    "--outdir", output_dir, docx_path
-                ], capture_output=True, text=True, timeout=60)
-                
-                if result.returncode != 0:
-                    print(f"   ❌ LibreOffice conversion failed: {result.stderr}")
-                    return None
+                # Long-lived headless LibreOffice; returns once the PDF is written
+                office_converter.convert(docx_path, pdf_path)
             elif HAS_DOCX2PDF:
-                # Use docx2pdf on Windows/macOS
+                # Use docx2pdf on Windows/macOS (blocks until Word has saved)
                 docx2pdf_convert(docx_path, pdf_path)
             else:
                 print("   ❌ No PDF conversion method available")
                 return None
             
-            # WAIT LOOP: Ensure file exists before returning
-            retries = 10
-            while retries > 0:
-                if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 0:
-                    print(f"   ✅ Conversion verified: {pdf_path}")
-                    return pdf_path
-                time.sleep(0.5)
-                retries -= 1
+            if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 0:
+                print(f"   ✅ Conversion verified: {pdf_path}")
+                return pdf_path
                 
             print(f"   ❌ File not found after conversion: {pdf_path}")
             return None
@@ -1,15 +1,25 @@
 import os
 import json
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+import numpy as np
 from dotenv import load_dotenv
 from pinecone import Pinecone
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
+from supabase import create_client
+
+from services.cache_service import cache_service
 
 # Load environment variables
 load_dotenv()
 
+# Append-only rejection log (one row per rejection)
+REJECTION_HISTORY_TABLE = os.getenv("REJECTION_HISTORY_TABLE", "rejection_history")
+
+# Upper bound on anti-pattern vectors fetched per user for batch screening
+ANTI_PATTERN_FETCH_LIMIT = int(os.getenv("ANTI_PATTERN_FETCH_LIMIT", "100"))
+
 
 def analyze_rejection(job_desc: str, resume_content: dict) -> str:
     """
@@ -57,6 +67,51 @@ Provide a concise gap analysis explaining why this resume was rejected.""")
     return response.content
 
 
+def record_rejection(user_id: str, gap_analysis: str) -> dict:
+    """
+    Appends a rejection to the user's history table.
+    
+    Rows are only ever inserted, so concurrent rejections for the same user
+    cannot overwrite each other.
+    
+    Returns:
+        The stored entry plus the user's running rejection count.
+    """
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    entry = {
+        "user_id": user_id,
+        "gap_analysis": gap_analysis,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    supabase.table(REJECTION_HISTORY_TABLE).insert(entry).execute()
+    
+    count_response = supabase.table(REJECTION_HISTORY_TABLE).select(
+        "id", count="exact"
+    ).eq("user_id", user_id).limit(1).execute()
+    
+    return {**entry, "total_rejections": count_response.count or 0}
+
+
+def user_exists(user_id: str) -> bool:
+    """
+    Whether the user has a profile row (cheaper than fetching their vector).
+    """
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    response = supabase.table("profiles").select("user_id").eq("user_id", user_id).limit(1).execute()
+    return bool(response.data)
+
+
+def get_rejection_history(user_id: str, limit: int = 10) -> List[dict]:
+    """
+    Returns the user's most recent rejections, newest first.
+    """
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    response = supabase.table(REJECTION_HISTORY_TABLE).select(
+        "gap_analysis, created_at"
+    ).eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
+    return response.data or []
+
+
 def update_vector_memory(
     user_id: str,
     gap_analysis: str,
@@ -92,50 +147,25 @@ def update_vector_memory(
     }
     
     try:
-        # Fetch existing user vector
-        fetch_response = index.fetch(ids=[user_id], namespace="users")
-        
-        if user_id in fetch_response.vectors:
-            existing_vector = fetch_response.vectors[user_id]
-            existing_metadata = existing_vector.metadata or {}
-            
-            # Get or initialize rejection history
-            rejection_history = existing_metadata.get("rejection_history", [])
-            
-            # Append new gap analysis with timestamp
-            rejection_entry = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "gap_analysis": gap_analysis
-            }
-            rejection_history.append(rejection_entry)
-            
-            # Keep only last 10 rejections to avoid metadata bloat
-            rejection_history = rejection_history[-10:]
-            
-            # Update metadata
-            updated_metadata = {
-                **existing_metadata,
-                "rejection_history": rejection_history,
-                "last_rejection": datetime.utcnow().isoformat(),
-                "total_rejections": len(rejection_history)
-            }
-            
-            # Upsert with updated metadata
-            index.upsert(
-                vectors=[{
-                    "id": user_id,
-                    "values": existing_vector.values,
-                    "metadata": updated_metadata
-                }],
-                namespace="users"
-            )
-            
-            result["updated_metadata"] = updated_metadata
-        else:
+        # Unknown users get no history row and no anti-pattern vector
+        if not user_exists(user_id):
             result["status"] = "user_not_found"
-            result["message"] = f"No vector found for user_id: {user_id}"
+            result["message"] = f"No profile found for user_id: {user_id}"
             return result
         
+        # Append-only history; the user vector only carries summary fields
+        entry = record_rejection(user_id, gap_analysis)
+        updated_metadata = {
+            "last_rejection": entry["created_at"],
+            "total_rejections": entry["total_rejections"]
+        }
+        
+        # Metadata-only update - the embedding values are never re-sent
+        index.update(id=user_id, set_metadata=updated_metadata, namespace="users")
+        cache_service.bump_profile_version(user_id)
+        
+        result["updated_metadata"] = updated_metadata
+        
         # Create anti-pattern vector for negative prompting
         if create_anti_pattern:
             anti_pattern_id = f"anti_{user_id}_{hash(gap_analysis) % 10000}"
@@ -170,10 +200,123 @@ def update_vector_memory(
     return result
 
 
+def _anti_pattern_result(matches: list) -> dict:
+    is_anti_pattern = bool(matches)
+    return {
+        "is_anti_pattern": is_anti_pattern,
+        "matches": matches,
+        "recommendation": "Consider skipping this job - similar positions led to rejections." if is_anti_pattern else "No anti-pattern matches found."
+    }
+
+
 def check_anti_patterns(user_id: str, job_description: str, threshold: float = 0.85) -> dict:
     """
     Checks if a job description matches known anti-patterns for a user.
     """
+    return check_anti_patterns_batch(user_id, [job_description], threshold)[0]
+
+
+def _fetch_anti_patterns(index, user_id: str, probe_vector: List[float]) -> list:
+    """All of the user's anti-pattern vectors in one round-trip (the filter, not the probe, selects them)."""
+    response = index.query(
+        vector=probe_vector,
+        top_k=ANTI_PATTERN_FETCH_LIMIT,
+        namespace="anti-patterns",
+        filter={"user_id": {"$eq": user_id}},
+        include_values=True,
+        include_metadata=True
+    )
+    return [m for m in response.matches if m.values]
+
+
+def _user_vector(index, user_id: str) -> Optional[List[float]]:
+    """The stored profile vector - a probe that costs no embedding call."""
+    try:
+        result = index.fetch(ids=[user_id], namespace="users")
+        if result.vectors and user_id in result.vectors:
+            return result.vectors[user_id].values
+    except Exception as e:
+        print(f"⚠️ [Agent 4] User vector fetch failed for {user_id}: {e}")
+    return None
+
+
+def score_anti_patterns(
+    anti_patterns: list,
+    job_vectors: List[Optional[List[float]]],
+    threshold: float = 0.85,
+    top_k: int = 5
+) -> List[dict]:
+    """
+    Scores job vectors against fetched anti-patterns with one cosine-similarity
+    matrix multiply. Jobs without a vector never match.
+    """
+    results = [_anti_pattern_result([]) for _ in job_vectors]
+    rows = [i for i, v in enumerate(job_vectors) if v]
+    if not anti_patterns or not rows:
+        return results
+    
+    def _unit_rows(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+    
+    # (jobs x anti-patterns) cosine similarities
+    scores = _unit_rows([job_vectors[i] for i in rows]) @ _unit_rows([m.values for m in anti_patterns]).T
+    
+    for job, row in zip(rows, scores):
+        ranked = np.argsort(-row)[:top_k]
+        matches = [
+            {
+                "id": anti_patterns[i].id,
+                "score": round(float(row[i]), 4),
+                "gap_analysis": (anti_patterns[i].metadata or {}).get("gap_analysis", "")
+            }
+            for i in ranked if row[i] >= threshold
+        ]
+        results[job] = _anti_pattern_result(matches)
+    return results
+
+
+def screen_job_vectors(
+    user_id: str,
+    job_vectors: List[Optional[List[float]]],
+    user_vector: List[float],
+    threshold: float = 0.85,
+    top_k: int = 5
+) -> List[dict]:
+    """
+    Screens jobs whose vectors are already in hand (e.g. returned by the
+    nightly Pinecone match query) - no embedding calls at all.
+    """
+    if not job_vectors:
+        return []
+    
+    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    index = pc.Index(os.getenv("PINECONE_INDEX_NAME", "ai-verse"))
+    anti_patterns = _fetch_anti_patterns(index, user_id, user_vector)
+    return score_anti_patterns(anti_patterns, job_vectors, threshold, top_k)
+
+
+def check_anti_patterns_batch(
+    user_id: str,
+    job_descriptions: List[str],
+    threshold: float = 0.85,
+    top_k: int = 5
+) -> List[dict]:
+    """
+    Screens many job descriptions against a user's anti-patterns at once.
+    
+    A user only has a handful of anti-pattern vectors, so they are fetched
+    once (probing with the stored user vector) before anything is embedded;
+    users without anti-patterns cost no embedding call. Otherwise every JD is
+    embedded in a single batch and scored with score_anti_patterns.
+    
+    Returns:
+        One check_anti_patterns-style result per job description, in order.
+    """
+    if not job_descriptions:
+        return []
+    
     pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
     index_name = os.getenv("PINECONE_INDEX_NAME", "ai-verse")
     index = pc.Index(index_name)
@@ -183,32 +326,21 @@ def check_anti_patterns(user_id: str, job_description: str, threshold: float = 0
         google_api_key=os.getenv("GEMINI_API_KEY")
     )
     
-    # Generate embedding for job description
-    job_embedding = embeddings.embed_query(job_description)
-    
-    # Query anti-patterns namespace
-    query_response = index.query(
-        vector=job_embedding,
-        top_k=5,
-        namespace="anti-patterns",
-        filter={"user_id": {"$eq": user_id}},
-        include_metadata=True
-    )
+    def _embed_jobs() -> List[List[float]]:
+        # Query task type, same as embed_query, so scores match the single check
+        return embeddings.embed_documents(list(job_descriptions), task_type="RETRIEVAL_QUERY")
     
-    matches = []
-    is_anti_pattern = False
+    job_embeddings = None
+    probe = _user_vector(index, user_id)
+    if probe is None:
+        # No profile vector to probe with - fall back to any JD
+        job_embeddings = _embed_jobs()
+        probe = job_embeddings[0]
     
-    for match in query_response.matches:
-        if match.score >= threshold:
-            is_anti_pattern = True
-            matches.append({
-                "id": match.id,
-                "score": match.score,
-                "gap_analysis": match.metadata.get("gap_analysis", "")
-            })
+    anti_patterns = _fetch_anti_patterns(index, user_id, probe)
+    if not anti_patterns:
+        return [_anti_pattern_result([]) for _ in job_descriptions]
     
-    return {
-        "is_anti_pattern": is_anti_pattern,
-        "matches": matches,
-        "recommendation": "Consider skipping this job - similar positions led to rejections." if is_anti_pattern else "No anti-pattern matches found."
-    }
+    if job_embeddings is None:
+        job_embeddings = _embed_jobs()
+    return score_anti_patterns(anti_patterns, job_embeddings, threshold, top_k)
@@ -1,12 +1,13 @@
 import os
 import jinja2
-import subprocess
 import tempfile
-import shutil
 
 import re
 
-import platform 
+from .latex_pool import latex_pool, run_pdflatex, resolve_latex_command, template_preamble
+from .workspace import request_tempdir
+
+LATEX_POOL_ENABLED = os.getenv("LATEX_POOL_ENABLED", "true").lower() == "true"
 
 class LatexSurgeon:
     def __init__(self, template_dir: str):
@@ -71,61 +72,48 @@ class LatexSurgeon:
             print(f"❌ [LatexSurgeon] Template Rendering Failed: {e}")
             raise e
 
-    def compile_pdf(self, tex_content: str, output_filename: str = "output.pdf") -> str:
+    def compile_pdf(self, tex_content: str, output_filename: str = "output.pdf", output_dir: str = None) -> str:
         """
-        Compiles the LaTeX content to PDF using MiKTeX (Windows-safe).
+        Compiles the LaTeX content to a PDF file.
+        Written into `output_dir`, or a fresh per-request temp namespace so
+        concurrent compiles with the same filename never collide.
         Returns the path to the generated PDF.
         """
-        with tempfile.TemporaryDirectory() as temp_dir:
-            tex_path = os.path.join(temp_dir, "resume.tex")
-
-            # Write .tex file
-            with open(tex_path, "w", encoding="utf-8") as f:
-                f.write(tex_content)
-
-            print("⚙️ [LatexSurgeon] Compiling PDF...")
-            
-            latex_cmd = self._resolve_latex_command()
-
-            cmd = [
-                latex_cmd,
-                "-interaction=nonstopmode",
-                "-halt-on-error",
-                "resume.tex"
-            ]
-
-            try:
-                # Run LaTeX ONCE (enough for resumes)
-                result = subprocess.run(
-                    cmd,
-                    cwd=temp_dir,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=120
-                )
+        try:
+            pdf_bytes = self.compile_pdf_bytes(tex_content)
 
-                if result.returncode != 0:
-                    raise RuntimeError(
-                        f"LaTeX compilation failed\n"
-                        f"STDOUT:\n{result.stdout}\n"
-                        f"STDERR:\n{result.stderr}"
-                    )
+            final_path = os.path.join(output_dir or request_tempdir(), output_filename)
+            with open(final_path, "wb") as f:
+                f.write(pdf_bytes)
 
-                generated_pdf = os.path.join(temp_dir, "resume.pdf")
+            print(f"✅ [LatexSurgeon] PDF Compiled: {final_path}")
+            return final_path
 
-                if not os.path.exists(generated_pdf):
-                    raise FileNotFoundError("LaTeX did not produce resume.pdf")
+        except Exception as e:
+            print(f"❌ [LatexSurgeon] Compilation Error:\n{e}")
+            return None
 
-                final_path = os.path.join(tempfile.gettempdir(), output_filename)
-                shutil.copy(generated_pdf, final_path)
+    def compile_pdf_bytes(self, tex_content: str) -> bytes:
+        """
+        Compiles the LaTeX content and returns the PDF bytes (no file copy).
+        Goes through the warm compile pool (pre-dumped preamble format,
+        bounded workers) unless LATEX_POOL_ENABLED=false.
+        Raises on failure.
+        """
+        print("⚙️ [LatexSurgeon] Compiling PDF...")
+        if LATEX_POOL_ENABLED:
+            return latex_pool.compile(tex_content)
+        return self.compile_one_shot(tex_content)
 
-                print(f"✅ [LatexSurgeon] PDF Compiled: {final_path}")
-                return final_path
+    def compile_one_shot(self, tex_content: str) -> bytes:
+        """Fresh pdflatex process in a fresh temp dir (no pool, no format)."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return run_pdflatex(tex_content, temp_dir)
 
-            except Exception as e:
-                print(f"❌ [LatexSurgeon] Compilation Error:\n{e}")
-                return None
+    def prewarm(self, template_name: str) -> bool:
+        """Dump the template's preamble format so the first compile is warm."""
+        preamble = template_preamble(self.template_dir, template_name)
+        return bool(preamble) and latex_pool.prewarm_preamble(preamble)
 
     def _resolve_latex_command(self):
         """
@@ -133,24 +121,4 @@ class LatexSurgeon:
         Windows  -> miktex-pdflatex
         Linux/Mac -> pdflatex
         """
-        system = platform.system().lower()
-
-        if system == "windows":
-            # Prefer MiKTeX binary
-            if shutil.which("miktex-pdflatex"):
-                return "miktex-pdflatex"
-            elif shutil.which("pdflatex"):
-                # Fallback (rare but safe)
-                return "pdflatex"
-            else:
-                raise RuntimeError(
-                    "No LaTeX compiler found. Please install MiKTeX."
-                )
-
-        # Linux / macOS
-        if shutil.which("pdflatex"):
-            return "pdflatex"
-
-        raise RuntimeError(
-            "pdflatex not found. Please install TeX Live."
-        )
+        return resolve_latex_command()
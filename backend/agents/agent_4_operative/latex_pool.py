@@ -0,0 +1,346 @@
+"""
+Warm LaTeX compilation pool for Agent 4.
+
+A one-page resume spends most of its pdflatex run loading the format and the
+preamble's packages. This pool removes that cost and bounds concurrency:
+
+- Preamble formats: everything before \\begin{document} is dumped once into a
+  .fmt file (keyed by a hash of the preamble), so each compile only typesets
+  the body. Formats are built lazily on first use, or up front via
+  `prewarm_preamble()`. A preamble that cannot be dumped falls back to a
+  normal full compile.
+- Bounded workers: N threads, each with a reusable working directory, drain
+  a bounded queue. When the queue is full, `submit()` blocks for at most
+  LATEX_SUBMIT_TIMEOUT seconds and then raises `LatexPoolBusy`, so callers
+  feel back-pressure instead of piling up pdflatex processes.
+- Async API: `await compile_async(tex)` runs without blocking the event loop.
+"""
+
+import os
+import re
+import shutil
+import asyncio
+import hashlib
+import logging
+import platform
+import tempfile
+import threading
+import time
+import subprocess
+from concurrent.futures import Future
+from queue import Queue, Full
+from typing import Callable, Optional
+
+logger = logging.getLogger("Agent4.LatexPool")
+
+LATEX_POOL_WORKERS = int(os.getenv("LATEX_POOL_WORKERS", "2"))
+LATEX_POOL_MAX_QUEUE = int(os.getenv("LATEX_POOL_MAX_QUEUE", "16"))
+LATEX_SUBMIT_TIMEOUT = float(os.getenv("LATEX_SUBMIT_TIMEOUT", "5.0"))
+LATEX_COMPILE_TIMEOUT = float(os.getenv("LATEX_COMPILE_TIMEOUT", "120"))
+LATEX_FORMAT_DIR = os.getenv("LATEX_FORMAT_DIR") or os.path.join(tempfile.gettempdir(), "erflog_latex_formats")
+
+BEGIN_DOCUMENT = "\\begin{document}"
+
+
+class LatexPoolBusy(RuntimeError):
+    """Raised when the compile queue stays full past the submit timeout."""
+
+
+class LatexCompileError(RuntimeError):
+    """Raised when pdflatex fails or produces no PDF."""
+
+
+def resolve_latex_command() -> str:
+    """
+    Resolve the correct LaTeX compiler command based on OS.
+    Windows  -> miktex-pdflatex
+    Linux/Mac -> pdflatex
+    """
+    system = platform.system().lower()
+
+    if system == "windows":
+        # Prefer MiKTeX binary
+        if shutil.which("miktex-pdflatex"):
+            return "miktex-pdflatex"
+        elif shutil.which("pdflatex"):
+            # Fallback (rare but safe)
+            return "pdflatex"
+        else:
+            raise RuntimeError(
+                "No LaTeX compiler found. Please install MiKTeX."
+            )
+
+    # Linux / macOS
+    if shutil.which("pdflatex"):
+        return "pdflatex"
+
+    raise RuntimeError(
+        "pdflatex not found. Please install TeX Live."
+    )
+
+
+def split_preamble(tex: str):
+    """Split a document into (preamble, body starting at \\begin{document})."""
+    idx = tex.find(BEGIN_DOCUMENT)
+    if idx < 0:
+        return None, tex
+    return tex[:idx], tex[idx:]
+
+
+def preamble_format_name(preamble: str) -> str:
+    return "resume_" + hashlib.sha256(preamble.encode("utf-8")).hexdigest()[:16]
+
+
+def run_pdflatex(tex: str, workdir: str, fmt: Optional[str] = None,
+                 fmt_dir: Optional[str] = None, timeout: float = LATEX_COMPILE_TIMEOUT) -> bytes:
+    """Compile `tex` in `workdir` and return the PDF bytes."""
+    tex_path = os.path.join(workdir, "resume.tex")
+    pdf_path = os.path.join(workdir, "resume.pdf")
+    if os.path.exists(pdf_path):
+        os.remove(pdf_path)
+
+    with open(tex_path, "w", encoding="utf-8") as f:
+        f.write(tex)
+
+    cmd = [resolve_latex_command(), "-interaction=nonstopmode", "-halt-on-error"]
+    env = None
+    if fmt:
+        cmd.append(f"-fmt={fmt}")
+        # Trailing separator keeps the default search path after ours
+        env = {**os.environ, "TEXFORMATS": f"{fmt_dir}{os.pathsep}"}
+    cmd.append("resume.tex")
+
+    # Run LaTeX ONCE (enough for resumes)
+    result = subprocess.run(
+        cmd,
+        cwd=workdir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=timeout,
+        env=env
+    )
+
+    if result.returncode != 0:
+        raise LatexCompileError(
+            f"LaTeX compilation failed\n"
+            f"STDOUT:\n{result.stdout[-4000:]}\n"
+            f"STDERR:\n{result.stderr[-2000:]}"
+        )
+    if not os.path.exists(pdf_path):
+        raise LatexCompileError("LaTeX did not produce resume.pdf")
+
+    with open(pdf_path, "rb") as f:
+        return f.read()
+
+
+class LatexCompilePool:
+    """Bounded pool of pdflatex workers sharing pre-dumped preamble formats."""
+
+    def __init__(
+        self,
+        workers: int = LATEX_POOL_WORKERS,
+        max_queue: int = LATEX_POOL_MAX_QUEUE,
+        format_dir: str = LATEX_FORMAT_DIR,
+        runner: Optional[Callable[..., bytes]] = None,
+        use_formats: bool = True
+    ):
+        self.workers = max(1, workers)
+        self.format_dir = format_dir
+        self.use_formats = use_formats
+        self._runner = runner or run_pdflatex
+        self._queue: "Queue" = Queue(maxsize=max(1, max_queue))
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._format_locks: dict[str, threading.Lock] = {}
+        self._formats: dict[str, bool] = {}  # name -> built OK
+        self._running = False
+        self.stats = {
+            "compiled": 0,
+            "failed": 0,
+            "rejected": 0,
+            "format_hits": 0,
+            "format_fallbacks": 0,
+            "total_seconds": 0.0,
+        }
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, args=(i,), name=f"latex-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"🧵 LaTeX pool started ({self.workers} workers)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    # =========================================================================
+    # Formats
+    # =========================================================================
+
+    def _format_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._format_locks.setdefault(name, threading.Lock())
+
+    def ensure_format(self, preamble: str) -> Optional[str]:
+        """Build (once) the .fmt for a preamble. Returns its name, or None if unusable."""
+        name = preamble_format_name(preamble)
+        if name in self._formats:
+            return name if self._formats[name] else None
+
+        with self._format_lock(name):
+            if name in self._formats:
+                return name if self._formats[name] else None
+
+            fmt_path = os.path.join(self.format_dir, f"{name}.fmt")
+            if os.path.exists(fmt_path):
+                self._formats[name] = True
+                return name
+
+            try:
+                os.makedirs(self.format_dir, exist_ok=True)
+                self._dump_format(name, preamble)
+                self._formats[name] = os.path.exists(fmt_path)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not dump LaTeX format {name}: {e}")
+                self._formats[name] = False
+
+            if self._formats[name]:
+                logger.info(f"🔥 LaTeX format ready: {name}")
+            return name if self._formats[name] else None
+
+    def _dump_format(self, name: str, preamble: str) -> None:
+        src = os.path.join(self.format_dir, f"{name}.tex")
+        with open(src, "w", encoding="utf-8") as f:
+            f.write(preamble)
+            f.write("\n\\dump\n")
+
+        result = subprocess.run(
+            [resolve_latex_command(), "-ini", f"-jobname={name}",
+             "-interaction=nonstopmode", "-halt-on-error", "&pdflatex", f"{name}.tex"],
+            cwd=self.format_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=LATEX_COMPILE_TIMEOUT
+        )
+        if result.returncode != 0:
+            raise LatexCompileError(result.stdout[-2000:])
+
+    def prewarm_preamble(self, preamble: str) -> bool:
+        """Dump the format for a known preamble ahead of the first request."""
+        return self.use_formats and self.ensure_format(preamble) is not None
+
+    # =========================================================================
+    # Compilation
+    # =========================================================================
+
+    def _compile(self, tex: str, workdir: str) -> bytes:
+        preamble, body = split_preamble(tex)
+        fmt = self.ensure_format(preamble) if (self.use_formats and preamble) else None
+
+        if fmt:
+            try:
+                pdf = self._runner(body, workdir, fmt=fmt, fmt_dir=self.format_dir)
+                self.stats["format_hits"] += 1
+                return pdf
+            except Exception as e:
+                # A body that depends on something the dump dropped - recompile in full
+                logger.warning(f"⚠️ Format compile failed, retrying without {fmt}: {str(e)[:200]}")
+                self.stats["format_fallbacks"] += 1
+
+        return self._runner(tex, workdir)
+
+    def _worker(self, index: int) -> None:
+        workdir = tempfile.mkdtemp(prefix=f"erflog_latex_{index}_")
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                tex, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                started = time.perf_counter()
+                try:
+                    future.set_result(self._compile(tex, workdir))
+                    self.stats["compiled"] += 1
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    future.set_exception(e)
+                finally:
+                    self.stats["total_seconds"] += time.perf_counter() - started
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def submit(self, tex: str, timeout: float = LATEX_SUBMIT_TIMEOUT) -> Future:
+        """
+        Queue a compile. Returns a Future resolving to the PDF bytes.
+
+        Raises:
+            LatexPoolBusy: if the queue stays full for `timeout` seconds
+        """
+        if not self._running:
+            self.start()
+        future: Future = Future()
+        try:
+            self._queue.put((tex, future), timeout=timeout)
+        except Full:
+            self.stats["rejected"] += 1
+            raise LatexPoolBusy(f"LaTeX compile queue full ({self._queue.maxsize} pending)")
+        return future
+
+    def compile(self, tex: str, timeout: float = LATEX_COMPILE_TIMEOUT) -> bytes:
+        """Blocking compile through the pool."""
+        return self.submit(tex).result(timeout=timeout)
+
+    async def compile_async(self, tex: str) -> bytes:
+        """Compile without blocking the event loop (queue wait included)."""
+        future = await asyncio.to_thread(self.submit, tex)
+        return await asyncio.wrap_future(future)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def snapshot(self) -> dict:
+        compiled = self.stats["compiled"] + self.stats["failed"]
+        return {
+            **self.stats,
+            "pending": self.pending,
+            "workers": self.workers,
+            "avg_seconds": round(self.stats["total_seconds"] / compiled, 3) if compiled else 0.0,
+        }
+
+
+def template_preamble(template_dir: str, template_name: str) -> Optional[str]:
+    """Static preamble of a LaTeX Jinja template, or None if it is templated."""
+    try:
+        with open(os.path.join(template_dir, template_name), encoding="utf-8") as f:
+            source = f.read()
+    except OSError:
+        return None
+    preamble, _ = split_preamble(source)
+    if preamble is None or re.search(r"\(\(|\(\*", preamble):
+        return None
+    return preamble
+
+
+# Singleton instance
+latex_pool = LatexCompilePool()
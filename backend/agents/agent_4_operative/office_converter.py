@@ -0,0 +1,502 @@
+"""
+Persistent headless LibreOffice converter for Agent 4 (DOCX -> PDF).
+
+`libreoffice --headless --convert-to pdf` pays the full office cold start
+(several seconds) for every document. This module keeps one office process
+alive and feeds it documents, unoserver-style:
+
+- Listener: soffice is started once with a UNO socket listener and its own
+  profile directory. Each conversion is a loadComponentFromURL/storeToURL
+  call on the live instance; the call returns when the PDF is written, so
+  completion is signalled by the Future resolving (no filesystem polling).
+- Queue: a single worker thread owns the office instance (LibreOffice is
+  not safe for concurrent document loads) and drains a bounded queue. When
+  the queue is full, `submit()` raises `OfficeConverterBusy` after
+  OFFICE_SUBMIT_TIMEOUT seconds.
+- Health checks: before a job, if the last check is older than
+  OFFICE_HEALTH_INTERVAL, the worker pings the instance and restarts it if
+  the process died or stopped answering. A conversion that crashes the
+  instance is retried once on a fresh one, and the instance is recycled
+  every OFFICE_MAX_CONVERSIONS documents to bound LibreOffice's memory
+  growth.
+- Watchdog: a conversion still running after OFFICE_CONVERT_TIMEOUT has
+  its Future failed and soffice killed; killing the process disposes the
+  UNO bridge, which unblocks the worker so it restarts the instance and
+  keeps draining the queue.
+
+When the `uno` bindings are not importable (e.g. local dev without
+python3-uno), the worker falls back to one `soffice --convert-to` run per
+document with a persistent profile, which still skips first-run profile
+creation and waits on process exit rather than sleeping.
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future, InvalidStateError
+from queue import Queue, Full, Empty
+from typing import Callable, Optional
+
+logger = logging.getLogger("Agent4.OfficeConverter")
+
+OFFICE_BINARY = os.getenv("OFFICE_BINARY", "")
+OFFICE_PORT = int(os.getenv("OFFICE_PORT", "2002"))
+OFFICE_PROFILE_DIR = os.getenv("OFFICE_PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "erflog_office_profile")
+OFFICE_UNO_PATH = os.getenv("OFFICE_UNO_PATH", "/usr/lib/python3/dist-packages")
+OFFICE_MAX_QUEUE = int(os.getenv("OFFICE_MAX_QUEUE", "16"))
+OFFICE_SUBMIT_TIMEOUT = float(os.getenv("OFFICE_SUBMIT_TIMEOUT", "5.0"))
+OFFICE_CONVERT_TIMEOUT = float(os.getenv("OFFICE_CONVERT_TIMEOUT", "60"))
+OFFICE_START_TIMEOUT = float(os.getenv("OFFICE_START_TIMEOUT", "30"))
+OFFICE_HEALTH_INTERVAL = float(os.getenv("OFFICE_HEALTH_INTERVAL", "30"))
+OFFICE_MAX_CONVERSIONS = int(os.getenv("OFFICE_MAX_CONVERSIONS", "200"))
+
+
+class OfficeConverterBusy(RuntimeError):
+    """Raised when the conversion queue stays full past the submit timeout."""
+
+
+class OfficeConversionError(RuntimeError):
+    """Raised when LibreOffice fails or produces no PDF."""
+
+
+def resolve_office_binary() -> Optional[str]:
+    """soffice/libreoffice executable, or None if LibreOffice is not installed."""
+    if OFFICE_BINARY:
+        return OFFICE_BINARY
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def import_uno():
+    """
+    Import the UNO bindings, or return None.
+
+    Debian's python3-uno installs into the system interpreter's
+    dist-packages, which the image's /usr/local Python does not search.
+    """
+    try:
+        import uno
+        return uno
+    except ImportError:
+        pass
+    if OFFICE_UNO_PATH and os.path.isdir(OFFICE_UNO_PATH) and OFFICE_UNO_PATH not in sys.path:
+        sys.path.append(OFFICE_UNO_PATH)
+        try:
+            import uno
+            return uno
+        except ImportError:
+            pass
+    return None
+
+
+def _profile_url(profile_dir: str) -> str:
+    return "file://" + os.path.abspath(profile_dir)
+
+
+# =============================================================================
+# Office backends (owned by the worker thread)
+# =============================================================================
+
+class UnoOffice:
+    """A long-lived soffice process driven over a UNO socket."""
+
+    def __init__(self, binary: str, port: int = OFFICE_PORT, profile_dir: str = OFFICE_PROFILE_DIR):
+        self.binary = binary
+        self.port = port
+        self.profile_dir = profile_dir
+        self._uno = import_uno()
+        self._process: Optional[subprocess.Popen] = None
+        self._desktop = None
+
+    def start(self) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self._process = subprocess.Popen(
+            [
+                self.binary, "--headless", "--invisible", "--nologo", "--nodefault",
+                "--norestore", "--nolockcheck",
+                f"-env:UserInstallation={_profile_url(self.profile_dir)}",
+                f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local = self._uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        url = f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+
+        # The listener socket opens a moment after the process starts
+        deadline = time.monotonic() + OFFICE_START_TIMEOUT
+        while True:
+            if self._process.poll() is not None:
+                raise OfficeConversionError(f"soffice exited during startup (code {self._process.returncode})")
+            try:
+                ctx = resolver.resolve(url)
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise OfficeConversionError("soffice did not open its UNO listener in time")
+                time.sleep(0.1)
+
+        self._desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+        logger.info(f"🏢 LibreOffice listener up (pid {self._process.pid}, port {self.port})")
+
+    def _props(self, **values):
+        from com.sun.star.beans import PropertyValue
+        props = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name = name
+            prop.Value = value
+            props.append(prop)
+        return tuple(props)
+
+    def convert(self, src_path: str, pdf_path: str) -> None:
+        src_url = self._uno.systemPathToFileUrl(os.path.abspath(src_path))
+        out_url = self._uno.systemPathToFileUrl(os.path.abspath(pdf_path))
+        document = self._desktop.loadComponentFromURL(src_url, "_blank", 0, self._props(Hidden=True, ReadOnly=True))
+        if document is None:
+            raise OfficeConversionError(f"LibreOffice could not open {src_path}")
+        try:
+            # Synchronous: returns once the PDF is fully written
+            document.storeToURL(out_url, self._props(FilterName="writer_pdf_Export"))
+        finally:
+            document.close(True)
+
+    def healthy(self) -> bool:
+        if self._process is None or self._process.poll() is not None:
+            return False
+        try:
+            self._desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def kill(self) -> None:
+        """Hard-stop a hung instance (called from the watchdog thread)."""
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+
+    def close(self) -> None:
+        try:
+            if self._desktop is not None:
+                self._desktop.terminate()
+        except Exception:
+            pass  # The bridge drops as the process exits
+        self._desktop = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+
+class CliOffice:
+    """One `soffice --convert-to` per document, sharing a persistent profile."""
+
+    def __init__(self, binary: str, profile_dir: str = OFFICE_PROFILE_DIR):
+        self.binary = binary
+        self.profile_dir = profile_dir
+
+    def start(self) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+    def convert(self, src_path: str, pdf_path: str) -> None:
+        outdir = tempfile.mkdtemp(prefix="erflog_office_")
+        try:
+            result = subprocess.run(
+                [
+                    self.binary, "--headless", "--norestore", "--nolockcheck",
+                    f"-env:UserInstallation={_profile_url(self.profile_dir)}",
+                    "--convert-to", "pdf", "--outdir", outdir, src_path,
+                ],
+                capture_output=True, text=True, timeout=OFFICE_CONVERT_TIMEOUT
+            )
+            produced = os.path.join(outdir, os.path.splitext(os.path.basename(src_path))[0] + ".pdf")
+            if result.returncode != 0 or not os.path.exists(produced):
+                raise OfficeConversionError(f"LibreOffice conversion failed: {result.stderr[-1000:]}")
+            shutil.move(produced, pdf_path)
+        finally:
+            shutil.rmtree(outdir, ignore_errors=True)
+
+    def healthy(self) -> bool:
+        return os.path.exists(self.binary) or shutil.which(self.binary) is not None
+
+    def kill(self) -> None:
+        pass  # subprocess.run's timeout already kills a hung soffice
+
+    def close(self) -> None:
+        pass
+
+
+def default_office_factory():
+    """UNO listener when the bindings are available, per-document CLI otherwise."""
+    binary = resolve_office_binary()
+    if not binary:
+        raise OfficeConversionError("LibreOffice (soffice) not found")
+    if import_uno() is not None:
+        return UnoOffice(binary)
+    logger.warning("⚠️ python3-uno not available - falling back to one soffice run per document")
+    return CliOffice(binary)
+
+
+# =============================================================================
+# Converter
+# =============================================================================
+
+class OfficeConverter:
+    """Queue of DOCX -> PDF conversions served by one long-lived office instance."""
+
+    def __init__(
+        self,
+        office_factory: Optional[Callable] = None,
+        max_queue: int = OFFICE_MAX_QUEUE,
+        health_interval: float = OFFICE_HEALTH_INTERVAL,
+        max_conversions: int = OFFICE_MAX_CONVERSIONS,
+        convert_timeout: float = OFFICE_CONVERT_TIMEOUT
+    ):
+        self._office_factory = office_factory or default_office_factory
+        self.health_interval = health_interval
+        self.convert_timeout = convert_timeout
+        self.max_conversions = max(1, max_conversions)
+        self._queue: "Queue" = Queue(maxsize=max(1, max_queue))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._ready = threading.Event()
+        self.stats = {
+            "converted": 0,
+            "failed": 0,
+            "rejected": 0,
+            "restarts": 0,
+            "health_failures": 0,
+            "timeouts": 0,
+            "total_seconds": 0.0,
+        }
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._worker, name="office-converter", daemon=True)
+            self._thread.start()
+        logger.info("🧵 Office converter started")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            thread, self._thread = self._thread, None
+        self._queue.put(None)
+        if thread:
+            thread.join(timeout=timeout)
+
+    def wait_ready(self, timeout: float = OFFICE_START_TIMEOUT) -> bool:
+        """Block until the office instance has started (for pre-warming)."""
+        return self._ready.wait(timeout)
+
+    # =========================================================================
+    # Worker
+    # =========================================================================
+
+    def _launch(self):
+        office = self._office_factory()
+        office.start()
+        self._ready.set()
+        return office
+
+    def _restart(self, office, reason: str):
+        logger.warning(f"♻️ Restarting office instance: {reason}")
+        self.stats["restarts"] += 1
+        if office is not None:
+            try:
+                office.close()
+            except Exception:
+                pass
+        return self._launch()
+
+    @staticmethod
+    def _settle(future: Future, result=None, error: Optional[BaseException] = None) -> None:
+        """Resolve a Future unless the watchdog already failed it."""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _on_timeout(self, office, future: Future, src_path: str, fired: threading.Event) -> None:
+        """Watchdog: fail the job and kill the hung instance to unblock the worker."""
+        fired.set()
+        self.stats["timeouts"] += 1
+        logger.error(f"⏱️ Conversion of {src_path} exceeded {self.convert_timeout:.0f}s - killing office instance")
+        self._settle(future, error=OfficeConversionError(
+            f"LibreOffice conversion timed out after {self.convert_timeout:.0f}s"
+        ))
+        try:
+            office.kill()
+        except Exception as e:
+            logger.warning(f"Office kill failed: {e}")
+
+    def _convert(self, office, src_path: str, pdf_path: str, fired: Optional[threading.Event] = None):
+        """Run one conversion, retrying once on a fresh instance if it crashed."""
+        try:
+            office.convert(src_path, pdf_path)
+            return office
+        except Exception as e:
+            if office.healthy() or (fired is not None and fired.is_set()):
+                raise  # The document is the problem (or hung it), not the instance
+            office = self._restart(office, f"crashed during conversion: {e}")
+            office.convert(src_path, pdf_path)
+            return office
+
+    def _worker(self) -> None:
+        office = None
+        last_check = 0.0
+        served = 0
+        try:
+            # Launch eagerly so a pre-warmed converter is ready before the first job
+            try:
+                office = self._launch()
+                last_check = time.monotonic()
+            except Exception as e:
+                logger.error(f"❌ Office instance unavailable: {e}")
+
+            while True:
+                try:
+                    # Idle periods double as health-check ticks
+                    item = self._queue.get(timeout=self.health_interval if office else None)
+                except Empty:
+                    item = False
+                if item is None:
+                    return
+
+                try:
+                    if office is None:
+                        office = self._launch()
+                        last_check, served = time.monotonic(), 0
+                    elif served >= self.max_conversions:
+                        office = self._restart(office, f"recycling after {served} conversions")
+                        last_check, served = time.monotonic(), 0
+                    elif time.monotonic() - last_check >= self.health_interval:
+                        if not office.healthy():
+                            self.stats["health_failures"] += 1
+                            office = self._restart(office, "health check failed")
+                            served = 0
+                        last_check = time.monotonic()
+                except Exception as e:
+                    logger.error(f"❌ Office instance unavailable: {e}")
+                    office = None
+                    if item:
+                        item[2].set_exception(e)
+                    continue
+
+                if not item:
+                    continue
+                src_path, pdf_path, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                started = time.perf_counter()
+                fired = threading.Event()
+                watchdog = threading.Timer(self.convert_timeout, self._on_timeout, args=(office, future, src_path, fired))
+                watchdog.daemon = True
+                watchdog.start()
+                try:
+                    office = self._convert(office, src_path, pdf_path, fired)
+                    if fired.is_set():
+                        raise OfficeConversionError(f"LibreOffice conversion timed out for {src_path}")
+                    if not os.path.exists(pdf_path) or os.path.getsize(pdf_path) == 0:
+                        raise OfficeConversionError(f"LibreOffice produced no PDF for {src_path}")
+                    self.stats["converted"] += 1
+                    self._settle(future, pdf_path)
+                except Exception as e:
+                    self.stats["failed"] += 1
+                    self._settle(future, error=e)
+                    if fired.is_set():
+                        try:
+                            office = self._restart(office, "conversion timed out")
+                            last_check, served = time.monotonic(), 0
+                        except Exception as restart_error:
+                            logger.error(f"❌ Office instance unavailable: {restart_error}")
+                            office = None
+                    elif not office.healthy():
+                        office = None  # Relaunched on the next job
+                finally:
+                    watchdog.cancel()
+                    served += 1
+                    self.stats["total_seconds"] += time.perf_counter() - started
+        finally:
+            if office is not None:
+                try:
+                    office.close()
+                except Exception:
+                    pass
+            self._ready.clear()
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def submit(self, src_path: str, pdf_path: str, timeout: float = OFFICE_SUBMIT_TIMEOUT) -> Future:
+        """
+        Queue a conversion. Returns a Future resolving to `pdf_path` once the
+        PDF has been written.
+
+        Raises:
+            OfficeConverterBusy: if the queue stays full for `timeout` seconds
+        """
+        if not self._running:
+            self.start()
+        future: Future = Future()
+        try:
+            self._queue.put((src_path, pdf_path, future), timeout=timeout)
+        except Full:
+            self.stats["rejected"] += 1
+            raise OfficeConverterBusy(f"Office conversion queue full ({self._queue.maxsize} pending)")
+        return future
+
+    def convert(self, src_path: str, pdf_path: str, timeout: float = OFFICE_CONVERT_TIMEOUT) -> str:
+        """Blocking conversion through the shared office instance."""
+        return self.submit(src_path, pdf_path).result(timeout=timeout)
+
+    async def convert_async(self, src_path: str, pdf_path: str) -> str:
+        """Convert without blocking the event loop (queue wait included)."""
+        future = await asyncio.to_thread(self.submit, src_path, pdf_path)
+        return await asyncio.wrap_future(future)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def snapshot(self) -> dict:
+        done = self.stats["converted"] + self.stats["failed"]
+        return {
+            **self.stats,
+            "pending": self.pending,
+            "running": self._running,
+            "avg_seconds": round(self.stats["total_seconds"] / done, 3) if done else 0.0,
+        }
+
+
+# Singleton instance
+office_converter = OfficeConverter()
@@ -2,6 +2,8 @@ import fitz  # PyMuPDF
 import io
 import os
 import re
+import threading
+from functools import lru_cache
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
@@ -10,6 +12,98 @@ from reportlab.platypus import Paragraph
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_LEFT
 
+# Auto-fit candidates, largest first
+FONT_SIZE_STEPS = (10, 9.5, 9, 8.5, 8)
+LEADING_RATIO = 1.2
+
+# Process-wide font registry: assets_dir -> (regular, bold, italic)
+_font_registry = {}
+_font_lock = threading.Lock()
+
+
+def register_resume_fonts(assets_dir: str) -> tuple:
+    """
+    Registers the LaTeX CMR/CMB fonts with ReportLab once per process.
+    Falls back to Times if the TTFs are missing.
+    """
+    fonts = _font_registry.get(assets_dir)
+    if fonts:
+        return fonts
+
+    with _font_lock:
+        if assets_dir in _font_registry:
+            return _font_registry[assets_dir]
+
+        fonts = ("Times-Roman", "Times-Bold", "Times-Italic")
+        try:
+            reg_path = os.path.join(assets_dir, "cmr10.ttf")
+            bold_path = os.path.join(assets_dir, "cmb10.ttf")
+            
+            if os.path.exists(reg_path) and os.path.exists(bold_path):
+                pdfmetrics.registerFont(TTFont('CMR', reg_path))
+                pdfmetrics.registerFont(TTFont('CMB', bold_path))
+                fonts = ("CMR", "CMB", "Times-Italic")
+                print("✅ [PDFSurgeon] LaTeX fonts loaded.")
+            else:
+                print(f"⚠️ [PDFSurgeon] LaTeX fonts not found in {assets_dir}. Using Times-Roman.")
+        except Exception as e:
+            print(f"⚠️ [PDFSurgeon] Font loading error: {e}")
+
+        _font_registry[assets_dir] = fonts
+        return fonts
+
+
+@lru_cache(maxsize=64)
+def _body_style(font_name: str, font_size: float) -> ParagraphStyle:
+    from reportlab.lib import colors
+    return ParagraphStyle(
+        name='Resume_Body',
+        fontName=font_name,
+        fontSize=font_size,
+        leading=font_size * LEADING_RATIO,
+        alignment=TA_LEFT,
+        textColor=colors.blue
+    )
+
+
+def _estimated_height(plain_lines: tuple, font_name: str, font_size: float, width: float) -> float:
+    """
+    Lower bound on the wrapped height: each source line needs at least
+    ceil(text width / box width) lines. Word wrapping only adds lines.
+    Widths are measured in the regular face with 5% slack for italics.
+    """
+    total = 0
+    for line in plain_lines:
+        line_width = pdfmetrics.stringWidth(line, font_name, font_size) * 0.95
+        total += max(1, -(-line_width // width))
+    return total * font_size * LEADING_RATIO
+
+
+@lru_cache(maxsize=256)
+def fit_font_size(formatted_text: str, font_name: str, width: float, height: float, sizes: tuple = FONT_SIZE_STEPS):
+    """
+    Largest size in `sizes` (descending) whose wrapped paragraph fits the box,
+    or None if even the smallest overflows.
+
+    Sizes whose metric lower bound already overflows are skipped without a
+    layout; the rest are binary-searched with Paragraph.wrap (no canvas).
+    Wrapped height only grows with font size, so the search is exact.
+    """
+    plain = re.sub(r'<[^>]+>', '', formatted_text.replace('<br/>', '\n'))
+    plain_lines = tuple(plain.split('\n'))
+
+    candidates = [fs for fs in sizes if _estimated_height(plain_lines, font_name, fs, width) <= height]
+    lo, hi, best = 0, len(candidates) - 1, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        _, text_h = Paragraph(formatted_text, _body_style(font_name, candidates[mid])).wrap(width, height)
+        if text_h <= height:
+            best, hi = candidates[mid], mid - 1  # Fits: try larger
+        else:
+            lo = mid + 1
+    return best
+
+
 class PDFSurgeon:
     def __init__(self, pdf_path):
         self.pdf_path = pdf_path
@@ -24,25 +118,8 @@ class PDFSurgeon:
         self._register_fonts()
 
     def _register_fonts(self):
-        """Attempts to load LaTeX fonts. Falls back to Times if missing."""
-        self.font_reg = "Times-Roman"
-        self.font_bold = "Times-Bold"
-        self.font_italic = "Times-Italic"
-        
-        try:
-            reg_path = os.path.join(self.assets_dir, "cmr10.ttf")
-            bold_path = os.path.join(self.assets_dir, "cmb10.ttf")
-            
-            if os.path.exists(reg_path) and os.path.exists(bold_path):
-                pdfmetrics.registerFont(TTFont('CMR', reg_path))
-                pdfmetrics.registerFont(TTFont('CMB', bold_path))
-                self.font_reg = 'CMR'
-                self.font_bold = 'CMB'
-                print("✅ [PDFSurgeon] LaTeX fonts loaded.")
-            else:
-                print(f"⚠️ [PDFSurgeon] LaTeX fonts not found in {self.assets_dir}. Using Times-Roman.")
-        except Exception as e:
-            print(f"⚠️ [PDFSurgeon] Font loading error: {e}")
+        """Uses the LaTeX fonts from the process-wide registry (Times if missing)."""
+        self.font_reg, self.font_bold, self.font_italic = register_resume_fonts(self.assets_dir)
 
     def _markdown_to_reportlab(self, text):
         """Converts Markdown bold/italic to ReportLab XML tags."""
@@ -101,20 +178,8 @@ class PDFSurgeon:
         # This ensures 1:1 overlay without scaling
         c = canvas.Canvas(packet, pagesize=(self.width, self.height))
         
-        from reportlab.lib import colors
-        
         formatted_text = self._markdown_to_reportlab(text)
-        
-        style = ParagraphStyle(
-            name='Resume_Body',
-            fontName=self.font_reg,
-            fontSize=font_size,
-            leading=font_size * 1.2,
-            alignment=TA_LEFT,
-            textColor=colors.blue
-        )
-        
-        p = Paragraph(formatted_text, style)
+        p = Paragraph(formatted_text, _body_style(self.font_reg, font_size))
         
         # Wrap text within the available width
         # This calculates the actual height the text will occupy
@@ -155,21 +220,17 @@ class PDFSurgeon:
         bounds = self.find_section_bounds(section_name, next_section_name)
         if not bounds: return False
         
-        # 2. Generate Full-Page Patch with Auto-Fit
-        patch_stream = None
+        # 2. Auto-Fit: solve for the largest size 10 -> 8 that fits, then render once
+        fs = fit_font_size(self._markdown_to_reportlab(new_text), self.font_reg, bounds["w"], bounds["h"])
+        result = self.create_patch_stream(new_text, bounds, font_size=fs) if fs else None
         
-        # Try resizing fonts 10 -> 8
-        for fs in [10, 9.5, 9, 8.5, 8]:
-            result = self.create_patch_stream(new_text, bounds, font_size=fs)
-            if result:
-                patch_stream = result[0] # We just need the stream
-                if fs < 10:
-                    print(f"   📉 Auto-fitted text with font-size {fs}pt")
-                break
-        
-        if not patch_stream:
+        if not result:
             print(f"   ⚠️ Content too long for section '{section_name}'. available_h={bounds['h']}")
             return False 
+        
+        patch_stream = result[0] # We just need the stream
+        if fs < FONT_SIZE_STEPS[0]:
+            print(f"   📉 Auto-fitted text with font-size {fs}pt")
             
         # 3. Redact Old Content (Clean Slate)
         # We still use the bounds to white-out the old text
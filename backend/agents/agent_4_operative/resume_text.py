@@ -0,0 +1,159 @@
+"""
+Resume text provider for Agent 4.
+
+Tailoring needs the plain text of the user's primary resume. Agent 1 already
+parsed it at upload time and stored it in `profiles.resume_text`, so the
+storage download + pdfminer pass is only needed when that column is empty
+(e.g. manual onboarding). Lookup order:
+
+1. profiles.resume_text (one DB read, written together with {user_id}.pdf)
+2. Local disk cache keyed by the storage object's ETag (one metadata call)
+3. Download + pdfminer extraction, which refills the disk cache and the
+   profiles.resume_text column
+"""
+
+import os
+import logging
+import tempfile
+import threading
+from typing import Optional, Callable
+
+from supabase import create_client
+
+logger = logging.getLogger("Agent4.ResumeText")
+
+RESUME_BUCKET = "Resume"
+RESUME_TEXT_CACHE_DIR = os.getenv("RESUME_TEXT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "erflog_resume_text")
+MIN_RESUME_TEXT_CHARS = 50  # Same threshold the ATS scorer uses for "no resume"
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    from pdfminer.high_level import extract_text
+    return extract_text(pdf_path)
+
+
+class ResumeTextProvider:
+    """Cache-first access to a user's primary resume text."""
+
+    def __init__(
+        self,
+        cache_dir: str = RESUME_TEXT_CACHE_DIR,
+        client_factory: Optional[Callable] = None,
+        extractor: Callable[[str], str] = extract_pdf_text
+    ):
+        self.cache_dir = cache_dir
+        self._client_factory = client_factory or (
+            lambda: create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+        )
+        self._extract = extractor
+        self._lock = threading.Lock()
+        self.stats = {"profile": 0, "disk": 0, "download": 0}
+
+    def _count(self, source: str) -> None:
+        with self._lock:
+            self.stats[source] += 1
+
+    # =========================================================================
+    # Sources
+    # =========================================================================
+
+    @staticmethod
+    def _object_name(user_id: str) -> str:
+        return f"{user_id}.pdf"
+
+    def _cache_path(self, user_id: str, etag: str) -> str:
+        safe = "".join(c for c in etag if c.isalnum() or c in "-_")
+        return os.path.join(self.cache_dir, f"{user_id}.{safe}.txt")
+
+    def _profile_text(self, supabase, user_id: str) -> str:
+        try:
+            response = supabase.table("profiles").select("resume_text").eq("user_id", user_id).execute()
+            if response.data:
+                return response.data[0].get("resume_text") or ""
+        except Exception as e:
+            logger.warning(f"profiles.resume_text read failed for {user_id}: {e}")
+        return ""
+
+    def _storage_etag(self, supabase, user_id: str) -> Optional[str]:
+        """ETag of {user_id}.pdf from a metadata listing (no download)."""
+        name = self._object_name(user_id)
+        try:
+            for obj in supabase.storage.from_(RESUME_BUCKET).list("", {"search": name, "limit": 10}):
+                if obj.get("name") != name:
+                    continue
+                meta = obj.get("metadata") or {}
+                etag = meta.get("eTag") or meta.get("etag")
+                if etag:
+                    return etag.strip('"')
+                # Older storage APIs omit eTag; size + mtime identify the upload
+                if obj.get("updated_at") or meta.get("lastModified"):
+                    return f"{meta.get('size', 0)}-{obj.get('updated_at') or meta.get('lastModified')}"
+        except Exception as e:
+            logger.warning(f"Storage metadata lookup failed for {name}: {e}")
+        return None
+
+    def _download_text(self, supabase, user_id: str) -> str:
+        name = self._object_name(user_id)
+        data = supabase.storage.from_(RESUME_BUCKET).download(name)
+        fd, path = tempfile.mkstemp(prefix=f"resume_{user_id}_", suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self._extract(path)
+        finally:
+            os.remove(path)
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def get_text(self, user_id: str) -> str:
+        """
+        Return the user's resume text, downloading the PDF only when no
+        parsed copy is current.
+
+        Raises:
+            Exception: if the resume has to be downloaded and that fails
+        """
+        supabase = self._client_factory()
+
+        text = self._profile_text(supabase, user_id)
+        if len(text.strip()) >= MIN_RESUME_TEXT_CHARS:
+            self._count("profile")
+            logger.info(f"🎯 Resume text for {user_id} from profiles.resume_text ({len(text)} chars)")
+            return text
+
+        etag = self._storage_etag(supabase, user_id)
+        cache_path = self._cache_path(user_id, etag) if etag else None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as f:
+                text = f.read()
+            self._count("disk")
+            logger.info(f"🎯 Resume text for {user_id} from disk cache (etag {etag[:12]})")
+            return text
+
+        logger.info(f"📭 Resume text for {user_id} not cached - downloading PDF")
+        text = self._download_text(supabase, user_id)
+        self._count("download")
+
+        if cache_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, cache_path)
+            except Exception as e:
+                logger.warning(f"Resume text disk write failed for {user_id}: {e}")
+
+        if len(text.strip()) >= MIN_RESUME_TEXT_CHARS:
+            try:
+                supabase.table("profiles").update({"resume_text": text}).eq("user_id", user_id).execute()
+                logger.info(f"💾 Backfilled profiles.resume_text for {user_id}")
+            except Exception as e:
+                logger.warning(f"profiles.resume_text backfill failed for {user_id}: {e}")
+        return text
+
+
+# Singleton instance
+resume_text_provider = ResumeTextProvider()
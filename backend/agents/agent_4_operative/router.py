@@ -1,7 +1,11 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+import os
+import json
+import time
+import asyncio
 import httpx
-import tempfile
 
 from .schemas import (
     GenerateResumeRequest,
@@ -17,11 +21,28 @@ from .schemas import (
     AtsRequest,
     AtsScoreResponse,
     AutoApplyRequest,
-    AutoApplyResponse
+    AutoApplyResponse,
+    ResumeJobSubmitResponse,
+    ResumeJobStatusResponse,
+    GenerateResumeBatchRequest,
+    GenerateResumeBatchResponse,
+    AutoApplyJobRequest,
+    AutoApplyBatchRequest,
+    AutoApplyJobSubmitResponse,
+    AutoApplyBatchSubmitResponse,
+    AutoApplyJobStatusResponse
 )
-from .service import agent4_service
+from .service import agent4_service, enqueue_resume_generation, RESUME_JOB_TYPE
 from auth.dependencies import get_current_user
-from .tools import calculate_ats_score, run_auto_apply, analyze_rejection
+from .tools import calculate_ats_score, quick_ats_score, run_auto_apply, analyze_rejection, RESUME_BATCH_MAX_JOBS
+from services.artifact_cache import artifact_cache
+from .browser_pool import browser_pool
+from .apply_queue import auto_apply_queue, browser_loop, enqueue_auto_apply, target_domain, AUTO_APPLY_JOB_TYPE, AUTO_APPLY_BATCH_MAX_JOBS
+from services.job_queue import job_queue, JobStatus, TERMINAL_STATUSES
+
+# SSE progress stream: poll interval and keep-alive for idle proxies
+RESUME_JOB_EVENT_INTERVAL = float(os.getenv("RESUME_JOB_EVENT_INTERVAL", "0.5"))
+RESUME_JOB_KEEPALIVE_SECONDS = 15.0
 
 
 agent4_router = APIRouter(
@@ -47,6 +68,18 @@ async def health_check():
     )
 
 
+@agent4_router.get("/metrics/artifact-cache")
+async def get_artifact_cache_metrics():
+    """Tailored-PDF artifact cache hit rate and bytes saved."""
+    return artifact_cache.snapshot()
+
+
+@agent4_router.get("/metrics/browser-pool")
+async def get_browser_pool_metrics():
+    """Auto-apply browser pool: launches, contexts served, evictions, active leases."""
+    return browser_pool.snapshot()
+
+
 @agent4_router.post(
     "/generate-resume",
     response_model=GenerateResumeResponse,
@@ -92,6 +125,133 @@ async def generate_resume_authenticated(
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
+# =============================================================================
+# ASYNC + BATCH RESUME GENERATION (submit / poll / SSE, multi-job)
+# =============================================================================
+
+def _current_user_id(user: dict) -> str:
+    user_id = user.get("sub") or user.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="User ID not found in token")
+    return user_id
+
+
+def _get_resume_job(job_id: str, user_id: str) -> dict:
+    job = job_queue.get(job_id)
+    if not job or job.get("type") != RESUME_JOB_TYPE or job.get("metadata", {}).get("user_id") != user_id:
+        raise HTTPException(status_code=404, detail="Resume job not found")
+    return job
+
+
+def _resume_job_view(job: dict) -> dict:
+    return ResumeJobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        attempts=job.get("attempts", 0),
+        stage=(job.get("current_stage") or {}).get("name"),
+        timings=job.get("timings", {}),
+        progress=job.get("progress", []),
+        result=job.get("result") if job["status"] == JobStatus.SUCCEEDED else None,
+        error=job.get("error") if job["status"] == JobStatus.FAILED else None
+    ).model_dump()
+
+
+@agent4_router.post("/generate-resume/jobs", response_model=ResumeJobSubmitResponse, status_code=202)
+async def submit_resume_job(
+    request: GenerateResumeAuthenticatedRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Queue resume generation and return a job id immediately.
+    
+    Poll GET /agent4/generate-resume/jobs/{job_id} or stream
+    GET /agent4/generate-resume/jobs/{job_id}/events (SSE) for stage progress.
+    """
+    user_id = _current_user_id(user)
+    job_id = enqueue_resume_generation(user_id, request.job_description, request.job_id)
+    return ResumeJobSubmitResponse(
+        job_id=job_id,
+        status_url=f"/agent4/generate-resume/jobs/{job_id}",
+        events_url=f"/agent4/generate-resume/jobs/{job_id}/events"
+    )
+
+
+@agent4_router.get("/generate-resume/jobs/{job_id}", response_model=ResumeJobStatusResponse)
+async def get_resume_job(job_id: str, user: dict = Depends(get_current_user)):
+    """Poll a queued resume generation. `result` is present once status is 'succeeded'."""
+    return _resume_job_view(_get_resume_job(job_id, _current_user_id(user)))
+
+
+@agent4_router.get("/generate-resume/jobs/{job_id}/events")
+async def stream_resume_job(job_id: str, user: dict = Depends(get_current_user)):
+    """
+    Server-Sent Events for a resume job.
+    
+    Emits one `progress` event per stage as it starts, then a final
+    `succeeded` / `failed` event carrying the full status (timings + result).
+    """
+    user_id = _current_user_id(user)
+    _get_resume_job(job_id, user_id)
+
+    async def events():
+        sent = 0
+        last_write = time.monotonic()
+        while True:
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            if not job:
+                yield f"event: failed\ndata: {json.dumps({'job_id': job_id, 'error': 'Job expired'})}\n\n"
+                return
+
+            progress = job.get("progress", [])
+            for event in progress[sent:]:
+                yield f"event: progress\ndata: {json.dumps(event)}\n\n"
+                last_write = time.monotonic()
+            sent = len(progress)
+
+            if job["status"] in TERMINAL_STATUSES:
+                yield f"event: {job['status']}\ndata: {json.dumps(_resume_job_view(job), default=str)}\n\n"
+                return
+
+            if time.monotonic() - last_write > RESUME_JOB_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_write = time.monotonic()
+            await asyncio.sleep(RESUME_JOB_EVENT_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@agent4_router.post(
+    "/generate-resume/batch",
+    response_model=GenerateResumeBatchResponse,
+    responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}}
+)
+async def generate_resume_batch(
+    request: GenerateResumeBatchRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Tailor the authenticated user's resume for several jobs in one call.
+    
+    Resume loading and contact parsing happen once; per-job structuring and
+    compilation run concurrently. Returns one artifact (or error) per job,
+    in request order.
+    """
+    user_id = _current_user_id(user)
+    if len(request.jobs) > RESUME_BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {RESUME_BATCH_MAX_JOBS} jobs per batch")
+    
+    try:
+        jobs = [job.model_dump() for job in request.jobs]
+        result = await asyncio.to_thread(agent4_service.generate_resumes_batch, user_id, jobs)
+        return GenerateResumeBatchResponse(**result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+
+
 @agent4_router.post(
     "/generate-resume-by-profile",
     response_model=GenerateResumeResponse,
@@ -198,14 +358,19 @@ async def ats_score_endpoint(request: AtsRequest):
     - Analyzes resume text for ATS-friendly formatting
     - Identifies missing keywords and skills
     - Returns a score from 0-100 with recommendations
+    - `provisional: true` answers instantly from the local pre-scorer
     """
     try:
-        result = await calculate_ats_score(resume_text=request.resume_text)
+        if request.provisional:
+            result = quick_ats_score(request.resume_text)
+        else:
+            result = await calculate_ats_score(resume_text=request.resume_text)
         return AtsScoreResponse(
             success=True,
             score=result["score"],
             missing_keywords=result["missing_keywords"],
-            summary=result["summary"]
+            summary=result["summary"],
+            provisional=result.get("provisional", False)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ATS analysis failed: {str(e)}")
@@ -229,14 +394,16 @@ async def auto_apply_endpoint(request: AutoApplyRequest):
     """
     try:
         from .tools import download_file
+        from .workspace import request_file, release
         
         # Handle resume: priority is user_id > resume_path > resume_url
         resume_file_path = None
+        downloaded_path = None
         
         if request.user_id:
             # Fetch resume from Supabase storage using user_id
             try:
-                resume_file_path = download_file(request.user_id, f"{request.user_id}.pdf")
+                resume_file_path = downloaded_path = download_file(request.user_id, f"{request.user_id}.pdf")
                 print(f"📄 Downloaded resume from Supabase: {resume_file_path}")
             except Exception as e:
                 print(f"⚠️ Failed to download resume from Supabase: {e}")
@@ -255,22 +422,90 @@ async def auto_apply_endpoint(request: AutoApplyRequest):
                     elif ".doc" in request.resume_url.lower():
                         ext = ".doc"
                     
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
-                    temp_file.write(response.content)
-                    temp_file.close()
-                    resume_file_path = temp_file.name
+                    resume_file_path = downloaded_path = request_file(request.user_id or "anon", f"resume{ext}")
+                    with open(resume_file_path, "wb") as f:
+                        f.write(response.content)
         
-        result = await run_auto_apply(
-            job_url=request.job_url,
-            user_data=request.user_data,
-            user_id=request.user_id,
-            resume_path=resume_file_path
-        )
+        try:
+            # Same loop as queued jobs, so the pooled Chromium is never rebound
+            result = await browser_loop.submit(run_auto_apply(
+                job_url=request.job_url,
+                user_data=request.user_data,
+                user_id=request.user_id,
+                resume_path=resume_file_path
+            ))
+        finally:
+            # Drop this request's temp namespace (never a caller-supplied path)
+            if downloaded_path:
+                release(downloaded_path)
         return AutoApplyResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Auto-apply failed: {str(e)}")
 
 
+# =============================================================================
+# QUEUED AUTO-APPLY (per-domain rate limits, retries, poll by job id)
+# =============================================================================
+
+def _validated_domain(request: AutoApplyJobRequest) -> str:
+    domain = target_domain(request.job_url)
+    if not domain:
+        raise HTTPException(status_code=400, detail=f"Invalid job URL: {request.job_url}")
+    return domain
+
+
+def _queue_auto_apply(user_id: str, request: AutoApplyJobRequest) -> AutoApplyJobSubmitResponse:
+    domain = _validated_domain(request)
+    job_id = enqueue_auto_apply(user_id, request.job_url, request.user_data, request.job_id, request.resume_url)
+    return AutoApplyJobSubmitResponse(
+        job_id=job_id,
+        status_url=f"/agent4/auto-apply/jobs/{job_id}",
+        domain=domain
+    )
+
+
+@agent4_router.post("/auto-apply/jobs", response_model=AutoApplyJobSubmitResponse, status_code=202)
+async def submit_auto_apply_job(request: AutoApplyJobRequest, user: dict = Depends(get_current_user)):
+    """
+    Queue an auto-apply and return its job id immediately.
+    
+    Applications to the same site are spaced out and capped in parallel, so
+    many jobs can be queued at once without tripping a job board's limits.
+    Poll `status_url` for the outcome.
+    """
+    return _queue_auto_apply(_current_user_id(user), request)
+
+
+@agent4_router.post("/auto-apply/jobs/batch", response_model=AutoApplyBatchSubmitResponse, status_code=202)
+async def submit_auto_apply_batch(request: AutoApplyBatchRequest, user: dict = Depends(get_current_user)):
+    """Queue several auto-applies; returns one job id per application, in order."""
+    user_id = _current_user_id(user)
+    if len(request.jobs) > AUTO_APPLY_BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {AUTO_APPLY_BATCH_MAX_JOBS} applications per batch")
+    # Reject the whole batch up front so an invalid URL never leaves earlier jobs queued
+    for job in request.jobs:
+        _validated_domain(job)
+    return AutoApplyBatchSubmitResponse(jobs=[_queue_auto_apply(user_id, job) for job in request.jobs])
+
+
+@agent4_router.get("/auto-apply/jobs/{job_id}", response_model=AutoApplyJobStatusResponse)
+async def get_auto_apply_job(job_id: str, user: dict = Depends(get_current_user)):
+    """Poll a queued auto-apply. `result` is present once status is 'succeeded'."""
+    job = auto_apply_queue.get(job_id)
+    if not job or job.get("type") != AUTO_APPLY_JOB_TYPE or job.get("metadata", {}).get("user_id") != _current_user_id(user):
+        raise HTTPException(status_code=404, detail="Auto-apply job not found")
+    return AutoApplyJobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        job_url=job.get("metadata", {}).get("job_url", ""),
+        attempts=job.get("attempts", 0),
+        deferrals=job.get("deferrals", 0),
+        stage=(job.get("current_stage") or {}).get("name"),
+        result=job.get("result") if job["status"] == JobStatus.SUCCEEDED else None,
+        error=job.get("error") if job["status"] == JobStatus.FAILED else None
+    )
+
+
 # =============================================================================
 # OPERATIVE ROUTER ENDPOINTS (Alternative prefix: /api/operative)
 # =============================================================================
@@ -286,12 +521,16 @@ async def operative_ats_score(request: AtsRequest):
     Alternative endpoint with /api/operative prefix.
     """
     try:
-        result = await calculate_ats_score(resume_text=request.resume_text)
+        if request.provisional:
+            result = quick_ats_score(request.resume_text)
+        else:
+            result = await calculate_ats_score(resume_text=request.resume_text)
         return AtsScoreResponse(
             success=True,
             score=result["score"],
             missing_keywords=result["missing_keywords"],
-            summary=result["summary"]
+            summary=result["summary"],
+            provisional=result.get("provisional", False)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ATS analysis failed: {str(e)}")
@@ -309,13 +548,15 @@ async def operative_auto_apply(request: AutoApplyRequest):
     """
     try:
         from .tools import download_file
+        from .workspace import request_file, release
         
         # Handle resume: priority is user_id > resume_path > resume_url
         resume_file_path = None
+        downloaded_path = None
         
         if request.user_id:
             try:
-                resume_file_path = download_file(request.user_id, f"{request.user_id}.pdf")
+                resume_file_path = downloaded_path = download_file(request.user_id, f"{request.user_id}.pdf")
             except Exception as e:
                 print(f"⚠️ Failed to download resume from Supabase: {e}")
         
@@ -332,17 +573,22 @@ async def operative_auto_apply(request: AutoApplyRequest):
                     elif ".doc" in request.resume_url.lower():
                         ext = ".doc"
                     
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
-                    temp_file.write(response.content)
-                    temp_file.close()
-                    resume_file_path = temp_file.name
+                    resume_file_path = downloaded_path = request_file(request.user_id or "anon", f"resume{ext}")
+                    with open(resume_file_path, "wb") as f:
+                        f.write(response.content)
         
-        result = await run_auto_apply(
-            job_url=request.job_url,
-            user_data=request.user_data,
-            user_id=request.user_id,
-            resume_path=resume_file_path
-        )
+        try:
+            # Same loop as queued jobs, so the pooled Chromium is never rebound
+            result = await browser_loop.submit(run_auto_apply(
+                job_url=request.job_url,
+                user_data=request.user_data,
+                user_id=request.user_id,
+                resume_path=resume_file_path
+            ))
+        finally:
+            # Drop this request's temp namespace (never a caller-supplied path)
+            if downloaded_path:
+                release(downloaded_path)
         return AutoApplyResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Auto-apply failed: {str(e)}")
\ No newline at end of file
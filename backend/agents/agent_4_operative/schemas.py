@@ -18,6 +18,17 @@ class GenerateResumeAuthenticatedRequest(BaseModel):
     job_id: Optional[str] = Field(None, description="Optional job ID if fetching from database")
 
 
+class BatchResumeJob(BaseModel):
+    """One target job in a batch tailoring request."""
+    job_description: str = Field(..., description="Target job description text")
+    job_id: Optional[str] = Field(None, description="Optional job ID to link the application")
+
+
+class GenerateResumeBatchRequest(BaseModel):
+    """Tailor the authenticated user's resume for several jobs in one call."""
+    jobs: list[BatchResumeJob] = Field(..., min_length=1, description="Target jobs (order is preserved)")
+
+
 class GenerateResumeByProfileIdRequest(BaseModel):
     """Request using profile ID instead of UUID."""
     profile_id: int = Field(..., description="Profile ID from Supabase profiles table")
@@ -96,6 +107,46 @@ class GenerateResumeResponse(BaseModel):
     message: str = ""
 
 
+class BatchResumeResult(BaseModel):
+    """Per-job artifact from a batch tailoring request."""
+    job_id: Optional[str] = None
+    status: Literal["success", "error"]
+    pdf_url: str = ""
+    pdf_path: str = ""
+    cached: bool = False
+    message: str = ""
+
+
+class GenerateResumeBatchResponse(BaseModel):
+    """Response from batch resume generation."""
+    success: bool
+    user_id: str
+    results: list[BatchResumeResult] = []
+    succeeded: int = 0
+    failed: int = 0
+    processing_time_ms: int = 0
+
+
+class ResumeJobSubmitResponse(BaseModel):
+    """Returned immediately when a resume generation is queued."""
+    job_id: str
+    status: str = "queued"
+    status_url: str = ""
+    events_url: str = ""
+
+
+class ResumeJobStatusResponse(BaseModel):
+    """Poll response for a queued resume generation."""
+    job_id: str
+    status: str
+    attempts: int = 0
+    stage: Optional[str] = None
+    timings: dict = {}  # stage -> seconds
+    progress: list = []
+    result: Optional[GenerateResumeResponse] = None
+    error: Optional[str] = None
+
+
 class AnalyzeRejectionResponse(BaseModel):
     """Response from rejection analysis."""
     success: bool
@@ -110,6 +161,7 @@ class AnalyzeRejectionResponse(BaseModel):
 class AtsRequest(BaseModel):
     """Request to calculate ATS score for a resume."""
     resume_text: str = Field(..., description="The full text content of the resume to analyze")
+    provisional: bool = Field(False, description="Return the instant local score instead of waiting for the LLM (a cached LLM score is still preferred)")
 
 
 class AtsScoreResponse(BaseModel):
@@ -118,6 +170,7 @@ class AtsScoreResponse(BaseModel):
     score: int = Field(..., ge=0, le=100, description="ATS compatibility score from 0-100")
     missing_keywords: list[str] = Field(default_factory=list, description="Recommended keywords to add")
     summary: str = Field(..., description="Brief analysis summary")
+    provisional: bool = Field(False, description="True when the score comes from the local pre-scorer, not the LLM")
 
 
 # ==================== AUTO-APPLY SCHEMAS ====================
@@ -139,6 +192,44 @@ class AutoApplyResponse(BaseModel):
     details: Optional[str] = None
 
 
+class AutoApplyJobRequest(BaseModel):
+    """Queue an auto-apply for the authenticated user (resume comes from storage)."""
+    job_url: str = Field(..., description="URL of the job application page")
+    user_data: dict = Field(..., description="User information for form filling (name, email, phone, etc.)")
+    job_id: Optional[str] = Field(None, description="Optional job ID; its application status is kept up to date")
+    resume_url: Optional[str] = Field(None, description="Resume to upload when none is stored for the user")
+
+
+class AutoApplyBatchRequest(BaseModel):
+    """Queue several auto-applies in one call."""
+    jobs: list[AutoApplyJobRequest] = Field(..., min_length=1, description="Applications (order is preserved)")
+
+
+class AutoApplyJobSubmitResponse(BaseModel):
+    """Returned immediately when an auto-apply is queued."""
+    job_id: str
+    status: str = "queued"
+    status_url: str = ""
+    domain: str = ""
+
+
+class AutoApplyBatchSubmitResponse(BaseModel):
+    """Queued applications, in request order."""
+    jobs: list[AutoApplyJobSubmitResponse]
+
+
+class AutoApplyJobStatusResponse(BaseModel):
+    """Poll response for a queued auto-apply."""
+    job_id: str
+    status: str
+    job_url: str = ""
+    attempts: int = 0
+    deferrals: int = 0  # times it waited on a domain limit
+    stage: Optional[str] = None
+    result: Optional[AutoApplyResponse] = None
+    error: Optional[str] = None
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
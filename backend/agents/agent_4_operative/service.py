@@ -1,12 +1,20 @@
+import os
 import time
-from typing import Optional
+from typing import Callable, Optional
+from supabase import create_client
+from services.job_queue import job_queue
+from services.cache_service import cache_service
 from .tools import (
+    llm_ats_score,
     mutate_resume_for_job, 
+    mutate_resumes_for_jobs,
     save_application_status, 
     analyze_rejection,
     fetch_user_profile,
-    generate_application_responses
+    generate_application_responses,
+    prune_tailored_artifacts
 )
+from services.artifact_cache import ARTIFACT_MAX_PER_USER
 
 
 """
@@ -97,6 +105,10 @@ def generate_resume(user_id: str = None, job_description: str = None, job_id: st
         except Exception as e:
             print(f"⚠️ [Agent 4] Failed to save application to DB: {e}")
             # Don't fail the whole request if DB save fails
+    
+    # Only after the application row links the new PDF
+    if result.get("status") == "success":
+        prune_tailored_artifacts(user_id)
             
     return response
 
@@ -139,16 +151,19 @@ class Agent4Service:
         self,
         user_id: str,
         job_description: str,
-        job_id: Optional[str] = None
+        job_id: Optional[str] = None,
+        on_stage: Optional[Callable[[str], None]] = None
     ) -> dict:
         """
         Orchestrates resume generation by calling the mutation tool directly.
+        
+        `on_stage` receives stage names as they start (see resume_generation_job).
         """
         print(f"🚀 [Service] Generating resume for User {user_id}")
         start_time = time.time()
         
         # 1. Direct Tool Call (Replaces the complex Graph invocation)
-        result = mutate_resume_for_job(user_id, job_description)
+        result = mutate_resume_for_job(user_id, job_description, on_stage=on_stage)
         
         processing_time_ms = int((time.time() - start_time) * 1000)
         
@@ -158,6 +173,8 @@ class Agent4Service:
         
         # 3. Logging to DB
         if job_id and result.get("status") == "success":
+            if on_stage:
+                on_stage("saving_application")
             try:
                 save_application_status(
                     user_id=user_id,
@@ -170,6 +187,7 @@ class Agent4Service:
                 )
             except Exception as e:
                 print(f"⚠️ [Service] DB save failed: {e}")
+        prune_tailored_artifacts(user_id)
 
         # 4. Transform result to match GenerateResumeResponse schema
         return {
@@ -185,6 +203,47 @@ class Agent4Service:
             "message": "Resume generated successfully"
         }
 
+    def generate_resumes_batch(self, user_id: str, jobs: list) -> dict:
+        """
+        Tailor resumes for several jobs, sharing the per-user work.
+        
+        Each successful job with a job_id is logged to applications. The
+        single-job flow's profiles.sec_resume_url is left untouched.
+        """
+        print(f"🚀 [Service] Batch generating {len(jobs)} resumes for User {user_id}")
+        start_time = time.time()
+        
+        results = mutate_resumes_for_jobs(user_id, jobs)
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        
+        for result in results:
+            if result.get("job_id") and result["status"] == "success":
+                try:
+                    save_application_status(
+                        user_id=user_id,
+                        job_id=str(result["job_id"]),
+                        status="resume_generated",
+                        result_data={
+                            "pdf_url": result.get("pdf_url"),
+                            "processing_time": f"{processing_time_ms}ms"
+                        }
+                    )
+                except Exception as e:
+                    print(f"⚠️ [Service] DB save failed for job {result['job_id']}: {e}")
+        
+        # Once per batch, keeping at least every PDF this batch produced
+        prune_tailored_artifacts(user_id, keep=max(ARTIFACT_MAX_PER_USER, len(jobs)))
+        
+        succeeded = sum(r["status"] == "success" for r in results)
+        return {
+            "success": succeeded > 0,
+            "user_id": user_id,
+            "results": results,
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "processing_time_ms": processing_time_ms
+        }
+
     def generate_resume_by_profile_id(self, profile_id: str, job_description: str) -> dict:
         """Wrapper for backward compatibility."""
         return self.generate_resume(user_id=profile_id, job_description=job_description)
@@ -225,4 +284,72 @@ class Agent4Service:
         }
 
 # Singleton Instance
-agent4_service = Agent4Service()
\ No newline at end of file
+agent4_service = Agent4Service()
+
+
+# =============================================================================
+# Background Resume Generation (job queue)
+# =============================================================================
+
+RESUME_JOB_TYPE = "resume_generation"
+
+
+def resume_generation_job(payload: dict, ctx) -> dict:
+    """Job handler: run the tailoring pipeline, timing each stage via ctx.stage."""
+    return agent4_service.generate_resume(
+        user_id=payload["user_id"],
+        job_description=payload["job_description"],
+        job_id=payload.get("job_id"),
+        on_stage=ctx.stage
+    )
+
+
+job_queue.register(RESUME_JOB_TYPE, resume_generation_job)
+
+
+def enqueue_resume_generation(user_id: str, job_description: str, job_id: Optional[str] = None) -> str:
+    """Queue a resume generation. Returns the id clients poll or stream."""
+    return job_queue.submit(
+        RESUME_JOB_TYPE,
+        {"user_id": user_id, "job_description": job_description, "job_id": job_id},
+        max_retries=1,
+        metadata={"user_id": user_id, "job_id": job_id}
+    )
+
+
+# =============================================================================
+# Background ATS Refinement (provisional local score -> LLM score)
+# =============================================================================
+
+ATS_JOB_TYPE = "ats_refinement"
+
+
+async def ats_refinement_job(payload: dict, ctx) -> dict:
+    """
+    Job handler: replace a provisional ATS score with the LLM score, unless
+    the user has uploaded a different resume in the meantime.
+    """
+    user_id = payload["user_id"]
+    result = await llm_ats_score(payload["resume_text"])  # raises -> retried
+    
+    supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+    current = supabase.table("profiles").select("resume_text").eq("user_id", user_id).execute()
+    if not current.data or cache_service.content_fingerprint(current.data[0].get("resume_text") or "") != payload["resume_hash"]:
+        return {"score": result["score"], "saved": False}
+    
+    supabase.table("profiles").update({"ATS_SCORE": str(result["score"])}).eq("user_id", user_id).execute()
+    cache_service.delete_profile(user_id)
+    return {"score": result["score"], "saved": True}
+
+
+job_queue.register(ATS_JOB_TYPE, ats_refinement_job)
+
+
+def enqueue_ats_refinement(user_id: str, resume_text: str) -> str:
+    """Queue the LLM ATS pass for a freshly uploaded resume."""
+    return job_queue.submit(
+        ATS_JOB_TYPE,
+        {"user_id": user_id, "resume_text": resume_text, "resume_hash": cache_service.content_fingerprint(resume_text)},
+        max_retries=2,
+        metadata={"user_id": user_id}
+    )
@@ -1,8 +1,10 @@
 import os
 import json
-import tempfile
 import asyncio
 import re
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # AI & LangChain
@@ -14,6 +16,13 @@ from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 import fitz  # PyMuPDF
 from .docx_engine import DocxSurgeon 
 from .latex_engine import LatexSurgeon
+from .resume_text import resume_text_provider
+from .workspace import request_file
+from .ats_local import score_resume_locally
+from .browser_pool import browser_pool, BrowserPoolBusy, BrowserLease
+from services.artifact_cache import artifact_cache, ARTIFACT_MAX_PER_USER, ARTIFACT_PRUNE_MIN_AGE
+from services.cache_service import cache_service
+from services.ats_cache import ats_cache, normalize_resume_text
 
 # Database
 from supabase import create_client
@@ -37,19 +46,28 @@ except ImportError as e:
 
 load_dotenv()
 
+# Resume LaTeX template (core/template.jinja)
+RESUME_TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "core"))
+RESUME_TEMPLATE_NAME = "template.jinja"
+
+# Batch tailoring: concurrent per-JD structuring/compiles and a per-request cap
+RESUME_BATCH_CONCURRENCY = int(os.getenv("RESUME_BATCH_CONCURRENCY", "4"))
+RESUME_BATCH_MAX_JOBS = int(os.getenv("RESUME_BATCH_MAX_JOBS", "10"))
+
 # =============================================================================
 # 1. ATS SCORING
 # =============================================================================
 
-async def calculate_ats_score(resume_text: str) -> dict:
-    """Analyzes resume text and returns an ATS compatibility score."""
-    print("📊 [Agent 4] Calculating ATS Score...")
-    
-    if not resume_text or len(resume_text.strip()) < 50:
-        return {"score": 0, "missing_keywords": [], "summary": "Resume text too short."}
-    
+# Bump when the ATS prompt or result parsing changes (invalidates ats_cache)
+ATS_PROMPT_VERSION = "ats-v1"
+ATS_MODEL = "gemini-2.0-flash"
+ATS_MAX_CHARS = 8000
+
+
+async def _llm_ats_score(resume_text: str) -> dict:
+    """One Gemini ATS pass over already-normalized, truncated text. Raises on failure."""
     llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
+        model=ATS_MODEL,
         google_api_key=os.getenv("GEMINI_API_KEY"),
         temperature=0.1
     )
@@ -59,11 +77,54 @@ async def calculate_ats_score(resume_text: str) -> dict:
         ("human", "Analyze this resume text:\n{resume_text}")
     ])
     
+    chain = prompt | llm | JsonOutputParser()
+    result = await chain.ainvoke({"resume_text": resume_text})
+    result["score"] = max(0, min(100, int(result.get("score", 50))))
+    return result
+
+
+def _ats_fingerprint(resume_text: str) -> tuple:
+    text = normalize_resume_text(resume_text)[:ATS_MAX_CHARS]
+    return text, ats_cache.fingerprint(text, ATS_PROMPT_VERSION, ATS_MODEL)
+
+
+async def llm_ats_score(resume_text: str) -> dict:
+    """
+    LLM ATS score, cached by normalized text + prompt version; concurrent
+    calls for the same text share one request. Raises on failure.
+    """
+    text, fingerprint = _ats_fingerprint(resume_text)
+    return await ats_cache.get_or_compute(fingerprint, lambda: _llm_ats_score(text))
+
+
+def quick_ats_score(resume_text: str, job_description: Optional[str] = None) -> dict:
+    """
+    Instant ATS score: the cached LLM result when there is one, else the
+    deterministic local pre-score (`provisional: True`). Never calls the LLM.
+    """
+    if not resume_text or len(resume_text.strip()) < 50:
+        return {"score": 0, "missing_keywords": [], "summary": "Resume text too short.", "provisional": False}
+    if not job_description:
+        cached = ats_cache.get(_ats_fingerprint(resume_text)[1])
+        if cached is not None:
+            return {**cached, "provisional": False}
+    return score_resume_locally(resume_text, job_description)
+
+
+async def calculate_ats_score(resume_text: str) -> dict:
+    """
+    Analyzes resume text and returns an ATS compatibility score.
+    
+    Results are cached by normalized text + prompt version, and concurrent
+    calls for the same text share one LLM request.
+    """
+    print("📊 [Agent 4] Calculating ATS Score...")
+    
+    if not resume_text or len(resume_text.strip()) < 50:
+        return {"score": 0, "missing_keywords": [], "summary": "Resume text too short."}
+    
     try:
-        chain = prompt | llm | JsonOutputParser()
-        result = await chain.ainvoke({"resume_text": resume_text[:8000]})
-        result["score"] = max(0, min(100, int(result.get("score", 50))))
-        return result
+        return await llm_ats_score(resume_text)
     except Exception as e:
         print(f"   ❌ ATS Analysis error: {e}")
         return {"score": 0, "missing_keywords": [], "summary": "Error during analysis."}
@@ -73,25 +134,43 @@ async def calculate_ats_score(resume_text: str) -> dict:
 # 2. AUTO-APPLY AGENT
 # =============================================================================
 
-# Keep a reference to browsers to prevent them from closing immediately
-_global_browser_refs = []
+def _agent_browser(lease: BrowserLease):
+    """
+    browser-use session on a pooled context. keep_alive: the pool, not the
+    agent, owns Chromium.
+    """
+    if _agent_binds_context():
+        return Browser(browser_context=lease.context, keep_alive=True)
+    # CDP-only releases attach to the whole browser (see run_auto_apply)
+    return Browser(cdp_url=lease.cdp_url, keep_alive=True)
+
+def _agent_binds_context() -> bool:
+    """Whether the installed browser-use can be scoped to one Playwright context."""
+    return "browser_context" in getattr(Browser, "model_fields", {})
 
 async def run_auto_apply(job_url: str, user_data: dict, user_id: str = None, job_id: str = None, resume_path: str = None) -> dict:
-    """Launches browser agent to auto-fill forms and optionally upload resume."""
+    """
+    Launches browser agent to auto-fill forms and optionally upload resume.
+    
+    `retryable` in the result is True for transient failures (crash, timeout,
+    pool at capacity) and False when the page itself said no (404, captcha,
+    login wall) - retrying those only gets the account blocked.
+    """
     if not BROWSER_USE_AVAILABLE:
         return {
             "success": False, 
             "job_url": job_url,
             "message": "Browser automation libraries not installed. Run: pip install browser-use",
-            "details": "browser-use library is required for auto-apply functionality"
+            "details": "browser-use library is required for auto-apply functionality",
+            "retryable": False
         }
 
     print(f"🤖 [Agent 4] Starting Auto-Apply for: {job_url}")
     if resume_path:
         print(f"📄 [Agent 4] Resume file: {resume_path}")
-    browser = None
     status = "pending"
     reason = "Initializing..."
+    retryable = False
     
     try:
         # browser-use v0.11.x requires its own LLM wrappers
@@ -101,12 +180,6 @@ async def run_auto_apply(job_url: str, user_data: dict, user_id: str = None, job
             model="gemini-2.0-flash",
             api_key=os.getenv("GEMINI_API_KEY"),
         )
-        # v0.11.x - Browser() takes no params for local browser
-        browser = Browser()
-        
-        # Keep browser alive
-        _global_browser_refs.append(browser)
-        
         clean_data = {k: v for k, v in user_data.items() if v}
         user_data_str = "\n".join([f"- {key}: {value}" for key, value in clean_data.items()])
         
@@ -138,9 +211,12 @@ async def run_auto_apply(job_url: str, user_data: dict, user_id: str = None, job
         Example: {{"upload_file": {{"index": 11, "file": "/path/to/file.pdf"}}}}
         """
         
-        # v0.11.x Agent API
-        agent = Agent(task=task, llm=llm, browser=browser)
-        history = await agent.run()
+        # Shared Chromium, isolated context per application. A CDP-only agent
+        # sees every tab, so those runs take the browser exclusively.
+        async with browser_pool.context(exclusive=not _agent_binds_context()) as lease:
+            # v0.11.x Agent API
+            agent = Agent(task=task, llm=llm, browser=_agent_browser(lease))
+            history = await agent.run()
         final_result = history.final_result() if hasattr(history, 'final_result') else str(history)
         reason = str(final_result) if final_result else "No result returned"
         
@@ -157,12 +233,14 @@ async def run_auto_apply(job_url: str, user_data: dict, user_id: str = None, job
         else:
             status = "success"
 
+    except BrowserPoolBusy as e:
+        status = "failed"
+        reason = f"Auto-apply is at capacity, try again shortly ({e})"
+        retryable = True
     except Exception as e:
         status = "failed"
         reason = str(e)
-    # NOTE: Do NOT close the browser properly here (await browser.close())
-    # 1. Browser object in v0.11.x doesn't have a close() method
-    # 2. We WANT to keep it open for the user to review
+        retryable = True
     
     if user_id and job_id:
         save_application_status(user_id, job_id, status, {"message": reason})
@@ -171,7 +249,8 @@ async def run_auto_apply(job_url: str, user_data: dict, user_id: str = None, job
         "success": status == "success", 
         "job_url": job_url,
         "message": reason if status == "failed" else "Auto-fill completed. Please review and submit manually.",
-        "details": reason
+        "details": reason,
+        "retryable": retryable
     }
 
 
@@ -198,83 +277,158 @@ def save_application_status(user_id: str, job_id: str, status: str, result_data:
 # 3. RESUME PROCESSING
 # =============================================================================
 
-def mutate_resume_for_job(user_id: str, job_description: str) -> dict:
-    """Orchestrates resume tailoring."""
+def load_resume_inputs(user_id: str) -> tuple:
+    """Per-user inputs shared by every tailoring run: (raw_text, contact_info)."""
+    # Parsed at upload time - only downloads + re-extracts the PDF when stale
+    raw_text = resume_text_provider.get_text(user_id)
+    print(f"📄 [Agent 4] Loaded {len(raw_text)} chars of resume text")
+    
+    contact_info = parse_resume_contact(raw_text) # Helper defined below
+    return raw_text, contact_info
+
+def tailor_resume_from_text(
+    user_id: str,
+    raw_text: str,
+    contact_info: dict,
+    job_description: str,
+    stage: Callable[[str], None] = lambda name: None,
+    latex_engine: Optional[LatexSurgeon] = None
+) -> dict:
+    """
+    Per-JD half of tailoring: structure, render, compile and upload.
+    
+    Returns {"pdf_url", "pdf_path", "cached"}; raises on failure.
+    """
+    stage("structuring")
+    structured_data = structure_resume_content(raw_text, job_description, dict(contact_info), user_id=user_id)
+    
+    # Handle case where structure_resume_content returns None
+    if structured_data is None:
+        print("❌ [Agent 4] Error: structure_resume_content returned None")
+        raise ValueError("Failed to structure resume content - Gemini API may be unavailable")
+    
+    print(f"📋 [Agent 4] Structured data keys: {list(structured_data.keys())}")
+    print(f"📋 [Agent 4] Name: {structured_data.get('name', 'MISSING!')}")
+    
+    stage("rendering")
+    latex_engine = latex_engine or LatexSurgeon(template_dir=RESUME_TEMPLATE_DIR)
+    tex_content = latex_engine.fill_template(RESUME_TEMPLATE_NAME, structured_data)
+    print(f"📝 [Agent 4] Generated {len(tex_content)} chars of LaTeX")
+    
+    # Same rendered .tex -> same PDF: reuse the stored artifact, skip compile + upload
+    fingerprint = artifact_cache.fingerprint(tex_content)
+    cached = artifact_cache.get(user_id, fingerprint)
+    
+    if cached:
+        print(f"♻️ [Agent 4] Reusing cached PDF artifact {cached['storage_path']}")
+        return {"pdf_url": cached["signed_url"], "pdf_path": cached["local_path"], "cached": True}
+    
+    stage("compiling")
+    # Compiler output stays in memory: validated, uploaded and cached as bytes
+    try:
+        pdf_bytes = latex_engine.compile_pdf_bytes(tex_content)
+    except Exception as e:
+        raise Exception(f"LaTeX compilation failed - no PDF generated: {e}")
+    
+    validate_pdf_bytes(pdf_bytes)
+    print(f"✅ [Agent 4] PDF validation passed ({len(pdf_bytes)} bytes)")
+    
+    stage("uploading")
+    storage_path = artifact_cache.storage_path(user_id, fingerprint)
+    public_url = upload_bytes(pdf_bytes, storage_path)
+    
+    # The single on-disk copy lives in the artifact cache (keeps pdf_path usable on hits)
+    pdf_path = artifact_cache.store_bytes(fingerprint, pdf_bytes)
+    if not pdf_path:
+        pdf_path = request_file(user_id, f"{user_id}_{fingerprint[:12]}_optimized.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_bytes)
+    artifact_cache.set(user_id, fingerprint, storage_path, public_url, pdf_path, size=len(pdf_bytes))
+    return {"pdf_url": public_url, "pdf_path": pdf_path, "cached": False}
+
+def validate_pdf_bytes(pdf_bytes: bytes) -> None:
+    """Reject empty/corrupt compiler output before it is uploaded."""
+    print(f"📦 [Agent 4] Generated PDF size: {len(pdf_bytes)} bytes")
+    
+    if len(pdf_bytes) < 1000:  # PDF should be at least 1KB
+        raise Exception(f"Generated PDF is too small ({len(pdf_bytes)} bytes), likely corrupted")
+    
+    # Verify it's a valid PDF by checking magic bytes
+    if not pdf_bytes.startswith(b'%PDF'):
+        raise Exception(f"Generated file is not a valid PDF (header: {pdf_bytes[:20]})")
+
+def save_sec_resume_url(user_id: str, public_url: str) -> None:
+    """Save tailored resume URL to profiles.sec_resume_url (best effort)."""
+    try:
+        supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+        supabase.table("profiles").update({
+            "sec_resume_url": public_url
+        }).eq("user_id", user_id).execute()
+        print(f"✅ [Agent 4] Saved tailored resume URL to profiles.sec_resume_url")
+    except Exception as db_err:
+        print(f"⚠️ [Agent 4] Failed to save sec_resume_url to DB: {db_err}")
+        # Don't fail the whole request if DB update fails
+
+def mutate_resume_for_job(user_id: str, job_description: str, on_stage: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Orchestrates resume tailoring.
+    
+    `on_stage(name)` is called as each stage starts (job progress/timings).
+    """
     print(f"\n🚀 [Agent 4] Tailoring resume for User: {user_id}")
+    stage = on_stage or (lambda name: None)
     try:
-        original_pdf = download_file(user_id, f"{user_id}.pdf")
-        
-        from pdfminer.high_level import extract_text
-        raw_text = extract_text(original_pdf)
-        print(f"📄 [Agent 4] Extracted {len(raw_text)} chars from original PDF")
-        
-        contact_info = parse_resume_contact(raw_text) # Helper defined below
-        
-        structured_data = structure_resume_content(raw_text, job_description, contact_info)
-        
-        # Handle case where structure_resume_content returns None
-        if structured_data is None:
-            print("❌ [Agent 4] Error: structure_resume_content returned None")
-            raise ValueError("Failed to structure resume content - Gemini API may be unavailable")
-        
-        print(f"📋 [Agent 4] Structured data keys: {list(structured_data.keys())}")
-        print(f"📋 [Agent 4] Name: {structured_data.get('name', 'MISSING!')}")
-        
-        # Resolve paths
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        template_dir = os.path.abspath(os.path.join(current_dir, "..", "..", "core"))
-        
-        latex_engine = LatexSurgeon(template_dir=template_dir)
-        tex_content = latex_engine.fill_template("template.jinja", structured_data)
-        print(f"📝 [Agent 4] Generated {len(tex_content)} chars of LaTeX")
+        stage("loading_resume")
+        raw_text, contact_info = load_resume_inputs(user_id)
         
-        final_pdf_path = latex_engine.compile_pdf(tex_content, output_filename=f"{user_id}_optimized.pdf")
+        artifact = tailor_resume_from_text(user_id, raw_text, contact_info, job_description, stage)
         
-        if not final_pdf_path: 
-            raise Exception("LaTeX compilation failed - no PDF generated")
+        stage("saving_profile")
+        save_sec_resume_url(user_id, artifact["pdf_url"])
         
-        # Validate PDF file exists and has content
-        if not os.path.exists(final_pdf_path):
-            raise Exception(f"PDF file not found at {final_pdf_path}")
-        
-        file_size = os.path.getsize(final_pdf_path)
-        print(f"📦 [Agent 4] Generated PDF size: {file_size} bytes")
-        
-        if file_size < 1000:  # PDF should be at least 1KB
-            raise Exception(f"Generated PDF is too small ({file_size} bytes), likely corrupted")
-        
-        # Verify it's a valid PDF by checking magic bytes
-        with open(final_pdf_path, "rb") as f:
-            header = f.read(8)
-            if not header.startswith(b'%PDF'):
-                raise Exception(f"Generated file is not a valid PDF (header: {header[:20]})")
-        
-        print(f"✅ [Agent 4] PDF validation passed")
-            
-        public_url = upload_file(final_pdf_path, f"{user_id}_mutated.pdf")
-        
-        # Save tailored resume URL to profiles.sec_resume_url
-        try:
-            supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
-            supabase.table("profiles").update({
-                "sec_resume_url": public_url
-            }).eq("user_id", user_id).execute()
-            print(f"✅ [Agent 4] Saved tailored resume URL to profiles.sec_resume_url")
-        except Exception as db_err:
-            print(f"⚠️ [Agent 4] Failed to save sec_resume_url to DB: {db_err}")
-            # Don't fail the whole request if DB update fails
-        
-        return {"status": "success", "pdf_url": public_url, "pdf_path": final_pdf_path}
+        return {"status": "success", "pdf_url": artifact["pdf_url"], "pdf_path": artifact["pdf_path"]}
     except Exception as e:
         print(f"❌ Mutation failed: {e}")
         import traceback
         traceback.print_exc()
         return {"status": "error", "message": str(e)}
 
-def structure_resume_content(raw_text: str, jd: str, contact: dict) -> dict:
-    """Structures raw text into JSON for LaTeX."""
-    print("🔧 [Agent 4] Starting structure_resume_content...")
+def mutate_resumes_for_jobs(user_id: str, jobs: List[dict], max_workers: int = RESUME_BATCH_CONCURRENCY) -> List[dict]:
+    """
+    Tailor one resume per job description in a single pass.
     
+    Resume text, contact parsing and the template environment are loaded
+    once; per-JD structuring + compile fan out over `max_workers` threads
+    (compiles are still bounded by the LaTeX pool). Results keep the input
+    order, one {"job_id", "status", "pdf_url", "pdf_path" | "message"} each.
+    """
+    print(f"\n🚀 [Agent 4] Batch tailoring {len(jobs)} resumes for User: {user_id}")
+    try:
+        raw_text, contact_info = load_resume_inputs(user_id)
+    except Exception as e:
+        print(f"❌ Batch mutation failed loading resume: {e}")
+        return [{"job_id": job.get("job_id"), "status": "error", "message": str(e)} for job in jobs]
+    
+    latex_engine = LatexSurgeon(template_dir=RESUME_TEMPLATE_DIR)
+    
+    def _tailor(job: dict) -> dict:
+        try:
+            artifact = tailor_resume_from_text(
+                user_id, raw_text, contact_info, job["job_description"], latex_engine=latex_engine
+            )
+            return {"job_id": job.get("job_id"), "status": "success", **artifact}
+        except Exception as e:
+            print(f"❌ Mutation failed for job {job.get('job_id')}: {e}")
+            return {"job_id": job.get("job_id"), "status": "error", "message": str(e)}
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs) or 1))) as pool:
+        results = list(pool.map(_tailor, jobs))
+    
+    print(f"✅ [Agent 4] Batch complete: {sum(r['status'] == 'success' for r in results)}/{len(jobs)} succeeded")
+    return results
+
+def _structure_with_llm(resume: str, jd: str):
+    """Single Gemini call that structures resume text against a JD (None on failure)."""
     try:
         llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key=os.getenv("GEMINI_API_KEY"))
         
@@ -312,7 +466,7 @@ IMPORTANT:
         
         chain = prompt | llm | JsonOutputParser()
         print("🔧 [Agent 4] Calling Gemini LLM...")
-        data = chain.invoke({"resume": raw_text[:4000], "jd": jd[:2000]})
+        data = chain.invoke({"resume": resume, "jd": jd})
         print(f"🔧 [Agent 4] Gemini response type: {type(data)}")
         
     except Exception as e:
@@ -321,6 +475,32 @@ IMPORTANT:
         traceback.print_exc()
         data = None
     
+    return data
+
+def structure_resume_content(raw_text: str, jd: str, contact: dict, user_id: str = None) -> dict:
+    """
+    Structures raw text into JSON for LaTeX.
+    
+    With a user_id, the LLM result is memoized per (resume text, JD) and
+    reused until the user's profile version changes.
+    """
+    print("🔧 [Agent 4] Starting structure_resume_content...")
+    
+    resume_input, jd_input = raw_text[:4000], jd[:2000]
+    data = None
+    if user_id:
+        resume_hash = cache_service.content_fingerprint(resume_input)
+        jd_hash = cache_service.content_fingerprint(jd_input)
+        profile_version = cache_service.get_profile_version(user_id)
+        data = cache_service.get_resume_structure(user_id, resume_hash, jd_hash)
+        if data is not None:
+            print("🎯 [Agent 4] Reusing memoized resume structure (LLM skipped)")
+    
+    if data is None:
+        data = _structure_with_llm(resume_input, jd_input)
+        if user_id and data:
+            cache_service.set_resume_structure(user_id, resume_hash, jd_hash, data, profile_version)
+    
     # Handle case where LLM returns None or fails
     if data is None:
         print("⚠️ [Agent 4] Gemini returned None, using fallback structure")
@@ -451,7 +631,7 @@ def download_original_pdf(user_id: str) -> str:
     try:
         print(f"📥 Downloading: {user_id}.pdf")
         data = supabase.storage.from_("Resume").download(f"{user_id}.pdf")
-        path = os.path.join(tempfile.gettempdir(), f"original_{user_id}.pdf")
+        path = request_file(user_id, f"original_{user_id}.pdf")
         with open(path, "wb") as f: f.write(data)
         return path
     except Exception as e:
@@ -459,7 +639,19 @@ def download_original_pdf(user_id: str) -> str:
 
 def upload_mutated_pdf(file_path: str, user_id: str) -> str:
     """
-    Uploads tailored/mutated PDF to Supabase Storage.
+    Uploads tailored/mutated PDF (or DOCX) from disk to Supabase Storage.
+    See upload_mutated_bytes.
+    """
+    ext = "docx" if file_path.endswith(".docx") else "pdf"
+    try:
+        with open(file_path, "rb") as f: data = f.read()
+    except Exception as e:
+        raise Exception(f"Upload failed: {e}")
+    return upload_mutated_bytes(data, user_id, ext)
+
+def upload_mutated_bytes(data: bytes, user_id: str, ext: str = "pdf") -> str:
+    """
+    Uploads tailored/mutated resume bytes to Supabase Storage.
     
     - Deletes previous secondary resume from S3 if exists
     - Uploads new tailored resume
@@ -469,16 +661,13 @@ def upload_mutated_pdf(file_path: str, user_id: str) -> str:
     key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
     supabase = create_client(supabase_url.rstrip('/'), key)
     
-    # Determine extension and mime type
-    is_docx = file_path.endswith(".docx")
-    ext = "docx" if is_docx else "pdf"
+    # Determine mime type
+    is_docx = ext == "docx"
     content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document" if is_docx else "application/pdf"
     
     file_name = f"{user_id}_mutated.{ext}"
     
     try:
-        with open(file_path, "rb") as f: data = f.read()
-        
         # Delete previous secondary resume from storage
         try:
             # Try to remove both PDF and DOCX variants
@@ -691,26 +880,82 @@ Context: {context}""")
 # UTILS
 # =============================================================================
 
-def download_file(user_id: str, filename: str) -> str:
+def download_bytes(filename: str) -> bytes:
     supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
-    data = supabase.storage.from_("Resume").download(filename)
-    path = os.path.join(tempfile.gettempdir(), f"download_{filename}")
+    return supabase.storage.from_("Resume").download(filename)
+
+def download_file(user_id: str, filename: str) -> str:
+    """Download into a per-request namespace (callers needing a path, e.g. browser uploads)."""
+    data = download_bytes(filename)
+    path = request_file(user_id, f"download_{filename}")
     with open(path, "wb") as f: f.write(data)
     return path
 
-def upload_file(file_path: str, destination_name: str) -> str:
+def upload_bytes(data: bytes, destination_name: str, content_type: str = "application/pdf") -> str:
     supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
-    with open(file_path, "rb") as f:
-        file_data = f.read()
-        print(f"📦 [Agent 4] Uploading {len(file_data)} bytes to {destination_name}")
-        
-        # Set proper content-type for PDF files
-        file_options = {
-            "upsert": "true",
-            "content-type": "application/pdf"
-        }
-        supabase.storage.from_("Resume").upload(destination_name, file_data, file_options)
+    print(f"📦 [Agent 4] Uploading {len(data)} bytes to {destination_name}")
+    
+    # Set proper content-type for PDF files
+    file_options = {
+        "upsert": "true",
+        "content-type": content_type
+    }
+    supabase.storage.from_("Resume").upload(destination_name, data, file_options)
     # Use signed URL for private buckets
     res = supabase.storage.from_("Resume").create_signed_url(destination_name, 31536000) # 1 year
     return res.get("signedURL") if isinstance(res, dict) else str(res)
 
+def _referenced_tailored_paths(supabase, user_id: str) -> set:
+    """Tailored storage paths still linked from the user's applications rows or profile."""
+    pattern = re.compile(rf"tailored/{re.escape(user_id)}/[0-9a-f]+\.pdf")
+    rows = supabase.table("applications").select("application_metadata").eq("user_id", user_id).execute().data or []
+    rows += supabase.table("profiles").select("sec_resume_url").eq("user_id", user_id).execute().data or []
+    return set(pattern.findall(json.dumps(rows, default=str)))
+
+def _object_age(obj: dict) -> float:
+    """Seconds since a storage object was created (0 when unknown, i.e. treated as new)."""
+    try:
+        created = datetime.fromisoformat(str(obj.get("created_at")).replace("Z", "+00:00"))
+        return (datetime.now(timezone.utc) - created).total_seconds()
+    except ValueError:
+        return 0.0
+
+def prune_tailored_artifacts(user_id: str, keep: int = ARTIFACT_MAX_PER_USER,
+                             min_age: int = ARTIFACT_PRUNE_MIN_AGE) -> list:
+    """
+    Delete old tailored PDFs under tailored/{user_id}/.
+    
+    Runs once per generation request, after its applications rows are
+    written - never per upload. An object survives if it is among the
+    newest `keep`, younger than `min_age` seconds, or still linked from an
+    applications row / profiles.sec_resume_url. If the references can't be
+    read nothing is deleted. Best effort - returns the removed storage paths.
+    """
+    folder = f"tailored/{user_id}"
+    try:
+        supabase = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_ROLE_KEY"))
+        bucket = supabase.storage.from_("Resume")
+        objects = bucket.list(folder, {"limit": 1000, "sortBy": {"column": "created_at", "order": "desc"}}) or []
+        objects = sorted(
+            (obj for obj in objects if obj.get("name", "").endswith(".pdf")),
+            key=lambda o: o.get("created_at") or "", reverse=True
+        )
+        candidates = [obj for obj in objects[max(keep, 1):] if _object_age(obj) >= min_age]
+        if not candidates:
+            return []
+        referenced = _referenced_tailored_paths(supabase, user_id)
+        stale = [f"{folder}/{obj['name']}" for obj in candidates if f"{folder}/{obj['name']}" not in referenced]
+        if stale:
+            bucket.remove(stale)
+            for path in stale:
+                artifact_cache.invalidate_storage_path(user_id, path)
+            print(f"🧹 [Agent 4] Removed {len(stale)} old tailored PDFs for {user_id}")
+        return stale
+    except Exception as e:
+        print(f"⚠️ [Agent 4] Tailored PDF cleanup skipped: {e}")
+        return []
+
+def upload_file(file_path: str, destination_name: str) -> str:
+    with open(file_path, "rb") as f:
+        return upload_bytes(f.read(), destination_name)
+
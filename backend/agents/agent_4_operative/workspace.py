@@ -0,0 +1,37 @@
+"""
+Per-request temp namespaces for Agent 4 artifacts.
+
+Files used to land directly in tempfile.gettempdir() under names derived
+from the user id (`{user_id}_optimized.pdf`, `download_{user_id}.pdf`), so
+two concurrent requests for the same user overwrote each other's files.
+Every request that still needs a file on disk now gets its own directory
+under AGENT4_TMP_ROOT; the name inside it can stay human-readable.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+
+AGENT4_TMP_ROOT = os.getenv("AGENT4_TMP_ROOT") or os.path.join(tempfile.gettempdir(), "erflog_requests")
+
+
+def request_tempdir(owner: str = "anon") -> str:
+    """Create a fresh directory private to one request."""
+    os.makedirs(AGENT4_TMP_ROOT, exist_ok=True)
+    safe = re.sub(r"[^A-Za-z0-9_-]", "", owner or "anon")[:64] or "anon"
+    return tempfile.mkdtemp(prefix=f"{safe}_", dir=AGENT4_TMP_ROOT)
+
+
+def request_file(owner: str, filename: str) -> str:
+    """Path for `filename` inside a new request namespace."""
+    return os.path.join(request_tempdir(owner), os.path.basename(filename))
+
+
+def release(path: str) -> None:
+    """Remove the request namespace holding `path` (no-op outside AGENT4_TMP_ROOT)."""
+    if not path:
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    if os.path.dirname(directory) == os.path.abspath(AGENT4_TMP_ROOT):
+        shutil.rmtree(directory, ignore_errors=True)
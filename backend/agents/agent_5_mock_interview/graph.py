@@ -14,6 +14,8 @@ from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from core.db import db_manager
+from services.job_queue import job_queue
+from services.structured_output import structured_output, langchain_call, StructuredOutputError
 from core.config import (
     get_interview_config, 
     get_stages_for_type, 
@@ -309,16 +311,24 @@ def should_continue(state: InterviewState) -> Literal["continue", "evaluate"]:
         return "evaluate"
     return "continue"
 
-def evaluate_node(state: InterviewState) -> dict:
-    mode = state.get("mode", "text")
+INTERVIEW_FEEDBACK_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "score": {"type": "INTEGER"},
+        "verdict": {"type": "STRING", "enum": ["Hired", "Not Hired"]},
+        "summary": {"type": "STRING"},
+        "strengths": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "improvements": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": ["score", "verdict", "summary", "strengths", "improvements"],
+}
+
+
+def generate_interview_feedback(state: InterviewState) -> dict:
+    """Run the evaluation LLM over the transcript and parse its JSON verdict."""
     interview_type = state.get("interview_type", "TECHNICAL")
-    log_prefix = f"[{interview_type} Evaluate]"
-    print(f"{log_prefix} Starting evaluation...")
-    
     ctx = state.get("context", {})
     messages = state.get("messages", [])
-    user_id = state.get("user_id")
-    job_id = state.get("job_id")
     
     job_title = ctx.get('job', {}).get('title', 'this position')
     
@@ -336,73 +346,177 @@ Return JSON only:
     "improvements": ["i1", "i2"]
 }}"""
     
-    response = get_llm().invoke(messages[-8:] + [HumanMessage(content=prompt)])
     try:
-        feedback = json.loads(response.content.replace("```json", "").replace("```", "").strip())
+        feedback = structured_output.generate(
+            "interview.generate_interview_feedback",
+            langchain_call(get_llm(), messages[-8:] + [HumanMessage(content=prompt)]),
+            schema=INTERVIEW_FEEDBACK_SCHEMA,
+        )
         # Add interview type to feedback for display purposes
         feedback["interview_type"] = interview_type
-    except:
+    except StructuredOutputError:
         feedback = {"score": 0, "verdict": "Error", "summary": "Failed to parse evaluation", "interview_type": interview_type}
+    return feedback
+
+
+def save_interview_record(user_id: str, job_id: Optional[str], messages: List[BaseMessage], feedback: dict, log_prefix: str = "[Evaluate]", session_id: Optional[str] = None) -> Optional[int]:
+    """
+    Insert the interview into the `interviews` table.
+    
+    With a session_id the write is idempotent: a second save for the same
+    session (job retry, or a job recovered from a worker that was still
+    alive) is ignored by the unique `session_id` column.
+    
+    Returns:
+        The job_id the row was saved under, or None if no valid job exists.
+    Raises:
+        Exception on database errors other than a missing job (so callers can retry).
+    """
+    print(f"{log_prefix} Attempting to save to database for user_id: {user_id}")
+    chat_history = [{"role": m.type, "content": m.content} for m in messages]
+    
+    # Parse job_id - required field in database
+    job_id_int = None
+    if job_id:
+        try:
+            job_id_int = int(float(job_id))
+            print(f"{log_prefix} Parsed job_id: {job_id_int}")
+        except (ValueError, TypeError):
+            print(f"⚠️ [DB] Invalid job_id format: {job_id}")
+    
+    # job_id is required (NOT NULL in schema) - get first valid job if not provided
+    if job_id_int is None:
+        print(f"⚠️ {log_prefix} No valid job_id provided - querying for first available job")
+        jobs_result = db_manager.get_client().table("jobs").select("id").limit(1).execute()
+        if jobs_result.data and len(jobs_result.data) > 0:
+            job_id_int = jobs_result.data[0]["id"]
+            print(f"{log_prefix} Using first available job_id: {job_id_int}")
+        else:
+            print(f"⚠️ {log_prefix} No jobs in database - cannot save interview")
+            return None
+    
+    insert_data = {
+        "user_id": user_id,
+        "job_id": job_id_int,
+        "chat_history": chat_history,  # Already a list, Supabase handles JSONB
+        "feedback_report": feedback,   # Already a dict, Supabase handles JSONB
+    }
+    
+    if session_id:
+        insert_data["session_id"] = session_id
+    
+    def write(data: dict):
+        table = db_manager.get_client().table("interviews")
+        if session_id:
+            return table.upsert(data, on_conflict="session_id", ignore_duplicates=True).execute()
+        return table.insert(data).execute()
+    
+    print(f"{log_prefix} Insert data prepared: user_id={user_id[:8]}..., job_id={job_id_int}")
     
-    # Save to database
     try:
-        if user_id:
-            print(f"{log_prefix} Attempting to save to database for user_id: {user_id}")
-            chat_history = [{"role": m.type, "content": m.content} for m in messages]
-            
-            # Parse job_id - required field in database
-            job_id_int = None
-            if job_id:
-                try:
-                    job_id_int = int(float(job_id))
-                    print(f"{log_prefix} Parsed job_id: {job_id_int}")
-                except (ValueError, TypeError):
-                    print(f"⚠️ [DB] Invalid job_id format: {job_id}")
-            
-            # job_id is required (NOT NULL in schema) - get first valid job if not provided
-            if job_id_int is None:
-                print(f"⚠️ {log_prefix} No valid job_id provided - querying for first available job")
-                try:
-                    jobs_result = db_manager.get_client().table("jobs").select("id").limit(1).execute()
-                    if jobs_result.data and len(jobs_result.data) > 0:
-                        job_id_int = jobs_result.data[0]["id"]
-                        print(f"{log_prefix} Using first available job_id: {job_id_int}")
-                    else:
-                        print(f"⚠️ {log_prefix} No jobs in database - cannot save interview")
-                except Exception as job_query_error:
-                    print(f"⚠️ {log_prefix} Failed to query jobs: {job_query_error}")
+        result = write(insert_data)
+        print(f"✅ [DB] Saved interview for User {user_id[:8]}... - Rows: {len(result.data) if result.data else 0}")
+        return job_id_int
+    except Exception as db_error:
+        error_str = str(db_error)
+        print(f"⚠️ [DB] Insert error: {error_str}")
+        
+        # If foreign key constraint fails, query for a valid job
+        if "23503" in error_str and "job_id" in error_str:
+            print(f"⚠️ [DB] Job {job_id_int} doesn't exist. Querying for valid job...")
+            jobs_result = db_manager.get_client().table("jobs").select("id").limit(1).execute()
+            if jobs_result.data and len(jobs_result.data) > 0:
+                insert_data["job_id"] = jobs_result.data[0]["id"]
+                result = write(insert_data)
+                print(f"✅ [DB] Saved with job_id={insert_data['job_id']} - Rows: {len(result.data) if result.data else 0}")
+                return insert_data["job_id"]
+            print(f"⚠️ [DB] No jobs found in database - cannot save interview")
+            return None
+        raise
+
+
+def enhance_roadmap_from_feedback(user_id: str, job_id_int: Optional[int], ctx: dict, feedback: dict, log_prefix: str = "[Evaluate]") -> dict:
+    """
+    FEEDBACK LOOP: Enhance the user's roadmap based on interview improvements.
+    Best-effort - failures are logged and never fail the evaluation.
+    """
+    if not user_id or not feedback.get("improvements"):
+        return feedback
+    try:
+        import httpx
+        
+        print(f"{log_prefix} 🔄 Triggering Feedback Loop - Enhancing roadmap...")
+        
+        # Build the enhancement request
+        enhancement_payload = {
+            "user_id": user_id,
+            "improvements": feedback.get("improvements", []),
+            "job_context": {
+                "title": ctx.get('job', {}).get('title', 'Unknown'),
+                "company": ctx.get('job', {}).get('company', 'Unknown'),
+            }
+        }
+        
+        # Call the enhancement endpoint (internal call)
+        # Using sync httpx since we're in a sync function
+        api_base = os.getenv("API_BASE_URL", "http://localhost:8000")
+        
+        with httpx.Client(timeout=180.0) as client:
+            response = client.post(
+                f"{api_base}/api/saved-jobs/enhance-roadmap-from-feedback",
+                json=enhancement_payload
+            )
             
-            if job_id_int is None:
-                print(f"⚠️ {log_prefix} No valid job_id available - skipping database save")
-            else:
-                insert_data = {
-                    "user_id": user_id,
-                    "job_id": job_id_int,
-                    "chat_history": chat_history,  # Already a list, Supabase handles JSONB
-                    "feedback_report": feedback,   # Already a dict, Supabase handles JSONB
+            if response.status_code == 200:
+                enhancement_result = response.json()
+                roadmap_additions = enhancement_result.get("additions", [])
+                
+                # Add roadmap additions to feedback for frontend display
+                feedback["roadmap_additions"] = {
+                    "nodes": roadmap_additions,
+                    "message": enhancement_result.get("message", ""),
+                    "roadmap_id": enhancement_result.get("roadmap_id")
                 }
                 
-                print(f"{log_prefix} Insert data prepared: user_id={user_id[:8]}..., job_id={job_id_int}")
+                print(f"✅ {log_prefix} Feedback Loop Complete - Added {len(roadmap_additions)} learning blocks")
                 
-                try:
-                    result = db_manager.get_client().table("interviews").insert(insert_data).execute()
-                    print(f"✅ [DB] Saved {interview_type} interview for User {user_id[:8]}... - Rows: {len(result.data) if result.data else 0}")
-                except Exception as db_error:
-                    error_str = str(db_error)
-                    print(f"⚠️ [DB] Insert error: {error_str}")
-                    
-                    # If foreign key constraint fails, query for a valid job
-                    if "23503" in error_str and "job_id" in error_str:
-                        print(f"⚠️ [DB] Job {job_id_int} doesn't exist. Querying for valid job...")
-                        jobs_result = db_manager.get_client().table("jobs").select("id").limit(1).execute()
-                        if jobs_result.data and len(jobs_result.data) > 0:
-                            insert_data["job_id"] = jobs_result.data[0]["id"]
-                            result = db_manager.get_client().table("interviews").insert(insert_data).execute()
-                            print(f"✅ [DB] Saved with job_id={insert_data['job_id']} - Rows: {len(result.data) if result.data else 0}")
-                        else:
-                            print(f"⚠️ [DB] No jobs found in database - cannot save interview")
-                    else:
-                        raise
+                # Update the interview record in database with roadmap_additions
+                if job_id_int:
+                    try:
+                        db_manager.get_client().table("interviews").update({
+                            "feedback_report": feedback
+                        }).eq("user_id", user_id).eq("job_id", job_id_int).order("created_at", desc=True).limit(1).execute()
+                        print(f"✅ {log_prefix} Updated interview record with roadmap additions")
+                    except Exception as update_error:
+                        print(f"⚠️ {log_prefix} Failed to update interview with roadmap: {update_error}")
+            else:
+                print(f"⚠️ {log_prefix} Feedback Loop Error: {response.status_code} - {response.text[:200]}")
+                
+    except Exception as feedback_loop_error:
+        print(f"⚠️ {log_prefix} Feedback Loop Failed: {feedback_loop_error}")
+        import traceback
+        traceback.print_exc()
+        # Don't fail the whole evaluation if feedback loop fails
+    return feedback
+
+
+def evaluate_node(state: InterviewState) -> dict:
+    interview_type = state.get("interview_type", "TECHNICAL")
+    log_prefix = f"[{interview_type} Evaluate]"
+    print(f"{log_prefix} Starting evaluation...")
+    
+    ctx = state.get("context", {})
+    messages = state.get("messages", [])
+    user_id = state.get("user_id")
+    job_id = state.get("job_id")
+    
+    feedback = generate_interview_feedback(state)
+    
+    # Save to database
+    job_id_int = None
+    try:
+        if user_id:
+            job_id_int = save_interview_record(user_id, job_id, messages, feedback, log_prefix)
         else:
             print(f"⚠️ {log_prefix} No user_id provided - skipping database save")
     except Exception as e:
@@ -410,74 +524,88 @@ Return JSON only:
         import traceback
         traceback.print_exc()
     
-    # ==========================================================================
-    # FEEDBACK LOOP: Enhance roadmap based on interview improvements
-    # ==========================================================================
-    if user_id and feedback.get("improvements"):
-        try:
-            import httpx
-            
-            print(f"{log_prefix} 🔄 Triggering Feedback Loop - Enhancing roadmap...")
-            
-            # Build the enhancement request
-            enhancement_payload = {
-                "user_id": user_id,
-                "improvements": feedback.get("improvements", []),
-                "job_context": {
-                    "title": ctx.get('job', {}).get('title', 'Unknown'),
-                    "company": ctx.get('job', {}).get('company', 'Unknown'),
-                }
-            }
-            
-            # Call the enhancement endpoint (internal call)
-            # Using sync httpx since we're in a sync function
-            api_base = os.getenv("API_BASE_URL", "http://localhost:8000")
-            
-            with httpx.Client(timeout=180.0) as client:
-                response = client.post(
-                    f"{api_base}/api/saved-jobs/enhance-roadmap-from-feedback",
-                    json=enhancement_payload
-                )
-                
-                if response.status_code == 200:
-                    enhancement_result = response.json()
-                    print(f"[DEBUG] Enhancement response keys: {enhancement_result.keys()}")
-                    roadmap_additions = enhancement_result.get("additions", [])
-                    print(f"[DEBUG] roadmap_additions count: {len(roadmap_additions)}")
-                    
-                    # Add roadmap additions to feedback for frontend display
-                    feedback["roadmap_additions"] = {
-                        "nodes": roadmap_additions,
-                        "message": enhancement_result.get("message", ""),
-                        "roadmap_id": enhancement_result.get("roadmap_id")
-                    }
-                    print(f"[DEBUG] feedback now has roadmap_additions: {feedback.get('roadmap_additions', {}).get('nodes', [])[:1]}...")
-                    
-                    print(f"✅ {log_prefix} Feedback Loop Complete - Added {len(roadmap_additions)} learning blocks")
-                    
-                    # Update the interview record in database with roadmap_additions
-                    if job_id_int:
-                        try:
-                            db_manager.get_client().table("interviews").update({
-                                "feedback_report": feedback
-                            }).eq("user_id", user_id).eq("job_id", job_id_int).order("created_at", desc=True).limit(1).execute()
-                            print(f"✅ {log_prefix} Updated interview record with roadmap additions")
-                        except Exception as update_error:
-                            print(f"⚠️ {log_prefix} Failed to update interview with roadmap: {update_error}")
-                else:
-                    print(f"⚠️ {log_prefix} Feedback Loop Error: {response.status_code} - {response.text[:200]}")
-                    
-        except Exception as feedback_loop_error:
-            print(f"⚠️ {log_prefix} Feedback Loop Failed: {feedback_loop_error}")
-            import traceback
-            traceback.print_exc()
-            # Don't fail the whole evaluation if feedback loop fails
+    feedback = enhance_roadmap_from_feedback(user_id, job_id_int, ctx, feedback, log_prefix)
     
     print(f"{log_prefix} Complete - Verdict: {feedback.get('verdict')}, Score: {feedback.get('score')}")
-    print(f"[DEBUG] Final feedback has roadmap_additions: {'roadmap_additions' in feedback}, nodes count: {len(feedback.get('roadmap_additions', {}).get('nodes', []))}")
     return {"feedback": feedback, "stage": "end"}
 
 
+# =============================================================================
+# Background Evaluation (durable job queue)
+# =============================================================================
+
+EVALUATION_JOB_TYPE = "interview_evaluation"
+
+
+def _serialize_messages(messages: List[BaseMessage]) -> List[dict]:
+    return [{"role": m.type, "content": m.content} for m in messages]
+
+
+def _deserialize_messages(items: List[dict]) -> List[BaseMessage]:
+    return [
+        AIMessage(content=item["content"]) if item["role"] == "ai" else HumanMessage(content=item["content"])
+        for item in items
+    ]
+
+
+def evaluation_job(payload: dict, ctx) -> dict:
+    """
+    Job handler: evaluate, persist, then run the roadmap feedback loop.
+    
+    Each step is checkpointed so a retry after a DB failure does not
+    re-run the evaluation LLM.
+    """
+    state = {**payload, "messages": _deserialize_messages(payload.get("messages", []))}
+    interview_type = state.get("interview_type", "TECHNICAL")
+    log_prefix = f"[{interview_type} Evaluate Job]"
+    user_id = state.get("user_id")
+    
+    feedback = ctx.checkpoint.get("feedback")
+    if feedback is None:
+        ctx.progress("evaluating")
+        feedback = generate_interview_feedback(state)
+        ctx.save_checkpoint(feedback=feedback)
+    
+    if user_id and not ctx.checkpoint.get("saved"):
+        ctx.progress("saving")
+        # One evaluation job per finished interview, so the job id doubles as the session key
+        job_id_int = save_interview_record(
+            user_id, state.get("job_id"), state["messages"], feedback, log_prefix,
+            session_id=state.get("session_id") or ctx.job_id
+        )
+        ctx.save_checkpoint(saved=True, job_id_int=job_id_int)
+    
+    if not ctx.checkpoint.get("enhanced"):
+        ctx.progress("enhancing_roadmap")
+        feedback = enhance_roadmap_from_feedback(
+            user_id, ctx.checkpoint.get("job_id_int"), state.get("context", {}), feedback, log_prefix
+        )
+        ctx.save_checkpoint(enhanced=True, feedback=feedback)
+    
+    return {"feedback": feedback}
+
+
+job_queue.register(EVALUATION_JOB_TYPE, evaluation_job)
+
+
+def enqueue_evaluation(state: dict) -> str:
+    """Queue an interview for background evaluation. Returns the evaluation id."""
+    payload = {
+        "messages": _serialize_messages(state.get("messages", [])),
+        "context": state.get("context", {}),
+        "interview_type": state.get("interview_type", "TECHNICAL"),
+        "mode": state.get("mode", "text"),
+        "user_id": state.get("user_id"),
+        "job_id": state.get("job_id"),
+        "session_id": state.get("session_id"),
+    }
+    return job_queue.submit(
+        EVALUATION_JOB_TYPE,
+        payload,
+        metadata={"user_id": state.get("user_id"), "job_id": state.get("job_id")}
+    )
+
+
 # Build workflow graphs
 def _build_graph(checkpointer):
     workflow = StateGraph(InterviewState)
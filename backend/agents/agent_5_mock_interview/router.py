@@ -5,6 +5,8 @@ Agent 5: Mock Interview - API Router
 Provides endpoints for:
 - GET /api/interview/history/{user_id} - Get interview history
 - POST /api/interview/chat - Legacy chat interview
+- GET /api/interview/evaluations/{evaluation_id} - Poll background evaluation
+- GET /api/interview/metrics/speculation - Speculative voice-turn metrics
 - WebSocket /ws/interview/{job_id} - Voice interview
 - WebSocket /ws/interview/text/{job_id} - Text interview
 """
@@ -12,22 +14,38 @@ Provides endpoints for:
 import os
 import re
 import uuid
-import math
-import struct
 import asyncio
 import time
 import logging
+from functools import partial
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 
 from core.db import db_manager
-from core.config import AudioState, SILENCE_THRESHOLD, SILENCE_DURATION, COOLDOWN_SECONDS
+from core.config import (
+    AudioState,
+    SILENCE_THRESHOLD,
+    SILENCE_DURATION,
+    COOLDOWN_SECONDS,
+    PLAYBACK_MARGIN_SECONDS,
+    SPECULATIVE_TURNS_ENABLED,
+    SPECULATION_PAUSE_SECONDS,
+    INTERVIEW_GOODBYE_PENDING_MESSAGE
+)
 from core.context_loader import fetch_interview_context
 from services.audio_service import transcribe_audio_bytes, synthesize_audio_bytes
+from services.audio_codec import (
+    negotiate_input_codec,
+    negotiate_output_format,
+    create_upstream,
+    audio_duration,
+    OUTPUT_MIME_TYPES,
+)
 
 from .graph import (
+    interviewer_node,
     chat_interview_graph,
     voice_interview_graph,
     create_chat_state,
@@ -35,8 +53,10 @@ from .graph import (
     add_chat_message,
     add_voice_message,
     run_interview_turn,
-    run_evaluation
+    enqueue_evaluation
 )
+from .speculation import TurnSpeculator, speculation_metrics
+from services.job_queue import job_queue, JobStatus
 
 logger = logging.getLogger("Agent5")
 
@@ -62,19 +82,61 @@ class InterviewRequest(BaseModel):
 # Helper Functions
 # =============================================================================
 
-def calculate_rms(audio_chunk: bytes) -> float:
-    """Calculates the Root Mean Square (volume) of the audio chunk."""
-    if not audio_chunk:
-        return 0
-    count = len(audio_chunk) // 2
-    if count == 0:
-        return 0
+async def send_voice_audio(websocket: WebSocket, audio: bytes, audio_format: str) -> float:
+    """
+    Send a TTS clip preceded by its metadata and return its exact duration.
+    
+    The duration comes from the container (MP3 frames / Ogg granules / WAV
+    header), so the caller can resume listening right when playback ends.
+    """
+    duration = audio_duration(audio, audio_format)
+    await websocket.send_json({
+        "type": "event",
+        "event": "audio_meta",
+        "format": audio_format,
+        "mime_type": OUTPUT_MIME_TYPES.get(audio_format, "application/octet-stream"),
+        "duration_ms": round(duration * 1000),
+        "bytes": len(audio)
+    })
+    await websocket.send_bytes(audio)
+    return duration
+
+
+async def queue_evaluation_and_close(websocket: WebSocket, result: dict, log_prefix: str) -> Optional[str]:
+    """
+    Hand the finished interview to the background job queue and close the socket.
+    
+    The client receives an `evaluation_queued` message and polls
+    GET /api/interview/evaluations/{evaluation_id} for the feedback.
+    """
+    evaluation_id = None
     try:
-        shorts = struct.unpack(f"{count}h", audio_chunk)
-        sum_squares = sum(s ** 2 for s in shorts)
-        return math.sqrt(sum_squares / count)
-    except:
-        return 0
+        evaluation_id = enqueue_evaluation(result)
+        logger.info(f"{log_prefix} Evaluation queued: {evaluation_id}")
+        await websocket.send_json({
+            "type": "evaluation_queued",
+            "evaluation_id": evaluation_id,
+            "poll_url": f"/api/interview/evaluations/{evaluation_id}"
+        })
+    except Exception as e:
+        logger.error(f"{log_prefix} Failed to queue evaluation: {e}")
+        try:
+            await websocket.send_json({
+                "type": "feedback",
+                "data": {
+                    "score": 0,
+                    "verdict": "Evaluation Error",
+                    "summary": f"Error: {str(e)}"
+                }
+            })
+        except Exception:
+            pass
+    
+    try:
+        await websocket.close()
+    except Exception:
+        pass
+    return evaluation_id
 
 
 def extract_user_id_from_token(access_token: str) -> Optional[str]:
@@ -154,6 +216,30 @@ async def interview_chat(request: InterviewRequest):
         raise HTTPException(status_code=500, detail=f"Interview chat failed: {str(e)}")
 
 
+@router.get("/api/interview/evaluations/{evaluation_id}")
+async def get_interview_evaluation(evaluation_id: str):
+    """Poll a queued interview evaluation. `feedback` is present once status is 'succeeded'."""
+    job = job_queue.get(evaluation_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    
+    result = job.get("result") or {}
+    return {
+        "evaluation_id": evaluation_id,
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "feedback": result.get("feedback") if job["status"] == JobStatus.SUCCEEDED else None,
+        "error": job.get("error") if job["status"] == JobStatus.FAILED else None,
+        "progress": job.get("progress", [])
+    }
+
+
+@router.get("/api/interview/metrics/speculation")
+async def get_speculation_metrics():
+    """Speculative voice-turn hit rate and turn-latency figures for this process."""
+    return speculation_metrics.snapshot()
+
+
 # =============================================================================
 # WebSocket: Text Interview
 # =============================================================================
@@ -248,35 +334,8 @@ async def interview_text_endpoint(websocket: WebSocket, job_id: str):
                 logger.info(f"[Text {interview_type}] Interview ending - triggering evaluation...")
                 logger.info(f"[Text] Current state - stage: {current_stage}, ending: {result.get('ending')}, user_id: {user_id}, job_id: {job_id_clean}")
                 
-                try:
-                    logger.info(f"[Text] Running evaluation with user_id: {user_id[:8]}..., job_id: {job_id_clean}")
-                    
-                    # Run evaluation directly (bypasses graph interrupt_after issue)
-                    eval_result = run_evaluation(result)
-                    feedback = eval_result.get("feedback")
-                    
-                    if feedback:
-                        logger.info(f"✅ Feedback generated: {feedback.get('verdict', 'N/A')} - Score: {feedback.get('score', 0)}")
-                        
-                        verdict = feedback.get("verdict", "Thank you")
-                        score = feedback.get("score", 0)
-                        summary = feedback.get("summary", "We appreciate your time.")
-                        
-                        feedback_message = f"\n\n**Interview Results**\n\n{verdict}. Your interview score is {score} out of 100.\n\n{summary}"
-                        
-                        await websocket.send_json({"type": "feedback", "data": feedback})
-                        await websocket.send_json({"type": "message", "role": "assistant", "content": feedback_message})
-                    else:
-                        logger.warning("[Text] No feedback returned from evaluation")
-                        logger.warning(f"[Text] Eval result: {eval_result}")
-                except Exception as eval_error:
-                    logger.error(f"[Text] Evaluation error: {eval_error}")
-                    import traceback
-                    traceback.print_exc()
-                
-                await asyncio.sleep(1)
-                logger.info("Closing interview session")
-                await websocket.close()
+                # Evaluation + persistence run on the job queue; the socket closes right away
+                await queue_evaluation_and_close(websocket, result, f"[Text {interview_type}]")
                 break
                 
     except WebSocketDisconnect:
@@ -298,6 +357,11 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
     try:
         init_data = await asyncio.wait_for(websocket.receive_json(), timeout=10.0)
         interview_type = init_data.get("interview_type", "TECHNICAL").upper()
+        speculative = bool(init_data.get("speculative", SPECULATIVE_TURNS_ENABLED))
+        
+        # Codec negotiation: client lists codecs in preference order
+        input_codec = negotiate_input_codec(init_data.get("input_codecs"))
+        output_format = negotiate_output_format(init_data.get("output_formats"))
         
         # Get user_id: prefer explicit user_id, then extract from token
         user_id = init_data.get("user_id")
@@ -348,8 +412,11 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
         "type": "config",
         "interview_type": interview_type,
         "job_title": full_context['job'].get('title', 'Unknown'),
-        "user_name": full_context['user'].get('name', 'Candidate')
+        "user_name": full_context['user'].get('name', 'Candidate'),
+        "input_codec": input_codec,
+        "output_format": output_format
     })
+    logger.info(f"[Voice] Codecs: in={input_codec}, out={output_format}")
     
     # State: THINKING - AI generating welcome message
     audio_state = AudioState.THINKING
@@ -367,17 +434,16 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
     
     tts_start = time.time()
     clean_welcome = welcome_text.replace('**', '').replace('*', '').replace('_', '').replace('~~', '')
-    welcome_audio = synthesize_audio_bytes(clean_welcome)
+    welcome_audio = synthesize_audio_bytes(clean_welcome, output_format)
     tts_time = time.time() - tts_start
     logger.info(f"⏱️ Welcome TTS: {tts_time:.2f}s, Total: {time.time() - welcome_start:.2f}s")
     
     await websocket.send_json({"type": "event", "event": "stage_change", "stage": result.get("stage", "intro")})
-    await websocket.send_bytes(welcome_audio)
+    clip_duration = await send_voice_audio(websocket, welcome_audio, output_format)
     
-    # Calculate audio duration (16kHz, 16-bit = 32000 bytes/sec)
-    audio_duration = len(welcome_audio) / 32000.0
-    wait_time = max(audio_duration + 0.5, COOLDOWN_SECONDS)
-    logger.info(f"[Voice] Audio duration: {audio_duration:.2f}s, waiting {wait_time:.2f}s before listening")
+    # Wait for playback to finish (exact clip duration from the container)
+    wait_time = max(clip_duration + PLAYBACK_MARGIN_SECONDS, COOLDOWN_SECONDS)
+    logger.info(f"[Voice] Audio duration: {clip_duration:.2f}s, waiting {wait_time:.2f}s before listening")
     await asyncio.sleep(wait_time)
     
     # State: LISTENING - Ready for user input
@@ -385,11 +451,19 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
     await websocket.send_json({"type": "event", "event": "audio_state", "state": "listening"})
     logger.info("[Voice] State -> LISTENING")
     
-    audio_buffer = bytearray()
+    upstream = create_upstream(input_codec)
     silence_start_time = None
     is_speaking = False
     last_ai_response_time = time.time()
     
+    # Optional: pre-generate the next question during mid-answer pauses
+    transcribe = partial(transcribe_audio_bytes, codec=input_codec)
+    speculator = TurnSpeculator(
+        transcribe=transcribe,
+        generate=interviewer_node,
+        add_message=add_voice_message
+    ) if speculative else None
+    
     try:
         while result.get("stage") != "end" and not result.get("ending"):
             data = await websocket.receive_bytes()
@@ -402,8 +476,7 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
             if time.time() - last_ai_response_time < COOLDOWN_SECONDS:
                 continue
             
-            audio_buffer.extend(data)
-            rms = calculate_rms(data)
+            rms = upstream.feed(data)
             
             if rms > SILENCE_THRESHOLD:
                 is_speaking = True
@@ -412,7 +485,11 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
                 if silence_start_time is None:
                     silence_start_time = asyncio.get_event_loop().time()
                 
-                if (asyncio.get_event_loop().time() - silence_start_time) >= SILENCE_DURATION:
+                silence_elapsed = asyncio.get_event_loop().time() - silence_start_time
+                if speculator and SPECULATION_PAUSE_SECONDS <= silence_elapsed < SILENCE_DURATION:
+                    speculator.maybe_start(result, upstream.payload())
+                
+                if silence_elapsed >= SILENCE_DURATION:
                     logger.info(f"[Voice {interview_type}] Processing user audio...")
                     
                     # State: THINKING
@@ -424,22 +501,27 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
                     
                     # Transcription
                     transcribe_start = time.time()
-                    user_text = transcribe_audio_bytes(bytes(audio_buffer))
+                    user_text = transcribe(upstream.payload())
                     transcribe_time = time.time() - transcribe_start
                     
                     # Clear buffer
-                    audio_buffer = bytearray()
+                    upstream.clear()
                     is_speaking = False
                     silence_start_time = None
+                    speculated = None
                     
                     if user_text.strip():
                         logger.info(f"[Voice {interview_type}] User: {user_text[:50]}...")
                         logger.info(f"⏱️ Transcription: {transcribe_time:.2f}s")
                         
-                        # LLM Inference
+                        # LLM Inference (reuse the speculated turn when the transcript matches)
                         llm_start = time.time()
-                        state = add_voice_message(result, user_text)
-                        result = voice_interview_graph.invoke(state, config=config)
+                        speculated = await speculator.resolve(result, user_text) if speculator else None
+                        if speculated is not None:
+                            result = speculated
+                        else:
+                            state = add_voice_message(result, user_text)
+                            result = voice_interview_graph.invoke(state, config=config)
                         llm_time = time.time() - llm_start
                         
                         ai_text = result["messages"][-1].content if result["messages"] else "Could you repeat?"
@@ -457,19 +539,22 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
                         # Audio Synthesis
                         tts_start = time.time()
                         clean_text = ai_text.replace('**', '').replace('*', '').replace('_', '').replace('~~', '')
-                        audio_bytes = synthesize_audio_bytes(clean_text)
+                        audio_bytes = synthesize_audio_bytes(clean_text, output_format)
                         tts_time = time.time() - tts_start
                         logger.info(f"⏱️ Audio TTS: {tts_time:.2f}s")
                         
-                        await websocket.send_bytes(audio_bytes)
+                        clip_duration = await send_voice_audio(websocket, audio_bytes, output_format)
                         
                         total_time = time.time() - turn_start
                         logger.info(f"⏱️ TOTAL TURN: {total_time:.2f}s")
+                        speculation_metrics.record_turn(
+                            total_time,
+                            (speculated is not None) if speculator else None
+                        )
                         
                         # Wait for audio to finish before listening again
-                        audio_duration = len(audio_bytes) / 32000.0
-                        wait_time = max(audio_duration + 0.5, COOLDOWN_SECONDS)
-                        logger.info(f"[Voice] Audio duration: {audio_duration:.2f}s, waiting {wait_time:.2f}s")
+                        wait_time = max(clip_duration + PLAYBACK_MARGIN_SECONDS, COOLDOWN_SECONDS)
+                        logger.info(f"[Voice] Audio duration: {clip_duration:.2f}s, waiting {wait_time:.2f}s")
                         await asyncio.sleep(wait_time)
                         
                         last_ai_response_time = time.time()
@@ -477,42 +562,11 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
                         # Check if interview is ending
                         if current_stage == "end" or result.get("ending"):
                             logger.info(f"[Voice {interview_type}] Interview ending...")
-                            
-                            # Send goodbye audio
-                            goodbye_msg = "Thank you for your time today. We'll review and be in touch soon."
-                            await websocket.send_bytes(synthesize_audio_bytes(goodbye_msg))
-                            await asyncio.sleep(3)
-                            
-                            # Run evaluation
-                            try:
-                                logger.info(f"[Voice] Running evaluation with user_id: {user_id[:8]}..., job_id: {job_id_clean}")
-                                
-                                # Directly run evaluation (bypasses graph interrupt_after)
-                                final_result = await asyncio.to_thread(
-                                    run_evaluation,
-                                    result
-                                )
-                                feedback = final_result.get("feedback")
-                                
-                                if feedback:
-                                    logger.info(f"✅ Feedback saved: {feedback.get('verdict')} - Score: {feedback.get('score')}")
-                                    await websocket.send_json({"type": "feedback", "data": feedback})
-                                    
-                                    verdict = feedback.get("verdict", "Thank you")
-                                    score = feedback.get("score", 0)
-                                    feedback_msg = f"{verdict}. Score: {score}. We'll be in touch soon."
-                                    await websocket.send_bytes(synthesize_audio_bytes(feedback_msg))
-                                    await asyncio.sleep(3)
-                                else:
-                                    logger.warning("[Voice] No feedback returned from evaluation")
-                            except Exception as eval_error:
-                                logger.error(f"Evaluation error: {eval_error}")
-                                import traceback
-                                traceback.print_exc()
-                            
-                            await websocket.close()
                             break
                         
+                        if speculator:
+                            speculator.reset()
+                        
                         # State: LISTENING - Ready for next input
                         audio_state = AudioState.LISTENING
                         await websocket.send_json({"type": "event", "event": "audio_state", "state": "listening"})
@@ -520,6 +574,8 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
                     else:
                         # No valid transcription - go back to listening
                         logger.info("[Voice] Empty transcription, back to listening")
+                        if speculator:
+                            speculator.reset()
                         audio_state = AudioState.LISTENING
                         await websocket.send_json({"type": "event", "event": "audio_state", "state": "listening"})
                         last_ai_response_time = time.time()
@@ -528,70 +584,17 @@ async def interview_voice_endpoint(websocket: WebSocket, job_id: str):
         logger.info(f"[Voice {interview_type}] Client Disconnected")
         return
     
-    # === INTERVIEW ENDED - PROCESS FEEDBACK OUTSIDE THE LOOP ===
-    logger.info(f"[Voice {interview_type}] Interview loop ended - processing feedback...")
+    # === INTERVIEW ENDED - QUEUE FEEDBACK OUTSIDE THE LOOP ===
+    logger.info(f"[Voice {interview_type}] Interview loop ended - queueing evaluation...")
     
-    # Let frontend know we're processing
+    # Send goodbye audio (cached phrase - no TTS round-trip)
     try:
-        await websocket.send_json({"type": "event", "event": "processing", "status": "start"})
-    except:
-        pass
-    
-    # Send goodbye audio
-    try:
-        goodbye_msg = "Thank you for your time today. We'll review your responses and provide feedback shortly."
-        await websocket.send_bytes(synthesize_audio_bytes(goodbye_msg))
-        await asyncio.sleep(3)
-    except:
+        await send_voice_audio(
+            websocket,
+            synthesize_audio_bytes(INTERVIEW_GOODBYE_PENDING_MESSAGE, output_format),
+            output_format
+        )
+    except Exception:
         pass
     
-    # Run evaluation
-    try:
-        logger.info(f"[Voice] Running evaluation with user_id: {user_id[:8]}..., job_id: {job_id_clean}")
-        
-        # Directly run evaluation
-        final_result = await asyncio.to_thread(run_evaluation, result)
-        feedback = final_result.get("feedback")
-        
-        if feedback:
-            logger.info(f"✅ Feedback saved: {feedback.get('verdict')} - Score: {feedback.get('score')}")
-            await websocket.send_json({"type": "feedback", "data": feedback})
-            
-            verdict = feedback.get("verdict", "Thank you")
-            score = feedback.get("score", 0)
-            feedback_msg = f"{verdict}. Score: {score}. We'll be in touch soon."
-            await websocket.send_bytes(synthesize_audio_bytes(feedback_msg))
-            await asyncio.sleep(3)
-        else:
-            logger.warning("[Voice] No feedback returned from evaluation")
-            # Send empty feedback so frontend can still transition
-            await websocket.send_json({
-                "type": "feedback", 
-                "data": {
-                    "score": 0,
-                    "verdict": "Unable to evaluate",
-                    "summary": "An error occurred during evaluation. Please try again."
-                }
-            })
-    except Exception as eval_error:
-        logger.error(f"Evaluation error: {eval_error}")
-        import traceback
-        traceback.print_exc()
-        # Send error feedback
-        try:
-            await websocket.send_json({
-                "type": "feedback",
-                "data": {
-                    "score": 0,
-                    "verdict": "Evaluation Error",
-                    "summary": f"Error: {str(eval_error)}"
-                }
-            })
-        except:
-            pass
-    
-    # Clean close
-    try:
-        await websocket.close()
-    except:
-        pass
+    await queue_evaluation_and_close(websocket, result, f"[Voice {interview_type}]")
@@ -0,0 +1,249 @@
+"""
+Agent 5 - Speculative Turn Generation (Voice Mode)
+
+While the candidate pauses mid-answer, transcribe the partial audio and run the
+interviewer node on it in the background. When the final transcript arrives and is
+close enough to the partial one, the speculated question is reused instead of
+starting a fresh LLM call after silence detection. The partial transcript is
+compared as soon as it exists; a miss or a superseded attempt cancels its
+generation instead of waiting for it.
+
+The interviewer node is called directly (not via the compiled graph) so speculation
+never writes to the LangGraph checkpointer.
+"""
+
+import re
+import time
+import asyncio
+import logging
+import threading
+from difflib import SequenceMatcher
+from typing import Callable, Optional
+
+from core.config import (
+    SPECULATION_MATCH_THRESHOLD,
+    SPECULATION_MAX_PER_TURN
+)
+
+logger = logging.getLogger("Agent5.Speculation")
+
+
+def normalize_transcript(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace for comparison."""
+    return " ".join(re.sub(r"[^\w\s']", " ", (text or "").lower()).split())
+
+
+def transcript_similarity(partial: str, final: str) -> float:
+    """Similarity ratio (0-1) between two transcripts after normalization."""
+    a, b = normalize_transcript(partial), normalize_transcript(final)
+    if not a and not b:
+        return 1.0
+    return SequenceMatcher(None, a.split(), b.split()).ratio()
+
+
+class SpeculationMetrics:
+    """Process-wide counters for speculation hit rate and turn latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.attempts = 0
+            self.hits = 0
+            self.misses = 0
+            self.superseded = 0
+            self.seconds_saved = 0.0
+            self.hit_turn_seconds = 0.0
+            self.miss_turn_seconds = 0.0
+            self.baseline_turns = 0
+            self.baseline_turn_seconds = 0.0
+
+    def record_attempt(self) -> None:
+        with self._lock:
+            self.attempts += 1
+
+    def record_superseded(self) -> None:
+        with self._lock:
+            self.superseded += 1
+
+    def record_hit(self, seconds_saved: float) -> None:
+        with self._lock:
+            self.hits += 1
+            self.seconds_saved += max(0.0, seconds_saved)
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def record_turn(self, seconds: float, speculated: Optional[bool]) -> None:
+        """Record end-to-end turn latency. speculated=None means speculation was off."""
+        with self._lock:
+            if speculated is None:
+                self.baseline_turns += 1
+                self.baseline_turn_seconds += seconds
+            elif speculated:
+                self.hit_turn_seconds += seconds
+            else:
+                self.miss_turn_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            resolved = self.hits + self.misses
+            return {
+                "attempts": self.attempts,
+                "hits": self.hits,
+                "misses": self.misses,
+                "superseded": self.superseded,
+                "hit_rate": round(self.hits / resolved, 3) if resolved else 0.0,
+                "total_seconds_saved": round(self.seconds_saved, 3),
+                "avg_seconds_saved_per_hit": round(self.seconds_saved / self.hits, 3) if self.hits else 0.0,
+                "avg_turn_seconds_hit": round(self.hit_turn_seconds / self.hits, 3) if self.hits else 0.0,
+                "avg_turn_seconds_miss": round(self.miss_turn_seconds / self.misses, 3) if self.misses else 0.0,
+                "avg_turn_seconds_no_speculation": (
+                    round(self.baseline_turn_seconds / self.baseline_turns, 3) if self.baseline_turns else 0.0
+                ),
+            }
+
+
+speculation_metrics = SpeculationMetrics()
+
+
+def merge_speculated_turn(state: dict, speculated_input: dict, update: dict, final_messages: list) -> dict:
+    """
+    Rebuild the post-turn state from a speculated node update.
+
+    The speculated update was computed against the partial transcript; its message
+    list is re-based onto the messages that contain the final transcript.
+    """
+    new_messages = update.get("messages", speculated_input["messages"])[len(speculated_input["messages"]):]
+    return {**state, **update, "messages": final_messages + list(new_messages)}
+
+
+class TurnSpeculator:
+    """
+    Per-session speculation driver.
+
+    Args:
+        transcribe: Blocking STT callable (audio bytes -> text)
+        generate: Blocking interviewer node (state -> state update)
+        add_message: Appends a user message to a state (state, text -> state)
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[bytes], str],
+        generate: Callable[[dict], dict],
+        add_message: Callable[[dict, str], dict],
+        metrics: SpeculationMetrics = speculation_metrics,
+        match_threshold: float = SPECULATION_MATCH_THRESHOLD,
+        max_per_turn: int = SPECULATION_MAX_PER_TURN
+    ):
+        self.transcribe = transcribe
+        self.generate = generate
+        self.add_message = add_message
+        self.metrics = metrics
+        self.match_threshold = match_threshold
+        self.max_per_turn = max_per_turn
+        self._transcript: Optional[asyncio.Task] = None
+        self._generation: Optional[asyncio.Task] = None
+        self._audio_len = 0
+        self._started_this_turn = 0
+
+    async def _generate_after(self, state: dict, transcript: asyncio.Task) -> Optional[dict]:
+        partial_text = await transcript
+        if not partial_text.strip():
+            return None
+        speculated_input = self.add_message(state, partial_text)
+        llm_start = time.time()
+        update = await asyncio.to_thread(self.generate, speculated_input)
+        return {
+            "speculated_input": speculated_input,
+            "update": update,
+            "llm_seconds": time.time() - llm_start,
+        }
+
+    @staticmethod
+    def _drop(task: Optional[asyncio.Task]) -> None:
+        """Cancel without awaiting; the worker thread's result is discarded."""
+        if task is not None and not task.done():
+            task.cancel()
+
+    def _discard(self) -> None:
+        self._drop(self._generation)
+        self._drop(self._transcript)
+        self._transcript = self._generation = None
+
+    def maybe_start(self, state: dict, audio: bytes) -> bool:
+        """Start speculating on the current buffer if it grew since the last attempt."""
+        if len(audio) <= self._audio_len or self._started_this_turn >= self.max_per_turn:
+            return False
+        if self._generation is not None:
+            self.metrics.record_superseded()
+            self._discard()
+        self._audio_len = len(audio)
+        self._started_this_turn += 1
+        self.metrics.record_attempt()
+        self._transcript = asyncio.create_task(asyncio.to_thread(self.transcribe, bytes(audio)))
+        self._generation = asyncio.create_task(self._generate_after(state, self._transcript))
+        for task in (self._transcript, self._generation):
+            # Dropped tasks may still fail; retrieve the exception so it is not reported as unhandled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        logger.info(f"[Speculation] Started on {len(audio)} bytes of partial audio")
+        return True
+
+    async def resolve(self, state: dict, final_text: str) -> Optional[dict]:
+        """
+        Return the post-turn state if the speculation matches the final transcript.
+
+        Only the partial transcription is awaited before comparing (it started
+        earlier on a shorter buffer). On a miss the generation is dropped, so a
+        miss costs no LLM wait.
+
+        Returns:
+            Merged state on a hit, None on a miss (caller runs the normal path)
+        """
+        transcript, generation = self._transcript, self._generation
+        self._transcript = self._generation = None
+        if generation is None:
+            return None
+
+        try:
+            partial_text = await transcript
+        except Exception as e:
+            logger.warning(f"[Speculation] Partial transcription failed: {e}")
+            partial_text = ""
+
+        similarity = transcript_similarity(partial_text, final_text) if partial_text.strip() else 0.0
+        if similarity < self.match_threshold:
+            logger.info(f"[Speculation] MISS (similarity {similarity:.2f})")
+            self._drop(generation)
+            self.metrics.record_miss()
+            return None
+
+        wait_start = time.time()
+        try:
+            outcome = await generation
+        except Exception as e:
+            logger.warning(f"[Speculation] Background turn failed: {e}")
+            outcome = None
+        waited = time.time() - wait_start
+
+        if not outcome:
+            self.metrics.record_miss()
+            return None
+
+        # The LLM time we did not have to wait for after the final transcript
+        saved = outcome["llm_seconds"] - waited
+        self.metrics.record_hit(saved)
+        logger.info(f"[Speculation] HIT (similarity {similarity:.2f}, saved {saved:.2f}s)")
+
+        final_messages = self.add_message(state, final_text)["messages"]
+        return merge_speculated_turn(state, outcome["speculated_input"], outcome["update"], final_messages)
+
+    def reset(self) -> None:
+        """Drop any in-flight speculation; call at the end of every turn."""
+        self._discard()
+        self._audio_len = 0
+        self._started_this_turn = 0
@@ -18,9 +18,13 @@ from supabase import create_client
 
 # Redis cache integration
 from services.cache_service import cache_service
+from services.structured_output import structured_output, genai_call
 
 logger = logging.getLogger("LeetCodeService")
 
+# Gemini must answer with a bare list of problem IDs
+RECOMMENDATION_SCHEMA = {"type": "ARRAY", "items": {"type": "INTEGER"}}
+
 
 class LeetCodeService:
     """Service for LeetCode problem solving features"""
@@ -155,21 +159,21 @@ Select exactly 30 problems from the available list that would be most beneficial
 RESPONSE FORMAT:
 Return ONLY a JSON array of problem IDs, nothing else. Example: [1, 121, 217, 238, ...]"""
 
-        response = model.generate_content(prompt)
-        text = response.text
+        available_ids = {p["id"] for p in available_problems}
         
-        # Parse response
-        import re
-        json_match = re.search(r'\[[\d,\s]+\]', text)
-        if json_match:
-            ids = json.loads(json_match.group())
-            valid_ids = [
-                id for id in ids
-                if any(p["id"] == id for p in self.all_problems) and id not in solved_ids
-            ]
-            return valid_ids[:30]
+        def _has_valid_ids(ids: List[int]) -> Optional[str]:
+            if not any(id in available_ids for id in ids):
+                return "no recommended IDs from the available list"
+            return None
         
-        return []
+        ids = structured_output.generate(
+            "leetcode.gemini_recommendations",
+            genai_call(model, prompt),
+            schema=RECOMMENDATION_SCHEMA,
+            validate=_has_valid_ids,
+        )
+        valid_ids = [id for id in dict.fromkeys(ids) if id in available_ids]
+        return valid_ids[:30]
     
     def _get_local_recommendations(
         self,
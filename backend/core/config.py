@@ -86,6 +86,29 @@ SILENCE_THRESHOLD = int(os.getenv("AUDIO_SILENCE_THRESHOLD", "500"))
 SILENCE_DURATION = float(os.getenv("AUDIO_SILENCE_DURATION", "0.8"))
 COOLDOWN_SECONDS = float(os.getenv("AUDIO_COOLDOWN_SECONDS", "1.0"))
 
+# Slack added to the exact TTS clip duration before listening resumes
+# (covers network delivery and client playback start-up)
+PLAYBACK_MARGIN_SECONDS = float(os.getenv("AUDIO_PLAYBACK_MARGIN", "0.5"))
+
+# Speculative next-question generation (voice mode, opt-in)
+SPECULATIVE_TURNS_ENABLED = os.getenv("INTERVIEW_SPECULATIVE_TURNS", "false").lower() == "true"
+SPECULATION_PAUSE_SECONDS = float(os.getenv("INTERVIEW_SPECULATION_PAUSE", "0.3"))
+SPECULATION_MATCH_THRESHOLD = float(os.getenv("INTERVIEW_SPECULATION_MATCH", "0.9"))
+SPECULATION_MAX_PER_TURN = int(os.getenv("INTERVIEW_SPECULATION_MAX_PER_TURN", "2"))
+
+# =============================================================================
+# Fixed Voice Utterances (pre-warmed into the TTS cache at startup)
+# =============================================================================
+
+INTERVIEW_GOODBYE_PENDING_MESSAGE = "Thank you for your time today. We'll review your responses and provide feedback shortly."
+
+INTERVIEW_FIXED_PHRASES = [
+    INTERVIEW_GOODBYE_PENDING_MESSAGE,
+]
+
+TTS_PREWARM_ENABLED = os.getenv("TTS_PREWARM_ENABLED", "true").lower() == "true"
+TTS_PREWARM_FORMATS = [f.strip() for f in os.getenv("TTS_PREWARM_FORMATS", "mp3,ogg_opus").split(",") if f.strip()]
+
 # =============================================================================
 # Interview States for Audio State Machine
 # =============================================================================
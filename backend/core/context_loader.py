@@ -1,42 +1,52 @@
 from agents.agent_3_strategist.graph import get_interview_gap_analysis
+from services.cache_service import cache_service
 import logging
+from typing import Iterable
 
 logger = logging.getLogger("ContextLoader")
 
-def fetch_interview_context(user_id: str, job_id: str):
-    logger.info(f"[Context] Fetching for User: {user_id}, Job: {job_id}")
-    
+
+def _normalize_job_id(job_id) -> str:
+    """Match Agent 3's Pinecone ID handling ("42.0" -> "42")."""
+    try:
+        return str(int(float(job_id)))
+    except (ValueError, TypeError):
+        return str(job_id)
+
+
+def build_interview_context(user_id: str, job_id: str):
+    """Compute the interview context (Pinecone fetch + Gemini gap analysis)."""
     agent3_result = get_interview_gap_analysis(
         job_id=str(job_id),
         user_id=str(user_id)
     )
-    
+
     # Handle empty result (error case)
     if not agent3_result or "error" in agent3_result:
         error_msg = f"Failed to fetch context: {agent3_result.get('error', 'Unknown error')}"
         logger.error(f"[Context] {error_msg}")
         raise ValueError(error_msg)
-    
+
     job_data = agent3_result.get("job", {})
     user_data = agent3_result.get("user", {})
     gap_analysis = agent3_result.get("gap_analysis", {})
     similarity_score = agent3_result.get("similarity_score", 0.0)
-    
+
     # Handle case where gap_analysis might be a list instead of dict
     if isinstance(gap_analysis, list):
         logger.warning(f"[Context] gap_analysis is a list, converting to empty dict")
         gap_analysis = {}
-    
+
     logger.info(f"[Context] Job: {job_data.get('title', 'Unknown')} at {job_data.get('company', 'Unknown')}")
     logger.info(f"[Context] User: {user_data.get('name', 'Unknown')}")
     logger.info(f"[Context] Description length: {len(job_data.get('description', ''))} chars")
-    
+
     # Validate required fields
     if not job_data.get("title") or not user_data.get("name"):
         error_msg = "Missing required job or user information"
         logger.error(f"[Context] {error_msg}")
         raise ValueError(error_msg)
-    
+
     gap_report = {
         "status": "gap_detected" if gap_analysis.get("missing_skills") else "ready",
         "similarity_score": similarity_score,
@@ -52,3 +62,52 @@ def fetch_interview_context(user_id: str, job_id: str):
         "user": user_data,
         "gaps": gap_report
     }
+
+
+def _build_and_cache(user_id: str, job_id: str):
+    # Read versions before computing so a concurrent profile/job update
+    # leaves this entry stale instead of masking the change.
+    versions = cache_service.get_context_versions(user_id, job_id)
+    context = build_interview_context(user_id, job_id)
+
+    # "Unknown" placeholders mean Pinecone had no record yet - don't pin them
+    if context["job"].get("title") != "Unknown" and context["user"].get("name") != "Unknown":
+        cache_service.set_interview_context(user_id, job_id, context, versions)
+    return context
+
+
+def fetch_interview_context(user_id: str, job_id: str):
+    logger.info(f"[Context] Fetching for User: {user_id}, Job: {job_id}")
+
+    user_id = str(user_id)
+    job_id = _normalize_job_id(job_id)
+
+    cached = cache_service.get_interview_context(user_id, job_id)
+    if cached:
+        return cached
+
+    return _build_and_cache(user_id, job_id)
+
+
+def prewarm_interview_contexts(user_id: str, job_ids: Iterable[str]) -> int:
+    """
+    Pre-compute interview contexts for a user's top jobs (nightly cron).
+
+    Skips jobs whose cached context is still current. Failures are logged
+    and never raised so they cannot break the caller's run.
+
+    Returns:
+        Number of contexts computed
+    """
+    warmed = 0
+    user_id = str(user_id)
+    for raw_job_id in job_ids:
+        job_id = _normalize_job_id(raw_job_id)
+        try:
+            if cache_service.get_interview_context(user_id, job_id):
+                continue
+            _build_and_cache(user_id, job_id)
+            warmed += 1
+        except Exception as e:
+            logger.warning(f"[Context] Pre-warm failed for {user_id}/{job_id}: {e}")
+    return warmed
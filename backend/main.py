@@ -93,6 +93,117 @@ app.include_router(agent5_router)   # /api/interview/*
 app.include_router(agent6_router)   # /api/leetcode/*
 
 
+# =============================================================================
+# Startup Hooks
+# =============================================================================
+@app.on_event("startup")
+async def start_job_workers():
+    """Start background job workers (interview evaluation, resume generation, etc.)."""
+    if os.getenv("JOB_WORKERS_IN_API", "true").lower() != "true":
+        logger.info("Job workers disabled in API process (run worker.py)")
+        return
+    from services.job_queue import job_queue
+    from agents.agent_4_operative.apply_queue import auto_apply_queue
+    job_queue.start()
+    auto_apply_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    from services.job_queue import job_queue
+    from agents.agent_4_operative.apply_queue import auto_apply_queue, browser_loop
+    from services.llm_cache import llm_cache
+    job_queue.stop()
+    auto_apply_queue.stop()
+    browser_loop.stop()
+    llm_cache.log_report()
+
+
+@app.on_event("startup")
+async def start_latex_pool():
+    """Start LaTeX compile workers and dump the resume template's preamble format."""
+    import asyncio
+    from agents.agent_4_operative.latex_pool import latex_pool
+    from agents.agent_4_operative.tools import RESUME_TEMPLATE_DIR, RESUME_TEMPLATE_NAME
+    from agents.agent_4_operative.latex_engine import LatexSurgeon
+
+    latex_pool.start()
+
+    async def _warm():
+        try:
+            surgeon = LatexSurgeon(template_dir=RESUME_TEMPLATE_DIR)
+            await asyncio.to_thread(surgeon.prewarm, RESUME_TEMPLATE_NAME)
+        except Exception as e:
+            logger.warning(f"LaTeX format pre-warm failed: {e}")
+
+    asyncio.create_task(_warm())
+
+
+@app.on_event("shutdown")
+async def stop_latex_pool():
+    from agents.agent_4_operative.latex_pool import latex_pool
+    latex_pool.stop()
+
+
+@app.on_event("startup")
+async def start_office_converter():
+    """Optionally launch the headless LibreOffice instance ahead of the first DOCX conversion."""
+    if os.getenv("OFFICE_CONVERTER_PREWARM", "false").lower() != "true":
+        return
+    from agents.agent_4_operative.office_converter import office_converter
+    office_converter.start()
+
+
+@app.on_event("shutdown")
+async def stop_office_converter():
+    from agents.agent_4_operative.office_converter import office_converter
+    office_converter.stop()
+
+
+@app.on_event("shutdown")
+async def close_browser_pool():
+    from agents.agent_4_operative.browser_pool import browser_pool
+    await browser_pool.close()
+
+
+@app.on_event("startup")
+async def prewarm_tts_phrase_bank():
+    """Synthesize fixed interview utterances in the background so first use is instant."""
+    from core.config import TTS_PREWARM_ENABLED, TTS_PREWARM_FORMATS, INTERVIEW_FIXED_PHRASES
+    if not TTS_PREWARM_ENABLED:
+        return
+
+    import asyncio
+    from services.audio_service import prewarm_phrase_bank
+
+    async def _warm():
+        try:
+            await asyncio.to_thread(prewarm_phrase_bank, INTERVIEW_FIXED_PHRASES, TTS_PREWARM_FORMATS)
+        except Exception as e:
+            logger.warning(f"TTS pre-warm failed: {e}")
+
+    asyncio.create_task(_warm())
+
+
+@app.on_event("startup")
+async def prewarm_quiz_bank():
+    """Queue quiz bank refills for popular skills so verification quizzes are served from stock."""
+    if os.getenv("QUIZ_BANK_PREWARM", "true").lower() != "true":
+        return
+
+    import asyncio
+    from agents.agent_1_perception.quiz_bank import quiz_bank
+
+    async def _warm():
+        try:
+            job_ids = await asyncio.to_thread(quiz_bank.prewarm)
+            logger.info(f"Quiz bank pre-warm queued {len(job_ids)} refills")
+        except Exception as e:
+            logger.warning(f"Quiz bank pre-warm failed: {e}")
+
+    asyncio.create_task(_warm())
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API overview"""
@@ -123,6 +234,13 @@ async def health():
     )
 
 
+@app.get("/metrics/llm-cache")
+async def get_llm_cache_metrics():
+    """Cross-agent LLM response cache: per-site hits, misses, latency / cost saved."""
+    from services.llm_cache import llm_cache
+    return llm_cache.report()
+
+
 @app.get("/api/me")
 async def get_me(user=Depends(get_current_user)):
     """Get current authenticated user info"""
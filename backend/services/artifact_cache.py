@@ -0,0 +1,282 @@
+"""
+Content-addressed artifact cache for generated documents (tailored resume PDFs).
+
+A PDF is fully determined by the LaTeX source it was compiled from, so the
+hash of the rendered .tex identifies it. On a hit the caller can skip both
+compilation and upload and reuse the existing storage object and signed URL.
+
+Key Schema:
+- pdf_artifact:{user_id}:{sha256(tex)} -> JSON {storage_path, signed_url, bytes, created_at} (30 day TTL)
+- artifact_cache:stats -> Redis hash of hit/miss/bytes_saved counters (no expiry)
+
+A local disk copy (ARTIFACT_CACHE_DIR) keeps `pdf_path` usable on hits.
+Signed URLs are issued for one year; entries expire long before that.
+All operations fail gracefully - a cache problem never blocks generation.
+
+Growth is bounded: once a generation request has written its applications
+rows, old unreferenced storage objects beyond the newest
+ARTIFACT_MAX_PER_USER are deleted (see prune_tailored_artifacts in agent 4
+tools), and the local directory is evicted by age and total size after
+every write.
+"""
+
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any
+
+from core.redis_client import redis_manager
+
+logger = logging.getLogger("ArtifactCache")
+
+# TTL Constants
+TTL_PDF_ARTIFACT = int(timedelta(days=30).total_seconds())  # 30 days (signed URLs last 1 year)
+
+ARTIFACT_CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "erflog_artifacts")
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # 512 MB
+ARTIFACT_CACHE_MAX_AGE = int(timedelta(days=int(os.getenv("ARTIFACT_CACHE_MAX_AGE_DAYS", "30"))).total_seconds())
+# Storage pruning (after each generation request): the newest N tailored PDFs per user and
+# anything younger than the min age always survive; PDFs linked from applications are never deleted
+ARTIFACT_MAX_PER_USER = int(os.getenv("ARTIFACT_MAX_PER_USER", "5"))
+ARTIFACT_PRUNE_MIN_AGE = int(timedelta(hours=int(os.getenv("ARTIFACT_PRUNE_MIN_AGE_HOURS", "24"))).total_seconds())
+
+
+class ArtifactCache:
+    """Redis-backed index of compiled + uploaded artifacts, keyed by source hash."""
+
+    def __init__(self, cache_dir: str = ARTIFACT_CACHE_DIR, max_bytes: int = ARTIFACT_CACHE_MAX_BYTES,
+                 max_age: int = ARTIFACT_CACHE_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bytes_saved": 0}
+
+    # =========================================================================
+    # Keys
+    # =========================================================================
+
+    @staticmethod
+    def fingerprint(source: str) -> str:
+        """Content hash of the artifact's source (rendered .tex)."""
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _redis_key(user_id: str, fingerprint: str) -> str:
+        """Generate Redis key for an artifact record (scoped to its owner)."""
+        return f"pdf_artifact:{user_id}:{fingerprint}"
+
+    @staticmethod
+    def _stats_key() -> str:
+        return "artifact_cache:stats"
+
+    @staticmethod
+    def storage_path(user_id: str, fingerprint: str) -> str:
+        """Immutable storage object name - never overwritten by a later run."""
+        return f"tailored/{user_id}/{fingerprint[:32]}.pdf"
+
+    def local_path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}.pdf")
+
+    # =========================================================================
+    # Stats
+    # =========================================================================
+
+    def _record(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[field] += amount
+        client = redis_manager.get_client()
+        if not client:
+            return
+        try:
+            client.hincrby(self._stats_key(), field, amount)
+        except Exception as e:
+            logger.warning(f"Artifact stats update failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Hit rate and bytes saved, shared across instances when Redis is up."""
+        stats = dict(self.stats)
+        scope = "process"
+        client = redis_manager.get_client()
+        if client:
+            try:
+                shared = client.hgetall(self._stats_key())
+                if shared:
+                    stats = {k: int(shared.get(k, 0)) for k in ("hits", "misses", "bytes_saved")}
+                    scope = "global"
+            except Exception as e:
+                logger.warning(f"Artifact stats read failed: {e}")
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["scope"] = scope
+        return stats
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def get(self, user_id: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously uploaded artifact.
+
+        Returns:
+            Record with storage_path, signed_url, bytes and (if still on this
+            host) local_path - or None on miss/error
+        """
+        client = redis_manager.get_client()
+        if not client:
+            return None
+
+        key = self._redis_key(user_id, fingerprint)
+        try:
+            data = client.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key[:40]}: {e}")
+            return None
+
+        if not data:
+            logger.info(f"📭 Cache MISS for {key[:40]}")
+            self._record("misses")
+            return None
+
+        record = json.loads(data)
+        local = self.local_path(fingerprint)
+        record["local_path"] = local if os.path.exists(local) else ""
+        if record["local_path"]:
+            try:
+                os.utime(local)  # Recently used files survive size eviction
+            except OSError:
+                pass
+        logger.info(f"🎯 Cache HIT for {key[:40]} ({record.get('bytes', 0)} bytes saved)")
+        self._record("hits")
+        self._record("bytes_saved", int(record.get("bytes", 0)))
+        return record
+
+    def store_bytes(self, fingerprint: str, data: bytes) -> str:
+        """
+        Write an artifact straight into the local cache (atomic rename).
+        Returns its path, or "" if the disk write failed.
+        """
+        path = self.local_path(fingerprint)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self.evict_local(keep=path)
+            return path
+        except Exception as e:
+            logger.warning(f"Artifact disk write failed for {fingerprint[:12]}: {e}")
+            return ""
+
+    def evict_local(self, keep: str = "") -> int:
+        """
+        Bound the local directory: drop files older than max_age, then the
+        least recently used until the total fits in max_bytes.
+        Returns the number of files removed.
+        """
+        try:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+        except OSError as e:
+            logger.warning(f"Artifact cache scan failed: {e}")
+            return 0
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for mtime, size, path in entries:
+            if path == keep or (mtime >= cutoff and total <= self.max_bytes):
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"🧹 Evicted {removed} local artifacts ({total} bytes kept)")
+        return removed
+
+    def set(self, user_id: str, fingerprint: str, storage_path: str, signed_url: str,
+            pdf_path: str = "", size: Optional[int] = None) -> bool:
+        """
+        Record an uploaded artifact. A `pdf_path` outside the cache is copied
+        in; pass `size` when the bytes were already written via store_bytes().
+        """
+        if size is None:
+            size = os.path.getsize(pdf_path) if pdf_path and os.path.exists(pdf_path) else 0
+        local = self.local_path(fingerprint)
+        if pdf_path and os.path.abspath(pdf_path) != os.path.abspath(local):
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                if size:
+                    shutil.copyfile(pdf_path, local)
+                    self.evict_local(keep=local)
+            except Exception as e:
+                logger.warning(f"Artifact disk write failed for {fingerprint[:12]}: {e}")
+
+        client = redis_manager.get_client()
+        if not client:
+            return False
+
+        key = self._redis_key(user_id, fingerprint)
+        try:
+            client.setex(key, TTL_PDF_ARTIFACT, json.dumps({
+                "storage_path": storage_path,
+                "signed_url": signed_url,
+                "bytes": size,
+                "created_at": datetime.now(timezone.utc).isoformat()
+            }))
+            logger.info(f"💾 Cache SET for {key[:40]}")
+            return True
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key[:40]}: {e}")
+            return False
+
+    def invalidate(self, user_id: str, fingerprint: str) -> bool:
+        """Drop a record (e.g. when its storage object was deleted)."""
+        client = redis_manager.get_client()
+        if not client:
+            return False
+        try:
+            client.delete(self._redis_key(user_id, fingerprint))
+            return True
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {fingerprint[:12]}: {e}")
+            return False
+
+    def invalidate_storage_path(self, user_id: str, storage_path: str) -> None:
+        """Drop the record and local copy of a storage object that was deleted."""
+        prefix = os.path.basename(storage_path).rsplit(".", 1)[0]
+        for path in glob.glob(os.path.join(self.cache_dir, f"{prefix}*.pdf")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        client = redis_manager.get_client()
+        if not client:
+            return
+        try:
+            for key in client.scan_iter(match=f"{self._redis_key(user_id, prefix)}*"):
+                client.delete(key)
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {storage_path}: {e}")
+
+
+# Singleton instance for easy imports
+artifact_cache = ArtifactCache()
@@ -0,0 +1,180 @@
+"""
+Content-addressed ATS score cache.
+
+An ATS score is determined by (prompt version, model, resume text), yet every
+upload, on-demand check and /ats-score call sent the same text to Gemini
+again. Results are reused through two tiers:
+
+- In-process LRU (fastest, per worker)
+- Redis (persistent, shared across workers/instances)
+
+Concurrent requests for the same text are single-flighted: the first caller
+runs the LLM and the rest await its result instead of issuing their own call.
+
+Key Schema:
+- ats_score:{sha256(prompt_version|model|normalized text)} -> JSON result (30 day TTL)
+
+Bump the prompt version whenever the ATS prompt or parsing changes; old
+entries then simply stop matching. All operations fail gracefully - a cache
+problem never blocks scoring.
+"""
+
+import os
+import re
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from core.redis_client import redis_manager
+
+logger = logging.getLogger("ATSCache")
+
+# TTL Constants
+TTL_ATS_SCORE = int(timedelta(days=30).total_seconds())  # 30 days (versioned by prompt)
+
+ATS_CACHE_MEMORY_ENTRIES = int(os.getenv("ATS_CACHE_MEMORY_ENTRIES", "512"))
+
+
+def normalize_resume_text(text: str) -> str:
+    """
+    Canonical form of resume text: trailing spaces, tabs/space runs and extra
+    blank lines removed. Line breaks are kept - they carry section structure.
+    """
+    lines = [re.sub(r"[ \t\f\v]+", " ", line).strip() for line in (text or "").splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+class ATSCache:
+    """Memory -> Redis cache with single-flight for ATS results."""
+
+    def __init__(self, max_entries: int = ATS_CACHE_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "coalesced": 0}
+
+    # =========================================================================
+    # Keys
+    # =========================================================================
+
+    @staticmethod
+    def fingerprint(normalized_text: str, prompt_version: str, model: str = "") -> str:
+        """Stable hash of everything that determines the score."""
+        raw = f"{prompt_version}|{model}|{normalized_text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _redis_key(fingerprint: str) -> str:
+        """Generate Redis key for a cached ATS result."""
+        return f"ats_score:{fingerprint}"
+
+    # =========================================================================
+    # Tiers
+    # =========================================================================
+
+    def _memory_get(self, fingerprint: str) -> Optional[dict]:
+        with self._lock:
+            result = self._memory.get(fingerprint)
+            if result is not None:
+                self._memory.move_to_end(fingerprint)
+            return result
+
+    def _memory_set(self, fingerprint: str, result: dict) -> None:
+        with self._lock:
+            self._memory[fingerprint] = result
+            self._memory.move_to_end(fingerprint)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        """Cached result (a copy), promoting Redis hits into memory. None on miss."""
+        result = self._memory_get(fingerprint)
+        if result is not None:
+            self.stats["memory_hits"] += 1
+            return dict(result)
+
+        client = redis_manager.get_client()
+        if client:
+            try:
+                data = client.get(self._redis_key(fingerprint))
+                if data:
+                    result = json.loads(data)
+                    self.stats["redis_hits"] += 1
+                    self._memory_set(fingerprint, result)
+                    return dict(result)
+            except Exception as e:
+                logger.warning(f"ATS cache read failed for {fingerprint[:12]}: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, fingerprint: str, result: dict) -> None:
+        """Store a result in both tiers."""
+        self._memory_set(fingerprint, dict(result))
+        client = redis_manager.get_client()
+        if not client:
+            return
+        try:
+            client.setex(self._redis_key(fingerprint), TTL_ATS_SCORE, json.dumps(result, default=str))
+        except Exception as e:
+            logger.warning(f"ATS cache write failed for {fingerprint[:12]}: {e}")
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    async def get_or_compute(self, fingerprint: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+        """
+        Return the cached result, else run `compute()` once for all concurrent
+        callers with this fingerprint. Exceptions propagate to every waiter
+        and nothing is cached.
+        """
+        cached = self.get(fingerprint)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flight = self._inflight.get(fingerprint)
+            owner = flight is None or flight[0] is not loop
+            if owner:
+                future = loop.create_future()
+                self._inflight[fingerprint] = (loop, future)
+            else:
+                future = flight[1]
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return dict(await asyncio.shield(future))
+
+        try:
+            result = await compute()
+            self.set(fingerprint, result)
+            future.set_result(result)
+            return dict(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(fingerprint, (None, None))[1] is future:
+                    del self._inflight[fingerprint]
+
+    def clear_memory(self) -> None:
+        """Drop the in-process tier (Redis is left intact)."""
+        with self._lock:
+            self._memory.clear()
+
+
+# Singleton instance for easy imports
+ats_cache = ATSCache()
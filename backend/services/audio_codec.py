@@ -0,0 +1,391 @@
+"""
+Audio codec layer for the voice interview WebSocket.
+
+Upstream (client -> server) the socket carries either:
+- "pcm":  raw 16 kHz mono LINEAR16 frames (legacy, ~256 kbps)
+- "opus": one Opus packet per message, prefixed with the client-side RMS
+          level as a big-endian uint16 (~24 kbps). Packets are muxed into an
+          Ogg Opus stream for Speech-to-Text, so nothing is decoded here.
+
+Downstream (server -> client) TTS audio is "mp3" (default), "ogg_opus" or
+"linear16" (WAV). Durations are read from the container itself - MP3 frame
+headers, Ogg granule positions, WAV headers - so the listen-resume time is
+exact instead of a bytes-per-second guess.
+
+Codecs are negotiated from the client's init message; anything unknown
+falls back to the legacy PCM/MP3 pair.
+"""
+
+import io
+import math
+import struct
+import wave
+from typing import Iterable, List, Optional
+
+# Codec identifiers
+INPUT_PCM = "pcm"
+INPUT_OPUS = "opus"
+OUTPUT_MP3 = "mp3"
+OUTPUT_OGG_OPUS = "ogg_opus"
+OUTPUT_LINEAR16 = "linear16"
+
+SUPPORTED_INPUT_CODECS = (INPUT_OPUS, INPUT_PCM)
+SUPPORTED_OUTPUT_FORMATS = (OUTPUT_OGG_OPUS, OUTPUT_MP3, OUTPUT_LINEAR16)
+
+OUTPUT_MIME_TYPES = {
+    OUTPUT_MP3: "audio/mpeg",
+    OUTPUT_OGG_OPUS: "audio/ogg; codecs=opus",
+    OUTPUT_LINEAR16: "audio/wav",
+}
+
+PCM_SAMPLE_RATE = 16000
+PCM_SAMPLE_WIDTH = 2
+
+# Opus always runs its granule clock at 48 kHz
+OPUS_GRANULE_RATE = 48000
+OPUS_DEFAULT_PRE_SKIP = 312
+OPUS_LEVEL_HEADER = struct.Struct(">H")
+
+
+# =============================================================================
+# Negotiation
+# =============================================================================
+
+def negotiate(offered: Optional[Iterable[str]], supported: Iterable[str], default: str) -> str:
+    """Pick the first client-offered codec the server supports."""
+    supported = set(supported)
+    for codec in offered or []:
+        codec = str(codec).lower()
+        if codec in supported:
+            return codec
+    return default
+
+
+def negotiate_input_codec(offered: Optional[Iterable[str]]) -> str:
+    return negotiate(offered, SUPPORTED_INPUT_CODECS, INPUT_PCM)
+
+
+def negotiate_output_format(offered: Optional[Iterable[str]]) -> str:
+    return negotiate(offered, SUPPORTED_OUTPUT_FORMATS, OUTPUT_MP3)
+
+
+# =============================================================================
+# Levels
+# =============================================================================
+
+def pcm_rms(audio_chunk: bytes) -> float:
+    """Root Mean Square (volume) of a LINEAR16 chunk."""
+    count = len(audio_chunk) // PCM_SAMPLE_WIDTH
+    if count == 0:
+        return 0
+    try:
+        shorts = struct.unpack(f"<{count}h", audio_chunk[:count * PCM_SAMPLE_WIDTH])
+        return math.sqrt(sum(s * s for s in shorts) / count)
+    except struct.error:
+        return 0
+
+
+# =============================================================================
+# MP3
+# =============================================================================
+
+# Bitrates in kbps, indexed by [version_group][layer][bitrate_index]
+_MP3_BITRATES = {
+    ("1", 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    ("1", 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    ("1", 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    ("2", 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    ("2", 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    ("2", 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+
+def _parse_mp3_header(header: bytes):
+    """Return (frame_length, samples, sample_rate) for a valid frame header, else None."""
+    b0, b1, b2, _ = header
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+    if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    group = "1" if version == 3 else "2"
+    bitrate = _MP3_BITRATES[(group, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or version == 3:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+    return length, samples, sample_rate
+
+
+def _skip_id3v2(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def mp3_duration(data: bytes) -> float:
+    """
+    Exact playback duration of an MP3 stream by walking its frame headers.
+
+    A leading Xing/Info (VBR header) frame carries no audio and is skipped.
+    """
+    pos = _skip_id3v2(data)
+    end = len(data)
+    if end - 128 >= pos and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    total = 0.0
+    first = True
+    while pos + 4 <= end:
+        parsed = _parse_mp3_header(data[pos:pos + 4])
+        if not parsed or parsed[0] <= 4:
+            pos += 1  # resync
+            continue
+        length, samples, sample_rate = parsed
+        frame = data[pos:pos + length]
+        if first and (b"Xing" in frame[:64] or b"Info" in frame[:64]):
+            first = False
+            pos += length
+            continue
+        first = False
+        if pos + length > end:
+            break  # truncated trailing frame is not played
+        total += samples / sample_rate
+        pos += length
+    return total
+
+
+# =============================================================================
+# Opus / Ogg
+# =============================================================================
+
+def _build_crc_table() -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else (crc << 1)
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_OGG_CRC_TABLE = _build_crc_table()
+
+
+def _ogg_crc(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _OGG_CRC_TABLE[((crc >> 24) & 0xFF) ^ byte]
+    return crc
+
+
+def opus_packet_samples(packet: bytes) -> int:
+    """Number of 48 kHz samples in an Opus packet, from its TOC byte (RFC 6716 3.1)."""
+    if not packet:
+        return 0
+    toc = packet[0]
+    config = toc >> 3
+    if config < 12:
+        frame_ms = (10, 20, 40, 60)[config % 4]
+    elif config < 16:
+        frame_ms = (10, 20)[config % 2]
+    else:
+        frame_ms = (2.5, 5, 10, 20)[config % 4]
+
+    code = toc & 0x03
+    if code == 0:
+        frames = 1
+    elif code in (1, 2):
+        frames = 2
+    else:
+        frames = packet[1] & 0x3F if len(packet) > 1 else 0
+    return int(frame_ms * 48 * frames)
+
+
+class OggOpusWriter:
+    """Mux raw Opus packets into an Ogg Opus stream (RFC 7845)."""
+
+    def __init__(self, sample_rate: int = PCM_SAMPLE_RATE, channels: int = 1,
+                 pre_skip: int = OPUS_DEFAULT_PRE_SKIP, serial: int = 0x45524621):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.pre_skip = pre_skip
+        self.serial = serial
+
+    def _page(self, payload: bytes, granule: int, sequence: int, header_type: int) -> bytes:
+        segments = [255] * (len(payload) // 255) + [len(payload) % 255]
+        header = struct.pack(
+            "<4sBBqIIIB", b"OggS", 0, header_type, granule,
+            self.serial, sequence, 0, len(segments)
+        ) + bytes(segments)
+        page = bytearray(header + payload)
+        struct.pack_into("<I", page, 22, _ogg_crc(bytes(page)))
+        return bytes(page)
+
+    def write(self, packets: Iterable[bytes]) -> bytes:
+        """Return a complete Ogg Opus file containing `packets` (one page each)."""
+        head = struct.pack(
+            "<8sBBHIhB", b"OpusHead", 1, self.channels, self.pre_skip,
+            self.sample_rate, 0, 0
+        )
+        vendor = b"erflog"
+        tags = b"OpusTags" + struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", 0)
+
+        out = [self._page(head, 0, 0, 0x02), self._page(tags, 0, 1, 0)]
+        packets = [p for p in packets if p]
+        granule = 0
+        for i, packet in enumerate(packets):
+            granule += opus_packet_samples(packet)
+            header_type = 0x04 if i == len(packets) - 1 else 0
+            out.append(self._page(packet, granule, i + 2, header_type))
+        return b"".join(out)
+
+
+def ogg_opus_duration(data: bytes) -> float:
+    """Exact playback duration of an Ogg Opus stream: (last granule - pre-skip) / 48 kHz."""
+    pos = 0
+    pre_skip = 0
+    last_granule = 0
+    while pos + 27 <= len(data):
+        if data[pos:pos + 4] != b"OggS":
+            nxt = data.find(b"OggS", pos + 1)
+            if nxt < 0:
+                break
+            pos = nxt
+            continue
+        granule = struct.unpack_from("<q", data, pos + 6)[0]
+        n_segments = data[pos + 26]
+        body_start = pos + 27 + n_segments
+        body_len = sum(data[pos + 27:body_start])
+        body = data[body_start:body_start + body_len]
+        if body.startswith(b"OpusHead") and len(body) >= 12:
+            pre_skip = struct.unpack_from("<H", body, 10)[0]
+        elif granule >= 0:
+            last_granule = max(last_granule, granule)
+        pos = body_start + body_len
+    return max(0, last_granule - pre_skip) / OPUS_GRANULE_RATE
+
+
+# =============================================================================
+# WAV / PCM
+# =============================================================================
+
+def pcm_duration(data: bytes, sample_rate: int = PCM_SAMPLE_RATE, sample_width: int = PCM_SAMPLE_WIDTH) -> float:
+    return len(data) / float(sample_rate * sample_width)
+
+
+def wav_duration(data: bytes) -> float:
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    except (wave.Error, EOFError):
+        return pcm_duration(data)
+
+
+def audio_duration(data: bytes, audio_format: str) -> float:
+    """Playback duration in seconds of downstream audio in the given format."""
+    if not data:
+        return 0.0
+    if audio_format == OUTPUT_MP3:
+        return mp3_duration(data)
+    if audio_format == OUTPUT_OGG_OPUS:
+        return ogg_opus_duration(data)
+    if audio_format == OUTPUT_LINEAR16:
+        return wav_duration(data)
+    return pcm_duration(data)
+
+
+# =============================================================================
+# Upstream buffers
+# =============================================================================
+
+class PcmUpstream:
+    """Accumulates raw LINEAR16 frames for one utterance."""
+
+    codec = INPUT_PCM
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, message: bytes) -> float:
+        """Append one WebSocket message; returns its RMS level."""
+        self._buffer.extend(message)
+        return pcm_rms(message)
+
+    def payload(self) -> bytes:
+        """Audio in the form Speech-to-Text expects for this codec."""
+        return bytes(self._buffer)
+
+    @property
+    def duration(self) -> float:
+        return pcm_duration(self._buffer)
+
+    def clear(self) -> None:
+        self._buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+
+class OpusUpstream:
+    """Accumulates level-prefixed Opus packets for one utterance."""
+
+    codec = INPUT_OPUS
+
+    def __init__(self, sample_rate: int = PCM_SAMPLE_RATE):
+        self._writer = OggOpusWriter(sample_rate=sample_rate)
+        self._packets: List[bytes] = []
+        self._samples = 0
+        self._size = 0
+
+    def feed(self, message: bytes) -> float:
+        if len(message) <= OPUS_LEVEL_HEADER.size:
+            return 0
+        (level,) = OPUS_LEVEL_HEADER.unpack_from(message)
+        packet = bytes(message[OPUS_LEVEL_HEADER.size:])
+        self._packets.append(packet)
+        self._samples += opus_packet_samples(packet)
+        self._size += len(packet)
+        return float(level)
+
+    def payload(self) -> bytes:
+        return self._writer.write(self._packets) if self._packets else b""
+
+    @property
+    def duration(self) -> float:
+        return self._samples / OPUS_GRANULE_RATE
+
+    def clear(self) -> None:
+        self._packets = []
+        self._samples = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def create_upstream(codec: str):
+    """Build the per-utterance buffer for a negotiated input codec."""
+    return OpusUpstream() if codec == INPUT_OPUS else PcmUpstream()
@@ -1,6 +1,9 @@
 import os
 from google.cloud import speech, texttospeech
 
+from services.tts_cache import tts_cache
+from services.audio_codec import INPUT_OPUS, OUTPUT_MP3, OUTPUT_OGG_OPUS, OUTPUT_LINEAR16, PCM_SAMPLE_RATE
+
 # Set credentials path - Docker sets this via ENV, fallback for local dev
 if not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "credential.json"
@@ -8,13 +11,27 @@ if not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
 speech_client = speech.SpeechClient()
 tts_client = texttospeech.TextToSpeechClient()
 
-def transcribe_audio_bytes(audio_content: bytes) -> str:
+TTS_VOICE_NAME = "en-US-Journey-D"
+TTS_SPEAKING_RATE = 1.1
+
+TTS_ENCODINGS = {
+    OUTPUT_MP3: texttospeech.AudioEncoding.MP3,
+    OUTPUT_OGG_OPUS: texttospeech.AudioEncoding.OGG_OPUS,
+    OUTPUT_LINEAR16: texttospeech.AudioEncoding.LINEAR16,
+}
+
+def transcribe_audio_bytes(audio_content: bytes, codec: str = "pcm") -> str:
     if not audio_content: return ""
     
+    # Opus uploads arrive already muxed into Ogg by services.audio_codec
+    encoding = (
+        speech.RecognitionConfig.AudioEncoding.OGG_OPUS if codec == INPUT_OPUS
+        else speech.RecognitionConfig.AudioEncoding.LINEAR16
+    )
     audio = speech.RecognitionAudio(content=audio_content)
     config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16, 
-        sample_rate_hertz=16000, 
+        encoding=encoding, 
+        sample_rate_hertz=PCM_SAMPLE_RATE, 
         language_code="en-US",
         enable_automatic_punctuation=True,
         model="latest_short"
@@ -27,16 +44,16 @@ def transcribe_audio_bytes(audio_content: bytes) -> str:
         print(f"STT Error: {e}")
         return ""
 
-def synthesize_audio_bytes(text: str) -> bytes:
+def _synthesize_uncached(text: str, audio_format: str = OUTPUT_MP3) -> bytes:
     synthesis_input = texttospeech.SynthesisInput(text=text)
     voice = texttospeech.VoiceSelectionParams(
         language_code="en-US",
-        name="en-US-Journey-D", 
+        name=TTS_VOICE_NAME, 
         ssml_gender=texttospeech.SsmlVoiceGender.MALE
     )
     audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3,
-        speaking_rate=1.1
+        audio_encoding=TTS_ENCODINGS.get(audio_format, texttospeech.AudioEncoding.MP3),
+        speaking_rate=TTS_SPEAKING_RATE
     )
     
     try:
@@ -47,3 +64,24 @@ def synthesize_audio_bytes(text: str) -> bytes:
     except Exception as e:
         print(f"TTS Error: {e}")
         return b""
+
+def synthesize_audio_bytes(text: str, audio_format: str = OUTPUT_MP3) -> bytes:
+    """Synthesize speech, serving repeated utterances from the TTS cache."""
+    if not text or not text.strip():
+        return b""
+    return tts_cache.get_or_synthesize(
+        TTS_VOICE_NAME, TTS_SPEAKING_RATE, text,
+        lambda t: _synthesize_uncached(t, audio_format),
+        audio_format=audio_format
+    )
+
+def prewarm_phrase_bank(phrases, audio_formats=(OUTPUT_MP3,)) -> int:
+    """Synthesize any fixed phrases not already cached. Returns TTS calls made."""
+    return sum(
+        tts_cache.prewarm(
+            TTS_VOICE_NAME, TTS_SPEAKING_RATE, phrases,
+            lambda t, fmt=fmt: _synthesize_uncached(t, fmt),
+            audio_format=fmt
+        )
+        for fmt in audio_formats
+    )
@@ -14,9 +14,14 @@ Key Schema:
 - saved_job:{user_id}:{job_id} -> JSON string (no expiry)
 - github_activity_cache:{user_id} -> JSON string (1h TTL)
 - profile:{user_id} -> JSON string (5min TTL)
+- interview_context:{user_id}:{job_id} -> JSON string (48h TTL, tagged with versions)
+- profile_version:{user_id} / job_version:{job_id} -> integer counters (no expiry)
+- resume_structure:{user_id}:{resume_hash}:{jd_hash} -> JSON string (7d TTL, tagged with profile version)
 """
 
+import re
 import json
+import hashlib
 import logging
 from typing import Optional, Any, List, Dict
 from datetime import timedelta
@@ -30,6 +35,8 @@ TTL_TODAY_DATA = int(timedelta(hours=24).total_seconds())  # 24 hours
 TTL_GITHUB_ACTIVITY = int(timedelta(hours=1).total_seconds())  # 1 hour (synced frequently)
 TTL_PROFILE = int(timedelta(minutes=5).total_seconds())  # 5 minutes (can change often)
 TTL_GLOBAL_ROADMAPS = int(timedelta(hours=1).total_seconds())  # 1 hour (shared data)
+TTL_INTERVIEW_CONTEXT = int(timedelta(hours=48).total_seconds())  # 48 hours (re-warmed nightly)
+TTL_RESUME_STRUCTURE = int(timedelta(days=7).total_seconds())  # 7 days (LLM output, versioned)
 TTL_LEETCODE = None  # No expiry - user progress is critical
 TTL_SAVED_JOBS = None  # No expiry - user data
 
@@ -596,6 +603,247 @@ class CacheService:
             logger.warning(f"Cache invalidate failed for global_roadmaps: {e}")
             return False
     
+    # =========================================================================
+    # INTERVIEW_CONTEXT Operations (versioned by profile + job)
+    # =========================================================================
+    
+    @staticmethod
+    def _interview_context_key(user_id: str, job_id: str) -> str:
+        """Generate Redis key for a pre-computed interview context."""
+        return f"interview_context:{user_id}:{job_id}"
+    
+    @staticmethod
+    def _profile_version_key(user_id: str) -> str:
+        """Generate Redis key for the user's profile version counter."""
+        return f"profile_version:{user_id}"
+    
+    @staticmethod
+    def _job_version_key(job_id: str) -> str:
+        """Generate Redis key for a job's version counter."""
+        return f"job_version:{job_id}"
+    
+    @classmethod
+    def get_context_versions(cls, user_id: str, job_id: str) -> Dict[str, int]:
+        """
+        Get the current profile and job versions for an interview context.
+        
+        Versions start at 0 and are bumped whenever the user's or job's
+        Pinecone record changes. Returns zeros when Redis is unavailable.
+        """
+        versions = {"profile": 0, "job": 0}
+        client = redis_manager.get_client()
+        if not client:
+            return versions
+        
+        try:
+            profile_v, job_v = client.mget(
+                cls._profile_version_key(user_id),
+                cls._job_version_key(job_id)
+            )
+            versions["profile"] = int(profile_v or 0)
+            versions["job"] = int(job_v or 0)
+        except Exception as e:
+            logger.warning(f"Version read failed for interview_context:{user_id}:{job_id}: {e}")
+        return versions
+    
+    @classmethod
+    def get_interview_context(cls, user_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a pre-computed interview context if it is still current.
+        
+        The entry and both version counters are read in one MGET round trip;
+        an entry built against an older profile or job version is a miss.
+        
+        Returns:
+            Context dict ({job, user, gaps}), or None on miss/stale/error
+        """
+        client = redis_manager.get_client()
+        if not client:
+            return None
+        
+        key = cls._interview_context_key(user_id, job_id)
+        try:
+            data, profile_v, job_v = client.mget(
+                key,
+                cls._profile_version_key(user_id),
+                cls._job_version_key(job_id)
+            )
+            if not data:
+                logger.info(f"📭 Cache MISS for {key}")
+                return None
+            
+            entry = json.loads(data)
+            versions = entry.get("versions", {})
+            if versions.get("profile") != int(profile_v or 0) or versions.get("job") != int(job_v or 0):
+                logger.info(f"♻️ Cache STALE for {key} (versions {versions})")
+                return None
+            
+            logger.info(f"🎯 Cache HIT for {key}")
+            return entry.get("context")
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+    
+    @classmethod
+    def set_interview_context(
+        cls,
+        user_id: str,
+        job_id: str,
+        context: Dict[str, Any],
+        versions: Dict[str, int]
+    ) -> bool:
+        """
+        Set a pre-computed interview context with 48h TTL.
+        
+        Args:
+            user_id: User's UUID
+            job_id: Job ID (Pinecone ID in the default namespace)
+            context: Context dict ({job, user, gaps})
+            versions: Versions read *before* the context was computed, so a
+                profile/job update that races the computation leaves it stale
+        """
+        client = redis_manager.get_client()
+        if not client:
+            return False
+        
+        key = cls._interview_context_key(user_id, job_id)
+        try:
+            client.setex(
+                key,
+                TTL_INTERVIEW_CONTEXT,
+                json.dumps({"context": context, "versions": versions}, default=str)
+            )
+            logger.info(f"💾 Cache SET for {key}")
+            return True
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+            return False
+    
+    @classmethod
+    def bump_profile_version(cls, user_id: str) -> bool:
+        """Invalidate all interview contexts and resume structures for a user (call after profile changes)."""
+        client = redis_manager.get_client()
+        if not client:
+            return False
+        
+        try:
+            client.incr(cls._profile_version_key(user_id))
+            logger.info(f"🗑️ Cache INVALIDATE for interview_context/resume_structure:{user_id}:*")
+            return True
+        except Exception as e:
+            logger.warning(f"Version bump failed for profile:{user_id}: {e}")
+            return False
+    
+    @classmethod
+    def bump_job_versions(cls, job_ids: List[str]) -> bool:
+        """Invalidate interview contexts for updated jobs (call after job vectors change)."""
+        if not job_ids:
+            return True
+        client = redis_manager.get_client()
+        if not client:
+            return False
+        
+        try:
+            pipe = client.pipeline()
+            for job_id in job_ids:
+                pipe.incr(cls._job_version_key(str(job_id)))
+            pipe.execute()
+            logger.info(f"🗑️ Cache INVALIDATE for interview_context of {len(job_ids)} jobs")
+            return True
+        except Exception as e:
+            logger.warning(f"Version bump failed for {len(job_ids)} jobs: {e}")
+            return False
+    
+    # =========================================================================
+    # RESUME_STRUCTURE Operations (LLM structuring memo, versioned by profile)
+    # =========================================================================
+    
+    @staticmethod
+    def content_fingerprint(text: str) -> str:
+        """Whitespace-insensitive hash of text sent to the LLM."""
+        normalized = re.sub(r"\s+", " ", text or "").strip()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+    
+    @staticmethod
+    def _resume_structure_key(user_id: str, resume_hash: str, jd_hash: str) -> str:
+        """Generate Redis key for a structured resume."""
+        return f"resume_structure:{user_id}:{resume_hash}:{jd_hash}"
+    
+    @classmethod
+    def get_profile_version(cls, user_id: str) -> int:
+        """Current profile version (0 when unset or Redis is unavailable)."""
+        client = redis_manager.get_client()
+        if not client:
+            return 0
+        try:
+            return int(client.get(cls._profile_version_key(user_id)) or 0)
+        except Exception as e:
+            logger.warning(f"Version read failed for profile:{user_id}: {e}")
+            return 0
+    
+    @classmethod
+    def get_resume_structure(cls, user_id: str, resume_hash: str, jd_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a memoized resume structuring result if the profile hasn't changed.
+        
+        Returns:
+            Structured resume dict (as returned by the LLM), or None on miss/stale/error
+        """
+        client = redis_manager.get_client()
+        if not client:
+            return None
+        
+        key = cls._resume_structure_key(user_id, resume_hash, jd_hash)
+        try:
+            data, profile_v = client.mget(key, cls._profile_version_key(user_id))
+            if not data:
+                logger.info(f"📭 Cache MISS for {key[:60]}")
+                return None
+            
+            entry = json.loads(data)
+            if entry.get("profile_version") != int(profile_v or 0):
+                logger.info(f"♻️ Cache STALE for {key[:60]} (profile v{entry.get('profile_version')})")
+                return None
+            
+            logger.info(f"🎯 Cache HIT for {key[:60]}")
+            return entry.get("data")
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key[:60]}: {e}")
+        return None
+    
+    @classmethod
+    def set_resume_structure(
+        cls,
+        user_id: str,
+        resume_hash: str,
+        jd_hash: str,
+        data: Dict[str, Any],
+        profile_version: int
+    ) -> bool:
+        """
+        Memoize a resume structuring result with 7d TTL.
+        
+        Args:
+            profile_version: Version read *before* the LLM call, so a profile
+                update that races the call leaves the entry stale
+        """
+        client = redis_manager.get_client()
+        if not client:
+            return False
+        
+        key = cls._resume_structure_key(user_id, resume_hash, jd_hash)
+        try:
+            client.setex(
+                key,
+                TTL_RESUME_STRUCTURE,
+                json.dumps({"data": data, "profile_version": profile_version}, default=str)
+            )
+            logger.info(f"💾 Cache SET for {key[:60]}")
+            return True
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key[:60]}: {e}")
+            return False
+    
     # =========================================================================
     # Utility Methods
     # =========================================================================
@@ -625,14 +873,14 @@ class CacheService:
                 cls._profile_key(user_id)
             ]
             
-            # Add individual saved job keys
-            pattern = f"saved_job:{user_id}:*"
-            cursor = 0
-            while True:
-                cursor, keys = client.scan(cursor, match=pattern, count=100)
-                keys_to_delete.extend(keys)
-                if cursor == 0:
-                    break
+            # Add individual saved job keys, interview contexts and resume structures
+            for pattern in (f"saved_job:{user_id}:*", f"interview_context:{user_id}:*", f"resume_structure:{user_id}:*"):
+                cursor = 0
+                while True:
+                    cursor, keys = client.scan(cursor, match=pattern, count=100)
+                    keys_to_delete.extend(keys)
+                    if cursor == 0:
+                        break
             
             if keys_to_delete:
                 client.delete(*keys_to_delete)
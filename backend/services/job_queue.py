@@ -0,0 +1,518 @@
+"""
+Background Job Queue for long-running agent work.
+
+Moves slow, failure-prone work (LLM evaluation, DB persistence, document
+compilation) off the request path. Clients get a job id immediately and poll
+(or are pushed) the result later.
+
+Features:
+- Pluggable backends: Redis (durable, shared across instances) or local (in-process)
+- Retries with exponential backoff and a per-job retry budget
+- Deferral: a handler raising `JobDeferred` is re-queued after a delay
+  without spending a retry (rate limits, busy downstreams)
+- Per-job progress events, stage timings and a checkpoint dict that survives retries
+- Worker threads run sync or async handlers
+- Each worker process owns its in-flight list and holds a heartbeat lease;
+  only jobs of workers whose lease expired are requeued
+
+Key Schema (Redis backend):
+- job_queue:{queue}:pending -> LIST of job ids
+- job_queue:{queue}:processing:{worker_id} -> LIST of job ids this worker is running
+- job_queue:{queue}:worker:{worker_id} -> heartbeat lease (JOB_LEASE_SECONDS TTL)
+- job_queue:{queue}:delayed -> ZSET of job ids scored by ready time
+- job:{job_id} -> JSON job record (7 day TTL)
+"""
+
+import os
+import json
+import time
+import uuid
+import heapq
+import asyncio
+import inspect
+import logging
+import threading
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from core.redis_client import redis_manager
+
+logger = logging.getLogger("JobQueue")
+
+# TTL Constants
+TTL_JOB_RECORD = int(timedelta(days=7).total_seconds())  # 7 days (poll window)
+
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "2"))
+JOB_DEFAULT_MAX_RETRIES = int(os.getenv("JOB_MAX_RETRIES", "3"))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "2.0"))
+# A worker whose heartbeat is older than this is considered dead and its jobs are requeued
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+TERMINAL_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED}
+
+
+class JobDeferred(Exception):
+    """
+    Raised by a handler that cannot run yet (e.g. a rate limit).
+
+    The job goes back to the queue after `delay` seconds and the attempt is
+    not counted against its retry budget.
+    """
+
+    def __init__(self, delay: float, reason: str = "deferred"):
+        super().__init__(reason)
+        self.delay = max(0.0, delay)
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+class LocalQueueBackend:
+    """In-process backend. Not durable across restarts; used for dev and tests."""
+
+    def __init__(self):
+        self._records: Dict[str, dict] = {}
+        self._pending: List[str] = []
+        self._delayed: List[tuple] = []  # heap of (ready_at, job_id)
+        self._cond = threading.Condition()
+
+    def save(self, record: dict) -> None:
+        with self._cond:
+            self._records[record["id"]] = json.loads(json.dumps(record, default=str))
+
+    def load(self, job_id: str) -> Optional[dict]:
+        with self._cond:
+            record = self._records.get(job_id)
+            return json.loads(json.dumps(record)) if record else None
+
+    def push(self, job_id: str) -> None:
+        with self._cond:
+            self._pending.append(job_id)
+            self._cond.notify()
+
+    def push_delayed(self, job_id: str, ready_at: float) -> None:
+        with self._cond:
+            heapq.heappush(self._delayed, (ready_at, job_id))
+            self._cond.notify()
+
+    def pop(self, timeout: float) -> Optional[str]:
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._pending.append(heapq.heappop(self._delayed)[1])
+                if self._pending:
+                    return self._pending.pop(0)
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                if self._delayed:
+                    remaining = min(remaining, max(0.0, self._delayed[0][0] - now))
+                self._cond.wait(remaining)
+
+    def ack(self, job_id: str) -> None:
+        pass
+
+    def heartbeat(self) -> None:
+        pass
+
+    def recover(self) -> int:
+        return 0
+
+
+class RedisQueueBackend:
+    """
+    Durable backend shared by every API/worker replica.
+
+    Popped jobs move to a processing list owned by this worker, and the
+    worker keeps a heartbeat key alive while it runs. recover() only
+    requeues lists whose owner's heartbeat has expired, so starting or
+    scaling replicas never steals jobs that live workers are still running.
+    """
+
+    def __init__(self, queue_name: str, worker_id: Optional[str] = None, lease: int = JOB_LEASE_SECONDS):
+        self.queue_name = queue_name
+        self.worker_id = worker_id or uuid.uuid4().hex[:12]
+        self.lease = lease
+
+    @property
+    def _pending_key(self) -> str:
+        return f"job_queue:{self.queue_name}:pending"
+
+    def _processing_key_for(self, worker_id: str) -> str:
+        return f"job_queue:{self.queue_name}:processing:{worker_id}"
+
+    def _heartbeat_key_for(self, worker_id: str) -> str:
+        return f"job_queue:{self.queue_name}:worker:{worker_id}"
+
+    @property
+    def _processing_key(self) -> str:
+        return self._processing_key_for(self.worker_id)
+
+    @property
+    def _delayed_key(self) -> str:
+        return f"job_queue:{self.queue_name}:delayed"
+
+    @staticmethod
+    def _record_key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def _client(self):
+        client = redis_manager.get_client()
+        if not client:
+            raise RuntimeError("Redis unavailable for job queue")
+        return client
+
+    def save(self, record: dict) -> None:
+        self._client().setex(
+            self._record_key(record["id"]),
+            TTL_JOB_RECORD,
+            json.dumps(record, default=str)
+        )
+
+    def load(self, job_id: str) -> Optional[dict]:
+        data = self._client().get(self._record_key(job_id))
+        return json.loads(data) if data else None
+
+    def push(self, job_id: str) -> None:
+        self._client().lpush(self._pending_key, job_id)
+
+    def push_delayed(self, job_id: str, ready_at: float) -> None:
+        self._client().zadd(self._delayed_key, {job_id: ready_at})
+
+    def _promote_due(self, client) -> None:
+        due = client.zrangebyscore(self._delayed_key, 0, time.time())
+        for job_id in due:
+            # ZREM returns 1 only for the replica that wins the promotion
+            if client.zrem(self._delayed_key, job_id):
+                client.lpush(self._pending_key, job_id)
+
+    def pop(self, timeout: float) -> Optional[str]:
+        client = self._client()
+        # Hold the lease before anything lands in our processing list
+        self.heartbeat()
+        self._promote_due(client)
+        return client.brpoplpush(self._pending_key, self._processing_key, timeout=max(1, int(timeout)))
+
+    def ack(self, job_id: str) -> None:
+        self._client().lrem(self._processing_key, 1, job_id)
+
+    def heartbeat(self) -> None:
+        """Renew this worker's lease."""
+        self._client().set(self._heartbeat_key_for(self.worker_id), time.time(), ex=self.lease)
+
+    def recover(self) -> int:
+        """Requeue jobs held by workers whose lease has expired (crashed / killed)."""
+        client = self._client()
+        prefix = self._processing_key_for("")
+        recovered = 0
+        for key in client.scan_iter(match=f"{prefix}*"):
+            worker_id = key[len(prefix):]
+            if worker_id == self.worker_id or client.exists(self._heartbeat_key_for(worker_id)):
+                continue
+            # RPOPLPUSH is atomic, so replicas recovering the same list never double-queue a job
+            while client.rpoplpush(key, self._pending_key):
+                recovered += 1
+        if recovered:
+            logger.warning(f"♻️ Recovered {recovered} in-flight jobs for queue '{self.queue_name}'")
+        return recovered
+
+
+# =============================================================================
+# Job Context (passed to handlers)
+# =============================================================================
+
+class JobContext:
+    """
+    Handle given to a job handler.
+
+    - `checkpoint` persists across retries, so handlers can skip steps that
+      already succeeded (e.g. don't re-run the LLM when only the DB write failed).
+    - `progress(stage, **info)` records a timestamped progress event.
+    - `stage(name)` also times each stage into the job's `timings` dict.
+    """
+
+    def __init__(self, queue: "JobQueue", record: dict):
+        self._queue = queue
+        self._record = record
+
+    @property
+    def job_id(self) -> str:
+        return self._record["id"]
+
+    @property
+    def attempt(self) -> int:
+        return self._record["attempts"]
+
+    @property
+    def final_attempt(self) -> bool:
+        """True when a failure now would not be retried."""
+        return self._record["attempts"] > self._record["max_retries"]
+
+    @property
+    def checkpoint(self) -> dict:
+        return self._record.setdefault("checkpoint", {})
+
+    def save_checkpoint(self, **values) -> None:
+        self.checkpoint.update(values)
+        self._queue._save(self._record)
+
+    def progress(self, stage: str, **info) -> None:
+        event = {"stage": stage, "at": time.time(), **info}
+        self._record.setdefault("progress", []).append(event)
+        self._queue._save(self._record)
+
+    def stage(self, name: str, **info) -> None:
+        """
+        Enter a named stage: records a progress event and closes the previous
+        stage, storing its duration (seconds) in the job's `timings`.
+        """
+        self._close_stage(time.time())
+        self._record["current_stage"] = {"name": name, "started_at": time.time()}
+        self.progress(name, **info)
+
+    def _close_stage(self, now: float) -> None:
+        current = self._record.pop("current_stage", None)
+        if current:
+            timings = self._record.setdefault("timings", {})
+            timings[current["name"]] = round(timings.get(current["name"], 0.0) + now - current["started_at"], 3)
+
+
+# =============================================================================
+# Queue
+# =============================================================================
+
+class JobQueue:
+    """
+    Named job queue with registered handlers and worker threads.
+
+    Handlers are `handler(payload: dict, ctx: JobContext) -> dict` and may be
+    sync or async. Raising an exception triggers a retry until `max_retries`;
+    raising `JobDeferred` re-queues the job without using up a retry.
+    """
+
+    def __init__(self, name: str = "default", backend=None, workers: int = JOB_QUEUE_WORKERS):
+        self.name = name
+        self._backend = backend
+        self.num_workers = workers
+        self._handlers: Dict[str, Callable] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self.lease = JOB_LEASE_SECONDS
+
+    @property
+    def backend(self):
+        """Resolve lazily so REDIS_URL is read after load_dotenv()."""
+        if self._backend is None:
+            if redis_manager.get_client():
+                self._backend = RedisQueueBackend(self.name)
+                logger.info(f"✅ Job queue '{self.name}' using Redis backend")
+            else:
+                self._backend = LocalQueueBackend()
+                logger.info(f"⚠️ Job queue '{self.name}' using local in-process backend")
+        return self._backend
+
+    def register(self, job_type: str, handler: Callable) -> None:
+        """Register the handler for a job type."""
+        self._handlers[job_type] = handler
+
+    def _save(self, record: dict) -> None:
+        record["updated_at"] = time.time()
+        self.backend.save(record)
+
+    # -------------------------------------------------------------------------
+    # Producer API
+    # -------------------------------------------------------------------------
+
+    def submit(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        max_retries: int = JOB_DEFAULT_MAX_RETRIES,
+        job_id: Optional[str] = None,
+        metadata: Optional[dict] = None
+    ) -> str:
+        """
+        Enqueue a job.
+
+        Returns:
+            The job id clients use to poll status
+        """
+        job_id = job_id or str(uuid.uuid4())
+        record = {
+            "id": job_id,
+            "type": job_type,
+            "queue": self.name,
+            "status": JobStatus.QUEUED,
+            "payload": payload,
+            "metadata": metadata or {},
+            "attempts": 0,
+            "max_retries": max_retries,
+            "result": None,
+            "error": None,
+            "progress": [],
+            "checkpoint": {},
+            "created_at": time.time(),
+        }
+        self._save(record)
+        self.backend.push(job_id)
+        logger.info(f"📥 Job queued: {job_type} ({job_id})")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Fetch a job record without its payload/checkpoint internals."""
+        try:
+            record = self.backend.load(job_id)
+        except Exception as e:
+            logger.warning(f"Job lookup failed for {job_id}: {e}")
+            return None
+        if not record:
+            return None
+        return {k: v for k, v in record.items() if k not in ("payload", "checkpoint")}
+
+    def wait(self, job_id: str, timeout: float = 30.0, interval: float = 0.05) -> Optional[dict]:
+        """Block until the job reaches a terminal status (tests / scripts)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            record = self.get(job_id)
+            if record and record["status"] in TERMINAL_STATUSES:
+                return record
+            time.sleep(interval)
+        return self.get(job_id)
+
+    # -------------------------------------------------------------------------
+    # Worker API
+    # -------------------------------------------------------------------------
+
+    def run_once(self, timeout: float = 1.0) -> bool:
+        """Pop and execute a single job. Returns False if nothing was available."""
+        job_id = self.backend.pop(timeout)
+        if not job_id:
+            return False
+        try:
+            self._execute(job_id)
+        finally:
+            self.backend.ack(job_id)
+        return True
+
+    def _execute(self, job_id: str) -> None:
+        record = self.backend.load(job_id)
+        if not record:
+            logger.warning(f"Job {job_id} popped but record expired")
+            return
+
+        handler = self._handlers.get(record["type"])
+        if handler is None:
+            record["status"] = JobStatus.FAILED
+            record["error"] = f"No handler registered for job type '{record['type']}'"
+            self._save(record)
+            return
+
+        record["status"] = JobStatus.RUNNING
+        record["attempts"] += 1
+        record.setdefault("started_at", time.time())
+        self._save(record)
+
+        ctx = JobContext(self, record)
+        try:
+            if inspect.iscoroutinefunction(handler):
+                result = asyncio.run(handler(record["payload"], ctx))
+            else:
+                result = handler(record["payload"], ctx)
+            ctx._close_stage(time.time())
+            record["status"] = JobStatus.SUCCEEDED
+            record["result"] = result
+            record["error"] = None
+            record["finished_at"] = time.time()
+            self._save(record)
+            logger.info(f"✅ Job {record['type']} ({job_id}) succeeded on attempt {record['attempts']}")
+        except JobDeferred as e:
+            ctx._close_stage(time.time())
+            record["attempts"] -= 1
+            record["deferrals"] = record.get("deferrals", 0) + 1
+            record["status"] = JobStatus.QUEUED
+            record["deferred_reason"] = str(e)
+            self._save(record)
+            self.backend.push_delayed(job_id, time.time() + e.delay)
+            logger.info(f"⏸️ Job {record['type']} ({job_id}) deferred {e.delay:.1f}s: {e}")
+        except Exception as e:
+            ctx._close_stage(time.time())
+            record["error"] = str(e)
+            if record["attempts"] <= record["max_retries"]:
+                delay = JOB_RETRY_BASE_DELAY * (2 ** (record["attempts"] - 1))
+                record["status"] = JobStatus.RETRYING
+                self._save(record)
+                self.backend.push_delayed(job_id, time.time() + delay)
+                logger.warning(f"🔁 Job {record['type']} ({job_id}) failed: {e} - retry in {delay:.1f}s")
+            else:
+                record["status"] = JobStatus.FAILED
+                record["finished_at"] = time.time()
+                self._save(record)
+                logger.error(f"❌ Job {record['type']} ({job_id}) failed permanently: {e}")
+                traceback.print_exc()
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once(timeout=1.0)
+            except Exception as e:
+                logger.error(f"Job worker error on queue '{self.name}': {e}")
+                time.sleep(1.0)
+
+    def _heartbeat_loop(self) -> None:
+        """Renew this worker's lease and periodically reclaim jobs of dead workers."""
+        last_recovery = time.time()
+        while not self._stop.wait(self.lease / 3):
+            try:
+                self.backend.heartbeat()
+                if time.time() - last_recovery >= self.lease:
+                    last_recovery = time.time()
+                    self.backend.recover()
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed on queue '{self.name}': {e}")
+
+    def start(self) -> None:
+        """Start worker threads (idempotent)."""
+        if self._threads:
+            return
+        self._stop.clear()
+        try:
+            self.backend.heartbeat()
+            self.backend.recover()
+        except Exception as e:
+            logger.warning(f"Job recovery skipped for '{self.name}': {e}")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name=f"job-heartbeat-{self.name}", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        for i in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f"job-worker-{self.name}-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"🚀 Started {self.num_workers} workers for queue '{self.name}'")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal workers to exit and join them."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+# Shared queue used by the agents
+job_queue = JobQueue("default")
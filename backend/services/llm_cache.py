@@ -0,0 +1,218 @@
+"""
+Cross-agent LLM response cache.
+
+The same prompts reach Gemini again and again: the nightly market run asks
+for role optimization and search queries over overlapping role/skill sets,
+quiz questions are generated for the same popular skills, and hot-skill
+advice repeats for users with the same profile. Responses are cached by
+everything that determines them - (model, temperature, prompt) - so any
+agent sending an identical request reuses the stored result.
+
+Each call site registers a policy:
+- TTL: how long a response stays valid for that site
+- enabled: opt-out for prompts whose output must vary per call
+  (LLM_CACHE_DISABLED_SITES=site1,site2 disables sites at deploy time)
+
+Only successful results are stored - if compute raises, nothing is cached
+and the caller's fallback runs as before. Each hit is credited with the
+latency and estimated token cost of the original call, reported per site
+(GET /metrics/llm-cache on the API; worker.py logs it every
+LLM_CACHE_REPORT_INTERVAL seconds).
+
+Key Schema (Redis backend):
+- llm_cache:{sha256(model|temperature|prompt)} -> JSON {value, latency, cost} (per-site TTL)
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from core.redis_client import redis_manager
+
+logger = logging.getLogger("LLMCache")
+
+# TTL Constants
+TTL_LLM_DEFAULT = int(timedelta(hours=24).total_seconds())  # 24 hours
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_DISABLED_SITES = {
+    site.strip() for site in os.getenv("LLM_CACHE_DISABLED_SITES", "").split(",") if site.strip()
+}
+LLM_CACHE_REPORT_INTERVAL = int(os.getenv("LLM_CACHE_REPORT_INTERVAL", "900"))  # seconds, 0 = never
+
+# USD per 1M tokens (input, output) - used to estimate the spend a hit avoided
+MODEL_PRICES = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+}
+
+
+def estimate_cost(model: str, prompt: str, response: str) -> float:
+    """Rough USD cost of one call (~4 characters per token)."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (len(prompt) / 4 * input_price + len(response) / 4 * output_price) / 1_000_000
+
+
+@dataclass
+class LLMCachePolicy:
+    ttl: int = TTL_LLM_DEFAULT
+    enabled: bool = True
+
+
+# Backends
+# =============================================================================
+
+class LocalLLMCacheBackend:
+    """In-process backend with expiry. Used for dev and tests."""
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            return payload
+
+    def set(self, key: str, payload: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, payload)
+
+
+class RedisLLMCacheBackend:
+    """Shared backend - every API/worker replica reuses the same responses."""
+
+    def get(self, key: str) -> Optional[str]:
+        client = redis_manager.get_client()
+        return client.get(key) if client else None
+
+    def set(self, key: str, payload: str, ttl: int) -> None:
+        client = redis_manager.get_client()
+        if client:
+            client.setex(key, ttl, payload)
+
+
+class LLMCache:
+    """Response cache keyed by (model, temperature, prompt) with per-site policies."""
+
+    def __init__(self, backend=None, enabled: bool = LLM_CACHE_ENABLED):
+        self._backend = backend
+        self.enabled = enabled
+        self.policies: Dict[str, LLMCachePolicy] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def backend(self):
+        """Resolve lazily so REDIS_URL is read after load_dotenv()."""
+        if self._backend is None:
+            if redis_manager.get_client():
+                self._backend = RedisLLMCacheBackend()
+                logger.info("✅ LLM cache using Redis backend")
+            else:
+                self._backend = LocalLLMCacheBackend()
+                logger.info("⚠️ LLM cache using local in-process backend")
+        return self._backend
+
+    def register(self, site: str, ttl: int = TTL_LLM_DEFAULT, enabled: bool = True) -> None:
+        """Set the TTL / opt-out for a call site."""
+        self.policies[site] = LLMCachePolicy(ttl=ttl, enabled=enabled and site not in LLM_CACHE_DISABLED_SITES)
+
+    @staticmethod
+    def key(model: str, temperature: Optional[float], prompt: str) -> str:
+        raw = f"{model}|{temperature}|{prompt}"
+        return f"llm_cache:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def _record(self, site: str, **deltas) -> None:
+        with self._lock:
+            counters = self.stats.setdefault(site, {
+                "hits": 0, "misses": 0, "bypassed": 0, "latency_saved_s": 0.0, "cost_saved_usd": 0.0
+            })
+            for field, delta in deltas.items():
+                counters[field] += delta
+
+    def get_or_compute(
+        self,
+        site: str,
+        model: str,
+        temperature: Optional[float],
+        prompt: str,
+        compute: Callable[[], Any],
+    ) -> Any:
+        """
+        Return the cached result for this exact request, or run compute and cache it.
+
+        compute must return a JSON-serializable value; exceptions propagate
+        and nothing is stored. Cache backend errors never block the call.
+        """
+        policy = self.policies.get(site) or LLMCachePolicy()
+        if not (self.enabled and policy.enabled):
+            self._record(site, bypassed=1)
+            return compute()
+
+        key = self.key(model, temperature, prompt)
+        try:
+            payload = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed for {site}: {e}")
+            payload = None
+
+        if payload:
+            entry = json.loads(payload)
+            self._record(site, hits=1, latency_saved_s=entry["latency"], cost_saved_usd=entry["cost"])
+            return entry["value"]
+
+        self._record(site, misses=1)
+        start = time.perf_counter()
+        value = compute()
+        latency = time.perf_counter() - start
+
+        try:
+            serialized = json.dumps(value)
+            entry = {
+                "value": value,
+                "latency": round(latency, 4),
+                "cost": estimate_cost(model, prompt, serialized),
+            }
+            self.backend.set(key, json.dumps(entry), policy.ttl)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed for {site}: {e}")
+        return value
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Per-site hits, misses, hit rate and latency / cost saved."""
+        report = {}
+        for site, counters in self.stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            report[site] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+                "latency_saved_s": round(counters["latency_saved_s"], 3),
+                "cost_saved_usd": round(counters["cost_saved_usd"], 6),
+            }
+        return report
+
+    def log_report(self) -> None:
+        """Log report() one line per site (processes without the metrics endpoint)."""
+        for site, stats in sorted(self.report().items()):
+            logger.info(
+                f"📊 {site}: {stats['hits']:.0f} hits / {stats['misses']:.0f} misses "
+                f"(hit rate {stats['hit_rate']:.0%}), {stats['bypassed']:.0f} bypassed, "
+                f"saved {stats['latency_saved_s']:.1f}s / ${stats['cost_saved_usd']:.4f}"
+            )
+
+
+# Singleton instance
+llm_cache = LLMCache()
@@ -0,0 +1,222 @@
+"""
+Schema-constrained JSON generation shared by the LLM call sites.
+
+Several agents asked Gemini for "JSON only" in the prompt, then stripped
+code fences (or regex-searched the text) before json.loads. Any stray prose
+or a truncated fence meant degraded output or a second full LLM call. This
+module:
+
+- Sends the expected shape as a response schema (response_mime_type
+  application/json), so the model is constrained to emit valid JSON
+- Parses with json.JSONDecoder.raw_decode from the first "{" / "[", so a
+  fence or trailing text after a complete value costs nothing
+- Validates the parsed value against the same schema (type, required, enum,
+  item counts) plus an optional call-site check
+- Retries only parse/validation failures, within a per-call budget
+- Counts attempts and failures per call site
+
+Schemas use the Gemini Schema subset as plain dicts (upper-case types), which
+google.generativeai, google.genai and langchain_google_genai all accept:
+
+    {"type": "OBJECT", "properties": {...}, "required": [...]}
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("StructuredOutput")
+
+# Extra attempts after a parse/validation failure (LLM errors are not retried)
+STRUCTURED_OUTPUT_RETRIES = int(os.getenv("STRUCTURED_OUTPUT_RETRIES", "1"))
+
+_JSON_TYPES = {
+    "OBJECT": dict,
+    "ARRAY": list,
+    "STRING": str,
+    "INTEGER": int,
+    "NUMBER": (int, float),
+    "BOOLEAN": bool,
+}
+
+_decoder = json.JSONDecoder()
+
+
+class StructuredOutputError(Exception):
+    """Raised when every attempt in the budget produced unusable output."""
+
+    def __init__(self, site: str, attempts: int, last_error: str):
+        super().__init__(f"{site}: no valid JSON after {attempts} attempt(s): {last_error}")
+        self.site = site
+        self.attempts = attempts
+        self.last_error = last_error
+
+
+def json_config(schema: Optional[dict] = None) -> dict:
+    """Generation config that constrains the response to JSON (and the schema)."""
+    config = {"response_mime_type": "application/json"}
+    if schema:
+        config["response_schema"] = schema
+    return config
+
+
+def parse_json(text: str) -> Any:
+    """
+    Decode the first complete JSON value in text.
+
+    Leading prose / code fences are skipped and anything after the value is
+    ignored. Raises ValueError if no value can be decoded.
+    """
+    text = text or ""
+    starts = sorted(i for i in (text.find("{"), text.find("[")) if i != -1)
+    if not starts:
+        raise ValueError("no JSON value in response")
+    for start in starts[:-1]:
+        try:
+            return _decoder.raw_decode(text, start)[0]
+        except ValueError:
+            continue
+    return _decoder.raw_decode(text, starts[-1])[0]
+
+
+def validate_schema(value: Any, schema: Optional[dict], path: str = "$") -> Optional[str]:
+    """Check value against the schema subset. Returns an error message or None."""
+    if not schema:
+        return None
+
+    expected = schema.get("type", "").upper()
+    py_type = _JSON_TYPES.get(expected)
+    if py_type:
+        # bool is an int subclass - don't let True pass as a number
+        if not isinstance(value, py_type) or (expected in ("INTEGER", "NUMBER") and isinstance(value, bool)):
+            return f"{path}: expected {expected.lower()}, got {type(value).__name__}"
+
+    if "enum" in schema and value not in schema["enum"]:
+        return f"{path}: {value!r} not in {schema['enum']}"
+
+    if expected == "OBJECT":
+        for key in schema.get("required", []):
+            if key not in value:
+                return f"{path}: missing '{key}'"
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in value:
+                error = validate_schema(value[key], sub_schema, f"{path}.{key}")
+                if error:
+                    return error
+
+    if expected == "ARRAY":
+        if "minItems" in schema and len(value) < int(schema["minItems"]):
+            return f"{path}: expected at least {schema['minItems']} items, got {len(value)}"
+        if "maxItems" in schema and len(value) > int(schema["maxItems"]):
+            return f"{path}: expected at most {schema['maxItems']} items, got {len(value)}"
+        for i, item in enumerate(value):
+            error = validate_schema(item, schema.get("items"), f"{path}[{i}]")
+            if error:
+                return error
+
+    return None
+
+
+def _request_schema(schema: Optional[dict]) -> Optional[dict]:
+    """Copy of the schema without the validation-only keys Gemini rejects."""
+    if not isinstance(schema, dict):
+        return schema
+    cleaned = {}
+    for key, value in schema.items():
+        if key in ("minItems", "maxItems"):
+            continue
+        if key == "properties":
+            cleaned[key] = {name: _request_schema(sub) for name, sub in value.items()}
+        elif key == "items":
+            cleaned[key] = _request_schema(value)
+        else:
+            cleaned[key] = value
+    return cleaned
+
+
+class StructuredOutput:
+    """Runs schema-constrained generations and tracks failures per call site."""
+
+    def __init__(self, retries: int = STRUCTURED_OUTPUT_RETRIES):
+        self.retries = retries
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, site: str, field: str) -> None:
+        with self._lock:
+            counters = self.stats.setdefault(site, {"calls": 0, "attempts": 0, "failures": 0, "exhausted": 0})
+            counters[field] += 1
+
+    def failure_rate(self, site: str) -> float:
+        """Share of attempts at a call site whose output could not be used."""
+        counters = self.stats.get(site, {})
+        return counters.get("failures", 0) / counters["attempts"] if counters.get("attempts") else 0.0
+
+    def generate(
+        self,
+        site: str,
+        call: Callable[[dict], str],
+        schema: Optional[dict] = None,
+        validate: Optional[Callable[[Any], Optional[str]]] = None,
+        retries: Optional[int] = None,
+    ) -> Any:
+        """
+        Run call(generation_config) until it returns usable JSON.
+
+        Args:
+            site: Call-site name used for metrics and logs.
+            call: Invokes the LLM with the given generation config, returns raw text.
+            schema: Expected shape; sent to the model and checked on the result.
+            validate: Extra check returning an error message (or None if valid).
+            retries: Override the default retry budget.
+
+        Raises:
+            StructuredOutputError once the budget is spent. LLM errors raised
+            by call propagate unchanged.
+        """
+        budget = 1 + (self.retries if retries is None else retries)
+        config = json_config(_request_schema(schema))
+        self._count(site, "calls")
+
+        last_error = ""
+        for attempt in range(1, budget + 1):
+            self._count(site, "attempts")
+            text = call(config)
+            try:
+                value = parse_json(text)
+                error = validate_schema(value, schema) or (validate(value) if validate else None)
+            except ValueError as e:
+                error = f"parse error: {e}"
+            if error is None:
+                return value
+
+            last_error = error
+            self._count(site, "failures")
+            logger.warning(
+                f"[{site}] unusable JSON (attempt {attempt}/{budget}, "
+                f"failure rate {self.failure_rate(site):.0%}): {error}"
+            )
+
+        self._count(site, "exhausted")
+        raise StructuredOutputError(site, budget, last_error)
+
+
+def genai_call(model, prompt) -> Callable[[dict], str]:
+    """Adapter for google.generativeai GenerativeModel.generate_content."""
+    return lambda config: model.generate_content(prompt, generation_config=config).text
+
+
+def genai_client_call(client, model: str, contents) -> Callable[[dict], str]:
+    """Adapter for google.genai Client.models.generate_content."""
+    return lambda config: client.models.generate_content(model=model, contents=contents, config=config).text
+
+
+def langchain_call(llm, messages) -> Callable[[dict], str]:
+    """Adapter for langchain ChatGoogleGenerativeAI.invoke."""
+    return lambda config: llm.invoke(messages, generation_config=config).content
+
+
+# Singleton instance
+structured_output = StructuredOutput()
@@ -0,0 +1,260 @@
+"""
+Content-addressed TTS audio cache.
+
+Synthesized speech is fully determined by (voice, speaking rate, text), so the
+resulting audio bytes can be reused across sessions. Lookups go through three tiers:
+
+- In-process LRU (fastest, per worker)
+- Local disk (survives restarts on the same host; bounded by age and size)
+- Redis (shared across workers/instances)
+
+Key Schema:
+- tts_audio:{sha256(voice|rate|text[|format])} -> base64 audio string (30 day TTL)
+
+All operations fail gracefully - a cache problem never blocks synthesis.
+"""
+
+import os
+import time
+import base64
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Callable, Iterable
+
+from core.redis_client import redis_manager
+
+logger = logging.getLogger("TTSCache")
+
+# TTL Constants
+TTL_TTS_AUDIO = int(timedelta(days=30).total_seconds())  # 30 days (audio never changes)
+
+# Tier limits
+TTS_MEMORY_MAX_ENTRIES = int(os.getenv("TTS_CACHE_MEMORY_ENTRIES", "256"))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "erflog_tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256 MB
+TTS_CACHE_MAX_AGE = int(timedelta(days=int(os.getenv("TTS_CACHE_MAX_AGE_DAYS", "30"))).total_seconds())
+
+
+class TTSCache:
+    """
+    Three-tier (memory -> disk -> Redis) cache for synthesized audio.
+
+    Hits in a slower tier are promoted into the faster tiers.
+    """
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_entries: int = TTS_MEMORY_MAX_ENTRIES,
+                 max_bytes: int = TTS_CACHE_MAX_BYTES, max_age: int = TTS_CACHE_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "redis_hits": 0, "misses": 0}
+
+    # =========================================================================
+    # Keys
+    # =========================================================================
+
+    @staticmethod
+    def fingerprint(voice: str, rate: float, text: str, audio_format: str = "mp3") -> str:
+        """Stable content hash for a (voice, rate, text, format) tuple."""
+        raw = f"{voice}|{rate:.3f}|{text.strip()}"
+        if audio_format != "mp3":
+            # MP3 keys predate format negotiation and stay unchanged
+            raw += f"|{audio_format}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _redis_key(fingerprint: str) -> str:
+        """Generate Redis key for cached audio."""
+        return f"tts_audio:{fingerprint}"
+
+    def _disk_path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}.audio")
+
+    # =========================================================================
+    # Tiers
+    # =========================================================================
+
+    def _memory_get(self, fingerprint: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(fingerprint)
+            if audio is not None:
+                self._memory.move_to_end(fingerprint)
+            return audio
+
+    def _memory_set(self, fingerprint: str, audio: bytes) -> None:
+        with self._lock:
+            self._memory[fingerprint] = audio
+            self._memory.move_to_end(fingerprint)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_get(self, fingerprint: str) -> Optional[bytes]:
+        path = self._disk_path(fingerprint)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read() or None
+            if audio:
+                os.utime(path)  # Recently used clips survive size eviction
+            return audio
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"TTS disk read failed for {fingerprint[:12]}: {e}")
+            return None
+
+    def _disk_set(self, fingerprint: str, audio: bytes) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write-then-rename so concurrent readers never see partial files
+            tmp_path = f"{self._disk_path(fingerprint)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, self._disk_path(fingerprint))
+            self.evict_disk(keep=self._disk_path(fingerprint))
+        except Exception as e:
+            logger.warning(f"TTS disk write failed for {fingerprint[:12]}: {e}")
+
+    def evict_disk(self, keep: str = "") -> int:
+        """
+        Bound the disk tier: drop clips older than max_age, then the least
+        recently used until the total fits in max_bytes.
+        Returns the number of files removed.
+        """
+        try:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".audio"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+        except OSError as e:
+            logger.warning(f"TTS disk scan failed: {e}")
+            return 0
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for mtime, size, path in entries:
+            if path == keep or (mtime >= cutoff and total <= self.max_bytes):
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info(f"🧹 Evicted {removed} cached TTS clips ({total} bytes kept)")
+        return removed
+
+    def _redis_get(self, fingerprint: str) -> Optional[bytes]:
+        client = redis_manager.get_client()
+        if not client:
+            return None
+        try:
+            data = client.get(self._redis_key(fingerprint))
+            return base64.b64decode(data) if data else None
+        except Exception as e:
+            logger.warning(f"TTS cache read failed for {fingerprint[:12]}: {e}")
+            return None
+
+    def _redis_set(self, fingerprint: str, audio: bytes) -> None:
+        client = redis_manager.get_client()
+        if not client:
+            return
+        try:
+            # Client uses decode_responses=True, so store audio as base64 text
+            client.setex(
+                self._redis_key(fingerprint),
+                TTL_TTS_AUDIO,
+                base64.b64encode(audio).decode("ascii")
+            )
+        except Exception as e:
+            logger.warning(f"TTS cache write failed for {fingerprint[:12]}: {e}")
+
+    # =========================================================================
+    # Public API
+    # =========================================================================
+
+    def get(self, voice: str, rate: float, text: str, audio_format: str = "mp3") -> Optional[bytes]:
+        """
+        Look up cached audio, promoting slower-tier hits.
+
+        Returns:
+            Audio bytes in `audio_format`, or None on miss
+        """
+        fingerprint = self.fingerprint(voice, rate, text, audio_format)
+
+        audio = self._memory_get(fingerprint)
+        if audio is not None:
+            self.stats["memory_hits"] += 1
+            return audio
+
+        audio = self._disk_get(fingerprint)
+        if audio is not None:
+            self.stats["disk_hits"] += 1
+            self._memory_set(fingerprint, audio)
+            return audio
+
+        audio = self._redis_get(fingerprint)
+        if audio is not None:
+            self.stats["redis_hits"] += 1
+            self._memory_set(fingerprint, audio)
+            self._disk_set(fingerprint, audio)
+            return audio
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, voice: str, rate: float, text: str, audio: bytes, audio_format: str = "mp3") -> None:
+        """Store audio in every tier. Empty audio (TTS failure) is never cached."""
+        if not audio:
+            return
+        fingerprint = self.fingerprint(voice, rate, text, audio_format)
+        self._memory_set(fingerprint, audio)
+        self._disk_set(fingerprint, audio)
+        self._redis_set(fingerprint, audio)
+
+    def get_or_synthesize(self, voice: str, rate: float, text: str, synthesize: Callable[[str], bytes],
+                          audio_format: str = "mp3") -> bytes:
+        """Return cached audio, calling `synthesize(text)` only on a miss."""
+        audio = self.get(voice, rate, text, audio_format)
+        if audio is not None:
+            return audio
+        audio = synthesize(text)
+        self.set(voice, rate, text, audio, audio_format)
+        return audio
+
+    def prewarm(self, voice: str, rate: float, phrases: Iterable[str], synthesize: Callable[[str], bytes],
+                audio_format: str = "mp3") -> int:
+        """
+        Ensure every phrase is cached.
+
+        Returns:
+            Number of phrases that required a TTS round-trip
+        """
+        synthesized = 0
+        for phrase in phrases:
+            if self.get(voice, rate, phrase, audio_format) is None:
+                self.set(voice, rate, phrase, synthesize(phrase), audio_format)
+                synthesized += 1
+        logger.info(f"🔥 TTS phrase bank warm ({synthesized} synthesized)")
+        return synthesized
+
+    def clear_memory(self) -> None:
+        """Drop the in-process tier (disk and Redis are left intact)."""
+        with self._lock:
+            self._memory.clear()
+
+
+# Singleton instance for easy imports
+tts_cache = TTSCache()
@@ -0,0 +1,115 @@
+"""
+Benchmark: ATS scoring throughput - local pre-scorer vs cache vs LLM.
+
+Builds a corpus of sample resume texts (tests/test_resume.pdf plus synthetic
+resumes with varied skills, sections and lengths) and scores it with:
+
+- local: deterministic pre-scorer (ats_local.score_resume_locally)
+- quick (warm): quick_ats_score after the LLM results are cached
+- llm: the Gemini scan, only with --live N and GEMINI_API_KEY set
+
+Usage (from backend/):
+    python tests/bench_ats_scoring.py --n 500
+    python tests/bench_ats_scoring.py --n 500 --live 3
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.agent_4_operative import tools
+from agents.agent_4_operative.ats_local import score_resume_locally, SKILL_VOCABULARY
+from services.ats_cache import ATSCache
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "test_resume.pdf")
+VERBS = ["Built", "Designed", "Led", "Shipped", "Migrated", "Optimized", "Automated", "Scaled"]
+OBJECTS = ["payment service", "search API", "data pipeline", "dashboard", "ML model", "deploy tooling", "auth flow"]
+
+
+def synthetic_resume(rng: random.Random) -> str:
+    skills = rng.sample([s for group in SKILL_VOCABULARY.values() for s in group], rng.randint(4, 24))
+    lines = [f"Candidate {rng.randint(1, 10**6)}", f"user{rng.randint(1, 999)}@example.com | +1 555 {rng.randint(1000000, 9999999)}"]
+    if rng.random() < 0.7:
+        lines += ["", "Summary", "Engineer who enjoys shipping reliable products."]
+    lines += ["", "Experience"]
+    for job in range(rng.randint(1, 4)):
+        lines.append(f"Software Engineer, Company {job} ({2014 + job} - {2016 + job})")
+        for _ in range(rng.randint(2, 6)):
+            lines.append(f"- {rng.choice(VERBS)} the {rng.choice(OBJECTS)} with {rng.choice(skills)}, "
+                         f"improving throughput by {rng.randint(5, 80)}%")
+    if rng.random() < 0.9:
+        lines += ["", "Education", f"B.Tech Computer Science ({rng.randint(2008, 2020)})"]
+    lines += ["", "Skills", ", ".join(skills)]
+    if rng.random() < 0.5:
+        lines += ["", "Projects", f"- Side project using {rng.choice(skills)} with {rng.randint(10, 5000)} users"]
+    lines.append("Worked closely with product, design and data teams on roadmap delivery. " * rng.randint(2, 30))
+    return "\n".join(lines)
+
+
+def build_corpus(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    try:
+        import fitz
+        with fitz.open(SAMPLE_PDF) as doc:
+            corpus.append("\n".join(page.get_text() for page in doc))
+    except Exception as e:
+        print(f"(sample PDF skipped: {e})")
+    while len(corpus) < n:
+        corpus.append(synthetic_resume(rng))
+    return corpus
+
+
+def report(name: str, durations: list) -> None:
+    total = sum(durations)
+    ordered = sorted(durations)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{name:<16} {len(durations) / total:>12,.0f}/s {statistics.median(durations) * 1000:>9.3f}ms {p99 * 1000:>9.3f}ms")
+
+
+def timed(fn, items) -> list:
+    durations = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=500, help="resumes in the corpus")
+    parser.add_argument("--live", type=int, default=0, help="also time N real Gemini scans")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.n)
+    scores = [score_resume_locally(text)["score"] for text in corpus]
+    print(f"corpus: {len(corpus)} resumes, avg {sum(map(len, corpus)) // len(corpus)} chars, "
+          f"local scores {min(scores)}-{max(scores)} (median {statistics.median(scores):.0f})")
+
+    print(f"\n{'path':<16} {'throughput':>14} {'p50':>11} {'p99':>11}")
+    report("local", timed(score_resume_locally, corpus))
+
+    # Warm the cache as if the LLM had scored every resume once
+    tools.ats_cache = ATSCache(max_entries=len(corpus))
+    for text, score in zip(corpus, scores):
+        tools.ats_cache.set(tools._ats_fingerprint(text)[1], {"score": score, "missing_keywords": [], "summary": ""})
+    report("quick (warm)", timed(tools.quick_ats_score, corpus))
+
+    if args.live:
+        if not os.getenv("GEMINI_API_KEY"):
+            print("llm: skipped (GEMINI_API_KEY not set)")
+        else:
+            texts = corpus[:args.live]
+            report("llm", timed(lambda text: asyncio.run(tools._llm_ats_score(text[:tools.ATS_MAX_CHARS])), texts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
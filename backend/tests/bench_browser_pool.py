@@ -0,0 +1,150 @@
+"""
+Benchmark: browser per application vs the shared browser pool.
+
+Serves a local job-application test page and "applies" N times (open the
+page, fill the form) three ways:
+
+- leaked: a fresh Chromium per application that is never closed (the old
+  `_global_browser_refs` behaviour)
+- fresh: a fresh Chromium per application, closed afterwards
+- pooled: BrowserPool - one Chromium, a context per application
+
+Reports per-application latency and the resident memory of all Chromium
+processes (from /proc, Linux only). Requires `playwright install chromium`.
+
+Usage (from backend/):
+    python tests/bench_browser_pool.py --n 5
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from agents.agent_4_operative.browser_pool import BrowserPool, launch_chromium
+
+APPLICATION_PAGE = b"""<!doctype html><html><body>
+<h1>Backend Engineer</h1><button id="apply">Apply</button>
+<form><input name="name"><input name="email"><input type="file" name="resume">
+<textarea name="cover"></textarea><select name="visa"><option>No</option><option>Yes</option></select></form>
+</body></html>"""
+
+
+class _Page(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(APPLICATION_PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def chromium_rss_mb() -> float:
+    total = 0
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if b"chrom" not in f.read().lower():
+                    continue
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return total / 1024
+
+
+async def fill(context, url):
+    page = await context.new_page()
+    await page.goto(url)
+    await page.click("#apply")
+    await page.fill("input[name=name]", "Ada Lovelace")
+    await page.fill("input[name=email]", "ada@example.com")
+    await page.fill("textarea[name=cover]", "Hello")
+    await page.select_option("select[name=visa]", "No")
+
+
+async def run_leaked(url, n):
+    closers, times = [], []
+    for _ in range(n):
+        start = time.perf_counter()
+        browser, _, close = await launch_chromium()
+        await fill(await browser.new_context(), url)
+        times.append(time.perf_counter() - start)
+        closers.append(close)
+    rss = chromium_rss_mb()
+    for close in closers:
+        await close()
+    return times, rss
+
+
+async def run_fresh(url, n):
+    times, peak = [], 0.0
+    for _ in range(n):
+        start = time.perf_counter()
+        browser, _, close = await launch_chromium()
+        await fill(await browser.new_context(), url)
+        peak = max(peak, chromium_rss_mb())
+        await close()
+        times.append(time.perf_counter() - start)
+    return times, peak
+
+
+async def run_pooled(url, n):
+    pool = BrowserPool(max_contexts=1, idle_timeout=60)
+    times, peak = [], 0.0
+    for _ in range(n):
+        start = time.perf_counter()
+        async with pool.context() as lease:
+            await fill(lease.context, url)
+            peak = max(peak, chromium_rss_mb())
+        times.append(time.perf_counter() - start)
+    rss_after = chromium_rss_mb()
+    await pool.close()
+    return times, max(peak, rss_after), pool.snapshot()
+
+
+async def main_async(args):
+    server = HTTPServer(("127.0.0.1", 0), _Page)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/apply"
+
+    try:
+        leaked, leaked_rss = await run_leaked(url, args.n)
+        fresh, fresh_rss = await run_fresh(url, args.n)
+        pooled, pooled_rss, stats = await run_pooled(url, args.n)
+    finally:
+        server.shutdown()
+
+    def row(name, times, rss):
+        print(f"{name:<22} {times[0]:8.2f}s {sum(times[1:]) / max(1, len(times) - 1):8.2f}s {rss:9.0f}MB")
+
+    print(f"\n{'mode':<22} {'first':>9} {'next avg':>9} {'chromium RSS':>12}")
+    row(f"leaked ({args.n} browsers)", leaked, leaked_rss)
+    row("fresh, closed", fresh, fresh_rss)
+    row("pooled", pooled, pooled_rss)
+    print(f"pool: {stats['launches']} launch(es), {stats['contexts']} contexts, avg launch {stats['avg_launch_seconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=5, help="applications to run")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main_async(args))
+    except Exception as e:
+        print(f"Benchmark needs Playwright Chromium (`playwright install chromium`): {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Benchmark: DocxSurgeon per-edit rescans vs the single-pass section index.
+
+Builds large multi-page resumes with python-docx (body sections plus a
+skills table) and applies the same edits with both strategies. The legacy
+strategy below is the previous simple_replace loop: a fresh scan of
+doc.paragraphs per edit and per deleted paragraph.
+
+Usage (from backend/):
+    python tests/bench_docx_edit.py --pages 5 10 20 --edits 6 --repeat 3
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from docx import Document
+from docx.shared import Pt
+
+from agents.agent_4_operative.docx_engine import DocxSurgeon, SECTION_HEADERS
+
+PARAGRAPHS_PER_PAGE = 45
+BODY_SECTIONS = ["EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION", "PUBLICATIONS", "VOLUNTEERING", "AWARDS", "INTERESTS"]
+
+
+def build_resume(pages: int) -> bytes:
+    doc = Document()
+    doc.add_paragraph("Ada Lovelace - ada@example.com")
+    per_section = max(2, pages * PARAGRAPHS_PER_PAGE // len(BODY_SECTIONS))
+    for header in BODY_SECTIONS:
+        doc.add_paragraph(header)
+        for i in range(per_section):
+            run = doc.add_paragraph().add_run(f"{header.title()} bullet {i}: shipped a measurable improvement to a production system")
+            run.font.name = "Garamond"
+            run.font.size = Pt(10)
+    table = doc.add_table(rows=pages * 4, cols=2)
+    table.cell(0, 0).text = "CERTIFICATIONS"
+    for r in range(1, pages * 4):
+        table.cell(r, 0).text = f"Cert {r}"
+        table.cell(r, 1).text = "Issued 2024"
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def legacy_apply(surgeon: DocxSurgeon, doc, edits: list) -> None:
+    for edit in edits:
+        section = edit["section"].upper()
+        new_content = edit["content"].replace("**", "")
+
+        start_idx = -1
+        for i, p in enumerate(doc.paragraphs):
+            txt = p.text.strip().upper()
+            if (section == txt) or (section in txt and len(txt) < 40):
+                start_idx = i
+                break
+
+        if start_idx != -1:
+            end_idx = len(doc.paragraphs)
+            for i in range(start_idx + 1, len(doc.paragraphs)):
+                txt = doc.paragraphs[i].text.strip().upper()
+                if txt in SECTION_HEADERS or (txt.isupper() and 3 < len(txt) < 30 and " " not in txt):
+                    end_idx = i
+                    break
+            style = surgeon._detect_section_style(doc.paragraphs, start_idx + 1, end_idx)
+            target_p = doc.paragraphs[start_idx + 1]
+            target_p.clear()
+            run = target_p.add_run(new_content)
+            if style["font_name"]: run.font.name = style["font_name"]
+            if style["font_size"]: run.font.size = style["font_size"]
+            for i in range(end_idx - 1, start_idx + 1, -1):
+                p_element = doc.paragraphs[i]._element
+                p_element.getparent().remove(p_element)
+            continue
+
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    txt = cell.text.strip().upper()
+                    if (section == txt) or (section in txt and len(txt) < 40):
+                        cell.text = section + "\n" + new_content
+                        break
+                else:
+                    continue
+                break
+
+
+def timed(fn, data: bytes, edits: list, repeat: int) -> tuple:
+    best = float("inf")
+    for _ in range(repeat):
+        doc = Document(io.BytesIO(data))
+        start = time.perf_counter()
+        fn(doc, edits)
+        best = min(best, time.perf_counter() - start)
+    return best, [p.text for p in doc.paragraphs]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--edits", type=int, default=6, help="sections edited per document")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    surgeon = DocxSurgeon()
+    sections = (BODY_SECTIONS[:args.edits - 1] + ["CERTIFICATIONS"])[:args.edits]
+    edits = [{"section": s, "content": f"Rewritten {s.lower()} for the target role"} for s in sections]
+
+    print(f"\n{'pages':>5} {'paras':>6} {'edits':>5} {'rescan':>9} {'single-pass':>12} {'speedup':>8}")
+    for pages in args.pages:
+        data = build_resume(pages)
+        paras = len(Document(io.BytesIO(data)).paragraphs)
+        legacy_time, legacy_text = timed(lambda d, e: legacy_apply(surgeon, d, e), data, edits, args.repeat)
+        new_time, new_text = timed(surgeon.apply_edits, data, edits, args.repeat)
+        assert legacy_text == new_text, "strategies disagree"
+        print(f"{pages:>5} {paras:>6} {len(edits):>5} {legacy_time * 1000:8.1f}ms {new_time * 1000:10.1f}ms {legacy_time / new_time:7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
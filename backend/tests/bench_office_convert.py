@@ -0,0 +1,103 @@
+"""
+Benchmark: cold `libreoffice --convert-to` per document vs the persistent
+office converter.
+
+Requires LibreOffice (and python3-uno for the listener backend; without it
+the converter falls back to per-document CLI runs on a warm profile).
+
+Usage (from backend/):
+    python tests/bench_office_convert.py --n 5
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from docx import Document
+
+from agents.agent_4_operative.office_converter import (
+    OfficeConverter, UnoOffice, CliOffice, import_uno, resolve_office_binary
+)
+
+
+def build_docx(path: str, index: int) -> None:
+    doc = Document()
+    doc.add_paragraph(f"Ada Lovelace #{index}")
+    for header in ["EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION"]:
+        doc.add_paragraph(header)
+        for i in range(12):
+            doc.add_paragraph(f"{header.title()} bullet {i}: shipped a measurable improvement")
+    doc.save(path)
+
+
+def cold_convert(binary: str, src: str, outdir: str) -> None:
+    # The pre-change path: fresh process and fresh profile each time
+    profile = tempfile.mkdtemp(prefix="erflog_bench_profile_")
+    try:
+        subprocess.run(
+            [binary, "--headless", f"-env:UserInstallation=file://{profile}",
+             "--convert-to", "pdf", "--outdir", outdir, src],
+            capture_output=True, check=True, timeout=120
+        )
+    finally:
+        shutil.rmtree(profile, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=5, help="documents to convert")
+    args = parser.parse_args()
+
+    binary = resolve_office_binary()
+    if not binary:
+        print("LibreOffice (soffice) not found - install libreoffice-writer to run this benchmark")
+        return 1
+
+    with tempfile.TemporaryDirectory() as workdir:
+        docs = []
+        for i in range(args.n):
+            path = os.path.join(workdir, f"resume_{i}.docx")
+            build_docx(path, i)
+            docs.append(path)
+
+        cold = []
+        for src in docs:
+            start = time.perf_counter()
+            cold_convert(binary, src, os.path.join(workdir, "cold"))
+            cold.append(time.perf_counter() - start)
+
+        backend = "uno listener" if import_uno() else "cli (warm profile)"
+        profile = os.path.join(workdir, "profile")
+        factory = (lambda: UnoOffice(binary, profile_dir=profile)) if import_uno() else (lambda: CliOffice(binary, profile))
+        converter = OfficeConverter(office_factory=factory)
+
+        start = time.perf_counter()
+        converter.start()
+        converter.wait_ready()
+        startup = time.perf_counter() - start
+
+        warm = []
+        try:
+            for src in docs:
+                start = time.perf_counter()
+                converter.convert(src, src.replace(".docx", ".pdf"))
+                warm.append(time.perf_counter() - start)
+        finally:
+            converter.stop()
+
+    print(f"\n{'mode':<28} {'docs':>5} {'first':>8} {'mean':>8}")
+    print(f"{'cold --convert-to':<28} {args.n:>5} {cold[0]:7.2f}s {sum(cold) / len(cold):7.2f}s")
+    print(f"{f'persistent ({backend})':<28} {args.n:>5} {warm[0]:7.2f}s {sum(warm) / len(warm):7.2f}s")
+    print(f"one-time office startup: {startup:.2f}s")
+    print(f"per-document speedup: {(sum(cold) / len(cold)) / (sum(warm) / len(warm)):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark: N single tailoring calls vs one batched call.
+
+External services are replaced with sleeps of representative latency so the
+comparison isolates the orchestration (shared per-user work + fan-out):
+resume text load, Gemini structuring, pdflatex compile, storage upload and
+the profile update.
+
+Usage (from backend/):
+    python tests/bench_resume_batch.py --n 5 --llm 1.5 --compile 0.8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+from agents.agent_4_operative import tools
+
+RESUME_TEXT = "Ada Lovelace\nada@example.com\n" + "Built analytical engines. " * 100
+
+
+def simulated(args, workdir):
+    def get_text(user_id):
+        time.sleep(args.load)
+        return RESUME_TEXT
+
+    def structure(resume, jd):
+        time.sleep(args.llm)
+        return {"name": "Ada Lovelace", "experience": [{"company": jd, "bullets": ["Shipped **X**"]}]}
+
+    def compile_pdf_bytes(self, tex):
+        time.sleep(args.compile)
+        return b"%PDF-1.5\n" + b"0" * 4096
+
+    def upload(data, destination):
+        time.sleep(args.upload)
+        return f"https://signed/{destination}"
+
+    supabase = MagicMock()
+    supabase.table.return_value.update.return_value.eq.return_value.execute.side_effect = lambda: time.sleep(args.db)
+
+    return [
+        patch.object(tools.resume_text_provider, "get_text", side_effect=get_text),
+        patch.object(tools, "_structure_with_llm", side_effect=structure),
+        patch.object(tools.LatexSurgeon, "compile_pdf_bytes", compile_pdf_bytes),
+        patch.object(tools, "upload_bytes", side_effect=upload),
+        patch.object(tools, "create_client", return_value=supabase),
+        # Measure cold runs: no memoized structures or cached artifacts
+        patch("services.cache_service.redis_manager.get_client", return_value=None),
+        patch("services.artifact_cache.redis_manager.get_client", return_value=None),
+        patch.object(tools.artifact_cache, "cache_dir", workdir),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=5, help="jobs to tailor")
+    parser.add_argument("--workers", type=int, default=tools.RESUME_BATCH_CONCURRENCY)
+    parser.add_argument("--load", type=float, default=0.3, help="resume text load (s)")
+    parser.add_argument("--llm", type=float, default=1.5, help="Gemini structuring (s)")
+    parser.add_argument("--compile", type=float, default=0.8, help="pdflatex compile (s)")
+    parser.add_argument("--upload", type=float, default=0.25, help="storage upload (s)")
+    parser.add_argument("--db", type=float, default=0.05, help="profile update (s)")
+    args = parser.parse_args()
+
+    jobs = [{"job_id": str(i), "job_description": f"Backend Engineer #{i}"} for i in range(args.n)]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        patches = simulated(args, workdir)
+        for p in patches:
+            p.start()
+        try:
+            start = time.perf_counter()
+            singles = [tools.mutate_resume_for_job("bench-user", job["job_description"]) for job in jobs]
+            single_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batched = tools.mutate_resumes_for_jobs("bench-user", jobs, max_workers=args.workers)
+            batch_time = time.perf_counter() - start
+        finally:
+            for p in patches:
+                p.stop()
+
+    assert all(r["status"] == "success" for r in singles + batched)
+    print(f"\n{'mode':<24} {'jobs':>5} {'total':>9} {'per job':>9}")
+    print(f"{'N single calls':<24} {args.n:>5} {single_time:8.2f}s {single_time / args.n:8.2f}s")
+    print(f"{f'batched ({args.workers} workers)':<24} {args.n:>5} {batch_time:8.2f}s {batch_time / args.n:8.2f}s")
+    print(f"speedup: {single_time / batch_time:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Tests for batched anti-pattern screening (Agent 4 evolution).
+
+Pinecone and the embedding model are faked; vectors are small hand-made
+arrays so the cosine scores are easy to reason about.
+
+Tests cover:
+- Anti-patterns are fetched first, probing with the stored user vector;
+  many JDs then cost one embedding call
+- Local cosine scores, threshold and top_k match the single-check contract
+- Users without anti-patterns short-circuit before any embedding
+- check_anti_patterns delegates to the batch path
+- Nightly matching scores the job vectors it already has, never stores them,
+  drops anti-pattern jobs and survives screening errors
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from agents.agent_4_operative import evolution
+
+
+# JD text -> embedding
+EMBEDDINGS = {
+    "frontend react role": [1.0, 0.0, 0.0],
+    "kernel c developer": [0.0, 1.0, 0.0],
+    "react native mobile": [0.9, 0.1, 0.0],
+    "unrelated sales job": [0.0, 0.0, 1.0],
+}
+
+ANTI_PATTERNS = [
+    SimpleNamespace(id="anti_u1_1", values=[1.0, 0.05, 0.0], metadata={"gap_analysis": "No frontend depth"}),
+    SimpleNamespace(id="anti_u1_2", values=[0.0, 1.0, 0.1], metadata={"gap_analysis": "No systems experience"}),
+]
+
+
+USER_VECTOR = [0.5, 0.5, 0.5]
+
+
+@pytest.fixture
+def pinecone():
+    index = MagicMock()
+    index.query.return_value = SimpleNamespace(matches=ANTI_PATTERNS)
+    index.fetch.return_value = SimpleNamespace(vectors={"u1": SimpleNamespace(values=USER_VECTOR)})
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts, **kw: [EMBEDDINGS[t] for t in texts]
+
+    with patch.object(evolution, "Pinecone") as pc, \
+         patch.object(evolution, "GoogleGenerativeAIEmbeddings", return_value=embeddings):
+        pc.return_value.Index.return_value = index
+        yield {"index": index, "embeddings": embeddings}
+
+
+class TestBatchScreening:
+
+    def test_one_embedding_call_and_one_query(self, pinecone):
+        jds = list(EMBEDDINGS)
+        results = evolution.check_anti_patterns_batch("u1", jds)
+
+        assert pinecone["embeddings"].embed_documents.call_count == 1
+        assert pinecone["embeddings"].embed_documents.call_args.kwargs["task_type"] == "RETRIEVAL_QUERY"
+        pinecone["index"].query.assert_called_once()
+        query = pinecone["index"].query.call_args.kwargs
+        assert query["vector"] == USER_VECTOR
+        assert query["filter"] == {"user_id": {"$eq": "u1"}}
+        assert query["include_values"] is True and query["namespace"] == "anti-patterns"
+
+        assert [r["is_anti_pattern"] for r in results] == [True, True, True, False]
+        assert [m["id"] for m in results[0]["matches"]] == ["anti_u1_1"]
+        assert results[1]["matches"][0]["gap_analysis"] == "No systems experience"
+        assert results[3]["recommendation"] == "No anti-pattern matches found."
+
+    def test_scores_are_cosine_similarity(self, pinecone):
+        result = evolution.check_anti_patterns_batch("u1", ["react native mobile"], threshold=0.0, top_k=2)[0]
+        # Sorted by similarity, rounded like Pinecone scores
+        assert [m["id"] for m in result["matches"]] == ["anti_u1_1", "anti_u1_2"]
+        assert result["matches"][0]["score"] == pytest.approx(0.9982, abs=1e-4)
+
+    def test_threshold_and_top_k(self, pinecone):
+        strict = evolution.check_anti_patterns_batch("u1", ["react native mobile"], threshold=0.999)[0]
+        assert strict["is_anti_pattern"] is False and strict["matches"] == []
+
+        top1 = evolution.check_anti_patterns_batch("u1", ["react native mobile"], threshold=0.0, top_k=1)[0]
+        assert len(top1["matches"]) == 1
+
+    def test_no_anti_patterns(self, pinecone):
+        pinecone["index"].query.return_value = SimpleNamespace(matches=[])
+        results = evolution.check_anti_patterns_batch("u1", ["frontend react role", "kernel c developer"])
+        assert [r["is_anti_pattern"] for r in results] == [False, False]
+        assert evolution.check_anti_patterns_batch("u1", []) == []
+        # Nothing to compare against, so the JDs were never embedded
+        pinecone["embeddings"].embed_documents.assert_not_called()
+
+    def test_missing_user_vector_probes_with_a_jd(self, pinecone):
+        pinecone["index"].fetch.return_value = SimpleNamespace(vectors={})
+        results = evolution.check_anti_patterns_batch("u1", ["kernel c developer", "unrelated sales job"])
+
+        assert [r["is_anti_pattern"] for r in results] == [True, False]
+        assert pinecone["embeddings"].embed_documents.call_count == 1
+        assert pinecone["index"].query.call_args.kwargs["vector"] == EMBEDDINGS["kernel c developer"]
+
+    def test_single_check_uses_batch_path(self, pinecone):
+        result = evolution.check_anti_patterns("u1", "kernel c developer")
+        assert result["is_anti_pattern"] is True
+        assert result["matches"][0]["id"] == "anti_u1_2"
+
+
+class TestNightlyScreening:
+
+    @pytest.fixture
+    def strategist(self):
+        from agents.agent_3_strategist.service import StrategistService
+        return StrategistService.__new__(StrategistService)
+
+    def test_stored_job_vectors_are_scored_without_embedding(self, strategist, pinecone):
+        jobs = [
+            {"id": "1", "title": "Frontend", "values": EMBEDDINGS["frontend react role"]},
+            {"id": "2", "title": "Sales", "values": EMBEDDINGS["unrelated sales job"]},
+            {"id": "3", "title": "Kernel", "values": None},
+        ]
+        kept = strategist._screen_anti_patterns("u1", jobs, USER_VECTOR)
+
+        assert [j["id"] for j in kept] == ["2", "3"]
+        assert all("values" not in j for j in kept)
+        pinecone["embeddings"].embed_documents.assert_not_called()
+        pinecone["index"].fetch.assert_not_called()
+        assert pinecone["index"].query.call_args.kwargs["vector"] == USER_VECTOR
+
+    def test_anti_pattern_jobs_are_dropped(self, strategist, pinecone):
+        jobs = [
+            {"id": "1", "title": "Frontend", "company": "A", "summary": "react", "values": [1.0, 0.0, 0.0]},
+            {"id": "2", "title": "Sales", "company": "B", "summary": "quota", "values": [0.0, 0.0, 1.0]},
+        ]
+        checks = [{"is_anti_pattern": True}, {"is_anti_pattern": False}]
+        with patch.object(evolution, "screen_job_vectors", return_value=checks) as screen:
+            kept = strategist._screen_anti_patterns("u1", jobs, USER_VECTOR)
+
+        assert [j["id"] for j in kept] == ["2"]
+        screen.assert_called_once()
+        assert screen.call_args.args[1:] == ([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0]], USER_VECTOR)
+
+    def test_screening_errors_keep_all_jobs(self, strategist):
+        jobs = [{"id": "1", "title": "Frontend", "values": [1.0, 0.0, 0.0]}]
+        with patch.object(evolution, "screen_job_vectors", side_effect=RuntimeError("pinecone down")):
+            assert strategist._screen_anti_patterns("u1", jobs, USER_VECTOR) == [{"id": "1", "title": "Frontend"}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
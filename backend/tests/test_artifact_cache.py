@@ -0,0 +1,197 @@
+"""
+Unit tests for the content-addressed PDF artifact cache.
+
+Tests cover:
+- Fingerprint/storage naming and per-user key scoping
+- Hit/miss accounting, bytes saved and hit rate
+- Resume tailoring skips compile + upload when the rendered .tex is unchanged
+- Bounded growth: local eviction by age / size; storage pruning spares the
+  newest N, recent and application-linked objects
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+import fnmatch
+import pytest
+from unittest.mock import patch, MagicMock
+
+from services.artifact_cache import ArtifactCache
+
+import agents.agent_4_operative.tools as tools
+
+
+PDF_BYTES = b"%PDF-1.5\n" + b"0" * 2048
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the commands the cache uses."""
+
+    def __init__(self):
+        self.store = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def hincrby(self, key, field, amount):
+        bucket = self.hashes.setdefault(key, {})
+        bucket[field] = str(int(bucket.get(field, 0)) + amount)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def scan_iter(self, match):
+        return [k for k in list(self.store) if fnmatch.fnmatch(k, match)]
+
+
+@pytest.fixture
+def fake_redis():
+    client = FakeRedis()
+    with patch("services.artifact_cache.redis_manager") as manager:
+        manager.get_client.return_value = client
+        yield client
+
+
+@pytest.fixture
+def cache(tmp_path, fake_redis):
+    return ArtifactCache(cache_dir=str(tmp_path / "artifacts"))
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "out.pdf"
+    path.write_bytes(PDF_BYTES)
+    return str(path)
+
+
+class TestArtifactCache:
+
+    def test_fingerprint_is_content_addressed(self, cache):
+        fp = cache.fingerprint("\\begin{document}A\\end{document}")
+        assert fp == cache.fingerprint("\\begin{document}A\\end{document}")
+        assert fp != cache.fingerprint("\\begin{document}B\\end{document}")
+        assert cache.storage_path("u1", fp) == f"tailored/u1/{fp[:32]}.pdf"
+
+    def test_hit_returns_record_and_counts_bytes_saved(self, cache, pdf_file):
+        fp = cache.fingerprint("tex")
+        assert cache.get("u1", fp) is None
+
+        cache.set("u1", fp, "tailored/u1/x.pdf", "https://signed/x", pdf_file)
+        record = cache.get("u1", fp)
+
+        assert record["signed_url"] == "https://signed/x"
+        assert record["bytes"] == len(PDF_BYTES)
+        assert open(record["local_path"], "rb").read() == PDF_BYTES
+
+        stats = cache.snapshot()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["bytes_saved"] == len(PDF_BYTES)
+        assert stats["hit_rate"] == 0.5
+        assert stats["scope"] == "global"
+
+    def test_records_are_scoped_per_user(self, cache, pdf_file):
+        fp = cache.fingerprint("tex")
+        cache.set("u1", fp, "tailored/u1/x.pdf", "https://signed/x", pdf_file)
+
+        assert cache.get("u2", fp) is None
+        cache.invalidate("u1", fp)
+        assert cache.get("u1", fp) is None
+
+    def test_no_redis_is_a_miss(self, tmp_path):
+        with patch("services.artifact_cache.redis_manager") as manager:
+            manager.get_client.return_value = None
+            cache = ArtifactCache(cache_dir=str(tmp_path))
+            assert cache.get("u1", "abc") is None
+            assert cache.snapshot()["scope"] == "process"
+
+
+class TestMutateResumeReuse:
+
+    def test_second_run_skips_compile_and_upload(self, cache):
+        with patch.object(tools, "artifact_cache", cache), \
+             patch.object(tools.resume_text_provider, "get_text", return_value="Ada Lovelace\nada@example.com"), \
+             patch.object(tools, "structure_resume_content", return_value={"name": "Ada"}), \
+             patch.object(tools.LatexSurgeon, "fill_template", return_value="\\begin{document}Ada\\end{document}"), \
+             patch.object(tools.LatexSurgeon, "compile_pdf_bytes", return_value=PDF_BYTES) as compile_pdf, \
+             patch.object(tools, "upload_bytes", return_value="https://signed/u1") as upload, \
+             patch.object(tools, "create_client", return_value=MagicMock()), \
+             patch.object(tools, "prune_tailored_artifacts") as prune:
+            first = tools.mutate_resume_for_job("u1", "JD")
+            second = tools.mutate_resume_for_job("u1", "JD")
+
+        assert first["status"] == second["status"] == "success"
+        assert second["pdf_url"] == first["pdf_url"] == "https://signed/u1"
+        # Pruning happens per request after the application is saved, never per upload
+        prune.assert_not_called()
+        assert compile_pdf.call_count == 1 and upload.call_count == 1
+        assert upload.call_args[0][1].startswith("tailored/u1/")
+        assert cache.snapshot()["bytes_saved"] == len(PDF_BYTES)
+        assert second["pdf_path"] == first["pdf_path"]
+
+
+class TestBoundedGrowth:
+
+    def test_local_eviction_by_age_and_size(self, tmp_path, fake_redis):
+        cache = ArtifactCache(cache_dir=str(tmp_path / "artifacts"), max_bytes=3 * len(PDF_BYTES), max_age=3600)
+        old = cache.store_bytes("a" * 64, PDF_BYTES)
+        os.utime(old, (time.time() - 7200, time.time() - 7200))
+        paths = [cache.store_bytes(c * 64, PDF_BYTES) for c in "bcd"]
+        for i, path in enumerate(paths):
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+        newest = cache.store_bytes("e" * 64, PDF_BYTES)
+
+        # The stale file goes by age, then the least recently used by size
+        assert sorted(os.listdir(cache.cache_dir)) == [f"{c * 64}.pdf" for c in "cde"]
+        assert os.path.exists(newest)
+
+    def test_prune_spares_recent_kept_and_referenced_objects(self, cache):
+        fresh = datetime.now(timezone.utc).isoformat()
+        created = {"a": "2026-01-01T00:00:00Z", "b": "2026-01-02T00:00:00Z", "c": "2026-01-03T00:00:00Z",
+                   "d": "2026-01-04T00:00:00Z", "e": fresh}
+        for c in created:
+            cache.set("u1", c * 64, f"tailored/u1/{c * 32}.pdf", "https://signed")
+            cache.store_bytes(c * 64, PDF_BYTES)
+        bucket = MagicMock()
+        bucket.list.return_value = [{"name": f"{c * 32}.pdf", "created_at": at} for c, at in created.items()]
+        client = MagicMock()
+        client.storage.from_.return_value = bucket
+        rows = {
+            # b is still linked from an application, whatever its age
+            "applications": [{"application_metadata": {"pdf_url": f"https://x/object/sign/Resume/tailored/u1/{'b' * 32}.pdf?token=t"}}],
+            "profiles": [{"sec_resume_url": None}],
+        }
+        client.table.side_effect = lambda name: MagicMock(**{
+            "select.return_value.eq.return_value.execute.return_value.data": rows[name]
+        })
+
+        with patch.object(tools, "artifact_cache", cache), patch.object(tools, "create_client", return_value=client):
+            removed = tools.prune_tailored_artifacts("u1", keep=2, min_age=3600)
+
+        # e is newest (and young), d is second newest; b is referenced
+        assert removed == [f"tailored/u1/{'c' * 32}.pdf", f"tailored/u1/{'a' * 32}.pdf"]
+        bucket.remove.assert_called_once_with(removed)
+        assert cache.get("u1", "a" * 64) is None and cache.get("u1", "c" * 64) is None
+        assert cache.get("u1", "b" * 64) and cache.get("u1", "d" * 64) and cache.get("u1", "e" * 64)
+        assert not os.path.exists(cache.local_path("a" * 64))
+
+    def test_prune_deletes_nothing_when_references_unreadable(self, cache):
+        bucket = MagicMock()
+        bucket.list.return_value = [{"name": f"{c * 32}.pdf", "created_at": "2026-01-01T00:00:00Z"} for c in "abc"]
+        client = MagicMock()
+        client.storage.from_.return_value = bucket
+        client.table.side_effect = ConnectionError("db down")
+
+        with patch.object(tools, "artifact_cache", cache), patch.object(tools, "create_client", return_value=client):
+            assert tools.prune_tailored_artifacts("u1", keep=1, min_age=0) == []
+        bucket.remove.assert_not_called()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,96 @@
+"""
+Tests for the bytes-based resume artifact path (Agent 4).
+
+Tests cover:
+- Compiler output goes to storage as the same bytes object (no temp file)
+- The only disk copy is the artifact cache entry
+- Corrupt output is rejected before upload
+- Per-request temp namespaces never collide and are released cleanly
+"""
+
+import os
+import pytest
+from unittest.mock import patch, MagicMock
+
+from agents.agent_4_operative import tools, workspace
+from services.artifact_cache import ArtifactCache
+
+
+PDF_BYTES = b"%PDF-1.5\n" + b"0" * 2048
+
+
+@pytest.fixture
+def namespace_root(tmp_path):
+    root = str(tmp_path / "requests")
+    with patch.object(workspace, "AGENT4_TMP_ROOT", root):
+        yield root
+
+
+@pytest.fixture
+def pipeline(tmp_path, namespace_root):
+    cache = ArtifactCache(cache_dir=str(tmp_path / "artifacts"))
+    with patch.object(tools, "artifact_cache", cache), \
+         patch("services.artifact_cache.redis_manager.get_client", return_value=None), \
+         patch.object(tools, "structure_resume_content", return_value={"name": "Ada"}), \
+         patch.object(tools.LatexSurgeon, "fill_template", return_value="\\begin{document}Ada\\end{document}"), \
+         patch.object(tools.LatexSurgeon, "compile_pdf_bytes", return_value=PDF_BYTES) as compile_pdf, \
+         patch.object(tools, "upload_bytes", return_value="https://signed/u1") as upload:
+        yield {"cache": cache, "compile": compile_pdf, "upload": upload}
+
+
+class TestBytesArtifactPath:
+
+    def test_compiled_bytes_are_uploaded_directly(self, pipeline, namespace_root):
+        result = tools.tailor_resume_from_text("u1", "Ada", {}, "JD")
+
+        uploaded = pipeline["upload"].call_args[0][0]
+        assert uploaded is PDF_BYTES
+        assert result["pdf_path"] == pipeline["cache"].local_path(pipeline["cache"].fingerprint("\\begin{document}Ada\\end{document}"))
+        assert open(result["pdf_path"], "rb").read() == PDF_BYTES
+        # Nothing staged in a temp namespace when the cache write succeeds
+        assert not os.path.exists(namespace_root) or os.listdir(namespace_root) == []
+
+    def test_corrupt_output_is_not_uploaded(self, pipeline):
+        pipeline["compile"].return_value = b"not a pdf" * 200
+        with pytest.raises(Exception, match="not a valid PDF"):
+            tools.tailor_resume_from_text("u1", "Ada", {}, "JD")
+        pipeline["upload"].assert_not_called()
+
+    def test_cache_disk_failure_falls_back_to_request_namespace(self, pipeline, namespace_root):
+        with patch.object(pipeline["cache"], "store_bytes", return_value=""):
+            result = tools.tailor_resume_from_text("u1", "Ada", {}, "JD")
+
+        assert result["pdf_path"].startswith(namespace_root)
+        assert open(result["pdf_path"], "rb").read() == PDF_BYTES
+
+
+class TestRequestNamespaces:
+
+    def test_same_filename_never_collides(self, namespace_root):
+        supabase = MagicMock()
+        supabase.storage.from_.return_value.download.side_effect = [b"first", b"second"]
+
+        with patch.object(tools, "create_client", return_value=supabase):
+            a = tools.download_file("u1", "u1.pdf")
+            b = tools.download_file("u1", "u1.pdf")
+
+        assert a != b
+        assert os.path.basename(a) == os.path.basename(b) == "download_u1.pdf"
+        assert open(a, "rb").read() == b"first" and open(b, "rb").read() == b"second"
+
+    def test_release_only_removes_namespaces(self, namespace_root, tmp_path):
+        path = workspace.request_file("../u1", "resume.pdf")
+        open(path, "wb").close()
+        assert os.path.dirname(os.path.dirname(path)) == namespace_root
+
+        outside = tmp_path / "keep.pdf"
+        outside.write_bytes(b"x")
+        workspace.release(str(outside))
+        workspace.release(path)
+
+        assert outside.exists()
+        assert not os.path.exists(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+"""
+Tests for the ATS score cache (services/ats_cache.py) and calculate_ats_score.
+
+Tests cover:
+- Whitespace-only differences share a key; prompt version / model do not
+- Repeat scoring of the same text skips the LLM
+- Concurrent identical requests make one LLM call (single-flight)
+- Failures are returned to every waiter and never cached
+- Redis tier survives a cold in-process cache
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+
+from services.ats_cache import ATSCache, normalize_resume_text
+from agents.agent_4_operative import tools
+
+
+RESUME = "Ada Lovelace\nSoftware Engineer\n\nSKILLS\nPython, FastAPI, Redis, PostgreSQL, Docker\n" * 3
+RESULT = {"score": 82, "missing_keywords": ["Kubernetes"], "summary": "Solid backend profile."}
+
+
+class FakeLLM:
+    def __init__(self, result=RESULT, delay=0.01, error=None):
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    async def __call__(self, text):
+        self.calls.append(text)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return dict(self.result)
+
+
+@pytest.fixture
+def cache():
+    cache = ATSCache()
+    with patch.object(tools, "ats_cache", cache), \
+         patch("services.ats_cache.redis_manager.get_client", return_value=None):
+        yield cache
+
+
+class TestFingerprint:
+
+    def test_whitespace_noise_shares_a_key(self):
+        noisy = "Ada Lovelace  \r\n\tSoftware   Engineer\n\n\n\nSKILLS\n"
+        clean = "Ada Lovelace\nSoftware Engineer\n\nSKILLS"
+        assert normalize_resume_text(noisy) == clean
+        assert ATSCache.fingerprint(clean, "v1") == ATSCache.fingerprint(normalize_resume_text(noisy), "v1")
+
+    def test_prompt_version_and_model_change_the_key(self):
+        base = ATSCache.fingerprint("text", "v1", "m")
+        assert ATSCache.fingerprint("text", "v2", "m") != base
+        assert ATSCache.fingerprint("text", "v1", "other") != base
+
+
+class TestCalculateAtsScore:
+
+    def test_repeat_text_is_served_from_cache(self, cache):
+        llm = FakeLLM()
+        with patch.object(tools, "_llm_ats_score", llm):
+            first = asyncio.run(tools.calculate_ats_score(RESUME))
+            second = asyncio.run(tools.calculate_ats_score(RESUME.replace("\n", "  \n")))
+
+        assert first == second == RESULT
+        assert len(llm.calls) == 1
+        assert cache.stats["memory_hits"] == 1
+
+    def test_concurrent_requests_share_one_call(self, cache):
+        llm = FakeLLM(delay=0.05)
+
+        async def _run():
+            return await asyncio.gather(*(tools.calculate_ats_score(RESUME) for _ in range(5)))
+
+        with patch.object(tools, "_llm_ats_score", llm):
+            results = asyncio.run(_run())
+
+        assert len(llm.calls) == 1
+        assert all(r == RESULT for r in results)
+        assert cache.stats["coalesced"] == 4
+        # Callers get independent copies
+        results[0]["score"] = 0
+        assert results[1]["score"] == 82
+
+    def test_failures_reach_waiters_and_are_not_cached(self, cache):
+        failing = FakeLLM(delay=0.02, error=RuntimeError("quota"))
+
+        async def _run():
+            return await asyncio.gather(*(tools.calculate_ats_score(RESUME) for _ in range(3)))
+
+        with patch.object(tools, "_llm_ats_score", failing):
+            results = asyncio.run(_run())
+        assert len(failing.calls) == 1
+        assert all(r["summary"] == "Error during analysis." for r in results)
+
+        llm = FakeLLM()
+        with patch.object(tools, "_llm_ats_score", llm):
+            assert asyncio.run(tools.calculate_ats_score(RESUME))["score"] == 82
+        assert len(llm.calls) == 1
+
+    def test_short_text_skips_cache_and_llm(self, cache):
+        llm = FakeLLM()
+        with patch.object(tools, "_llm_ats_score", llm):
+            result = asyncio.run(tools.calculate_ats_score("too short"))
+        assert result["score"] == 0 and llm.calls == []
+
+    def test_redis_tier_survives_cold_memory(self):
+        store = {}
+        redis = MagicMock()
+        redis.get.side_effect = store.get
+        redis.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+        llm = FakeLLM()
+
+        with patch("services.ats_cache.redis_manager.get_client", return_value=redis), \
+             patch.object(tools, "_llm_ats_score", llm):
+            with patch.object(tools, "ats_cache", ATSCache()):
+                asyncio.run(tools.calculate_ats_score(RESUME))
+            fresh = ATSCache()
+            with patch.object(tools, "ats_cache", fresh):
+                assert asyncio.run(tools.calculate_ats_score(RESUME)) == RESULT
+
+        assert len(llm.calls) == 1
+        assert fresh.stats["redis_hits"] == 1
+        assert all(key.startswith("ats_score:") for key in store)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
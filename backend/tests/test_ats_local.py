@@ -0,0 +1,143 @@
+"""
+Tests for the deterministic local ATS pre-scorer and the provisional flow.
+
+Tests cover:
+- Skill extraction (aliases, longest match, ambiguous short names)
+- Scores are deterministic and reward sections, keywords and formatting
+- Job description coverage drives missing keywords
+- quick_ats_score prefers a cached LLM score and never calls the LLM
+- The ATS endpoint's provisional mode
+- Background refinement only overwrites the score for the same resume
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agents.agent_4_operative import tools, service, router as agent4_router_module
+from agents.agent_4_operative.ats_local import score_resume_locally, extract_skills
+from services.ats_cache import ATSCache
+from services.cache_service import cache_service
+
+
+STRONG = """Ada Lovelace
+ada@example.com | +44 20 7946 0958
+
+Summary
+Backend engineer building data-heavy APIs.
+
+Experience
+Senior Software Engineer, Analytical Engines Ltd (2019 - 2024)
+- Built FastAPI microservices on PostgreSQL and Redis serving 40000 users
+- Cut p99 latency by 35% with caching and query tuning
+- Moved deploys to Docker and Kubernetes with GitHub Actions CI/CD
+- Led code reviews for a team of 6 engineers
+- Reduced cloud spend by $120k per year on AWS
+
+Education
+B.Sc. Mathematics, University of London (2015 - 2019)
+
+Skills
+Python, Go, SQL, FastAPI, Django, PostgreSQL, Redis, Kafka, Docker, Kubernetes, AWS, Terraform, Linux, Git
+
+Projects
+- Open-source job queue in Python with 1200+ GitHub stars
+""" + "Delivered features end to end with product and design partners. " * 25
+
+SPARSE = "Ada Lovelace\nI am a hard working person who likes computers and wants a job in technology. " * 2
+
+
+class TestExtractSkills:
+
+    def test_aliases_and_longest_match(self):
+        skills = extract_skills("Shipped apps in React Native, k8s and Postgres; ML with sklearn")
+        assert skills == ["React Native", "Kubernetes", "PostgreSQL", "Machine Learning", "scikit-learn"]
+
+    def test_ambiguous_names_need_a_list_context(self):
+        assert extract_skills("I like to go hiking and rest on weekends with the team") == []
+        assert extract_skills("Languages: C, R, Go") == ["C", "R", "Go"]
+
+
+class TestLocalScore:
+
+    def test_deterministic_and_ranked(self):
+        strong = score_resume_locally(STRONG)
+        assert strong == score_resume_locally(STRONG)
+        assert strong["provisional"] is True
+        assert strong["score"] >= 85
+        assert score_resume_locally(SPARSE)["score"] < 25
+        breakdown = strong["breakdown"]
+        assert strong["score"] == breakdown["keywords"] + breakdown["sections"] + breakdown["formatting"]
+
+    def test_job_description_coverage(self):
+        jd = "We use Python, Rust, Kubernetes and Snowflake. Experience with gRPC is a plus."
+        result = score_resume_locally(STRONG, jd)
+        assert result["missing_keywords"] == ["Rust", "Snowflake", "gRPC"]
+        assert result["breakdown"]["keywords"] == round(45 * 2 / 5)
+        assert "2/5 job skills matched" in result["summary"]
+
+    def test_missing_sections_are_reported(self):
+        result = score_resume_locally(SPARSE)
+        assert "missing sections: experience, education, skills, projects, summary" in result["summary"]
+
+
+class TestQuickAtsScore:
+
+    @pytest.fixture
+    def cache(self):
+        cache = ATSCache()
+        with patch.object(tools, "ats_cache", cache), \
+             patch("services.ats_cache.redis_manager.get_client", return_value=None):
+            yield cache
+
+    def test_provisional_without_llm(self, cache):
+        with patch.object(tools, "_llm_ats_score") as llm:
+            result = tools.quick_ats_score(STRONG)
+        llm.assert_not_called()
+        assert result["provisional"] is True and result["score"] == score_resume_locally(STRONG)["score"]
+
+    def test_prefers_cached_llm_score(self, cache):
+        with patch.object(tools, "_llm_ats_score", AsyncMock(return_value={"score": 71, "missing_keywords": [], "summary": "LLM"})):
+            asyncio.run(tools.calculate_ats_score(STRONG))
+        result = tools.quick_ats_score(STRONG)
+        assert result["score"] == 71 and result["provisional"] is False
+
+    def test_endpoint_provisional_mode(self, cache):
+        app = FastAPI()
+        app.include_router(agent4_router_module.agent4_router)
+        client = TestClient(app)
+
+        with patch.object(tools, "_llm_ats_score") as llm:
+            body = client.post("/agent4/ats-score", json={"resume_text": STRONG, "provisional": True}).json()
+        llm.assert_not_called()
+        assert body["provisional"] is True and body["score"] >= 85
+
+
+class TestAtsRefinementJob:
+
+    def run_job(self, stored_text):
+        supabase = MagicMock()
+        supabase.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [{"resume_text": stored_text}]
+        payload = {"user_id": "u1", "resume_text": STRONG, "resume_hash": cache_service.content_fingerprint(STRONG)}
+        with patch.object(service, "llm_ats_score", AsyncMock(return_value={"score": 77})), \
+             patch.object(service, "create_client", return_value=supabase), \
+             patch.object(service.cache_service, "delete_profile") as invalidate:
+            result = asyncio.run(service.ats_refinement_job(payload, MagicMock()))
+        return result, supabase, invalidate
+
+    def test_saves_llm_score_for_same_resume(self):
+        result, supabase, invalidate = self.run_job(STRONG)
+        assert result == {"score": 77, "saved": True}
+        supabase.table.return_value.update.assert_called_once_with({"ATS_SCORE": "77"})
+        invalidate.assert_called_once_with("u1")
+
+    def test_skips_when_resume_changed(self):
+        result, supabase, _ = self.run_job("A completely different resume")
+        assert result["saved"] is False
+        supabase.table.return_value.update.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+"""
+Unit tests for the voice WebSocket codec layer.
+
+Fixtures are encoded locally: MP3 streams are assembled frame by frame,
+Ogg Opus streams are muxed with OggOpusWriter and WAV files use `wave`.
+
+Tests cover:
+- Codec negotiation and legacy fallback
+- Frame-accurate durations for MP3 / Ogg Opus / WAV / PCM
+- Opus upstream framing (level prefix, Ogg muxing, duration)
+"""
+
+import io
+import math
+import struct
+import wave
+import pytest
+
+from services.audio_codec import (
+    negotiate_input_codec,
+    negotiate_output_format,
+    audio_duration,
+    mp3_duration,
+    ogg_opus_duration,
+    opus_packet_samples,
+    OggOpusWriter,
+    PcmUpstream,
+    OpusUpstream,
+    create_upstream,
+    pcm_rms,
+)
+
+
+# =============================================================================
+# Fixture encoders
+# =============================================================================
+
+def mp3_frames(count: int, xing: bool = False, id3: bool = False) -> bytes:
+    """MPEG-2 Layer III, 24 kHz, 32 kbps mono: 96-byte frames of 576 samples (24 ms)."""
+    header = bytes([0xFF, 0xF3, 0x44, 0xC4])
+    frame = header + b"\x00" * 92
+    out = b""
+    if id3:
+        out += b"ID3\x04\x00\x00" + bytes([0, 0, 0, 20]) + b"\x00" * 20
+    if xing:
+        out += header + b"\x00" * 9 + b"Xing" + b"\x00" * 79
+    return out + frame * count
+
+
+def opus_packet(frame_ms: int = 20) -> bytes:
+    """SILK wideband packet with one frame of the given size (code 0)."""
+    config = 8 + (10, 20, 40, 60).index(frame_ms)
+    return bytes([config << 3]) + b"\x00" * 40
+
+
+def wav_bytes(seconds: float, rate: int = 24000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def pcm_tone(samples: int, amplitude: int) -> bytes:
+    return struct.pack(f"<{samples}h", *[int(amplitude * math.sin(i / 5)) for i in range(samples)])
+
+
+# =============================================================================
+# Tests
+# =============================================================================
+
+class TestNegotiation:
+
+    def test_first_supported_offer_wins(self):
+        assert negotiate_input_codec(["flac", "opus", "pcm"]) == "opus"
+        assert negotiate_output_format(["OGG_OPUS", "mp3"]) == "ogg_opus"
+
+    def test_legacy_clients_get_pcm_and_mp3(self):
+        assert negotiate_input_codec(None) == "pcm"
+        assert negotiate_output_format(["aac"]) == "mp3"
+
+
+class TestDurations:
+
+    def test_mp3_duration_is_frame_accurate(self):
+        clip = mp3_frames(125)  # 125 * 24 ms
+        assert mp3_duration(clip) == pytest.approx(3.0)
+        # The old bytes/32000 estimate was off by 8x for this clip
+        assert len(clip) / 32000.0 == pytest.approx(0.375)
+
+    def test_mp3_skips_id3_and_xing_header(self):
+        assert mp3_duration(mp3_frames(50, xing=True, id3=True)) == pytest.approx(1.2)
+
+    def test_mp3_ignores_truncated_trailing_frame(self):
+        assert mp3_duration(mp3_frames(10)[:-10]) == pytest.approx(0.216)
+
+    def test_ogg_opus_duration_excludes_pre_skip(self):
+        stream = OggOpusWriter().write([opus_packet(20)] * 100)
+        assert ogg_opus_duration(stream) == pytest.approx((96000 - 312) / 48000)
+
+    def test_wav_and_pcm(self):
+        assert audio_duration(wav_bytes(1.5), "linear16") == pytest.approx(1.5)
+        assert audio_duration(b"\x00" * 32000, "pcm") == pytest.approx(1.0)
+        assert audio_duration(b"", "mp3") == 0.0
+
+    def test_opus_toc_frame_counts(self):
+        assert opus_packet_samples(opus_packet(60)) == 2880
+        # CELT 20 ms, code 3 with 3 frames
+        assert opus_packet_samples(bytes([(19 << 3) | 3, 3])) == 2880
+
+
+class TestUpstream:
+
+    def test_pcm_upstream_matches_legacy_buffering(self):
+        upstream = create_upstream("pcm")
+        chunk = pcm_tone(1600, 3000)
+        level = upstream.feed(chunk)
+
+        assert isinstance(upstream, PcmUpstream)
+        assert level == pytest.approx(pcm_rms(chunk))
+        assert upstream.payload() == chunk
+        assert upstream.duration == pytest.approx(0.1)
+
+    def test_opus_upstream_reads_level_and_muxes_ogg(self):
+        upstream = create_upstream("opus")
+        assert isinstance(upstream, OpusUpstream)
+
+        for level in (900, 100):
+            assert upstream.feed(struct.pack(">H", level) + opus_packet(20)) == level
+
+        payload = upstream.payload()
+        assert payload.startswith(b"OggS")
+        assert b"OpusHead" in payload[:64]
+        assert upstream.duration == pytest.approx(0.04)
+        assert ogg_opus_duration(payload) == pytest.approx((1920 - 312) / 48000)
+
+        upstream.clear()
+        assert len(upstream) == 0 and upstream.payload() == b""
+
+    def test_opus_is_smaller_than_pcm_for_same_audio(self):
+        pcm, opus = PcmUpstream(), OpusUpstream()
+        for _ in range(50):  # one second
+            pcm.feed(b"\x00" * 640)
+            opus.feed(struct.pack(">H", 0) + opus_packet(20))
+
+        assert pcm.duration == pytest.approx(opus.duration)
+        assert len(opus) * 4 < len(pcm)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
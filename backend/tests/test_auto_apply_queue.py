@@ -0,0 +1,326 @@
+"""
+Tests for queued auto-apply (Agent 4).
+
+Uses the local in-process queue backend; the browser agent is replaced by an
+async fake so no Chromium is needed.
+
+Tests cover:
+- JobDeferred re-queues a job without spending a retry
+- Per-domain concurrency and start spacing (local and Redis limiters)
+- Bulk runs to one site are spaced out while other sites keep flowing
+- Transient failures retry, page-reported failures do not
+- Application status is saved on submit and on the final outcome,
+  including when the last attempt raises
+- Submit / batch / poll endpoints and per-user visibility; a batch with an
+  invalid URL queues nothing
+- The inline /auto-apply endpoints run on the shared browser loop
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.job_queue import JobQueue, LocalQueueBackend, JobStatus, JobDeferred
+from auth.dependencies import get_current_user
+from agents.agent_4_operative import apply_queue, router as agent4_router_module
+from agents.agent_4_operative.apply_queue import DomainLimiter, BrowserLoop, target_domain
+
+
+USER = {"sub": "11111111-1111-1111-1111-111111111111"}
+
+
+class FakeRedis:
+    """Just the commands DomainLimiter uses, with real PX expiry."""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    def _alive(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.values
+
+    def incr(self, key):
+        self._alive(key)
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def decr(self, key):
+        self._alive(key)
+        self.values[key] = int(self.values.get(key, 0)) - 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        self.expiry[key] = time.time() + seconds
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self._alive(key):
+            return None
+        self.values[key] = value
+        if px:
+            self.expiry[key] = time.time() + px / 1000
+        return True
+
+    def pttl(self, key):
+        if not self._alive(key):
+            return -2
+        return int((self.expiry[key] - time.time()) * 1000) if key in self.expiry else -1
+
+    def delete(self, key):
+        self.values.pop(key, None)
+        self.expiry.pop(key, None)
+
+
+class FakeApply:
+    """Async stand-in for run_auto_apply that records start times per URL."""
+
+    def __init__(self, results=None, hold=0.0):
+        self.results = list(results or [])
+        self.hold = hold
+        self.starts = []
+
+    async def __call__(self, job_url, user_data, resume_path=None, **kwargs):
+        self.starts.append((job_url, time.monotonic(), threading.current_thread().name))
+        await asyncio.sleep(self.hold)
+        if self.results:
+            return self.results.pop(0)
+        return {"success": True, "job_url": job_url, "message": "Auto-fill completed.", "details": "filled", "retryable": False}
+
+
+def failure(message, retryable):
+    return {"success": False, "job_url": "", "message": message, "details": message, "retryable": retryable}
+
+
+@pytest.fixture
+def local_apply(tmp_path):
+    queue = JobQueue("auto_apply_test", backend=LocalQueueBackend(), workers=3)
+    queue.register(apply_queue.AUTO_APPLY_JOB_TYPE, apply_queue.auto_apply_job)
+    limiter = DomainLimiter(concurrency=1, min_interval=0.0, jitter=0.0, busy_defer=0.01)
+    loop = BrowserLoop()
+    with patch.object(apply_queue, "auto_apply_queue", queue), \
+         patch.object(agent4_router_module, "auto_apply_queue", queue), \
+         patch.object(apply_queue, "domain_limiter", limiter), \
+         patch.object(apply_queue, "browser_loop", loop), \
+         patch("agents.agent_4_operative.apply_queue.redis_manager.get_client", return_value=None), \
+         patch.object(apply_queue, "download_file", side_effect=FileNotFoundError("no resume")), \
+         patch.object(apply_queue, "save_application_status") as save, \
+         patch("services.job_queue.JOB_RETRY_BASE_DELAY", 0.0):
+        yield {"queue": queue, "limiter": limiter, "save": save}
+    loop.stop()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(agent4_router_module.agent4_router)
+    app.dependency_overrides[get_current_user] = lambda: USER
+    return TestClient(app)
+
+
+def drain(queue, timeout=0.05):
+    while queue.run_once(timeout=timeout):
+        pass
+
+
+class TestJobDeferred:
+
+    def test_deferral_does_not_spend_retries(self):
+        queue = JobQueue("defer", backend=LocalQueueBackend(), workers=1)
+        calls = []
+
+        def handler(payload, ctx):
+            calls.append(ctx.attempt)
+            if len(calls) < 4:
+                raise JobDeferred(0.0, "not yet")
+            return {"ok": True}
+
+        queue.register("deferred", handler)
+        job_id = queue.submit("deferred", {}, max_retries=0)
+        drain(queue)
+
+        job = queue.get(job_id)
+        assert job["status"] == JobStatus.SUCCEEDED
+        assert job["attempts"] == 1 and job["deferrals"] == 3
+        assert calls == [1, 1, 1, 1]
+
+
+class TestDomainLimiter:
+
+    def test_target_domain(self):
+        assert target_domain("https://www.Greenhouse.io/jobs/1") == "greenhouse.io"
+        assert target_domain("jobs.lever.co/acme/2") == "jobs.lever.co"
+        assert target_domain("not a url") == ""
+
+    def test_local_concurrency_and_spacing(self):
+        limiter = DomainLimiter(concurrency=1, min_interval=0.05, jitter=0.0, busy_defer=1.0)
+        assert limiter.try_acquire("a.com") == 0.0
+        assert limiter.try_acquire("a.com") == 1.0  # busy
+        assert limiter.try_acquire("b.com") == 0.0  # other sites unaffected
+        limiter.release("a.com")
+        wait = limiter.try_acquire("a.com")
+        assert 0 < wait <= 0.05  # free, but too soon after the last start
+        time.sleep(wait)
+        assert limiter.try_acquire("a.com") == 0.0
+
+    def test_redis_limits_are_shared(self):
+        redis = FakeRedis()
+        first = DomainLimiter(concurrency=1, min_interval=0.05, jitter=0.0, busy_defer=1.0)
+        second = DomainLimiter(concurrency=1, min_interval=0.05, jitter=0.0, busy_defer=1.0)
+        with patch("agents.agent_4_operative.apply_queue.redis_manager.get_client", return_value=redis):
+            assert first.try_acquire("a.com") == 0.0
+            assert second.try_acquire("a.com") == 1.0  # another replica holds the slot
+            first.release("a.com")
+            wait = second.try_acquire("a.com")
+            assert 0 < wait <= 0.1
+            assert redis.values["apply_domain:a.com:active"] == 0
+            time.sleep(0.06)
+            assert second.try_acquire("a.com") == 0.0
+
+
+class TestAutoApplyJobs:
+
+    def test_bulk_run_spaces_each_domain(self, local_apply):
+        local_apply["limiter"].min_interval = 0.05
+        fake = FakeApply(hold=0.01)
+        urls = [f"https://{site}/jobs/{i}" for i in range(3) for site in ("a.com", "b.com", "c.com")]
+        with patch.object(apply_queue, "run_auto_apply", fake):
+            ids = [apply_queue.enqueue_auto_apply("u1", url, {"name": "Ada"}) for url in urls]
+            local_apply["queue"].start()
+            try:
+                jobs = [local_apply["queue"].wait(job_id, timeout=5) for job_id in ids]
+            finally:
+                local_apply["queue"].stop()
+
+        assert all(job["status"] == JobStatus.SUCCEEDED for job in jobs)
+        assert all(job["attempts"] == 1 for job in jobs)
+        # Every browser run shared one loop (and so one pooled Chromium)
+        assert {thread for _, _, thread in fake.starts} == {"auto-apply-loop"}
+        for site in ("a.com", "b.com", "c.com"):
+            starts = sorted(at for url, at, _ in fake.starts if site in url)
+            assert len(starts) == 3
+            assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
+
+    def test_status_saved_on_submit_and_outcome(self, local_apply):
+        with patch.object(apply_queue, "run_auto_apply", FakeApply()):
+            job_id = apply_queue.enqueue_auto_apply("u1", "https://a.com/jobs/1", {"name": "Ada"}, job_id="42")
+            drain(local_apply["queue"])
+
+        saves = local_apply["save"].call_args_list
+        assert [c.args[2] for c in saves] == ["queued", "success"]
+        assert saves[0].args[3]["apply_job_id"] == job_id
+        assert saves[1].args[:2] == ("u1", "42") and saves[1].args[3]["attempts"] == 1
+
+    def test_transient_failure_is_retried(self, local_apply):
+        fake = FakeApply(results=[failure("Browser crashed", retryable=True)])
+        with patch.object(apply_queue, "run_auto_apply", fake):
+            job_id = apply_queue.enqueue_auto_apply("u1", "https://a.com/jobs/1", {}, job_id="42")
+            drain(local_apply["queue"])
+
+        job = local_apply["queue"].get(job_id)
+        assert job["status"] == JobStatus.SUCCEEDED and job["attempts"] == 2
+        assert [c.args[2] for c in local_apply["save"].call_args_list] == ["queued", "success"]
+
+    def test_page_failure_is_not_retried(self, local_apply):
+        fake = FakeApply(results=[failure("Captcha required", retryable=False)])
+        with patch.object(apply_queue, "run_auto_apply", fake):
+            job_id = apply_queue.enqueue_auto_apply("u1", "https://a.com/jobs/1", {}, job_id="42")
+            drain(local_apply["queue"])
+
+        job = local_apply["queue"].get(job_id)
+        assert job["status"] == JobStatus.SUCCEEDED and job["attempts"] == 1
+        assert job["result"]["success"] is False
+        assert local_apply["save"].call_args_list[-1].args[2] == "failed"
+
+    def test_last_attempt_records_failure(self, local_apply):
+        results = [failure("Timed out", retryable=True)] * (apply_queue.AUTO_APPLY_MAX_RETRIES + 1)
+        with patch.object(apply_queue, "run_auto_apply", FakeApply(results=results)):
+            job_id = apply_queue.enqueue_auto_apply("u1", "https://a.com/jobs/1", {}, job_id="42")
+            drain(local_apply["queue"])
+
+        job = local_apply["queue"].get(job_id)
+        assert job["attempts"] == apply_queue.AUTO_APPLY_MAX_RETRIES + 1
+        assert job["result"]["message"] == "Timed out"
+        assert [c.args[2] for c in local_apply["save"].call_args_list] == ["queued", "failed"]
+        # The domain slot is returned after every attempt
+        assert local_apply["limiter"]._active["a.com"] == 0
+
+    def test_last_attempt_exception_records_failure(self, local_apply):
+        def timed_out(coro, timeout=None):
+            coro.close()
+            raise TimeoutError(f"Auto-apply timed out after {timeout:.0f}s")
+
+        with patch.object(apply_queue, "run_auto_apply", FakeApply()), \
+             patch.object(apply_queue.browser_loop, "run", side_effect=timed_out):
+            job_id = local_apply["queue"].submit(apply_queue.AUTO_APPLY_JOB_TYPE, {
+                "user_id": "u1", "job_id": "42", "job_url": "https://a.com/jobs/1", "domain": "a.com", "user_data": {}
+            }, max_retries=1)
+            drain(local_apply["queue"])
+
+        assert local_apply["queue"].get(job_id)["status"] == JobStatus.FAILED
+        saves = local_apply["save"].call_args_list
+        # Only the final attempt records the outcome
+        assert [c.args[2] for c in saves] == ["failed"]
+        assert "timed out" in saves[0].args[3]["message"] and saves[0].args[3]["attempts"] == 2
+        assert local_apply["limiter"]._active["a.com"] == 0
+
+
+class TestAutoApplyApi:
+
+    def test_submit_and_poll(self, local_apply, client):
+        with patch.object(apply_queue, "run_auto_apply", FakeApply()) as fake:
+            response = client.post("/agent4/auto-apply/jobs", json={"job_url": "https://www.a.com/jobs/1", "user_data": {"name": "Ada"}})
+            assert response.status_code == 202
+            body = response.json()
+            assert body["domain"] == "a.com" and fake.starts == []
+
+            assert client.get(body["status_url"]).json()["status"] == JobStatus.QUEUED
+            drain(local_apply["queue"])
+
+        polled = client.get(body["status_url"]).json()
+        assert polled["status"] == JobStatus.SUCCEEDED
+        assert polled["job_url"] == "https://www.a.com/jobs/1"
+        assert polled["result"]["success"] is True
+
+    def test_batch_returns_ids_in_order(self, local_apply, client):
+        jobs = [{"job_url": f"https://{site}/jobs/1", "user_data": {}} for site in ("a.com", "b.com")]
+        response = client.post("/agent4/auto-apply/jobs/batch", json={"jobs": jobs})
+
+        assert response.status_code == 202
+        assert [j["domain"] for j in response.json()["jobs"]] == ["a.com", "b.com"]
+
+    def test_batch_with_invalid_url_queues_nothing(self, local_apply, client):
+        jobs = [{"job_url": "https://a.com/jobs/1", "user_data": {}, "job_id": "42"}, {"job_url": "not a url", "user_data": {}}]
+        response = client.post("/agent4/auto-apply/jobs/batch", json={"jobs": jobs})
+
+        assert response.status_code == 400
+        assert local_apply["queue"].run_once(timeout=0.05) is False
+        local_apply["save"].assert_not_called()
+
+    def test_invalid_url_and_other_users(self, local_apply, client):
+        assert client.post("/agent4/auto-apply/jobs", json={"job_url": "not a url", "user_data": {}}).status_code == 400
+
+        job_id = client.post("/agent4/auto-apply/jobs", json={"job_url": "https://a.com/1", "user_data": {}}).json()["job_id"]
+        client.app.dependency_overrides[get_current_user] = lambda: {"sub": "someone-else"}
+        assert client.get(f"/agent4/auto-apply/jobs/{job_id}").status_code == 404
+
+    def test_inline_endpoints_run_on_the_browser_loop(self, local_apply, client):
+        client.app.include_router(agent4_router_module.operative_router)
+        fake = FakeApply()
+        with patch.object(agent4_router_module, "browser_loop", apply_queue.browser_loop), \
+             patch.object(agent4_router_module, "run_auto_apply", fake):
+            for path in ("/agent4/auto-apply", "/api/operative/auto-apply"):
+                response = client.post(path, json={"job_url": "https://a.com/jobs/1", "user_data": {"name": "Ada"}})
+                assert response.status_code == 200 and response.json()["success"] is True
+
+        # Same thread (and loop) as queued jobs, so the pooled browser is shared
+        assert [thread for _, _, thread in fake.starts] == ["auto-apply-loop"] * 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
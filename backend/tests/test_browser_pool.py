@@ -0,0 +1,234 @@
+"""
+Unit tests for the auto-apply browser pool (Agent 4).
+
+A fake launcher stands in for Playwright; tests/bench_browser_pool.py
+measures real Chromium against a local test page.
+
+Tests cover:
+- One Chromium serves many applications, each in its own context
+- Max-concurrency gate and BrowserPoolBusy
+- Idle eviction, recycling after max uses, relaunch after a crash
+- Exclusive leases are serialized
+- Moving to a new event loop closes the old browser on its own loop
+- run_auto_apply leases from the pool and no longer leaks browsers
+"""
+
+import sys
+import types
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+
+from agents.agent_4_operative.browser_pool import BrowserPool, BrowserPoolBusy
+from agents.agent_4_operative.apply_queue import BrowserLoop
+from agents.agent_4_operative import tools
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+
+class FakeLauncher:
+    def __init__(self):
+        self.browsers = []
+
+    async def __call__(self):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+
+        async def close():
+            browser.closed = True
+        return browser, "http://127.0.0.1:9222", close
+
+
+def make_pool(**kwargs):
+    launcher = FakeLauncher()
+    options = {"max_contexts": 2, "idle_timeout": 60, "max_uses": 100, "acquire_timeout": 1, **kwargs}
+    return BrowserPool(launcher=launcher, **options), launcher
+
+
+class TestBrowserPool:
+
+    def test_one_browser_isolated_contexts(self):
+        pool, launcher = make_pool()
+
+        async def _run():
+            leases = []
+            for _ in range(3):
+                async with pool.context() as lease:
+                    leases.append(lease.context)
+            return leases
+
+        contexts = asyncio.run(_run())
+
+        assert len(launcher.browsers) == 1
+        assert len(set(map(id, contexts))) == 3
+        assert all(c.closed for c in contexts)
+        assert pool.snapshot()["contexts"] == 3 and pool.active == 0
+
+    def test_concurrency_gate(self):
+        pool, _ = make_pool(max_contexts=2, acquire_timeout=0.05)
+        peak = {"active": 0}
+
+        async def apply(hold):
+            async with pool.context():
+                peak["active"] = max(peak["active"], pool.active)
+                await hold.wait()
+
+        async def _run():
+            hold = asyncio.Event()
+            tasks = [asyncio.create_task(apply(hold)) for _ in range(2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(BrowserPoolBusy):
+                async with pool.context():
+                    pass
+            hold.set()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(_run())
+        assert peak["active"] == 2
+        assert pool.stats["rejected"] == 1
+
+    def test_idle_browser_is_evicted_and_relaunched(self):
+        pool, launcher = make_pool(idle_timeout=0.02)
+
+        async def _run():
+            async with pool.context():
+                pass
+            await asyncio.sleep(0.05)
+            evicted = launcher.browsers[0].closed
+            async with pool.context():
+                pass
+            return evicted
+
+        assert asyncio.run(_run()) is True
+        assert len(launcher.browsers) == 2
+        assert pool.stats["evictions"] == 1
+
+    def test_recycle_after_max_uses_and_relaunch_after_crash(self):
+        pool, launcher = make_pool(max_uses=2)
+
+        async def _run():
+            for _ in range(3):
+                async with pool.context():
+                    pass
+            launcher.browsers[-1].connected = False
+            async with pool.context():
+                pass
+
+        asyncio.run(_run())
+        assert len(launcher.browsers) == 3
+        assert launcher.browsers[0].closed
+        assert pool.stats["recycles"] == 1
+
+    def test_exclusive_leases_are_serialized(self):
+        pool, _ = make_pool(max_contexts=3)
+        peak = {"exclusive": 0, "now": 0}
+
+        async def apply():
+            async with pool.context(exclusive=True):
+                peak["now"] += 1
+                peak["exclusive"] = max(peak["exclusive"], peak["now"])
+                await asyncio.sleep(0.01)
+                peak["now"] -= 1
+
+        async def _run():
+            await asyncio.gather(*(apply() for _ in range(3)))
+
+        asyncio.run(_run())
+        assert peak["exclusive"] == 1
+
+    def test_new_loop_closes_the_old_browser_on_its_loop(self):
+        pool, launcher = make_pool()
+        first, second = BrowserLoop(), BrowserLoop()
+
+        async def apply():
+            async with pool.context():
+                pass
+
+        try:
+            first.run(apply())
+            second.run(apply())
+            first.run(asyncio.sleep(0.01))  # Let the scheduled close run on the first loop
+            assert launcher.browsers[0].closed and not launcher.browsers[1].closed
+            first.run(apply())
+            second.run(asyncio.sleep(0.01))
+            first.run(pool.close())
+        finally:
+            first.stop()
+            second.stop()
+
+        assert len(launcher.browsers) == 3
+        assert all(b.closed for b in launcher.browsers)
+
+
+class TestRunAutoApply:
+
+    @pytest.fixture
+    def browser_use(self):
+        llm_module = types.ModuleType("browser_use.llm.google")
+        llm_module.ChatGoogle = MagicMock()
+        history = MagicMock()
+        history.final_result.return_value = "Filled name and email"
+
+        agent_cls = MagicMock()
+        agent_cls.return_value.run = MagicMock(side_effect=lambda: asyncio.sleep(0, result=history))
+        browser_cls = MagicMock()
+        browser_cls.model_fields = {"browser_context": None}
+
+        with patch.dict(sys.modules, {"browser_use.llm": types.ModuleType("browser_use.llm"), "browser_use.llm.google": llm_module}), \
+             patch.object(tools, "BROWSER_USE_AVAILABLE", True), \
+             patch.object(tools, "Agent", agent_cls, create=True), \
+             patch.object(tools, "Browser", browser_cls, create=True):
+            yield {"agent": agent_cls, "browser": browser_cls}
+
+    def test_applications_share_one_browser(self, browser_use):
+        pool, launcher = make_pool()
+
+        async def _run():
+            return [await tools.run_auto_apply("https://jobs.example.com/1", {"name": "Ada"}) for _ in range(2)]
+
+        with patch.object(tools, "browser_pool", pool):
+            results = asyncio.run(_run())
+
+        assert all(r["success"] for r in results)
+        assert len(launcher.browsers) == 1
+        assert not hasattr(tools, "_global_browser_refs")
+        # Each agent got its own pooled context, and the pool keeps Chromium
+        contexts = [c.kwargs["browser_context"] for c in browser_use["browser"].call_args_list]
+        assert len(set(map(id, contexts))) == 2 and all(c.closed for c in contexts)
+        assert all(c.kwargs["keep_alive"] is True for c in browser_use["browser"].call_args_list)
+
+    def test_busy_pool_reports_failure(self, browser_use):
+        pool = MagicMock()
+        pool.context.side_effect = BrowserPoolBusy("All 2 browser contexts are in use")
+
+        with patch.object(tools, "browser_pool", pool):
+            result = asyncio.run(tools.run_auto_apply("https://jobs.example.com/1", {"name": "Ada"}))
+
+        assert result["success"] is False
+        assert "capacity" in result["message"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,159 @@
+"""
+Unit tests for DocxSurgeon section editing (Agent 4).
+
+Documents are built with python-docx; tests/bench_docx_edit.py compares the
+single-pass editor against per-edit rescans on large resumes.
+
+Tests cover:
+- Section index: boundaries, header matching and table cells
+- All edits applied in one pass with the old content's font preserved
+- Sections that are not edited stay intact
+- Overlapping section spans are clipped, never edited twice
+- Table-cell fallback, in-memory bytes API and replace_section_content
+"""
+
+import io
+import pytest
+from docx import Document
+from docx.shared import Pt
+
+from agents.agent_4_operative.docx_engine import DocxSurgeon, SectionIndex
+
+
+def build_resume(with_table=False):
+    doc = Document()
+    doc.add_paragraph("Ada Lovelace")
+    for header, lines in [
+        ("EXPERIENCE", ["Analyst, Engine Co - built the difference engine", "Wrote the first program"]),
+        ("PROJECTS", ["Bernoulli numbers", "Loom cards"]),
+        ("SKILLS", ["Mathematics, Python"]),
+        ("EDUCATION", ["Home tutored"]),
+    ]:
+        doc.add_paragraph(header)
+        for line in lines:
+            run = doc.add_paragraph().add_run(line)
+            run.font.name = "Garamond"
+            run.font.size = Pt(10)
+    if with_table:
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "CERTIFICATIONS"
+        table.cell(0, 1).text = "AWS"
+    return doc
+
+
+def texts(doc):
+    return [p.text for p in doc.paragraphs]
+
+
+class TestSectionIndex:
+
+    def test_index_finds_sections_and_boundaries(self):
+        index = SectionIndex(build_resume(with_table=True))
+
+        assert [index.texts[i] for i in index.boundaries] == ["EXPERIENCE", "PROJECTS", "SKILLS", "EDUCATION"]
+        assert index.find_paragraph_section("PROJECTS", []) == (4, 7)
+        assert index.find_paragraph_section("EDUCATION", []) == (9, 11)
+        assert index.find_paragraph_section("PROJECTS", [(4, 7)]) is None
+        assert index.find_cell("CERTIFICATIONS") is not None
+
+
+class TestApplyEdits:
+
+    def test_all_edits_applied_in_one_pass(self):
+        doc = build_resume()
+        applied = DocxSurgeon().apply_edits(doc, [
+            {"section": "experience", "content": "Led **analytics** team"},
+            {"section": "SKILLS", "content": "Python, Rust"},
+        ])
+
+        assert applied == 2
+        assert texts(doc) == [
+            "Ada Lovelace",
+            "EXPERIENCE", "Led analytics team",
+            "PROJECTS", "Bernoulli numbers", "Loom cards",
+            "SKILLS", "Python, Rust",
+            "EDUCATION", "Home tutored",
+        ]
+
+    def test_style_comes_from_old_content(self):
+        doc = build_resume()
+        DocxSurgeon().apply_edits(doc, [{"section": "PROJECTS", "content": "New project"}])
+
+        run = doc.paragraphs[5].runs[0]
+        assert run.font.name == "Garamond"
+        assert run.font.size == Pt(10)
+
+    def test_table_cell_fallback(self):
+        doc = build_resume(with_table=True)
+        applied = DocxSurgeon().apply_edits(doc, [{"section": "CERTIFICATIONS", "content": "GCP"}])
+
+        assert applied == 1
+        assert doc.tables[0].cell(0, 0).text == "CERTIFICATIONS\nGCP"
+
+    def test_unknown_section_is_skipped(self):
+        doc = build_resume()
+        assert DocxSurgeon().apply_edits(doc, [{"section": "AWARDS", "content": "x"}]) == 0
+        assert texts(doc) == texts(build_resume())
+
+
+    def test_overlapping_sections_are_clipped(self):
+        paragraphs = ["EXPERIENCE", "Acme engineer", "Tools and skills", "built stuff", "more stuff", "PROJECTS"]
+        doc = Document()
+        for text in paragraphs:
+            doc.add_paragraph(text)
+        buf = io.BytesIO()
+        doc.save(buf)
+        index = SectionIndex(doc)
+
+        # "Tools and skills" matches SKILLS and sits inside EXPERIENCE
+        assert index.find_paragraph_section("SKILLS", []) == (2, 5)
+        assert index.find_paragraph_section("EXPERIENCE", [(2, 5)]) == (0, 2)
+        assert index.find_paragraph_section("SKILLS", [(0, 5)]) is None
+
+        out = DocxSurgeon().simple_replace_bytes(buf.getvalue(), [
+            {"section": "SKILLS", "content": "Python"},
+            {"section": "EXPERIENCE", "content": "Staff engineer"},
+        ])
+        assert texts(Document(io.BytesIO(out))) == [
+            "EXPERIENCE", "Staff engineer", "Tools and skills", "Python", "PROJECTS"
+        ]
+
+    def test_header_right_before_claimed_span_is_skipped(self):
+        doc = Document()
+        for text in ["EXPERIENCE", "Tools and skills", "built stuff", "PROJECTS"]:
+            doc.add_paragraph(text)
+
+        applied = DocxSurgeon().apply_edits(doc, [
+            {"section": "SKILLS", "content": "Python"},
+            {"section": "EXPERIENCE", "content": "Staff engineer"},
+        ])
+        assert applied == 1
+        assert texts(doc) == ["EXPERIENCE", "Tools and skills", "Python", "PROJECTS"]
+
+
+class TestFileApis:
+
+    def test_simple_replace_bytes_round_trip(self):
+        buf = io.BytesIO()
+        build_resume().save(buf)
+
+        edited = DocxSurgeon().simple_replace_bytes(buf.getvalue(), [{"section": "EDUCATION", "content": "Self taught"}])
+
+        assert texts(Document(io.BytesIO(edited)))[-2:] == ["EDUCATION", "Self taught"]
+
+    def test_simple_replace_and_replace_section_content(self, tmp_path):
+        path = str(tmp_path / "resume.docx")
+        build_resume().save(path)
+        surgeon = DocxSurgeon()
+
+        new_path = surgeon.simple_replace(path, [{"section": "SKILLS", "content": "Go"}])
+        assert new_path.endswith("resume_edited.docx")
+        assert "Go" in texts(Document(new_path))
+
+        assert surgeon.replace_section_content(path, "PROJECTS", "Compiler") is True
+        assert texts(Document(path))[4:7] == ["PROJECTS", "Compiler", "SKILLS"]
+        assert surgeon.replace_section_content(path, "AWARDS", "x") is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
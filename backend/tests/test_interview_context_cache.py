@@ -0,0 +1,144 @@
+"""
+Unit tests for the pre-computed interview context cache.
+
+Tests cover:
+- Cache hit returns the stored context without a gap analysis call
+- Profile/job version bumps make entries stale
+- Miss computes, stores with the pre-computation versions
+- Nightly pre-warm skips current entries and swallows failures
+"""
+
+import os
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from services.cache_service import CacheService
+
+# Agent 3's roadmap module requires a key at import time; no calls are made
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+
+CONTEXT = {
+    "job": {"title": "Backend Engineer", "company": "Acme"},
+    "user": {"name": "Ada"},
+    "gaps": {"status": "ready", "missing_skills": []}
+}
+
+GAP_RESULT = {
+    "job": CONTEXT["job"],
+    "user": CONTEXT["user"],
+    "similarity_score": 0.8,
+    "gap_analysis": {"match_tier": "A"}
+}
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the commands the cache uses."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def mget(self, *keys):
+        return [self.store.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def fake_redis():
+    client = FakeRedis()
+    with patch("services.cache_service.redis_manager") as mock_redis:
+        mock_redis.get_client.return_value = client
+        yield client
+
+
+class TestInterviewContextCache:
+
+    def test_hit_when_versions_match(self, fake_redis):
+        versions = CacheService.get_context_versions("u1", "42")
+        CacheService.set_interview_context("u1", "42", CONTEXT, versions)
+
+        assert CacheService.get_interview_context("u1", "42") == CONTEXT
+
+    def test_profile_bump_makes_entry_stale(self, fake_redis):
+        CacheService.set_interview_context("u1", "42", CONTEXT, {"profile": 0, "job": 0})
+        CacheService.bump_profile_version("u1")
+
+        assert CacheService.get_interview_context("u1", "42") is None
+
+    def test_job_bump_makes_entry_stale(self, fake_redis):
+        CacheService.set_interview_context("u1", "42", CONTEXT, {"profile": 0, "job": 0})
+        CacheService.bump_job_versions(["42"])
+
+        assert CacheService.get_interview_context("u1", "42") is None
+        assert CacheService.get_context_versions("u1", "42") == {"profile": 0, "job": 1}
+
+    def test_redis_unavailable(self):
+        with patch("services.cache_service.redis_manager") as mock_redis:
+            mock_redis.get_client.return_value = None
+            assert CacheService.get_interview_context("u1", "42") is None
+            assert CacheService.set_interview_context("u1", "42", CONTEXT, {}) is False
+
+
+class TestFetchInterviewContext:
+
+    def test_cache_hit_skips_gap_analysis(self, fake_redis):
+        from core import context_loader
+        CacheService.set_interview_context("u1", "42", CONTEXT, {"profile": 0, "job": 0})
+
+        with patch.object(context_loader, "get_interview_gap_analysis") as gap:
+            assert context_loader.fetch_interview_context("u1", "42.0") == CONTEXT
+            gap.assert_not_called()
+
+    def test_miss_computes_and_stores(self, fake_redis):
+        from core import context_loader
+
+        with patch.object(context_loader, "get_interview_gap_analysis", return_value=GAP_RESULT) as gap:
+            first = context_loader.fetch_interview_context("u1", "42")
+            second = context_loader.fetch_interview_context("u1", "42")
+
+        assert gap.call_count == 1
+        assert first == second
+        assert first["gaps"]["match_tier"] == "A"
+        stored = json.loads(fake_redis.store["interview_context:u1:42"])
+        assert stored["versions"] == {"profile": 0, "job": 0}
+
+    def test_unknown_placeholder_not_cached(self, fake_redis):
+        from core import context_loader
+        unknown = {**GAP_RESULT, "user": {"name": "Unknown"}}
+
+        with patch.object(context_loader, "get_interview_gap_analysis", return_value=unknown):
+            context_loader.fetch_interview_context("u1", "42")
+
+        assert "interview_context:u1:42" not in fake_redis.store
+
+    def test_prewarm_skips_current_and_tolerates_errors(self, fake_redis):
+        from core import context_loader
+        CacheService.set_interview_context("u1", "1", CONTEXT, {"profile": 0, "job": 0})
+        gap = MagicMock(side_effect=[GAP_RESULT, RuntimeError("pinecone down")])
+
+        with patch.object(context_loader, "get_interview_gap_analysis", gap):
+            warmed = context_loader.prewarm_interview_contexts("u1", ["1", "2", "3"])
+
+        assert warmed == 1
+        assert gap.call_count == 2
+        assert "interview_context:u1:2" in fake_redis.store
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
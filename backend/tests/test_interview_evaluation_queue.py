@@ -0,0 +1,263 @@
+"""
+Tests for background interview evaluation on the job queue (Agent 5).
+
+Uses the local in-process queue backend with the LLM and Supabase mocked.
+
+Tests cover:
+- Evaluation job persists feedback and exposes it via the job record
+- DB failures are retried without re-running the evaluation LLM
+- Permanent failures surface as 'failed'
+- A re-run of the same evaluation writes under the same session key
+- Redis recovery only requeues jobs of workers whose lease expired
+"""
+
+import json
+import time
+import fnmatch
+import pytest
+from unittest.mock import patch, MagicMock
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from services import job_queue as job_queue_module
+from services.job_queue import JobQueue, LocalQueueBackend, RedisQueueBackend, JobStatus
+from agents.agent_5_mock_interview import graph
+
+
+FEEDBACK = {
+    "score": 82,
+    "verdict": "Hired",
+    "summary": "Solid answers.",
+    "strengths": ["Python"],
+    "improvements": []
+}
+
+
+def make_state():
+    return {
+        "messages": [AIMessage(content="Tell me about yourself."), HumanMessage(content="I build APIs.")],
+        "context": {"job": {"title": "Backend Engineer", "company": "Acme"}},
+        "interview_type": "TECHNICAL",
+        "mode": "voice",
+        "user_id": "11111111-1111-1111-1111-111111111111",
+        "job_id": "42",
+    }
+
+
+@pytest.fixture
+def local_queue():
+    queue = JobQueue("test", backend=LocalQueueBackend(), workers=1)
+    queue.register(graph.EVALUATION_JOB_TYPE, graph.evaluation_job)
+    with patch.object(graph, "job_queue", queue), patch("services.job_queue.JOB_RETRY_BASE_DELAY", 0.0):
+        yield queue
+
+
+@pytest.fixture
+def mock_llm():
+    llm = MagicMock()
+    llm.invoke.return_value = MagicMock(content=json.dumps(FEEDBACK))
+    with patch.object(graph, "get_llm", return_value=llm):
+        yield llm
+
+
+class TestEvaluationQueue:
+
+    def test_enqueue_returns_immediately(self, local_queue, mock_llm):
+        """Test enqueueing does no LLM work on the caller's thread."""
+        evaluation_id = graph.enqueue_evaluation(make_state())
+
+        assert local_queue.get(evaluation_id)["status"] == JobStatus.QUEUED
+        mock_llm.invoke.assert_not_called()
+
+    def test_job_evaluates_and_persists(self, local_queue, mock_llm):
+        """Test a worker evaluates, inserts the interview and stores feedback."""
+        with patch.object(graph, "db_manager") as mock_db:
+            table = mock_db.get_client.return_value.table.return_value
+            table.upsert.return_value.execute.return_value = MagicMock(data=[{"id": 1}])
+
+            evaluation_id = graph.enqueue_evaluation(make_state())
+            assert local_queue.run_once(timeout=0.1)
+
+            job = local_queue.get(evaluation_id)
+            assert job["status"] == JobStatus.SUCCEEDED
+            assert job["result"]["feedback"]["score"] == 82
+            assert job["result"]["feedback"]["interview_type"] == "TECHNICAL"
+
+            inserted = table.upsert.call_args[0][0]
+            assert inserted["job_id"] == 42
+            assert inserted["session_id"] == evaluation_id
+            assert table.upsert.call_args.kwargs == {"on_conflict": "session_id", "ignore_duplicates": True}
+            assert inserted["chat_history"][1] == {"role": "human", "content": "I build APIs."}
+
+    def test_db_failure_retries_without_rerunning_llm(self, local_queue, mock_llm):
+        """Test the checkpointed feedback is reused on retry."""
+        with patch.object(graph, "db_manager") as mock_db:
+            table = mock_db.get_client.return_value.table.return_value
+            table.upsert.return_value.execute.side_effect = [
+                Exception("connection reset"),
+                MagicMock(data=[{"id": 1}])
+            ]
+
+            evaluation_id = graph.enqueue_evaluation(make_state())
+            local_queue.run_once(timeout=0.1)
+            assert local_queue.get(evaluation_id)["status"] == JobStatus.RETRYING
+
+            local_queue.run_once(timeout=0.5)
+            job = local_queue.get(evaluation_id)
+
+            assert job["status"] == JobStatus.SUCCEEDED
+            assert job["attempts"] == 2
+            assert mock_llm.invoke.call_count == 1
+
+    def test_permanent_failure_marks_failed(self, local_queue, mock_llm):
+        """Test retry budget exhaustion ends in 'failed' with the error."""
+        with patch.object(graph, "db_manager") as mock_db:
+            table = mock_db.get_client.return_value.table.return_value
+            table.upsert.return_value.execute.side_effect = Exception("db down")
+
+            evaluation_id = local_queue.submit(
+                graph.EVALUATION_JOB_TYPE,
+                {**make_state(), "messages": []},
+                max_retries=1
+            )
+            local_queue.run_once(timeout=0.1)
+            local_queue.run_once(timeout=0.5)
+
+            job = local_queue.get(evaluation_id)
+            assert job["status"] == JobStatus.FAILED
+            assert "db down" in job["error"]
+
+    def test_worker_threads_drain_queue(self, local_queue, mock_llm):
+        """Test started workers pick jobs up without explicit run_once calls."""
+        with patch.object(graph, "db_manager") as mock_db:
+            table = mock_db.get_client.return_value.table.return_value
+            table.upsert.return_value.execute.return_value = MagicMock(data=[{"id": 1}])
+
+            local_queue.start()
+            try:
+                evaluation_id = graph.enqueue_evaluation(make_state())
+                job = local_queue.wait(evaluation_id, timeout=5.0)
+            finally:
+                local_queue.stop()
+
+            assert job["status"] == JobStatus.SUCCEEDED
+
+
+    def test_rerun_writes_same_session(self, local_queue, mock_llm):
+        """Test a job run twice (e.g. recovered while still alive) targets one interview row."""
+        with patch.object(graph, "db_manager") as mock_db:
+            table = mock_db.get_client.return_value.table.return_value
+            table.upsert.return_value.execute.return_value = MagicMock(data=[])
+
+            state = {**make_state(), "messages": []}
+            payload = {**state, "session_id": None}
+            job_id = local_queue.submit(graph.EVALUATION_JOB_TYPE, payload)
+            local_queue.run_once(timeout=0.1)
+            # Same job popped again with no checkpoint (another worker picked it up)
+            local_queue.backend.push(job_id)
+            record = local_queue.backend.load(job_id)
+            local_queue.backend.save({**record, "checkpoint": {}})
+            local_queue.run_once(timeout=0.1)
+
+            sessions = {c[0][0]["session_id"] for c in table.upsert.call_args_list}
+            assert table.upsert.call_count == 2 and sessions == {job_id}
+            table.insert.assert_not_called()
+
+
+class FakeRedis:
+    """Just enough of redis-py (decode_responses=True) for the queue backend."""
+
+    def __init__(self):
+        self.lists, self.values, self.expiry, self.zsets = {}, {}, {}, {}
+
+    def _alive(self, key):
+        if key in self.expiry and self.expiry[key] <= time.time():
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.values
+
+    def set(self, key, value, ex=None):
+        self.values[key] = str(value)
+        if ex:
+            self.expiry[key] = time.time() + ex
+
+    def exists(self, key):
+        return int(self._alive(key))
+
+    def lpush(self, key, *values):
+        for value in values:
+            self.lists.setdefault(key, []).insert(0, value)
+
+    def rpoplpush(self, src, dst):
+        items = self.lists.get(src)
+        if not items:
+            return None
+        value = items.pop()
+        self.lpush(dst, value)
+        return value
+
+    def brpoplpush(self, src, dst, timeout=0):
+        return self.rpoplpush(src, dst)
+
+    def lrem(self, key, count, value):
+        if value in self.lists.get(key, []):
+            self.lists[key].remove(value)
+
+    def scan_iter(self, match):
+        return [k for k, v in list(self.lists.items()) if v and fnmatch.fnmatch(k, match)]
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high):
+        return [m for m, score in self.zsets.get(key, {}).items() if low <= score <= high]
+
+    def zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+
+@pytest.fixture
+def fake_redis():
+    client = FakeRedis()
+    with patch.object(job_queue_module, "redis_manager") as manager:
+        manager.get_client.return_value = client
+        yield client
+
+
+class TestRedisRecovery:
+
+    def test_live_workers_keep_their_jobs(self, fake_redis):
+        """Test a starting replica does not requeue jobs a live worker is running."""
+        busy = RedisQueueBackend("q", worker_id="busy", lease=60)
+        busy.push("job-1")
+        assert busy.pop(timeout=1) == "job-1"
+
+        starting = RedisQueueBackend("q", worker_id="new", lease=60)
+        assert starting.recover() == 0
+        assert fake_redis.lists["job_queue:q:processing:busy"] == ["job-1"]
+        assert not fake_redis.lists.get("job_queue:q:pending")
+
+    def test_expired_lease_is_recovered_once(self, fake_redis):
+        """Test jobs of a dead worker are requeued exactly once across replicas."""
+        dead = RedisQueueBackend("q", worker_id="dead", lease=60)
+        dead.push("job-1")
+        dead.push("job-2")
+        dead.pop(timeout=1)
+        dead.pop(timeout=1)
+        fake_redis.expiry["job_queue:q:worker:dead"] = time.time() - 1
+
+        a = RedisQueueBackend("q", worker_id="a", lease=60)
+        b = RedisQueueBackend("q", worker_id="b", lease=60)
+        assert a.recover() + b.recover() == 2
+        assert sorted(fake_redis.lists["job_queue:q:pending"]) == ["job-1", "job-2"]
+
+    def test_ack_clears_own_processing_list(self, fake_redis):
+        backend = RedisQueueBackend("q", worker_id="w", lease=60)
+        backend.push("job-1")
+        backend.pop(timeout=1)
+        backend.ack("job-1")
+        assert fake_redis.lists["job_queue:q:processing:w"] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
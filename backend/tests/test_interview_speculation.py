@@ -0,0 +1,139 @@
+"""
+Unit tests for speculative voice-turn generation (Agent 5).
+
+Tests cover:
+- Transcript similarity normalization
+- Hit path reuses the speculated question with the final transcript
+- Miss path falls back to the normal flow without waiting for the LLM
+- Superseded speculations are cancelled
+- Hit-rate metrics
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from agents.agent_5_mock_interview.speculation import (
+    TurnSpeculator,
+    SpeculationMetrics,
+    transcript_similarity,
+)
+
+
+def add_message(state: dict, text: str) -> dict:
+    return {**state, "messages": state.get("messages", []) + [("human", text)]}
+
+
+def generate(state: dict) -> dict:
+    return {
+        "messages": state["messages"] + [("ai", "Next question?")],
+        "stage": "resume",
+        "turn": state.get("turn", 0) + 1,
+    }
+
+
+def run_turn(partial: str, final: str, metrics: SpeculationMetrics):
+    """Speculate on `partial`, then resolve against `final`."""
+    transcribe = MagicMock(return_value=partial)
+    generate_spy = MagicMock(side_effect=generate)
+
+    async def _turn():
+        speculator = TurnSpeculator(transcribe, generate_spy, add_message, metrics=metrics)
+        state = {"messages": [("ai", "Tell me about yourself.")], "turn": 1}
+        assert speculator.maybe_start(state, b"\x00" * 3200)
+        return await speculator.resolve(state, final)
+
+    return asyncio.run(_turn()), generate_spy
+
+
+class TestSpeculation:
+
+    def test_similarity_ignores_case_and_punctuation(self):
+        assert transcript_similarity("I built a REST API.", "i built a rest api") == 1.0
+        assert transcript_similarity("I built a REST API", "I hate APIs entirely") < 0.9
+
+    def test_hit_reuses_question_with_final_transcript(self):
+        metrics = SpeculationMetrics()
+        result, generate_spy = run_turn("I used Python and Django", "I used Python and Django.", metrics)
+
+        assert result is not None
+        generate_spy.assert_called_once()
+        assert result["messages"][-2] == ("human", "I used Python and Django.")
+        assert result["messages"][-1] == ("ai", "Next question?")
+        assert result["turn"] == 2
+        assert metrics.snapshot()["hits"] == 1
+
+    def test_miss_when_candidate_kept_talking(self):
+        metrics = SpeculationMetrics()
+        result, _ = run_turn(
+            "I used Python",
+            "I used Python but mostly Go for the backend services at scale",
+            metrics
+        )
+
+        assert result is None
+        snapshot = metrics.snapshot()
+        assert snapshot["misses"] == 1
+        assert snapshot["hit_rate"] == 0.0
+
+    def test_buffer_must_grow_to_restart(self):
+        async def _start_twice():
+            speculator = TurnSpeculator(MagicMock(return_value=""), generate, add_message, metrics=SpeculationMetrics())
+            first = speculator.maybe_start({"messages": []}, b"\x00" * 100)
+            second = speculator.maybe_start({"messages": []}, b"\x00" * 100)
+            await speculator.resolve({"messages": []}, "")
+            return first, second
+
+        assert asyncio.run(_start_twice()) == (True, False)
+
+    def test_miss_does_not_wait_for_generation(self):
+        metrics = SpeculationMetrics()
+        release = threading.Event()
+
+        def slow_generate(state):
+            release.wait(5)
+            return generate(state)
+
+        async def _turn():
+            speculator = TurnSpeculator(MagicMock(return_value="I used Python"), slow_generate, add_message, metrics=metrics)
+            state = {"messages": [], "turn": 1}
+            speculator.maybe_start(state, b"\x00" * 3200)
+            generation = speculator._generation
+            start = time.perf_counter()
+            result = await speculator.resolve(state, "Mostly Go for backend services at scale, honestly")
+            return result, time.perf_counter() - start, generation
+
+        try:
+            result, elapsed, generation = asyncio.run(_turn())
+        finally:
+            release.set()
+
+        assert result is None and elapsed < 1.0
+        assert generation.cancelled()
+        assert metrics.snapshot()["misses"] == 1
+
+    def test_superseded_speculation_is_cancelled(self):
+        metrics = SpeculationMetrics()
+        release = threading.Event()
+        transcribe = MagicMock(side_effect=lambda audio: release.wait(5) and "I used Python and Django")
+
+        async def _turn():
+            speculator = TurnSpeculator(transcribe, generate, add_message, metrics=metrics)
+            state = {"messages": [], "turn": 1}
+            speculator.maybe_start(state, b"\x00" * 100)
+            first = speculator._generation
+            speculator.maybe_start(state, b"\x00" * 200)
+            await asyncio.sleep(0)
+            cancelled = first.cancelled()
+            release.set()
+            return cancelled, await speculator.resolve(state, "I used Python and Django.")
+
+        cancelled, result = asyncio.run(_turn())
+        assert cancelled and result is not None
+        assert metrics.snapshot()["superseded"] == 1 and metrics.snapshot()["hits"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,125 @@
+"""
+Unit tests for the warm LaTeX compile pool (Agent 4).
+
+pdflatex is replaced by an injected runner so the pool logic runs anywhere;
+tests/bench_latex_compile.py measures the real compiler.
+
+Tests cover:
+- Preamble split and format reuse across compiles
+- Fallback to a full compile when a format is unusable
+- Back-pressure when the queue is full
+- Async submission
+"""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+
+from agents.agent_4_operative.latex_pool import (
+    LatexCompilePool,
+    LatexPoolBusy,
+    LatexCompileError,
+    split_preamble,
+    template_preamble,
+)
+from agents.agent_4_operative.tools import RESUME_TEMPLATE_DIR, RESUME_TEMPLATE_NAME
+
+
+PREAMBLE = "\\documentclass{article}\n\\usepackage{hyperref}\n"
+DOC = PREAMBLE + "\\begin{document}\nHello\n\\end{document}\n"
+
+
+class RecordingRunner:
+    def __init__(self, fail_with_format: bool = False, gate: threading.Event = None):
+        self.calls = []
+        self.fail_with_format = fail_with_format
+        self.gate = gate
+
+    def __call__(self, tex, workdir, fmt=None, fmt_dir=None):
+        if self.gate:
+            self.gate.wait(timeout=5)
+        self.calls.append({"tex": tex, "fmt": fmt})
+        if fmt and self.fail_with_format:
+            raise LatexCompileError("undefined control sequence")
+        return b"%PDF-1.5 " + tex.encode()
+
+
+@pytest.fixture
+def pool_factory(tmp_path):
+    pools = []
+
+    def make(runner, **kwargs):
+        pool = LatexCompilePool(format_dir=str(tmp_path), runner=runner, **kwargs)
+        pools.append(pool)
+        return pool
+
+    # Format dumping shells out to pdflatex -ini; pretend it succeeded
+    def fake_dump(self, name, preamble):
+        (tmp_path / f"{name}.fmt").write_bytes(b"fmt")
+
+    with patch.object(LatexCompilePool, "_dump_format", fake_dump):
+        yield make
+    for pool in pools:
+        pool.stop()
+
+
+class TestLatexPool:
+
+    def test_split_preamble_and_template_is_static(self):
+        preamble, body = split_preamble(DOC)
+        assert preamble == PREAMBLE
+        assert body.startswith("\\begin{document}")
+        # The shipped resume template must stay dumpable
+        assert template_preamble(RESUME_TEMPLATE_DIR, RESUME_TEMPLATE_NAME).startswith("%")
+
+    def test_body_only_compile_with_shared_format(self, pool_factory):
+        runner = RecordingRunner()
+        pool = pool_factory(runner, workers=2)
+
+        pdfs = [pool.compile(DOC) for _ in range(3)]
+
+        assert all(pdf.startswith(b"%PDF") for pdf in pdfs)
+        assert {c["fmt"] for c in runner.calls} == {pool.ensure_format(PREAMBLE)}
+        assert all(c["tex"].startswith("\\begin{document}") for c in runner.calls)
+        assert pool.snapshot()["format_hits"] == 3
+
+    def test_falls_back_to_full_compile(self, pool_factory):
+        runner = RecordingRunner(fail_with_format=True)
+        pool = pool_factory(runner, workers=1)
+
+        assert pool.compile(DOC).startswith(b"%PDF")
+        assert runner.calls[-1] == {"tex": DOC, "fmt": None}
+        assert pool.stats["format_fallbacks"] == 1
+
+    def test_back_pressure_when_queue_full(self, pool_factory):
+        gate = threading.Event()
+        pool = pool_factory(RecordingRunner(gate=gate), workers=1, max_queue=1, use_formats=False)
+
+        first = pool.submit(DOC)
+        # Let the worker pick up the first job so the queue slot is free
+        for _ in range(100):
+            if first.running():
+                break
+            threading.Event().wait(0.01)
+        second = pool.submit(DOC)
+
+        with pytest.raises(LatexPoolBusy):
+            pool.submit(DOC, timeout=0.05)
+
+        gate.set()
+        assert first.result(timeout=5) and second.result(timeout=5)
+        assert pool.stats["rejected"] == 1
+
+    def test_compile_async(self, pool_factory):
+        pool = pool_factory(RecordingRunner(), workers=2)
+
+        async def _run():
+            return await asyncio.gather(*(pool.compile_async(DOC) for _ in range(4)))
+
+        results = asyncio.run(_run())
+        assert len(results) == 4 and all(r.startswith(b"%PDF") for r in results)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
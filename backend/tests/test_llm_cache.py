@@ -0,0 +1,192 @@
+"""
+Tests for the cross-agent LLM response cache (services/llm_cache.py).
+
+The local backend stands in for Redis; LLM calls are fakes that count
+invocations.
+
+Tests cover:
+- Keys depend on model, temperature and prompt only
+- Repeat prompts skip the LLM and are credited with latency / cost saved
+- Failures are never cached
+- Per-site TTL expiry and opt-outs (register + LLM_CACHE_DISABLED_SITES)
+- Backend errors never block the call
+- Per-site report is logged one line per site
+- Call sites: market role optimization / search queries, hot skills;
+  sampled single skill quizzes opt out
+"""
+
+import os
+import json
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from services import llm_cache as llm_cache_module
+from services.llm_cache import LLMCache, LocalLLMCacheBackend, estimate_cost
+from services.structured_output import StructuredOutput
+
+
+PROMPT = "Return ONLY a JSON array of role strings for: Backend, Data, ML"
+
+
+class CountingLLM:
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+@pytest.fixture
+def cache():
+    cache = LLMCache(backend=LocalLLMCacheBackend())
+    cache.register("site", ttl=60)
+    return cache
+
+
+class TestKeys:
+
+    def test_model_temperature_and_prompt_change_the_key(self):
+        base = LLMCache.key("gemini-2.5-flash", 0.7, PROMPT)
+        assert LLMCache.key("gemini-2.5-flash", 0.7, PROMPT) == base
+        assert LLMCache.key("gemini-2.0-flash", 0.7, PROMPT) != base
+        assert LLMCache.key("gemini-2.5-flash", 0.2, PROMPT) != base
+        assert LLMCache.key("gemini-2.5-flash", 0.7, PROMPT + " ") != base
+        assert base.startswith("llm_cache:")
+
+
+class TestGetOrCompute:
+
+    def test_repeat_prompt_is_served_from_cache(self, cache):
+        llm = CountingLLM(["Backend Engineer"], delay=0.02)
+        first = cache.get_or_compute("site", "gemini-2.5-flash", None, PROMPT, llm)
+        second = cache.get_or_compute("site", "gemini-2.5-flash", None, PROMPT, llm)
+
+        assert first == second == ["Backend Engineer"]
+        assert llm.calls == 1
+        report = cache.report()["site"]
+        assert report["hits"] == 1 and report["misses"] == 1 and report["hit_rate"] == 0.5
+        assert report["latency_saved_s"] >= 0.02
+        assert report["cost_saved_usd"] == pytest.approx(
+            estimate_cost("gemini-2.5-flash", PROMPT, json.dumps(first)), abs=1e-6
+        )
+
+    def test_failures_are_not_cached(self, cache):
+        def failing():
+            raise RuntimeError("quota")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("site", "m", None, PROMPT, failing)
+        llm = CountingLLM(["ok"])
+        assert cache.get_or_compute("site", "m", None, PROMPT, llm) == ["ok"]
+        assert llm.calls == 1
+
+    def test_ttl_expiry(self, cache):
+        cache.register("short", ttl=1)
+        llm = CountingLLM("v")
+        with patch("services.llm_cache.time.time", return_value=1000.0):
+            cache.get_or_compute("short", "m", None, PROMPT, llm)
+        with patch("services.llm_cache.time.time", return_value=1002.0):
+            cache.get_or_compute("short", "m", None, PROMPT, llm)
+        assert llm.calls == 2
+
+    def test_opt_outs(self, cache):
+        cache.register("random", enabled=False)
+        llm = CountingLLM("v")
+        cache.get_or_compute("random", "m", 1.0, PROMPT, llm)
+        cache.get_or_compute("random", "m", 1.0, PROMPT, llm)
+        assert llm.calls == 2
+        assert cache.report()["random"]["bypassed"] == 2
+
+        with patch.object(llm_cache_module, "LLM_CACHE_DISABLED_SITES", {"ops-disabled"}):
+            cache.register("ops-disabled", ttl=60)
+        assert cache.policies["ops-disabled"].enabled is False
+
+    def test_backend_errors_do_not_block(self):
+        backend = MagicMock()
+        backend.get.side_effect = ConnectionError("redis down")
+        backend.set.side_effect = ConnectionError("redis down")
+        cache = LLMCache(backend=backend)
+
+        assert cache.get_or_compute("site", "m", None, PROMPT, CountingLLM("v")) == "v"
+
+
+@pytest.fixture
+def shared():
+    """Fresh cache + structured output singletons for call-site tests."""
+    cache = LLMCache(backend=LocalLLMCacheBackend())
+    outputs = StructuredOutput(retries=0)
+    return cache, outputs
+
+    def test_report_is_logged_per_site(self, cache, caplog):
+        cache.register("other", ttl=60)
+        for site in ("site", "site", "other"):
+            cache.get_or_compute(site, "gemini-2.0-flash", 0.2, PROMPT, CountingLLM(["Backend"]))
+
+        with caplog.at_level("INFO", logger="LLMCache"):
+            cache.log_report()
+
+        lines = [r.getMessage() for r in caplog.records]
+        assert len(lines) == 2
+        assert lines[0].startswith("📊 other: 0 hits / 1 misses")
+        assert lines[1].startswith("📊 site: 1 hits / 1 misses (hit rate 50%)")
+
+
+class TestCallSites:
+
+    def test_market_prompts_are_shared(self, shared):
+        # The package builds its Supabase-backed service singleton on import
+        env = {"SUPABASE_URL": "http://localhost", "SUPABASE_SERVICE_ROLE_KEY": "test", "PINECONE_API_KEY": ""}
+        with patch.dict(os.environ, env), patch("supabase.create_client"):
+            from agents.agent_2_market import tools
+        cache, outputs = shared
+        model = MagicMock()
+        model.generate_content.side_effect = lambda prompt, **kw: MagicMock(
+            text='["Backend Engineer", "Data Engineer"]' if "distinct job roles" in prompt else '["python backend jobs"]'
+        )
+        roles = ["Backend Engineer", "Data Engineer", "ML Engineer", "SRE", "DBA", "QA"]
+
+        with patch.object(tools, "llm_cache", cache), patch.object(tools, "structured_output", outputs), \
+             patch.object(tools.genai, "GenerativeModel", return_value=model):
+            for _ in range(3):
+                assert tools.optimize_roles_with_llm(roles, ["Python"], max_roles=2) == ["Backend Engineer", "Data Engineer"]
+                assert tools.generate_search_queries_with_llm(roles, ["Python"], "jobs") == ["python backend jobs"]
+
+        assert model.generate_content.call_count == 2
+        report = cache.report()
+        assert report["market.optimize_roles"]["hits"] == 2
+        assert report["market.search_queries"]["hits"] == 2
+
+    def test_hot_skills_cached_across_users(self, shared):
+        from agents.agent_3_strategist import service
+        cache, outputs = shared
+        strategist = service.StrategistService.__new__(service.StrategistService)
+        strategist.gemini_client = MagicMock()
+        strategist.gemini_client.models.generate_content.return_value = MagicMock(
+            text='[{"skill": "Rust", "demand_trend": "rising", "reason": "Systems roles"}]'
+        )
+        jobs = [{"title": "Backend Engineer", "summary": "APIs"}]
+
+        with patch.object(service, "llm_cache", cache), patch.object(service, "structured_output", outputs):
+            first = strategist._generate_hot_skills(["Python"], ["Backend Engineer"], jobs)
+            second = strategist._generate_hot_skills(["Python"], ["Backend Engineer"], jobs)
+
+        assert first == second == [{"skill": "Rust", "demand_trend": "rising", "reason": "Systems roles"}]
+        strategist.gemini_client.models.generate_content.assert_called_once()
+        config = strategist.gemini_client.models.generate_content.call_args.kwargs["config"]
+        assert config["response_schema"] == service.HOT_SKILLS_SCHEMA
+
+    def test_sampled_skill_quiz_is_not_cached(self):
+        from agents.agent_1_perception import tools
+        # Single questions are sampled for variety; the quiz bank handles reuse
+        assert tools.llm_cache.policies["perception.generate_skill_quiz"].enabled is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,190 @@
+"""
+Unit tests for the persistent LibreOffice converter (Agent 4).
+
+A fake office backend stands in for soffice/UNO; tests/bench_office_convert.py
+measures the real thing when LibreOffice is installed.
+
+Tests cover:
+- One office instance serves many conversions; Futures resolve on completion
+- Health check failure and mid-conversion crashes restart the instance
+- Instances are recycled after OFFICE_MAX_CONVERSIONS documents
+- Bad documents fail without restarting a healthy instance
+- Back-pressure when the queue is full
+- A hung conversion is failed and the instance killed and restarted by the watchdog
+- DocxSurgeon.convert_docx_to_pdf goes through the converter
+"""
+
+import threading
+import pytest
+from unittest.mock import patch
+
+from agents.agent_4_operative.office_converter import OfficeConverter, OfficeConverterBusy, OfficeConversionError
+from agents.agent_4_operative import docx_engine
+
+
+class FakeOffice:
+    """Writes a stub PDF; can be told to crash or fail health checks."""
+
+    instances = []
+
+    def __init__(self):
+        self.alive = False
+        self.converted = 0
+        self.crash_next = False
+        self.hang_next = False
+        self.killed = threading.Event()
+        self.gate = None
+        FakeOffice.instances.append(self)
+
+    def start(self):
+        self.alive = True
+
+    def convert(self, src_path, pdf_path):
+        if self.gate:
+            self.gate.wait(timeout=5)
+        if self.hang_next:
+            # Blocks like a wedged UNO call until the process is killed
+            self.killed.wait(timeout=5)
+            raise RuntimeError("bridge disposed")
+        if self.crash_next:
+            self.alive = False
+            raise RuntimeError("bridge disposed")
+        if src_path.endswith(".bad"):
+            raise OfficeConversionError("could not open")
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.5 " + src_path.encode())
+        self.converted += 1
+
+    def healthy(self):
+        return self.alive
+
+    def kill(self):
+        self.alive = False
+        self.killed.set()
+
+    def close(self):
+        self.alive = False
+
+
+@pytest.fixture
+def converter():
+    FakeOffice.instances = []
+    conv = OfficeConverter(office_factory=FakeOffice, health_interval=60, max_conversions=100)
+    yield conv
+    conv.stop()
+
+
+def convert(conv, tmp_path, name):
+    src = tmp_path / f"{name}.docx"
+    src.write_bytes(b"PK")
+    return conv.convert(str(src), str(tmp_path / f"{name}.pdf"), timeout=5)
+
+
+class TestOfficeConverter:
+
+    def test_single_instance_serves_many_documents(self, converter, tmp_path):
+        paths = [convert(converter, tmp_path, f"doc{i}") for i in range(5)]
+
+        assert paths[0].endswith("doc0.pdf")
+        assert open(paths[4], "rb").read().startswith(b"%PDF")
+        assert len(FakeOffice.instances) == 1
+        assert FakeOffice.instances[0].converted == 5
+        assert converter.snapshot()["converted"] == 5
+
+    def test_health_check_restarts_dead_instance(self, converter, tmp_path):
+        convert(converter, tmp_path, "first")
+        FakeOffice.instances[0].alive = False
+        converter.health_interval = 0
+
+        convert(converter, tmp_path, "second")
+
+        assert len(FakeOffice.instances) == 2
+        assert converter.stats["health_failures"] == 1
+
+    def test_crash_mid_conversion_retries_on_fresh_instance(self, converter, tmp_path):
+        convert(converter, tmp_path, "first")
+        FakeOffice.instances[0].crash_next = True
+
+        assert convert(converter, tmp_path, "second").endswith("second.pdf")
+        assert len(FakeOffice.instances) == 2
+        assert converter.stats["restarts"] == 1
+
+    def test_bad_document_keeps_instance(self, converter, tmp_path):
+        src = tmp_path / "resume.bad"
+        src.write_bytes(b"??")
+        with pytest.raises(OfficeConversionError):
+            converter.convert(str(src), str(tmp_path / "resume.pdf"), timeout=5)
+
+        convert(converter, tmp_path, "next")
+        assert len(FakeOffice.instances) == 1
+        assert converter.stats["failed"] == 1
+
+    def test_instance_recycled_after_max_conversions(self, tmp_path):
+        FakeOffice.instances = []
+        conv = OfficeConverter(office_factory=FakeOffice, health_interval=60, max_conversions=2)
+        try:
+            for i in range(5):
+                convert(conv, tmp_path, f"doc{i}")
+        finally:
+            conv.stop()
+        assert len(FakeOffice.instances) == 3
+
+    def test_full_queue_raises_busy(self, tmp_path):
+        FakeOffice.instances = []
+        gate = threading.Event()
+        conv = OfficeConverter(office_factory=FakeOffice, max_queue=1)
+        conv.start()
+        assert conv.wait_ready(timeout=5)
+        FakeOffice.instances[0].gate = gate
+        try:
+            first = conv.submit(str(tmp_path / "a.docx"), str(tmp_path / "a.pdf"))
+            # Wait until the worker holds the first job, leaving one queue slot
+            while conv.pending:
+                pass
+            conv.submit(str(tmp_path / "b.docx"), str(tmp_path / "b.pdf"))
+            with pytest.raises(OfficeConverterBusy):
+                conv.submit(str(tmp_path / "c.docx"), str(tmp_path / "c.pdf"), timeout=0.05)
+            assert conv.stats["rejected"] == 1
+        finally:
+            gate.set()
+            first.result(timeout=5)
+            conv.stop()
+
+    def test_hung_conversion_is_killed_and_queue_drains(self, tmp_path):
+        FakeOffice.instances = []
+        conv = OfficeConverter(office_factory=FakeOffice, health_interval=60, convert_timeout=0.2)
+        conv.start()
+        assert conv.wait_ready(timeout=5)
+        FakeOffice.instances[0].hang_next = True
+        try:
+            hung = conv.submit(str(tmp_path / "hang.docx"), str(tmp_path / "hang.pdf"))
+            queued = conv.submit(str(tmp_path / "next.docx"), str(tmp_path / "next.pdf"))
+
+            with pytest.raises(OfficeConversionError, match="timed out"):
+                hung.result(timeout=2)
+            assert queued.result(timeout=2).endswith("next.pdf")
+        finally:
+            conv.stop()
+
+        assert FakeOffice.instances[0].killed.is_set()
+        # Not retried on the fresh instance: the replacement only served the next job
+        assert len(FakeOffice.instances) == 2 and FakeOffice.instances[1].converted == 1
+        assert conv.stats["timeouts"] == 1 and conv.stats["restarts"] == 1
+
+
+class TestDocxSurgeonConversion:
+
+    def test_linux_conversion_uses_shared_converter(self, converter, tmp_path):
+        src = tmp_path / "resume.docx"
+        src.write_bytes(b"PK")
+
+        with patch.object(docx_engine, "office_converter", converter), \
+             patch.object(docx_engine.platform, "system", return_value="Linux"):
+            pdf = docx_engine.DocxSurgeon().convert_docx_to_pdf(str(src))
+
+        assert pdf == str(tmp_path / "resume.pdf")
+        assert FakeOffice.instances[0].converted == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
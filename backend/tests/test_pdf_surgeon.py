@@ -0,0 +1,102 @@
+"""
+Unit tests for PDFSurgeon font registration and auto-fit (Agent 4).
+
+Tests cover:
+- LaTeX fonts are registered once per process, not per PDFSurgeon
+- fit_font_size matches trying every size in FONT_SIZE_STEPS
+- replace_section renders the patch once and reports overflow
+"""
+
+import os
+import shutil
+import pytest
+import fitz
+import reportlab
+from unittest.mock import patch
+
+from agents.agent_4_operative import pdf_engine
+from agents.agent_4_operative.pdf_engine import PDFSurgeon, fit_font_size, FONT_SIZE_STEPS, _body_style
+from reportlab.platypus import Paragraph
+
+
+BULLET = "**Built** a *distributed* scheduler handling 10k jobs/min with Redis and FastAPI"
+
+
+def make_pdf(path):
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 80), "EXPERIENCE", fontsize=12)
+    page.insert_text((50, 110), "Old bullet", fontsize=10)
+    page.insert_text((50, 300), "EDUCATION", fontsize=12)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def brute_force(formatted, font, width, height):
+    for fs in FONT_SIZE_STEPS:
+        _, h = Paragraph(formatted, _body_style(font, fs)).wrap(width, height)
+        if h <= height:
+            return fs
+    return None
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    return make_pdf(str(tmp_path / "resume.pdf"))
+
+
+class TestFontRegistry:
+
+    def test_fonts_registered_once_per_process(self, tmp_path, pdf_path):
+        vera = os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf")
+        assets = tmp_path / "assets"
+        assets.mkdir()
+        shutil.copy(vera, assets / "cmr10.ttf")
+        shutil.copy(vera, assets / "cmb10.ttf")
+
+        with patch.object(pdf_engine.PDFSurgeon, "__init__", lambda self, p: None), \
+             patch.object(pdf_engine.pdfmetrics, "registerFont", wraps=pdf_engine.pdfmetrics.registerFont) as register:
+            for _ in range(3):
+                surgeon = PDFSurgeon(pdf_path)
+                surgeon.assets_dir = str(assets)
+                surgeon._register_fonts()
+
+        assert register.call_count == 2  # CMR + CMB, once
+        assert surgeon.font_reg == "CMR" and surgeon.font_bold == "CMB"
+        pdf_engine._font_registry.pop(str(assets), None)
+
+    def test_missing_fonts_fall_back_to_times(self, pdf_path):
+        surgeon = PDFSurgeon(pdf_path)
+        assert surgeon.font_reg in ("Times-Roman", "CMR")
+
+
+class TestFitFontSize:
+
+    @pytest.mark.parametrize("bullets,height", [(1, 200), (8, 96), (8, 92), (8, 87), (8, 82), (8, 78), (12, 90)])
+    def test_matches_trying_every_size(self, bullets, height):
+        formatted = "<br/>".join([f"<b>Built</b> a <i>distributed</i> scheduler number {i} handling jobs" for i in range(bullets)])
+        fit_font_size.cache_clear()
+        assert fit_font_size(formatted, "Times-Roman", 300.0, float(height)) == brute_force(formatted, "Times-Roman", 300.0, height)
+
+
+class TestReplaceSection:
+
+    def test_single_render_pass(self, pdf_path, tmp_path):
+        surgeon = PDFSurgeon(pdf_path)
+        with patch.object(surgeon, "create_patch_stream", wraps=surgeon.create_patch_stream) as render:
+            assert surgeon.replace_section("EXPERIENCE", "\n".join([BULLET] * 6), "EDUCATION") is True
+
+        assert render.call_count == 1
+        assert render.call_args.kwargs["font_size"] in FONT_SIZE_STEPS
+        surgeon.save(str(tmp_path / "patched.pdf"))
+
+    def test_overflow_skips_rendering(self, pdf_path):
+        surgeon = PDFSurgeon(pdf_path)
+        with patch.object(surgeon, "create_patch_stream") as render:
+            assert surgeon.replace_section("EXPERIENCE", "\n".join([BULLET] * 80), "EDUCATION") is False
+        render.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,180 @@
+"""
+Tests for the pre-generated skill quiz bank (Agent 1).
+
+Gemini is replaced by a fake batch generator that numbers its questions;
+the bank uses the local backend and a local job queue.
+
+Tests cover:
+- Refill tops a (skill, level) bank up to its target in batches, deduped
+- Users never see a question twice; other users are unaffected
+- Skill names are normalized ("python " and "Python" share a bank)
+- Low stock queues one background refill (deduped while pending)
+- A cold bank generates a small batch inline
+- Onboarding quizzes are assembled from banks, or fall back when they can't be
+- The verification quiz endpoint path serves from the bank
+"""
+
+import asyncio
+import itertools
+import pytest
+from unittest.mock import patch, MagicMock
+
+from services.job_queue import JobQueue, LocalQueueBackend
+from agents.agent_1_perception import quiz_bank as quiz_bank_module
+from agents.agent_1_perception.quiz_bank import QuizBank, LocalQuizBankBackend, REFILL_JOB_TYPE
+
+
+class FakeGenerator:
+    """Returns `count` fresh numbered questions per call."""
+
+    def __init__(self):
+        self.counter = itertools.count(1)
+        self.calls = []
+
+    def __call__(self, skill, level, count=10, avoid=None):
+        self.calls.append({"skill": skill, "level": level, "count": count, "avoid": list(avoid or [])})
+        return [
+            {
+                "question": f"{skill} {level} question {n}?",
+                "options": ["a", "b", "c", "d"],
+                "correct_index": n % 4,
+                "explanation": "because",
+            }
+            for n in itertools.islice(self.counter, count)
+        ]
+
+
+@pytest.fixture
+def generator():
+    fake = FakeGenerator()
+    with patch.object(quiz_bank_module, "generate_skill_quiz_batch", fake):
+        yield fake
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue("test", backend=LocalQueueBackend(), workers=1)
+    queue.register(REFILL_JOB_TYPE, quiz_bank_module.quiz_bank_refill_job)
+    with patch.object(quiz_bank_module, "job_queue", queue):
+        yield queue
+
+
+@pytest.fixture
+def bank(generator, queue):
+    bank = QuizBank(backend=LocalQuizBankBackend(), size=6, low_watermark=2)
+    with patch.object(quiz_bank_module, "quiz_bank", bank), \
+         patch.object(quiz_bank_module, "QUIZ_BANK_BATCH_SIZE", 4), \
+         patch.object(quiz_bank_module, "QUIZ_BANK_INLINE_BATCH", 2):
+        yield bank
+
+
+class TestRefill:
+
+    def test_tops_up_in_batches(self, bank, generator):
+        assert bank.refill("Python", "intermediate") == 6
+        assert bank.stock("Python", "intermediate") == 6
+        assert [c["count"] for c in generator.calls] == [4, 2]
+        # Second batch is told what already exists
+        assert len(generator.calls[1]["avoid"]) == 4
+
+        assert bank.refill("Python", "intermediate") == 0
+        assert len(generator.calls) == 2
+
+    def test_duplicate_questions_are_not_counted(self, bank):
+        repeat = [{"question": "Same?", "options": ["a", "b", "c", "d"], "correct_index": 0, "explanation": ""}]
+        with patch.object(quiz_bank_module, "generate_skill_quiz_batch", return_value=repeat):
+            assert bank.refill("Go", "beginner") == 1
+            assert bank.refill("Go", "beginner") == 0
+
+
+class TestDraw:
+
+    def test_no_repeats_per_user(self, bank):
+        bank.refill("Python", "intermediate")
+        served = [bank.draw("u1", "Python", "intermediate")["question_id"] for _ in range(6)]
+        assert len(set(served)) == 6
+
+        # Another user samples from the full bank
+        assert bank.draw("u2", "Python", "intermediate")["question_id"] in served
+
+    def test_skill_names_share_a_bank(self, bank, generator):
+        bank.refill("Python", "intermediate")
+        question = bank.draw("u1", "  python ", "Intermediate")
+        assert question["skill"] == "Python"
+        assert len(generator.calls) == 2
+
+    def test_low_stock_queues_one_refill(self, bank, queue):
+        bank.refill("Python", "intermediate")
+        for _ in range(4):
+            bank.draw("u1", "Python", "intermediate")
+        assert bank.stats["refills_queued"] == 0
+
+        # 1 unseen left after the 5th draw -> below the watermark
+        bank.draw("u1", "Python", "intermediate")
+        assert bank.stats["refills_queued"] == 1
+        assert queue.get(f"{REFILL_JOB_TYPE}:python:intermediate")["status"] == "queued"
+
+        # Still pending - not queued twice
+        bank.draw("u1", "Python", "intermediate")
+        assert bank.stats["refills_queued"] == 1
+
+    def test_refill_job_runs(self, bank, queue):
+        job_id = bank.schedule_refill("React", "advanced")
+        queue.run_once(timeout=1)
+        assert queue.get(job_id)["result"] == {"added": 6, "stock": 6}
+
+    def test_cold_bank_generates_inline(self, bank, generator):
+        question = bank.draw("u1", "Docker", "beginner")
+        assert question["question"].startswith("Docker beginner")
+        assert generator.calls[0]["count"] == 2
+        assert bank.stats["cold_misses"] == 1
+        # Rest of the bank is filled in the background
+        assert bank.stats["refills_queued"] == 1
+
+    def test_generation_failure_returns_none(self, bank):
+        with patch.object(quiz_bank_module, "generate_skill_quiz_batch", return_value=[]):
+            assert bank.draw("u1", "Docker", "beginner") is None
+
+
+class TestOnboarding:
+
+    def test_assembled_from_banks(self, bank):
+        for skill in ("Python", "React"):
+            for level in ("beginner", "intermediate", "advanced"):
+                bank.refill(skill, level)
+
+        questions = bank.draw_onboarding("u1", ["Python", "React"])
+        assert [q["id"] for q in questions] == ["q1", "q2", "q3", "q4", "q5"]
+        assert [q["skill_being_tested"] for q in questions] == ["Python", "React", "Python", "React", "Python"]
+        assert "advanced" in questions[4]["question"]
+        assert len({q["question"] for q in questions}) == 5
+
+    def test_missing_banks_fall_back(self, bank, generator):
+        assert bank.draw_onboarding("u1", ["Rust"]) is None
+        assert generator.calls == []
+        assert bank.stats["refills_queued"] == 3
+
+
+class TestVerificationQuiz:
+
+    def test_generate_quiz_serves_from_bank(self, bank):
+        # The module builds its Supabase / Pinecone clients on import
+        with patch("supabase.create_client"), patch("pinecone.Pinecone"):
+            from agents.agent_1_perception import service
+        svc = service.PerceptionService.__new__(service.PerceptionService)
+        svc.supabase = MagicMock()
+        svc.supabase.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+            {"skills_metadata": {"Python": {"level": "advanced"}}}
+        ]
+        bank.refill("Python", "advanced")
+
+        with patch.object(service, "quiz_bank", bank):
+            quiz = asyncio.run(svc.generate_quiz("u1", "Python"))
+
+        assert quiz["question"].startswith("Python advanced")
+        assert quiz["options"] == ["a", "b", "c", "d"]
+        assert bank.stats["served"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
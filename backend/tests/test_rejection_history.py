@@ -0,0 +1,108 @@
+"""
+Tests for the append-only rejection history (Agent 4 evolution).
+
+Supabase, Pinecone and the embedding model are faked.
+
+Tests cover:
+- Each rejection is a single insert; the running total comes from a count
+- The user vector gets a metadata-only update (no fetch, no values re-upserted)
+- Anti-pattern vectors are still written
+- Users without a profile get user_not_found and nothing is written
+- A failed history insert leaves Pinecone untouched
+- History reads are newest-first and limited
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from agents.agent_4_operative import evolution
+
+
+@pytest.fixture
+def supabase():
+    client = MagicMock()
+    table = client.table.return_value
+    table.select.return_value.eq.return_value.limit.return_value.execute.return_value = SimpleNamespace(data=[{"id": 1}], count=14)
+    with patch.object(evolution, "create_client", return_value=client):
+        yield client
+
+
+@pytest.fixture
+def pinecone():
+    index = MagicMock()
+    embeddings = MagicMock()
+    embeddings.embed_query.return_value = [0.1, 0.2, 0.3]
+    with patch.object(evolution, "Pinecone") as pc, \
+         patch.object(evolution, "GoogleGenerativeAIEmbeddings", return_value=embeddings), \
+         patch.object(evolution.cache_service, "bump_profile_version") as bump:
+        pc.return_value.Index.return_value = index
+        yield {"index": index, "bump": bump}
+
+
+class TestUpdateVectorMemory:
+
+    def test_history_is_appended_and_vector_metadata_updated(self, supabase, pinecone):
+        result = evolution.update_vector_memory("u1", "Missing Kubernetes", create_anti_pattern=False)
+
+        assert result["status"] == "success"
+        inserted = supabase.table.return_value.insert.call_args.args[0]
+        assert inserted["user_id"] == "u1" and inserted["gap_analysis"] == "Missing Kubernetes"
+        supabase.table.assert_any_call(evolution.REJECTION_HISTORY_TABLE)
+
+        index = pinecone["index"]
+        index.fetch.assert_not_called()
+        index.upsert.assert_not_called()
+        index.update.assert_called_once_with(
+            id="u1",
+            set_metadata={"last_rejection": inserted["created_at"], "total_rejections": 14},
+            namespace="users"
+        )
+        assert result["updated_metadata"]["total_rejections"] == 14
+        pinecone["bump"].assert_called_once_with("u1")
+
+    def test_anti_pattern_is_still_written(self, supabase, pinecone):
+        result = evolution.update_vector_memory("u1", "Missing Kubernetes")
+
+        assert result["anti_pattern_created"] is True
+        upsert = pinecone["index"].upsert.call_args.kwargs
+        assert upsert["namespace"] == "anti-patterns"
+        assert upsert["vectors"][0]["metadata"]["user_id"] == "u1"
+
+    def test_unknown_user_is_reported_and_nothing_written(self, supabase, pinecone):
+        profiles = MagicMock()
+        profiles.select.return_value.eq.return_value.limit.return_value.execute.return_value = SimpleNamespace(data=[])
+        history = supabase.table.return_value
+        supabase.table.side_effect = lambda name: profiles if name == "profiles" else history
+
+        result = evolution.update_vector_memory("ghost", "Missing Kubernetes")
+
+        assert result["status"] == "user_not_found" and result["anti_pattern_created"] is False
+        profiles.select.return_value.eq.assert_called_once_with("user_id", "ghost")
+        history.insert.assert_not_called()
+        pinecone["index"].update.assert_not_called()
+        pinecone["index"].upsert.assert_not_called()
+
+    def test_failed_insert_skips_pinecone(self, supabase, pinecone):
+        supabase.table.return_value.insert.return_value.execute.side_effect = RuntimeError("db down")
+        result = evolution.update_vector_memory("u1", "Missing Kubernetes")
+
+        assert result["status"] == "error" and "db down" in result["message"]
+        pinecone["index"].update.assert_not_called()
+        pinecone["index"].upsert.assert_not_called()
+
+
+class TestRejectionHistory:
+
+    def test_reads_newest_first(self, supabase):
+        rows = [{"gap_analysis": "b", "created_at": "2026-02-01"}, {"gap_analysis": "a", "created_at": "2026-01-01"}]
+        query = supabase.table.return_value.select.return_value.eq.return_value
+        query.order.return_value.limit.return_value.execute.return_value = SimpleNamespace(data=rows)
+
+        assert evolution.get_rejection_history("u1", limit=2) == rows
+        query.order.assert_called_once_with("created_at", desc=True)
+        query.order.return_value.limit.assert_called_once_with(2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,120 @@
+"""
+Tests for batch resume tailoring (Agent 4).
+
+Storage, the LLM and pdflatex are mocked; tests/bench_resume_batch.py
+compares batched vs single calls with simulated latencies.
+
+Tests cover:
+- Per-user work (resume text, contact parsing) runs once per batch
+- Per-JD structuring fans out and results keep request order
+- One failing job doesn't fail the rest
+- Endpoint validation and application logging; storage pruned once per batch
+"""
+
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from auth.dependencies import get_current_user
+from agents.agent_4_operative import tools, service, router as agent4_router_module
+
+
+USER = {"sub": "11111111-1111-1111-1111-111111111111"}
+RESUME_TEXT = "Ada Lovelace\nada@example.com\nSenior Engineer"
+
+
+def fake_tailor(user_id, raw_text, contact_info, job_description, stage=None, latex_engine=None):
+    if "broken" in job_description:
+        raise ValueError("LaTeX compilation failed")
+    return {"pdf_url": f"https://signed/{job_description}.pdf", "pdf_path": f"/tmp/{job_description}.pdf", "cached": False}
+
+
+@pytest.fixture
+def pipeline():
+    with patch.object(tools.resume_text_provider, "get_text", return_value=RESUME_TEXT) as get_text, \
+         patch.object(tools, "parse_resume_contact", wraps=tools.parse_resume_contact) as parse_contact, \
+         patch.object(tools, "tailor_resume_from_text", side_effect=fake_tailor) as tailor:
+        yield {"get_text": get_text, "parse_contact": parse_contact, "tailor": tailor}
+
+
+class TestBatchTailoring:
+
+    def test_shared_work_runs_once(self, pipeline):
+        jobs = [{"job_id": str(i), "job_description": f"jd{i}"} for i in range(5)]
+        results = tools.mutate_resumes_for_jobs("u1", jobs)
+
+        assert pipeline["get_text"].call_count == 1
+        assert pipeline["parse_contact"].call_count == 1
+        assert pipeline["tailor"].call_count == 5
+        assert [r["job_id"] for r in results] == ["0", "1", "2", "3", "4"]
+        assert results[3]["pdf_url"] == "https://signed/jd3.pdf"
+        # Every job shares one template engine
+        engines = {id(call.kwargs["latex_engine"]) for call in pipeline["tailor"].call_args_list}
+        assert len(engines) == 1
+
+    def test_jobs_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def tailor(*args, **kwargs):
+            barrier.wait()  # Deadlocks (then times out) if jobs run one at a time
+            return {"pdf_url": "u", "pdf_path": "p", "cached": False}
+
+        with patch.object(tools.resume_text_provider, "get_text", return_value=RESUME_TEXT), \
+             patch.object(tools, "tailor_resume_from_text", side_effect=tailor):
+            results = tools.mutate_resumes_for_jobs("u1", [{"job_description": "x"}] * 3, max_workers=3)
+
+        assert all(r["status"] == "success" for r in results)
+
+    def test_failures_are_isolated(self, pipeline):
+        jobs = [{"job_id": "a", "job_description": "good"}, {"job_id": "b", "job_description": "broken"}]
+        results = tools.mutate_resumes_for_jobs("u1", jobs)
+
+        assert results[0]["status"] == "success"
+        assert results[1] == {"job_id": "b", "status": "error", "message": "LaTeX compilation failed"}
+
+    def test_resume_load_failure_fails_every_job(self):
+        with patch.object(tools.resume_text_provider, "get_text", side_effect=RuntimeError("no resume")):
+            results = tools.mutate_resumes_for_jobs("u1", [{"job_id": "a", "job_description": "x"}] * 2)
+        assert [r["status"] for r in results] == ["error", "error"]
+
+
+class TestBatchEndpoint:
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.include_router(agent4_router_module.agent4_router)
+        app.dependency_overrides[get_current_user] = lambda: USER
+        return TestClient(app)
+
+    def test_batch_returns_per_job_artifacts(self, client, pipeline):
+        calls = []
+        with patch.object(service, "save_application_status", side_effect=lambda **kw: calls.append("save")) as save, \
+             patch.object(service, "prune_tailored_artifacts", side_effect=lambda *a, **kw: calls.append(("prune", kw))):
+            response = client.post("/agent4/generate-resume/batch", json={"jobs": [
+                {"job_description": "good", "job_id": "1"},
+                {"job_description": "broken", "job_id": "2"},
+                {"job_description": "other"},
+            ]})
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["succeeded"] == 2 and body["failed"] == 1
+        assert body["results"][1]["status"] == "error"
+        # Only successful jobs with an id are logged to applications
+        assert save.call_count == 1
+        assert save.call_args.kwargs["job_id"] == "1"
+        # Storage is pruned once, after the applications rows, keeping the whole batch
+        assert calls[:-1] == ["save"] and calls[-1][0] == "prune"
+        assert calls[-1][1]["keep"] >= 3
+
+    def test_batch_size_is_capped(self, client):
+        jobs = [{"job_description": "x"}] * (tools.RESUME_BATCH_MAX_JOBS + 1)
+        assert client.post("/agent4/generate-resume/batch", json={"jobs": jobs}).status_code == 400
+        assert client.post("/agent4/generate-resume/batch", json={"jobs": []}).status_code == 422
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,141 @@
+"""
+Tests for queued resume generation (Agent 4 submit / poll / SSE).
+
+Uses the local in-process queue backend with the tailoring pipeline mocked.
+
+Tests cover:
+- Stage timings recorded by JobContext.stage
+- Submit returns a job id without running the pipeline
+- Poll exposes stage timings and the final GenerateResumeResponse
+- SSE streams one progress event per stage and a terminal event
+- Jobs are only visible to the user who submitted them
+"""
+
+import json
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.job_queue import JobQueue, LocalQueueBackend, JobStatus
+from auth.dependencies import get_current_user
+from agents.agent_4_operative import service, router as agent4_router_module
+
+
+USER = {"sub": "11111111-1111-1111-1111-111111111111"}
+STAGES = ["loading_resume", "structuring", "rendering", "compiling", "uploading", "saving_profile"]
+
+
+def fake_mutate(user_id, job_description, on_stage=None):
+    for name in STAGES:
+        on_stage(name)
+    return {"status": "success", "pdf_url": "https://signed/resume.pdf", "pdf_path": "/tmp/r.pdf"}
+
+
+@pytest.fixture
+def local_queue():
+    queue = JobQueue("test", backend=LocalQueueBackend(), workers=1)
+    queue.register(service.RESUME_JOB_TYPE, service.resume_generation_job)
+    with patch.object(service, "job_queue", queue), \
+         patch.object(agent4_router_module, "job_queue", queue), \
+         patch.object(agent4_router_module, "RESUME_JOB_EVENT_INTERVAL", 0.01), \
+         patch("services.job_queue.JOB_RETRY_BASE_DELAY", 0.0):
+        yield queue
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(agent4_router_module.agent4_router)
+    app.dependency_overrides[get_current_user] = lambda: USER
+    return TestClient(app)
+
+
+def submit(client):
+    response = client.post("/agent4/generate-resume/jobs", json={"job_description": "Backend Engineer"})
+    assert response.status_code == 202
+    return response.json()["job_id"]
+
+
+class TestStageTimings:
+
+    def test_stage_records_durations(self):
+        queue = JobQueue("timings", backend=LocalQueueBackend(), workers=1)
+
+        def handler(payload, ctx):
+            ctx.stage("first")
+            time.sleep(0.02)
+            ctx.stage("second")
+            return {}
+
+        queue.register("timed", handler)
+        job_id = queue.submit("timed", {})
+        queue.run_once(timeout=0.1)
+
+        job = queue.get(job_id)
+        assert job["status"] == JobStatus.SUCCEEDED
+        assert set(job["timings"]) == {"first", "second"}
+        assert job["timings"]["first"] >= 0.02
+        assert "current_stage" not in job
+        assert [e["stage"] for e in job["progress"]] == ["first", "second"]
+
+
+class TestResumeJobApi:
+
+    def test_submit_returns_before_any_work(self, local_queue, client):
+        with patch.object(service, "mutate_resume_for_job") as mutate:
+            job_id = submit(client)
+            mutate.assert_not_called()
+        assert local_queue.get(job_id)["status"] == JobStatus.QUEUED
+
+    def test_poll_returns_timings_and_result(self, local_queue, client):
+        with patch.object(service, "mutate_resume_for_job", side_effect=fake_mutate):
+            job_id = submit(client)
+            assert local_queue.run_once(timeout=0.1)
+
+        body = client.get(f"/agent4/generate-resume/jobs/{job_id}").json()
+        assert body["status"] == JobStatus.SUCCEEDED
+        assert list(body["timings"]) == STAGES
+        assert body["result"]["pdf_url"] == "https://signed/resume.pdf"
+        assert body["result"]["success"] is True
+
+    def test_sse_streams_stage_progress(self, local_queue, client):
+        with patch.object(service, "mutate_resume_for_job", side_effect=fake_mutate):
+            job_id = submit(client)
+            local_queue.start()
+            try:
+                with client.stream("GET", f"/agent4/generate-resume/jobs/{job_id}/events") as response:
+                    assert response.headers["content-type"].startswith("text/event-stream")
+                    raw = "".join(response.iter_text())
+            finally:
+                local_queue.stop()
+
+        events = [block for block in raw.split("\n\n") if block.startswith("event:")]
+        names = [block.split("\n")[0].split(": ", 1)[1] for block in events]
+        assert names == ["progress"] * len(STAGES) + ["succeeded"]
+
+        final = json.loads(events[-1].split("data: ", 1)[1])
+        assert final["result"]["pdf_url"] == "https://signed/resume.pdf"
+
+    def test_failure_surfaces_error(self, local_queue, client):
+        with patch.object(service, "mutate_resume_for_job", return_value={"status": "error", "message": "LaTeX failed"}):
+            job_id = submit(client)
+            while local_queue.run_once(timeout=0.1):
+                pass
+
+        body = client.get(f"/agent4/generate-resume/jobs/{job_id}").json()
+        assert body["status"] == JobStatus.FAILED
+        assert body["error"] == "LaTeX failed"
+        assert body["attempts"] == 2
+
+    def test_other_users_cannot_see_job(self, local_queue, client):
+        job_id = submit(client)
+        client.app.dependency_overrides[get_current_user] = lambda: {"sub": "someone-else"}
+
+        assert client.get(f"/agent4/generate-resume/jobs/{job_id}").status_code == 404
+        assert client.get(f"/agent4/generate-resume/jobs/{job_id}/events").status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
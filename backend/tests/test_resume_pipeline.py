@@ -0,0 +1,159 @@
+"""
+Tests for the resume ingestion stage graph (PerceptionService.process_resume_upload).
+
+Storage, PDF parsing, Gemini, ATS scoring, Supabase and Pinecone are all
+replaced by fakes that sleep for a fixed latency and log when they ran.
+
+Tests cover:
+- Independent stages overlap (upload / parse, extract / ATS, embedding / profile upsert)
+- Dependent stages wait for their inputs; the profile row is written before the vector
+- End-to-end latency is close to the critical path, not the sum of stages
+- Per-stage timings are returned but not written to the profile row
+- A failing stage propagates and the temp file is removed after siblings settle
+"""
+
+import os
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+
+# The module builds its Supabase / Pinecone clients on import
+with patch("supabase.create_client"), patch("pinecone.Pinecone"):
+    from agents.agent_1_perception import service
+
+
+DELAY = 0.05
+
+
+class FakeUpload:
+    filename = "resume.pdf"
+
+    async def read(self):
+        return b"%PDF-1.4 fake"
+
+
+class StageLog:
+    """Fake backends that sleep DELAY and record (stage, start, end)."""
+
+    def __init__(self, delay=DELAY):
+        self.delay = delay
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def fake(self, name, result=None, error=None):
+        def run(*args, **kwargs):
+            start = time.perf_counter()
+            time.sleep(self.delay)
+            with self._lock:
+                self.spans[name] = (start, time.perf_counter(), args, kwargs)
+            if error:
+                raise error
+            return result(*args) if callable(result) else result
+        return run
+
+    def overlap(self, a, b):
+        return self.spans[a][0] < self.spans[b][1] and self.spans[b][0] < self.spans[a][1]
+
+    def after(self, later, earlier):
+        return self.spans[later][0] >= self.spans[earlier][1]
+
+
+EXTRACTED = {"name": "Ada", "email": "ada@example.com", "skills": ["Python"], "experience_summary": "Backend"}
+
+
+@pytest.fixture
+def pipeline():
+    log = StageLog()
+    svc = service.PerceptionService.__new__(service.PerceptionService)
+    svc.supabase = MagicMock()
+    svc.supabase.table.return_value.upsert.return_value.execute.side_effect = log.fake("profile_upsert")
+    svc.index = MagicMock()
+    svc.index.upsert.side_effect = log.fake("vector_upsert")
+
+    with patch.object(service, "upload_resume_to_storage", log.fake("upload", "https://storage/resume.pdf")), \
+         patch.object(service, "parse_pdf", log.fake("parse", "Ada Lovelace resume text")), \
+         patch.object(service, "extract_structured_data", log.fake("extract", EXTRACTED)), \
+         patch.object(service, "quick_ats_score", log.fake("ats_score", {"score": 72, "provisional": False})), \
+         patch.object(service, "generate_embedding", log.fake("embedding", [0.1, 0.2])), \
+         patch.object(service, "cache_service") as cache, \
+         patch.object(service, "enqueue_ats_refinement") as refine:
+        yield svc, log, cache, refine
+
+
+def run(svc):
+    return asyncio.run(svc.process_resume_upload(FakeUpload(), "u1"))
+
+
+class TestStageGraph:
+
+    def test_independent_stages_overlap(self, pipeline):
+        svc, log, _, _ = pipeline
+        run(svc)
+
+        assert log.overlap("upload", "parse")
+        assert log.overlap("extract", "ats_score")
+        assert log.overlap("embedding", "profile_upsert")
+
+    def test_dependencies_are_respected(self, pipeline):
+        svc, log, cache, _ = pipeline
+        run(svc)
+
+        assert log.after("extract", "parse") and log.after("ats_score", "parse")
+        assert log.after("embedding", "extract")
+        for dep in ("upload", "extract", "ats_score"):
+            assert log.after("profile_upsert", dep)
+        assert log.after("vector_upsert", "embedding") and log.after("vector_upsert", "profile_upsert")
+
+        vector = log.spans["vector_upsert"][3]["vectors"][0]
+        assert vector["values"] == [0.1, 0.2]
+        assert vector["metadata"]["resume_url"] == "https://storage/resume.pdf"
+        cache.bump_profile_version.assert_called_once_with("u1")
+
+    def test_latency_follows_the_critical_path(self, pipeline):
+        svc, _, _, _ = pipeline
+        start = time.perf_counter()
+        run(svc)
+        elapsed = time.perf_counter() - start
+
+        # 7 stages in sequence vs parse -> extract -> embedding -> vector_upsert
+        assert elapsed < 6 * DELAY
+
+    def test_timings_returned_not_stored(self, pipeline):
+        svc, _, _, _ = pipeline
+        result = run(svc)
+
+        stages = {"upload", "parse", "extract", "ats_score", "embedding", "profile_upsert", "vector_upsert"}
+        assert set(result["timings"]) == stages | {"total"}
+        assert all(result["timings"][name] >= DELAY - 0.01 for name in stages)
+        assert result["ATS_SCORE"] == "72" and result["resume_url"] == "https://storage/resume.pdf"
+
+        row = svc.supabase.table.return_value.upsert.call_args.args[0]
+        assert "timings" not in row
+
+    def test_provisional_score_queues_refinement(self, pipeline):
+        svc, _, _, refine = pipeline
+        with patch.object(service, "quick_ats_score", return_value={"score": 50, "provisional": True}):
+            run(svc)
+        refine.assert_called_once_with("u1", "Ada Lovelace resume text")
+
+
+class TestFailures:
+
+    def test_failed_stage_propagates_after_siblings_settle(self, pipeline):
+        svc, log, _, _ = pipeline
+        pdf_path = os.path.join(service.tempfile.gettempdir(), "agent1_uploads", "u1_resume.pdf")
+
+        with patch.object(service, "extract_structured_data", log.fake("extract", error=RuntimeError("gemini down"))):
+            with pytest.raises(RuntimeError, match="gemini down"):
+                run(svc)
+
+        # ATS ran alongside extraction and finished; nothing was written
+        assert "ats_score" in log.spans and "upload" in log.spans
+        assert "profile_upsert" not in log.spans and "vector_upsert" not in log.spans
+        assert not os.path.exists(pdf_path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+"""
+Unit tests for memoized resume structuring (Agent 4).
+
+Tests cover:
+- Repeat structuring for the same resume + JD skips the LLM
+- Whitespace-only differences share an entry; a different JD does not
+- A profile version bump invalidates memoized structures
+- LLM failures are not memoized
+"""
+
+import pytest
+from unittest.mock import patch
+
+from services.cache_service import CacheService
+
+import agents.agent_4_operative.tools as tools
+
+
+RESUME = "Ada Lovelace\nada@example.com\n\nExperience\n  Analytical Engines Ltd - Engineer"
+JD = "Backend Engineer: Python, FastAPI, Redis"
+LLM_RESULT = {"name": "Ada Lovelace", "experience": [{"company": "Analytical Engines Ltd"}]}
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the commands the cache uses."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def mget(self, *keys):
+        return [self.store.get(k) for k in keys]
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+
+@pytest.fixture
+def fake_redis():
+    client = FakeRedis()
+    with patch("services.cache_service.redis_manager") as manager:
+        manager.get_client.return_value = client
+        yield client
+
+
+@pytest.fixture
+def llm():
+    with patch.object(tools, "_structure_with_llm", side_effect=lambda resume, jd: dict(LLM_RESULT)) as mock:
+        yield mock
+
+
+class TestResumeStructureMemo:
+
+    def test_repeat_generation_skips_llm(self, fake_redis, llm):
+        first = tools.structure_resume_content(RESUME, JD, {"email": "ada@example.com"}, user_id="u1")
+        second = tools.structure_resume_content(RESUME, JD, {"email": "ada@example.com"}, user_id="u1")
+
+        assert llm.call_count == 1
+        assert first == second
+        assert second["email"] == "ada@example.com"
+        assert second["skills"]["libraries"] == "N/A"
+
+    def test_fingerprint_normalizes_whitespace_only(self, fake_redis, llm):
+        tools.structure_resume_content(RESUME, JD, {}, user_id="u1")
+        tools.structure_resume_content(RESUME.replace("\n", "\n\n  "), JD + "  ", {}, user_id="u1")
+        assert llm.call_count == 1
+
+        tools.structure_resume_content(RESUME, "Frontend Engineer: React", {}, user_id="u1")
+        assert llm.call_count == 2
+        assert CacheService.content_fingerprint("a  b") != CacheService.content_fingerprint("A b")
+
+    def test_profile_change_invalidates(self, fake_redis, llm):
+        tools.structure_resume_content(RESUME, JD, {}, user_id="u1")
+        CacheService.bump_profile_version("u1")
+        tools.structure_resume_content(RESUME, JD, {}, user_id="u1")
+
+        assert llm.call_count == 2
+
+    def test_failures_and_anonymous_calls_are_not_memoized(self, fake_redis):
+        with patch.object(tools, "_structure_with_llm", return_value=None) as failing:
+            result = tools.structure_resume_content(RESUME, JD, {}, user_id="u1")
+            tools.structure_resume_content(RESUME, JD, {}, user_id="u1")
+
+        assert failing.call_count == 2
+        assert result["name"] == "Candidate Name"
+        assert not any(k.startswith("resume_structure:") for k in fake_redis.store)
+
+        with patch.object(tools, "_structure_with_llm", return_value=dict(LLM_RESULT)):
+            tools.structure_resume_content(RESUME, JD, {})
+        assert not any(k.startswith("resume_structure:") for k in fake_redis.store)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,77 @@
+"""
+Unit tests for the Agent 4 resume text provider.
+
+Tests cover:
+- profiles.resume_text is used without touching storage
+- ETag-keyed disk cache avoids the download + parse
+- A new upload (new ETag) is re-extracted and backfilled to the profile
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from agents.agent_4_operative.resume_text import ResumeTextProvider
+
+
+PARSED = "Ada Lovelace - Senior Engineer. Python, FastAPI, Redis, Kubernetes, PostgreSQL."
+
+
+def make_supabase(profile_text="", etag="abc123"):
+    supabase = MagicMock()
+    query = supabase.table.return_value.select.return_value.eq.return_value
+    query.execute.return_value = MagicMock(data=[{"resume_text": profile_text}])
+
+    bucket = supabase.storage.from_.return_value
+    bucket.list.return_value = [
+        {"name": "u1.pdf", "metadata": {"eTag": f'"{etag}"', "size": 1234}},
+        {"name": "u1.pdf.bak", "metadata": {"eTag": '"other"'}},
+    ]
+    bucket.download.return_value = b"%PDF-1.5 fake"
+    return supabase
+
+
+@pytest.fixture
+def extractor():
+    return MagicMock(return_value=PARSED)
+
+
+class TestResumeTextProvider:
+
+    def test_profile_text_skips_storage(self, tmp_path, extractor):
+        supabase = make_supabase(profile_text=PARSED)
+        provider = ResumeTextProvider(str(tmp_path), lambda: supabase, extractor)
+
+        assert provider.get_text("u1") == PARSED
+        supabase.storage.from_.assert_not_called()
+        extractor.assert_not_called()
+        assert provider.stats == {"profile": 1, "disk": 0, "download": 0}
+
+    def test_disk_cache_keyed_by_etag(self, tmp_path, extractor):
+        supabase = make_supabase()
+        provider = ResumeTextProvider(str(tmp_path), lambda: supabase, extractor)
+
+        assert provider.get_text("u1") == PARSED
+        assert provider.get_text("u1") == PARSED
+
+        bucket = supabase.storage.from_.return_value
+        assert bucket.download.call_count == 1
+        assert extractor.call_count == 1
+        assert provider.stats == {"profile": 0, "disk": 1, "download": 1}
+        assert (tmp_path / "u1.abc123.txt").read_text() == PARSED
+
+        # Extracted text is written back so other instances hit the DB path
+        supabase.table.return_value.update.assert_called_with({"resume_text": PARSED})
+
+    def test_new_upload_is_re_extracted(self, tmp_path, extractor):
+        provider = ResumeTextProvider(str(tmp_path), lambda: make_supabase(etag="v1"), extractor)
+        provider.get_text("u1")
+
+        provider._client_factory = lambda: make_supabase(etag="v2")
+        provider.get_text("u1")
+
+        assert extractor.call_count == 2
+        assert provider.stats["download"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,169 @@
+"""
+Tests for schema-constrained LLM output (services/structured_output.py).
+
+The LLM is a scripted fake returning canned texts in order.
+
+Tests cover:
+- Parsing skips fences / prose and ignores trailing text
+- Schema validation (types, required keys, enums, item counts)
+- JSON mode and the schema are sent in the generation config
+- Retry budget, per-site failure metrics and the exhausted error
+- LLM errors are not retried
+- Call sites: skill quiz, interview feedback, LeetCode recommendations
+"""
+
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from services import structured_output as so
+from services.structured_output import (
+    StructuredOutput, StructuredOutputError, parse_json, validate_schema
+)
+
+
+QUIZ = {
+    "question": "What does a Python generator return?",
+    "options": ["A list", "An iterator", "A tuple", "None"],
+    "correct_index": 1,
+    "explanation": "Calling a generator function returns a generator iterator.",
+}
+
+
+class ScriptedLLM:
+    """Returns the scripted texts in order and records generation configs."""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.configs = []
+
+    def __call__(self, config):
+        self.configs.append(config)
+        item = self.texts.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+class TestParsing:
+
+    def test_fences_prose_and_trailing_text(self):
+        assert parse_json('```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+        assert parse_json("Sure! [1, 121, 217] are good picks.") == [1, 121, 217]
+        assert parse_json('See [note] below: {"ok": true}') == {"ok": True}
+
+    def test_unparseable(self):
+        with pytest.raises(ValueError):
+            parse_json("no json here")
+        with pytest.raises(ValueError):
+            parse_json('{"truncated": ')
+
+    def test_schema_validation(self):
+        from agents.agent_1_perception.tools import SKILL_QUIZ_SCHEMA as schema
+        assert validate_schema(QUIZ, schema) is None
+        assert "missing 'explanation'" in validate_schema({k: v for k, v in QUIZ.items() if k != "explanation"}, schema)
+        assert "at least 4" in validate_schema({**QUIZ, "options": ["a", "b"]}, schema)
+        assert "expected integer" in validate_schema({**QUIZ, "correct_index": "1"}, schema)
+        assert "expected integer" in validate_schema({**QUIZ, "correct_index": True}, schema)
+        assert "not in" in validate_schema("maybe", {"type": "STRING", "enum": ["yes", "no"]})
+
+
+class TestGenerate:
+
+    def test_sends_json_mode_and_schema(self):
+        llm = ScriptedLLM(json.dumps([1, 2]))
+        schema = {"type": "ARRAY", "items": {"type": "INTEGER"}, "minItems": 1}
+
+        assert StructuredOutput().generate("site", llm, schema=schema) == [1, 2]
+        config = llm.configs[0]
+        assert config["response_mime_type"] == "application/json"
+        # Validation-only keys are not sent to Gemini
+        assert config["response_schema"] == {"type": "ARRAY", "items": {"type": "INTEGER"}}
+
+    def test_retries_within_budget_and_counts_failures(self):
+        outputs = StructuredOutput(retries=1)
+        llm = ScriptedLLM("not json", json.dumps(QUIZ))
+
+        assert outputs.generate("quiz", llm)["correct_index"] == 1
+        assert outputs.stats["quiz"] == {"calls": 1, "attempts": 2, "failures": 1, "exhausted": 0}
+        assert outputs.failure_rate("quiz") == 0.5
+
+    def test_budget_exhausted(self):
+        outputs = StructuredOutput(retries=1)
+        llm = ScriptedLLM('{"a": 1}', '{"a": 2}', '{"a": 3}')
+
+        with pytest.raises(StructuredOutputError) as exc:
+            outputs.generate("site", llm, validate=lambda v: "always wrong")
+        assert exc.value.attempts == 2 and exc.value.last_error == "always wrong"
+        assert len(llm.texts) == 1
+        assert outputs.stats["site"]["exhausted"] == 1
+
+    def test_llm_errors_are_not_retried(self):
+        outputs = StructuredOutput(retries=3)
+        llm = ScriptedLLM(RuntimeError("quota"), "[]")
+
+        with pytest.raises(RuntimeError):
+            outputs.generate("site", llm)
+        assert outputs.stats["site"]["attempts"] == 1
+
+
+@pytest.fixture
+def outputs():
+    outputs = StructuredOutput(retries=1)
+    with patch.object(so, "structured_output", outputs):
+        yield outputs
+
+
+class TestCallSites:
+
+    def test_skill_quiz(self, outputs):
+        from agents.agent_1_perception import tools
+        llm = MagicMock()
+        llm.invoke.side_effect = [
+            MagicMock(content=json.dumps({**QUIZ, "correct_index": 7})),
+            MagicMock(content=json.dumps(QUIZ)),
+        ]
+        with patch.object(tools, "structured_output", outputs), \
+             patch.object(tools, "ChatGoogleGenerativeAI", return_value=llm), \
+             patch.dict("os.environ", {"GEMINI_API_KEY": "test"}):
+            assert tools.generate_skill_quiz("Python") == QUIZ
+
+        assert llm.invoke.call_count == 2
+        assert llm.invoke.call_args.kwargs["generation_config"]["response_mime_type"] == "application/json"
+        assert outputs.stats["perception.generate_skill_quiz"]["failures"] == 1
+
+    def test_interview_feedback_falls_back_after_budget(self, outputs):
+        from agents.agent_5_mock_interview import graph
+        llm = MagicMock()
+        llm.invoke.return_value = MagicMock(content='{"score": 80, "verdict": "Maybe"}')
+        with patch.object(graph, "structured_output", outputs), \
+             patch.object(graph, "get_llm", return_value=llm):
+            feedback = graph.generate_interview_feedback({"interview_type": "HR", "messages": []})
+
+        assert feedback["verdict"] == "Error" and feedback["interview_type"] == "HR"
+        assert llm.invoke.call_count == 2
+
+    def test_leetcode_recommendations(self, outputs):
+        # The module builds a Supabase-backed singleton on import
+        with patch("supabase.create_client"):
+            from agents.agent_6_leetcode import service as leetcode
+        svc = leetcode.LeetCodeService.__new__(leetcode.LeetCodeService)
+        svc.gemini_api_key = "test"
+        svc._all_problems = [
+            {"id": i, "title": f"P{i}", "category": "Arrays", "difficulty": "Easy"} for i in (1, 2, 3)
+        ]
+        model = MagicMock()
+        model.generate_content.return_value = MagicMock(text="[3, 1, 3, 99, 2]")
+
+        with patch.object(leetcode, "structured_output", outputs), \
+             patch("google.generativeai.GenerativeModel", return_value=model), \
+             patch("google.generativeai.configure"):
+            ids = svc._get_gemini_recommendations({"Arrays": "weak"}, None, {2})
+
+        assert ids == [3, 1]
+        config = model.generate_content.call_args.kwargs["generation_config"]
+        assert config["response_schema"] == leetcode.RECOMMENDATION_SCHEMA
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
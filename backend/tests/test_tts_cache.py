@@ -0,0 +1,145 @@
+"""
+Unit tests for the TTS audio cache.
+
+Tests cover:
+- Content-addressed keys per (voice, rate, text)
+- Memory / disk / Redis tier promotion
+- Zero synthesis calls for repeated and pre-warmed phrases
+- Disk tier bounded by age and size (least recently used first)
+"""
+
+import os
+import time
+import base64
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+VOICE = "en-US-Journey-D"
+RATE = 1.1
+
+
+class TestTTSCache:
+    """Test suite for TTSCache tiers."""
+
+    def test_fingerprint_distinguishes_voice_rate_text(self):
+        """Test any change in voice, rate or text changes the key."""
+        from services.tts_cache import TTSCache
+        base = TTSCache.fingerprint(VOICE, RATE, "Hello")
+
+        assert base == TTSCache.fingerprint(VOICE, RATE, "Hello")
+        assert base != TTSCache.fingerprint("en-US-Other", RATE, "Hello")
+        assert base != TTSCache.fingerprint(VOICE, 1.0, "Hello")
+        assert base != TTSCache.fingerprint(VOICE, RATE, "Hello!")
+
+    def test_repeated_phrase_synthesized_once(self, tmp_path):
+        """Test second request is served without a TTS call."""
+        with patch('services.tts_cache.redis_manager') as mock_redis:
+            mock_redis.get_client.return_value = None
+
+            from services.tts_cache import TTSCache
+            cache = TTSCache(cache_dir=str(tmp_path))
+            synthesize = MagicMock(return_value=b"mp3-bytes")
+
+            first = cache.get_or_synthesize(VOICE, RATE, "Goodbye", synthesize)
+            second = cache.get_or_synthesize(VOICE, RATE, "Goodbye", synthesize)
+
+            assert first == second == b"mp3-bytes"
+            synthesize.assert_called_once_with("Goodbye")
+            assert cache.stats["memory_hits"] == 1
+
+    def test_disk_tier_survives_memory_loss(self, tmp_path):
+        """Test audio is recovered from disk after the process tier is dropped."""
+        with patch('services.tts_cache.redis_manager') as mock_redis:
+            mock_redis.get_client.return_value = None
+
+            from services.tts_cache import TTSCache
+            cache = TTSCache(cache_dir=str(tmp_path))
+            cache.set(VOICE, RATE, "Goodbye", b"mp3-bytes")
+            cache.clear_memory()
+
+            assert cache.get(VOICE, RATE, "Goodbye") == b"mp3-bytes"
+            assert cache.stats["disk_hits"] == 1
+
+    def test_redis_tier_hit_is_promoted(self, tmp_path):
+        """Test Redis hit is decoded and written to the faster tiers."""
+        with patch('services.tts_cache.redis_manager') as mock_redis:
+            mock_client = MagicMock()
+            mock_client.get.return_value = base64.b64encode(b"shared-mp3").decode("ascii")
+            mock_redis.get_client.return_value = mock_client
+
+            from services.tts_cache import TTSCache
+            cache = TTSCache(cache_dir=str(tmp_path))
+
+            assert cache.get(VOICE, RATE, "Goodbye") == b"shared-mp3"
+            mock_client.get.reset_mock()
+            assert cache.get(VOICE, RATE, "Goodbye") == b"shared-mp3"
+            mock_client.get.assert_not_called()
+
+    def test_empty_audio_not_cached(self, tmp_path):
+        """Test failed synthesis (empty bytes) is retried next time."""
+        with patch('services.tts_cache.redis_manager') as mock_redis:
+            mock_redis.get_client.return_value = None
+
+            from services.tts_cache import TTSCache
+            cache = TTSCache(cache_dir=str(tmp_path))
+            synthesize = MagicMock(return_value=b"")
+
+            cache.get_or_synthesize(VOICE, RATE, "Goodbye", synthesize)
+            cache.get_or_synthesize(VOICE, RATE, "Goodbye", synthesize)
+
+            assert synthesize.call_count == 2
+
+    def test_prewarm_skips_cached_phrases(self, tmp_path):
+        """Test pre-warm only synthesizes phrases that are missing."""
+        with patch('services.tts_cache.redis_manager') as mock_redis:
+            mock_redis.get_client.return_value = None
+
+            from services.tts_cache import TTSCache
+            cache = TTSCache(cache_dir=str(tmp_path))
+            cache.set(VOICE, RATE, "Already here", b"cached")
+            synthesize = MagicMock(side_effect=lambda text: text.encode())
+
+            count = cache.prewarm(VOICE, RATE, ["Already here", "New phrase"], synthesize)
+
+            assert count == 1
+            synthesize.assert_called_once_with("New phrase")
+
+    def test_memory_tier_is_bounded(self, tmp_path):
+        """Test LRU eviction keeps the in-process tier bounded."""
+        with patch('services.tts_cache.redis_manager') as mock_redis:
+            mock_redis.get_client.return_value = None
+
+            from services.tts_cache import TTSCache
+            cache = TTSCache(cache_dir=str(tmp_path), max_entries=2)
+            for text in ["a", "b", "c"]:
+                cache.set(VOICE, RATE, text, text.encode())
+
+            assert len(cache._memory) == 2
+
+    def test_disk_tier_is_bounded_by_size_and_age(self, tmp_path):
+        """Test stale clips expire and the least recently used go first past the size cap."""
+        with patch('services.tts_cache.redis_manager') as mock_redis:
+            mock_redis.get_client.return_value = None
+
+            from services.tts_cache import TTSCache
+            cache = TTSCache(cache_dir=str(tmp_path), max_bytes=250, max_age=3600)
+            for i, text in enumerate(["old", "a", "b"]):
+                cache.set(VOICE, RATE, text, b"x" * 100)
+                path = cache._disk_path(cache.fingerprint(VOICE, RATE, text))
+                os.utime(path, (1000 + i, 1000 + i) if text == "old" else None)
+
+            # "old" is past max_age; "a" is touched by a disk hit so "b" becomes least recent
+            assert not os.path.exists(cache._disk_path(cache.fingerprint(VOICE, RATE, "old")))
+            cache.clear_memory()
+            assert cache.get(VOICE, RATE, "a") == b"x" * 100
+            os.utime(cache._disk_path(cache.fingerprint(VOICE, RATE, "b")), (time.time() - 60,) * 2)
+            cache.set(VOICE, RATE, "c", b"x" * 100)
+
+            remaining = sorted(os.listdir(tmp_path))
+            assert len(remaining) == 2
+            assert not os.path.exists(cache._disk_path(cache.fingerprint(VOICE, RATE, "b")))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
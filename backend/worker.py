@@ -0,0 +1,61 @@
+"""
+Career Flow AI - Standalone Job Worker
+
+Runs background job handlers (resume generation, interview evaluation,
+quiz bank refills, queued auto-apply) without the HTTP API, so workers scale independently of API replicas.
+Requires REDIS_URL - the local backend is per-process and would never see
+jobs submitted by the API.
+
+Usage:
+    python worker.py
+
+Set JOB_WORKERS_IN_API=false on API replicas to keep them request-only.
+"""
+
+import signal
+import logging
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Worker")
+
+from core.redis_client import redis_manager
+from services.job_queue import job_queue
+from services.llm_cache import llm_cache, LLM_CACHE_REPORT_INTERVAL
+from agents.agent_4_operative.apply_queue import auto_apply_queue, browser_loop  # auto_apply
+
+# Importing the modules registers their job handlers
+import agents.agent_4_operative.service  # noqa: F401  resume_generation
+import agents.agent_5_mock_interview.graph  # noqa: F401  interview_evaluation
+import agents.agent_1_perception.quiz_bank  # noqa: F401  quiz_bank_refill
+
+
+def main() -> int:
+    if not redis_manager.get_client():
+        logger.error("❌ Redis unavailable - a standalone worker needs the shared Redis queue")
+        return 1
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    for queue in (job_queue, auto_apply_queue):
+        queue.start()
+        logger.info(f"👷 Worker running {queue.num_workers} threads on queue '{queue.name}'")
+    # Workers make most of the cached LLM calls; log their hit rates periodically
+    while not stop.wait(LLM_CACHE_REPORT_INTERVAL or None):
+        llm_cache.log_report()
+
+    logger.info("🛑 Worker shutting down")
+    job_queue.stop()
+    auto_apply_queue.stop()
+    browser_loop.stop()
+    llm_cache.log_report()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,6 +4,7 @@ import { useState, useEffect, useRef, useCallback, Suspense } from "react";
 import { useSearchParams } from "next/navigation";
 import { useSession } from "@/lib/SessionContext";
 import { useAuth } from "@/lib/AuthContext";
+import { waitForInterviewEvaluation } from "@/lib/api";
 import {
   Send,
   Loader2,
@@ -144,6 +145,11 @@ function TextInterviewContent() {
             timestamp: new Date(),
           },
         ]);
+      } else if (data.type === "evaluation_queued") {
+        // Evaluation runs in the background - poll until feedback is ready
+        waitForInterviewEvaluation(data.evaluation_id).then((report) =>
+          setFeedback(report as unknown as Feedback)
+        );
       } else if (data.type === "feedback") {
         setFeedback(data.data);
       } else if (data.type === "error") {
@@ -4,6 +4,14 @@ import { useState, useEffect, useRef, useCallback, Suspense } from "react";
 import { useSearchParams } from "next/navigation";
 import { useSession } from "@/lib/SessionContext";
 import { useAuth } from "@/lib/AuthContext";
+import { waitForInterviewEvaluation } from "@/lib/api";
+import {
+  supportedInputCodecs,
+  supportedOutputFormats,
+  createOpusSender,
+  toPcm16,
+  OpusSender,
+} from "@/lib/voiceCodec";
 import {
   Mic,
   MicOff,
@@ -94,6 +102,8 @@ function VoiceInterviewContent() {
   const isPlayingRef = useRef(false);
   const transcriptEndRef = useRef<HTMLDivElement>(null);
   const audioStateRef = useRef<AudioState>("idle");
+  const opusSenderRef = useRef<OpusSender | null>(null);
+  const audioMimeRef = useRef<string>("audio/mpeg");
 
   // Keep ref in sync with state
   useEffect(() => {
@@ -184,7 +194,9 @@ function VoiceInterviewContent() {
       if (event.data instanceof Blob) {
         // Audio data received - add to queue and play
         console.log("[Frontend] Received audio blob");
-        audioQueueRef.current.push(event.data);
+        audioQueueRef.current.push(
+          new Blob([event.data], { type: audioMimeRef.current })
+        );
         playNextAudio();
 
         setTranscript((prev) => {
@@ -209,8 +221,18 @@ function VoiceInterviewContent() {
 
           if (data.type === "config") {
             setJobTitle(data.job_title || "");
+            // Server picked the upstream codec - switch encoders if needed
+            if (data.input_codec === "opus" && wsRef.current) {
+              const ws = wsRef.current;
+              opusSenderRef.current = createOpusSender((packet) => {
+                if (ws.readyState === WebSocket.OPEN) ws.send(packet);
+              });
+            }
           } else if (data.type === "event") {
-            if (data.event === "audio_state") {
+            if (data.event === "audio_meta") {
+              // Precedes each audio clip
+              audioMimeRef.current = data.mime_type || "audio/mpeg";
+            } else if (data.event === "audio_state") {
               // Backend telling us what state to be in
               console.log(`[Frontend] Backend audio_state: ${data.state}`);
               setAudioState(data.state);
@@ -223,6 +245,11 @@ function VoiceInterviewContent() {
               setCurrentStage(data.stage as InterviewStage);
               setCurrentTurn((prev) => prev + 1);
             }
+          } else if (data.type === "evaluation_queued") {
+            // Evaluation runs in the background - poll until feedback is ready
+            waitForInterviewEvaluation(data.evaluation_id).then((report) =>
+              setFeedback(report as unknown as Feedback)
+            );
           } else if (data.type === "feedback") {
             setFeedback(data.data);
           } else if (data.type === "error") {
@@ -268,18 +295,21 @@ function VoiceInterviewContent() {
       processor.connect(audioContext.destination);
       processorRef.current = processor;
 
+      const inputCodecs = await supportedInputCodecs();
       const ws = new WebSocket(`${WS_URL}/ws/interview/${jobId}`);
       wsRef.current = ws;
 
       ws.onopen = () => {
         console.log("[Frontend] WebSocket connected");
 
-        // Send auth and config first
+        // Send auth and config first (codecs in preference order)
         ws.send(
           JSON.stringify({
             access_token: accessToken || "test",
             interview_type: interviewType,
             user_id: userId,
+            input_codecs: inputCodecs,
+            output_formats: supportedOutputFormats(),
           })
         );
 
@@ -294,12 +324,11 @@ function VoiceInterviewContent() {
             !isMuted
           ) {
             const inputData = e.inputBuffer.getChannelData(0);
-            const pcmData = new Int16Array(inputData.length);
-            for (let i = 0; i < inputData.length; i++) {
-              const s = Math.max(-1, Math.min(1, inputData[i]));
-              pcmData[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+            if (opusSenderRef.current) {
+              opusSenderRef.current.encode(inputData);
+            } else {
+              ws.send(toPcm16(inputData));
             }
-            ws.send(pcmData.buffer);
           }
         };
 
@@ -315,6 +344,8 @@ function VoiceInterviewContent() {
 
       ws.onclose = () => {
         console.log("WebSocket closed");
+        opusSenderRef.current?.close();
+        opusSenderRef.current = null;
         setIsConnected(false);
         setAudioState("idle");
       };
@@ -19,6 +19,16 @@ import {
   XCircle,
 } from "lucide-react";
 
+const RESUME_STAGE_LABELS: Record<string, string> = {
+  loading_resume: "Loading your resume...",
+  structuring: "Tailoring your experience to this job...",
+  rendering: "Laying out your resume...",
+  compiling: "Building the PDF...",
+  uploading: "Saving your resume...",
+  saving_profile: "Almost done...",
+  saving_application: "Almost done...",
+};
+
 export default function ApplyPage() {
   const params = useParams();
   const router = useRouter();
@@ -34,6 +44,7 @@ export default function ApplyPage() {
   const [resumeUrl, setResumeUrl] = useState<string | null>(null);
   const [isGeneratingResume, setIsGeneratingResume] = useState(false);
   const [resumeError, setResumeError] = useState<string | null>(null);
+  const [resumeStage, setResumeStage] = useState<string | null>(null);
 
   // State for copied indicators
   const [copied, setCopied] = useState<string | null>(null);
@@ -127,6 +138,7 @@ export default function ApplyPage() {
 
     setIsGeneratingResume(true);
     setResumeError(null);
+    setResumeStage(null);
 
     try {
       // Build job description for the API
@@ -141,7 +153,7 @@ Platform: ${job.platform || ""}
 Location: ${job.location || ""}
       `.trim();
 
-      const result = await generateTailoredResume(jobDescription, job.id);
+      const result = await generateTailoredResume(jobDescription, job.id, setResumeStage);
 
       if (result.success && result.pdf_url) {
         setResumeUrl(result.pdf_url);
@@ -182,7 +194,7 @@ Location: ${job.location || ""}
         skills: (profile.skills || []).join(", "),
       };
 
-      const result = await autoApplyToJob(job.link, userData);
+      const result = await autoApplyToJob(job.link, userData, job.id);
 
       setAutoApplyResult({
         success: result.success,
@@ -382,8 +394,9 @@ Location: ${job.location || ""}
               {isGeneratingResume && (
                 <div className="mt-4 p-4 rounded-lg bg-blue-50 border border-blue-200">
                   <p className="text-sm text-blue-700">
-                    ⏳ This may take 15-30 seconds. We&apos;re analyzing your
-                    resume and optimizing it for this specific job...
+                    ⏳ {resumeStage && RESUME_STAGE_LABELS[resumeStage]
+                      ? RESUME_STAGE_LABELS[resumeStage]
+                      : "This may take 15-30 seconds. We're analyzing your resume and optimizing it for this specific job..."}
                   </p>
                 </div>
               )}
@@ -515,35 +515,231 @@ export async function interviewChat(
   return response.data;
 }
 
+export interface InterviewEvaluationStatus {
+  evaluation_id: string;
+  status: "queued" | "running" | "retrying" | "succeeded" | "failed";
+  attempts: number;
+  feedback: Record<string, unknown> | null;
+  error: string | null;
+}
+
+export async function getInterviewEvaluation(
+  evaluationId: string
+): Promise<InterviewEvaluationStatus> {
+  const response = await api.get<InterviewEvaluationStatus>(
+    `/api/interview/evaluations/${evaluationId}`
+  );
+  return response.data;
+}
+
+/**
+ * Poll a background interview evaluation until it finishes.
+ * Resolves with the feedback report (or a fallback report on failure/timeout).
+ */
+export async function waitForInterviewEvaluation(
+  evaluationId: string,
+  intervalMs: number = 2000,
+  timeoutMs: number = 180000
+): Promise<Record<string, unknown>> {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    try {
+      const status = await getInterviewEvaluation(evaluationId);
+      if (status.status === "succeeded" && status.feedback) {
+        return status.feedback;
+      }
+      if (status.status === "failed") {
+        return {
+          score: 0,
+          verdict: "Evaluation Error",
+          summary: status.error || "An error occurred during evaluation. Please try again.",
+        };
+      }
+    } catch (e) {
+      console.error("Error polling evaluation:", e);
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+  return {
+    score: 0,
+    verdict: "Unable to evaluate",
+    summary: "Evaluation is taking longer than expected. Check your interview history shortly.",
+  };
+}
+
+export interface ResumeJobStatus {
+  job_id: string;
+  status: "queued" | "running" | "retrying" | "succeeded" | "failed";
+  attempts: number;
+  stage: string | null;
+  timings: Record<string, number>;
+  result: GenerateTailoredResumeResponse | null;
+  error: string | null;
+}
+
+export async function getResumeJob(jobId: string): Promise<ResumeJobStatus> {
+  const response = await api.get<ResumeJobStatus>(
+    `/agent4/generate-resume/jobs/${jobId}`
+  );
+  return response.data;
+}
+
+/**
+ * Follow a resume job over SSE (fetch-based so the JWT header is sent).
+ * Resolves with the terminal status, or null if the stream dropped early.
+ */
+async function streamResumeJob(
+  jobId: string,
+  onStage?: (stage: string) => void
+): Promise<ResumeJobStatus | null> {
+  const {
+    data: { session },
+  } = await supabase.auth.getSession();
+  const res = await fetch(
+    `${API_BASE_URL}/agent4/generate-resume/jobs/${jobId}/events`,
+    { headers: { Authorization: `Bearer ${session?.access_token}` } }
+  );
+  if (!res.ok || !res.body) return null;
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) return null;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) >= 0) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = block.match(/^event: (.+)$/m)?.[1];
+      const data = block.match(/^data: (.+)$/m)?.[1];
+      if (!event || !data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === "progress") {
+        onStage?.(payload.stage);
+      } else {
+        reader.cancel();
+        return payload as ResumeJobStatus;
+      }
+    }
+  }
+}
+
 /**
  * Generate a tailored resume for a specific job using Agent 4's LaTeX engine.
  * This is user-triggered (not part of cron job) to avoid heavy processing.
+ *
+ * The work runs as a background job: we submit, then follow stage progress
+ * over SSE (falling back to polling), so no request waits on the full pipeline.
  */
 export async function generateTailoredResume(
   jobDescription: string,
-  jobId?: string
+  jobId?: string,
+  onStage?: (stage: string) => void,
+  timeoutMs: number = 180000
 ): Promise<GenerateTailoredResumeResponse> {
-  const response = await api.post("/agent4/generate-resume", {
-    job_description: jobDescription,
-    job_id: jobId,
-  });
-  return response.data as GenerateTailoredResumeResponse;
+  const submitted = await api.post<{ job_id: string }>(
+    "/agent4/generate-resume/jobs",
+    { job_description: jobDescription, job_id: jobId }
+  );
+  const resumeJobId = submitted.data.job_id;
+
+  let status: ResumeJobStatus | null = null;
+  try {
+    status = await streamResumeJob(resumeJobId, onStage);
+  } catch (e) {
+    console.error("Resume job stream failed, polling instead:", e);
+  }
+
+  const deadline = Date.now() + timeoutMs;
+  while (
+    (!status || (status.status !== "succeeded" && status.status !== "failed")) &&
+    Date.now() < deadline
+  ) {
+    await new Promise((resolve) => setTimeout(resolve, 2000));
+    status = await getResumeJob(resumeJobId);
+    if (status.stage) onStage?.(status.stage);
+  }
+
+  if (status?.status === "succeeded" && status.result) {
+    return status.result;
+  }
+  return {
+    success: false,
+    status: "error",
+    user_id: "",
+    original_profile: {},
+    optimized_resume: {},
+    pdf_path: "",
+    pdf_url: "",
+    application_status: "failed",
+    processing_time_ms: 0,
+    message:
+      status?.error ||
+      "Resume generation is taking longer than expected. Please try again shortly.",
+  };
+}
+
+export interface AutoApplyJobStatus {
+  job_id: string;
+  status: "queued" | "running" | "retrying" | "succeeded" | "failed";
+  job_url: string;
+  attempts: number;
+  deferrals: number;
+  stage: string | null;
+  result: AutoApplyResponse | null;
+  error: string | null;
+}
+
+export async function getAutoApplyJob(jobId: string): Promise<AutoApplyJobStatus> {
+  const response = await api.get<AutoApplyJobStatus>(
+    `/agent4/auto-apply/jobs/${jobId}`
+  );
+  return response.data;
 }
 
 /**
  * Auto-fill a job application form using browser automation.
- * Opens a visible browser, clicks Apply, and fills form fields.
+ * Opens a browser, clicks Apply, and fills form fields.
  * Does NOT submit - user must review and submit manually.
+ *
+ * The application is queued (job boards are rate limited per site), so we
+ * submit and then poll until it settles.
  */
 export async function autoApplyToJob(
   jobUrl: string,
-  userData: Record<string, string>
+  userData: Record<string, string>,
+  jobId?: string,
+  timeoutMs: number = 900000
 ): Promise<AutoApplyResponse> {
-  const response = await api.post<AutoApplyResponse>("/agent4/auto-apply", {
+  const submitted = await api.post<{ job_id: string }>("/agent4/auto-apply/jobs", {
     job_url: jobUrl,
     user_data: userData,
+    job_id: jobId,
   });
-  return response.data;
+  const applyJobId = submitted.data.job_id;
+
+  const deadline = Date.now() + timeoutMs;
+  let status: AutoApplyJobStatus | null = null;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, 3000));
+    status = await getAutoApplyJob(applyJobId);
+    if (status.status === "succeeded" || status.status === "failed") break;
+  }
+
+  if (status?.status === "succeeded" && status.result) {
+    return status.result;
+  }
+  return {
+    success: false,
+    job_url: jobUrl,
+    message:
+      status?.error ||
+      "Auto-apply is still queued. Check your applications shortly.",
+  };
 }
 
 export async function generateKit(
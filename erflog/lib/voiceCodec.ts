@@ -0,0 +1,110 @@
+"use client";
+
+// Codec negotiation helpers for the voice interview WebSocket.
+// Must stay in sync with backend/services/audio_codec.py.
+
+export type InputCodec = "opus" | "pcm";
+export type OutputFormat = "ogg_opus" | "mp3" | "linear16";
+
+export const VOICE_SAMPLE_RATE = 16000;
+const OPUS_BITRATE = 24000;
+
+/** Upstream codecs this browser can produce, in preference order. */
+export async function supportedInputCodecs(): Promise<InputCodec[]> {
+  if (typeof AudioEncoder === "undefined") return ["pcm"];
+  try {
+    const { supported } = await AudioEncoder.isConfigSupported({
+      codec: "opus",
+      sampleRate: VOICE_SAMPLE_RATE,
+      numberOfChannels: 1,
+      bitrate: OPUS_BITRATE,
+    });
+    return supported ? ["opus", "pcm"] : ["pcm"];
+  } catch {
+    return ["pcm"];
+  }
+}
+
+/** Downstream formats this browser can play, in preference order. */
+export function supportedOutputFormats(): OutputFormat[] {
+  const probe = typeof Audio !== "undefined" ? new Audio() : null;
+  const formats: OutputFormat[] = [];
+  if (probe?.canPlayType('audio/ogg; codecs="opus"')) formats.push("ogg_opus");
+  formats.push("mp3");
+  return formats;
+}
+
+/** RMS of a float frame in int16 units (matches the server's silence threshold). */
+export function frameLevel(samples: Float32Array): number {
+  let sum = 0;
+  for (let i = 0; i < samples.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[i])) * 0x7fff;
+    sum += s * s;
+  }
+  return samples.length ? Math.sqrt(sum / samples.length) : 0;
+}
+
+/** Convert a float frame to LINEAR16 PCM. */
+export function toPcm16(samples: Float32Array): ArrayBuffer {
+  const pcm = new Int16Array(samples.length);
+  for (let i = 0; i < samples.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[i]));
+    pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+  }
+  return pcm.buffer;
+}
+
+export interface OpusSender {
+  encode: (samples: Float32Array) => void;
+  close: () => void;
+}
+
+/**
+ * Encode microphone frames to Opus and send one packet per message,
+ * prefixed with the level of the frame it came from (uint16, big-endian).
+ */
+export function createOpusSender(send: (data: ArrayBuffer) => void): OpusSender {
+  // Level of each submitted frame, keyed by its timestamp (microseconds)
+  const levels: { timestamp: number; level: number }[] = [];
+  let timestamp = 0;
+
+  const encoder = new AudioEncoder({
+    output: (chunk) => {
+      while (levels.length > 1 && levels[1].timestamp <= chunk.timestamp) {
+        levels.shift();
+      }
+      const level = Math.min(0xffff, Math.round(levels[0]?.level ?? 0));
+      const message = new Uint8Array(2 + chunk.byteLength);
+      new DataView(message.buffer).setUint16(0, level, false);
+      chunk.copyTo(message.subarray(2));
+      send(message.buffer);
+    },
+    error: (e) => console.error("[Frontend] Opus encoder error:", e),
+  });
+  encoder.configure({
+    codec: "opus",
+    sampleRate: VOICE_SAMPLE_RATE,
+    numberOfChannels: 1,
+    bitrate: OPUS_BITRATE,
+  });
+
+  return {
+    encode: (samples: Float32Array) => {
+      levels.push({ timestamp, level: frameLevel(samples) });
+      const data = new AudioData({
+        format: "f32",
+        sampleRate: VOICE_SAMPLE_RATE,
+        numberOfFrames: samples.length,
+        numberOfChannels: 1,
+        timestamp,
+        data: new Float32Array(samples),
+      });
+      encoder.encode(data);
+      data.close();
+      timestamp += Math.round((samples.length / VOICE_SAMPLE_RATE) * 1e6);
+    },
+    close: () => {
+      if (encoder.state !== "closed") encoder.close();
+    },
+  };
+}